@@ -1,6 +1,7 @@
 import logging
 import os
 import json
+import time
 from flask import Flask, send_from_directory, jsonify, request, render_template, url_for
 from flask_cors import CORS
 from flask_migrate import Migrate
@@ -21,6 +22,7 @@ def get_plugin_manager():
 
 def create_app():
     """Create and configure the Flask application."""
+    startup_start = time.perf_counter()
     app = Flask(__name__, 
                 template_folder='../templates',
                 static_folder='../static',
@@ -46,7 +48,8 @@ def create_app():
         r"/*": {
             "origins": ["http://localhost:8080", "http://localhost:3000", "http://127.0.0.1:3000", "http://127.0.0.1:8080"],  # Autoriser les deux ports et leurs équivalents 127.0.0.1
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "HX-Request", "HX-Current-URL", "HX-Target", "HX-Trigger"],
+            "allow_headers": ["Content-Type", "HX-Request", "HX-Current-URL", "HX-Target", "HX-Trigger", "X-MysterAI-Trace"],
+            "expose_headers": ["X-MysterAI-Trace-Id", "Server-Timing"],
             "supports_credentials": True
         }
     })
@@ -60,19 +63,9 @@ def create_app():
     # Route pour servir les images des géocaches
     @app.route('/geocaches_images/<gc_code>/<filename>')
     def serve_geocache_image(gc_code, filename):
-        logger.debug(f"Tentative d'accès à l'image: {gc_code}/{filename}")
-        try:
-            # Construire le chemin complet
-            full_path = os.path.join(app.images_folder, gc_code, filename)
-            logger.debug(f"Chemin complet: {full_path}")
-            logger.debug(f"Le fichier existe: {os.path.exists(full_path)}")
-            
-            # Obtenir le répertoire contenant l'image et le nom du fichier
-            directory = os.path.dirname(full_path)
-            return send_from_directory(directory=directory, path=filename)
-        except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de l'image: {str(e)}")
-            return f"Erreur: {str(e)}", 404
+        # Importer ici pour éviter l'importation circulaire
+        from app.routes.geocaches import send_geocache_image
+        return send_geocache_image(f"{gc_code}/{filename}", request.args.get('size'))
 
     # Enregistrer tous les blueprints
     try:
@@ -85,6 +78,10 @@ def create_app():
         print(f"Erreur lors de l'enregistrement des blueprints : {e}")
         raise
 
+    # Traçage des requêtes (activé par en-tête ou échantillonnage)
+    from app.services.tracing_service import init_tracing
+    init_tracing(app)
+
     # Création des tables si elles n'existent pas
     with app.app_context():
         db.create_all()
@@ -153,10 +150,25 @@ def create_app():
         # Initialisation du gestionnaire de plugins
         logger.info("Initializing PluginManager...")
         plugins_dir = os.path.join(app.config['BASEDIR'], 'plugins')
+        # Le constructeur découvre et enregistre déjà les plugins (import différé)
         app.plugin_manager = PluginManager(plugins_dir, app)
-        logger.info("Loading plugins...")
-        app.plugin_manager.load_plugins()
         logger.info("PluginManager initialized.")
+
+        # Rechargement à chaud des plugins (si PLUGIN_HOT_RELOAD est activé)
+        from app.services.plugin_watcher import start_plugin_watcher
+        start_plugin_watcher(app)
+
+        # Index de recherche plein texte (tables, triggers et indexation initiale en arrière-plan)
+        from app.services.search_index_service import init_search_index
+        init_search_index(app)
+
+        # File de tâches de fond : démarrée à la première requête servie par le processus
+        from app.services.job_queue_service import register_job_queue
+        register_job_queue(app)
+
+        # Index des alphabets (rafraîchi ensuite sur changement des dates de modification)
+        from app.services.alphabet_catalog_service import get_alphabet_catalog
+        logger.info(f"Alphabet catalog loaded: {len(get_alphabet_catalog().list())} alphabets")
         
         # Préchargement des paramètres de l'application
         try:
@@ -178,4 +190,5 @@ def create_app():
         except Exception as e:
             logger.error(f"Error preloading application settings: {str(e)}")
 
+    logger.info(f"Application started in {(time.perf_counter() - startup_start) * 1000:.1f} ms")
     return app
@@ -90,6 +90,13 @@ class Config:
     # Configuration du logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+    # Traçage des requêtes : proportion de requêtes tracées automatiquement (0 = uniquement sur en-tête X-MysterAI-Trace)
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0'))
+
+    # Rechargement à chaud des plugins modifiés sur disque (inotify via watchdog, sinon scrutation des mtimes)
+    PLUGIN_HOT_RELOAD = os.getenv('PLUGIN_HOT_RELOAD', '0').lower() in ('1', 'true', 'yes', 'on')
+    PLUGIN_HOT_RELOAD_INTERVAL = float(os.getenv('PLUGIN_HOT_RELOAD_INTERVAL', '1.0'))
+
     # Configuration de l'API OpenAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o')
@@ -1,11 +1,13 @@
 from app.models.app_config import AppConfig
 from app.models.plugin_model import Plugin
+from app.models.plugin_result_model import PluginResult
 from app.models.geocache import Zone, Geocache, AdditionalWaypoint, Attribute, GeocacheAttribute, Checker, Note, GeocacheNote
 from app.models.config_manager import ConfigManager
 
 __all__ = [
     'AppConfig', 
     'Plugin',
+    'PluginResult',
     'Zone',
     'Geocache',
     'AdditionalWaypoint',
@@ -7,6 +7,7 @@ from bs4 import BeautifulSoup
 from flask import url_for, current_app
 import os
 from sqlalchemy import inspect
+from app.utils.coordinates import convert_gc_coords_to_decimal
 
 def decimal_to_dm(decimal_degrees):
     """Convertit des degrés décimaux en degrés et minutes décimales"""
@@ -28,32 +29,7 @@ def gc_coords_to_decimal(gc_lat, gc_lon):
     Retourne:
     - (latitude_decimal, longitude_decimal) ou (None, None) en cas d'erreur
     """
-    try:
-        lat_decimal = None
-        lon_decimal = None
-        
-        if gc_lat and gc_lon:
-            # Latitude
-            lat_parts = gc_lat.split('°')
-            if len(lat_parts) == 2:
-                lat_deg = float(lat_parts[0].replace('N', '').replace('S', '').strip())
-                lat_min = float(lat_parts[1].strip())
-                lat_decimal = lat_deg + (lat_min / 60)
-                if 'S' in gc_lat:
-                    lat_decimal = -lat_decimal
-            
-            # Longitude
-            lon_parts = gc_lon.split('°')
-            if len(lon_parts) == 2:
-                lon_deg = float(lon_parts[0].replace('E', '').replace('W', '').strip())
-                lon_min = float(lon_parts[1].strip())
-                lon_decimal = lon_deg + (lon_min / 60)
-                if 'W' in gc_lon:
-                    lon_decimal = -lon_decimal
-        
-        return lat_decimal, lon_decimal
-    except Exception:
-        return None, None
+    return convert_gc_coords_to_decimal(gc_lat, gc_lon)
 
 class Zone(db.Model):
     __table_args__ = {'extend_existing': True}
@@ -255,6 +231,11 @@ class GeocacheImage(db.Model):
     def url(self):
         # Utiliser la route pour servir l'image avec le code GC
         return url_for('geocaches.serve_image', filename=f'{self.geocache.gc_code}/{self.filename}')
+    
+    @property
+    def thumbnail_url(self):
+        # Variante réduite pour la galerie (l'original est servi tant qu'elle n'est pas générée)
+        return url_for('geocaches.serve_image', filename=f'{self.geocache.gc_code}/{self.filename}', size='thumb')
         
     @property
     def name(self):
@@ -0,0 +1,62 @@
+# models/plugin_result_model.py
+
+from datetime import datetime, timezone
+from app.database import db
+
+class PluginResult(db.Model):
+    """
+    Résultat d'un plugin pour une géocache, conservé pour ne pas recalculer
+    la même analyse à chaque ouverture du solveur.
+
+    Une ligne par (géocache, plugin, version du plugin, empreinte des entrées).
+    Le résultat complet est stocké en JSON compressé (zlib) ; le résumé du
+    scoring et les coordonnées détectées sont des colonnes indexées.
+    """
+    __tablename__ = 'plugin_result'
+
+    id = db.Column(db.Integer, primary_key=True)
+    geocache_id = db.Column(db.Integer, db.ForeignKey('geocache.id'), nullable=False)
+    plugin_name = db.Column(db.String(128), nullable=False)
+    plugin_version = db.Column(db.String(32), nullable=False)
+    input_hash = db.Column(db.String(40), nullable=False)
+    result_data = db.Column(db.LargeBinary, nullable=False)
+    result_size = db.Column(db.Integer)  # Taille du JSON non compressé
+    confidence = db.Column(db.Float)
+    confidence_level = db.Column(db.String(16))
+    has_coordinates = db.Column(db.Boolean, default=False, nullable=False)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    coordinates_ddm = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    geocache = db.relationship('Geocache', backref=db.backref('plugin_results', lazy='dynamic',
+                                                              cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.UniqueConstraint('geocache_id', 'plugin_name', 'plugin_version', 'input_hash', name='_plugin_result_uc'),
+        db.Index('ix_plugin_result_confidence', 'plugin_name', 'confidence'),
+        db.Index('ix_plugin_result_coordinates', 'has_coordinates', 'confidence'),
+        db.Index('ix_plugin_result_version', 'plugin_name', 'plugin_version'),
+    )
+
+    def to_dict(self):
+        """Résumé sans le résultat complet."""
+        return {
+            'id': self.id,
+            'geocache_id': self.geocache_id,
+            'plugin_name': self.plugin_name,
+            'plugin_version': self.plugin_version,
+            'input_hash': self.input_hash,
+            'confidence': self.confidence,
+            'confidence_level': self.confidence_level,
+            'has_coordinates': self.has_coordinates,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'coordinates_ddm': self.coordinates_ddm,
+            'result_size': self.result_size,
+            'stored_size': len(self.result_data) if self.result_data is not None else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<PluginResult {self.plugin_name} v{self.plugin_version} geocache={self.geocache_id}>'
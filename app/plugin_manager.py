@@ -1,9 +1,13 @@
 import os
 import json
+import hashlib
 import subprocess
+import threading
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 from loguru import logger
 
@@ -11,6 +15,9 @@ from loguru import logger
 from app.models.plugin_model import Plugin
 from app import db  # Utiliser l'instance de db de l'application
 from app.services.scoring_service import get_scoring_service
+from app.services.metrics_service import UNKNOWN_PLUGIN, get_metrics_service
+from app.services.tracing_service import tracer
+from app.utils.text_view import TextView, strip_accents, text_view
 
 
 # ============================================================
@@ -89,13 +96,53 @@ class PythonPluginWrapper(PluginInterface):
         self.plugin_path = plugin_path
         self.metadata = metadata
         self._module = None  # On stockera ici le module Python importé
-        self._instance = None  # Si on a besoin d'instancier une classe
+        self._loaded_instance = None  # Instance de la classe du plugin, créée au premier usage
+        self._import_attempted = False
+        # Sérialise l'import : plusieurs requêtes peuvent demander le plugin en même temps
+        self._import_lock = threading.Lock()
         self.plugin_manager = plugin_manager
 
-    def initialize(self) -> bool:
+    def initialize(self, lazy: bool = True) -> bool:
+        """
+        Prépare le plugin. En mode lazy, vérifie seulement la présence du point
+        d'entrée : le module sera importé au premier appel de execute/check_code.
+        """
+        entry_file = os.path.join(self.plugin_path, self.metadata.entry_point)
+        if not os.path.exists(entry_file):
+            logger.error(f"Entry point file not found: {entry_file}")
+            return False
+        if lazy:
+            return True
+        with self._import_lock:
+            return self._import_plugin()
+
+    @property
+    def is_imported(self) -> bool:
+        return self._loaded_instance is not None
+
+    @property
+    def _instance(self):
+        """Instance du plugin, importée à la demande (utilisée aussi par metadetection)."""
+        instance = self._loaded_instance
+        if instance is None:
+            # Les threads concurrents attendent la fin de l'import au lieu de recevoir None
+            with self._import_lock:
+                if self._loaded_instance is None and not self._import_attempted:
+                    self._import_plugin()
+                instance = self._loaded_instance
+        return instance
+
+    @_instance.setter
+    def _instance(self, value):
+        self._loaded_instance = value
+        self._import_attempted = value is not None
+
+    def _import_plugin(self) -> bool:
         """
         Charge le module Python et instancie la classe du plugin.
         """
+        self._import_attempted = True
+        start_time = time.perf_counter()
         try:
             entry_file = os.path.join(self.plugin_path, self.metadata.entry_point)
             if not os.path.exists(entry_file):
@@ -110,28 +157,31 @@ class PythonPluginWrapper(PluginInterface):
             self._module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(self._module)  # Charge le module
 
+            instance = None
             # Chercher la classe du plugin
             expected_class_name = f"{self.metadata.name.title().replace('_', '')}Plugin"
             if hasattr(self._module, expected_class_name):
                 cls = getattr(self._module, expected_class_name)
-                self._instance = cls()
+                instance = cls()
             else:
                 # Chercher n'importe quelle classe qui se termine par 'Plugin'
                 for attr_name in dir(self._module):
                     if attr_name.endswith('Plugin'):
                         cls = getattr(self._module, attr_name)
                         if isinstance(cls, type):  # Vérifier que c'est bien une classe
-                            self._instance = cls()
+                            instance = cls()
                             break
 
-            if not self._instance:
+            if not instance:
                 logger.error(f"No plugin class found in {entry_file}")
                 return False
 
             # Injecter le plugin_manager si le plugin le supporte
-            if hasattr(self._instance, 'set_plugin_manager') and self.plugin_manager:
-                self._instance.set_plugin_manager(self.plugin_manager)
+            if hasattr(instance, 'set_plugin_manager') and self.plugin_manager:
+                instance.set_plugin_manager(self.plugin_manager)
 
+            self._loaded_instance = instance
+            logger.debug(f"Plugin {self.metadata.name} importé en {(time.perf_counter() - start_time) * 1000:.1f} ms")
             return True
         except Exception as e:
             logger.error(f"Failed to initialize Python plugin {self.metadata.name}: {e}")
@@ -141,18 +191,36 @@ class PythonPluginWrapper(PluginInterface):
         """
         Exécute la méthode 'execute' du plugin.
         """
-        if not self._instance:
+        instance = self._instance
+        if not instance:
             raise RuntimeError("Plugin not initialized or class not found.")
 
-        if hasattr(self._instance, 'execute'):
-            return self._instance.execute(inputs)
+        if hasattr(instance, 'execute'):
+            return instance.execute(inputs)
         else:
             raise NotImplementedError("Plugin class must implement 'execute' method.")
 
+    def check_code(self, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Appelle la méthode 'check_code' du plugin (import à la demande).
+        """
+        instance = self._instance
+        if not instance:
+            raise RuntimeError("Plugin not initialized or class not found.")
+
+        if hasattr(instance, 'check_code'):
+            # Les plugins reçoivent toujours des chaînes, jamais de TextView
+            args = [str(arg) if isinstance(arg, TextView) else arg for arg in args]
+            kwargs = {key: str(value) if isinstance(value, TextView) else value for key, value in kwargs.items()}
+            return instance.check_code(*args, **kwargs)
+        raise NotImplementedError(f"Plugin {self.metadata.name} does not implement 'check_code'.")
+
     def cleanup(self) -> bool:
         # Ici, on peut faire du nettoyage si besoin
-        self._module = None
-        self._instance = None
+        with self._import_lock:
+            self._module = None
+            self._loaded_instance = None
+            self._import_attempted = False
         return True
 
 
@@ -187,7 +255,97 @@ class BinaryPluginWrapper(PluginInterface):
         return True
 
 # ============================================================
-# 4. Le PluginManager
+# 4. Cache des manifestes plugin.json
+# ============================================================
+
+MANIFEST_CACHE_FILENAME = '.manifest_cache.json'
+
+
+class PluginManifestCache:
+    """
+    Cache persistant des plugin.json, indexé par chemin.
+
+    Chaque entrée conserve le mtime, la taille et l'empreinte SHA-1 du fichier :
+    un manifeste dont le mtime et la taille n'ont pas bougé n'est ni relu ni
+    reparsé, et un fichier simplement « touché » (même empreinte) n'est pas
+    considéré comme modifié.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get('entries'), dict):
+                self._entries = data['entries']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache des manifestes illisible, reconstruction: {e}")
+            self._entries = {}
+
+    def read(self, manifest_path: str):
+        """
+        Retourne (plugin_info, changed) pour un plugin.json.
+        `changed` vaut True si le contenu diffère de celui mis en cache.
+        """
+        stat = os.stat(manifest_path)
+        entry = self._entries.get(manifest_path)
+        if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            return dict(entry['info']), False
+
+        with open(manifest_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if entry and entry.get('sha1') == digest:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            self._dirty = True
+            return dict(entry['info']), False
+
+        info = json.loads(raw.decode('utf-8'))
+        self._entries[manifest_path] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': digest,
+            'info': info,
+        }
+        self._dirty = True
+        return dict(info), True
+
+    def prune(self, manifest_paths):
+        """Supprime les entrées des manifestes qui n'existent plus."""
+        for path in list(self._entries):
+            if path not in manifest_paths:
+                del self._entries[path]
+                self._dirty = True
+
+    def discard(self, manifest_path: str):
+        """Oublie l'entrée d'un manifeste supprimé."""
+        if self._entries.pop(manifest_path, None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """Écrit le cache sur disque (remplacement atomique), seulement s'il a changé."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': self._entries}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire le cache des manifestes {self.cache_path}: {e}")
+
+
+# ============================================================
+# 5. Le PluginManager
 # ============================================================
 
 class PluginManager:
@@ -201,21 +359,32 @@ class PluginManager:
         self.loaded_plugins: Dict[str, PluginInterface] = {}
         self._plugin_cache: Dict[str, Dict] = {}  # Cache des métadonnées
         self._loading_errors: Dict[str, str] = {}  # Stockage des erreurs
+        self._manifest_cache = PluginManifestCache(os.path.join(plugins_dir, MANIFEST_CACHE_FILENAME))
+        self._reload_listeners: List = []  # Callbacks (nom, ancienne version, nouvelle version)
         
         if app:
+            start_time = time.perf_counter()
             with app.app_context():
                 self.discover_plugins()
                 self.load_plugins()
+            logger.info(
+                f"Plugins prêts en {(time.perf_counter() - start_time) * 1000:.1f} ms "
+                f"({len(self.loaded_plugins)} enregistrés, import à la première utilisation)"
+            )
 
     def discover_plugins(self):
         """
         Scanne le répertoire `self.plugins_dir` pour trouver
         tous les plugin.json et mettre à jour la base de données.
+        Seuls les manifestes nouveaux ou modifiés (cf. PluginManifestCache)
+        sont reparsés et réécrits en base.
         Supprime également les plugins qui n'existent plus physiquement.
         Retourne la liste des dict infos plugin découverts.
         """
         discovered_plugins = []
         discovered_paths = set()  # Pour garder une trace des chemins de plugins valides
+        manifest_paths = set()
+        changed_plugins = set()
         logger.debug(f"Scanning for plugins in: {self.plugins_dir}")
         
         for root, _, files in os.walk(self.plugins_dir):
@@ -223,36 +392,57 @@ class PluginManager:
                 plugin_json_path = os.path.join(root, 'plugin.json')
                 plugin_dir = os.path.dirname(plugin_json_path)
                 discovered_paths.add(plugin_dir)  # Ajoute le chemin aux chemins découverts
-                logger.debug(f"Found plugin.json at: {plugin_json_path}")
+                manifest_paths.add(plugin_json_path)
                 try:
-                    with open(plugin_json_path, 'r', encoding='utf-8') as f:
-                        plugin_info = json.load(f)
-                        plugin_info['path'] = plugin_dir
-                        logger.debug(f"Loading plugin: {plugin_info['name']} from {plugin_info['path']}")
-                        self._update_plugin_in_db(plugin_info)
-                        discovered_plugins.append(plugin_info)
+                    plugin_info, changed = self._manifest_cache.read(plugin_json_path)
+                    plugin_info['path'] = plugin_dir
+                    if changed:
+                        logger.debug(f"Manifest changed: {plugin_info['name']} from {plugin_info['path']}")
+                        changed_plugins.add(plugin_info['name'])
+                    discovered_plugins.append(plugin_info)
+                    self._plugin_cache[plugin_info['name']] = plugin_info
                 except Exception as e:
                     logger.error(f"Failed loading {plugin_json_path}: {e}")
-        
+
+        self._manifest_cache.prune(manifest_paths)
+        self._manifest_cache.save()
+
+        # Synchronisation de la base : une seule requête, écritures limitées aux manifestes modifiés
+        try:
+            existing_plugins = {plugin.name: plugin for plugin in Plugin.query.all()}
+        except Exception as e:
+            logger.error(f"Failed to read plugins from DB: {e}")
+            existing_plugins = {}
+
+        for plugin_info in discovered_plugins:
+            name = plugin_info['name']
+            if name not in existing_plugins or name in changed_plugins:
+                self._update_plugin_in_db(plugin_info, force=name in changed_plugins)
+
         # Nettoyage des plugins qui n'existent plus
         try:
-            all_plugins = Plugin.query.all()
-            for plugin in all_plugins:
+            deleted = False
+            for plugin in existing_plugins.values():
                 if plugin.path not in discovered_paths:
                     logger.debug(f"Removing plugin {plugin.name} as its directory no longer exists: {plugin.path}")
                     db.session.delete(plugin)
-            db.session.commit()
+                    self._plugin_cache.pop(plugin.name, None)
+                    deleted = True
+            if deleted:
+                db.session.commit()
         except Exception as e:
             db.session.rollback()
             logger.error(f"Failed to clean up deleted plugins: {e}")
                     
-        logger.info(f"Total plugins discovered: {len(discovered_plugins)}")
+        logger.info(f"Total plugins discovered: {len(discovered_plugins)} ({len(changed_plugins)} manifestes modifiés)")
         return discovered_plugins
 
-    def _update_plugin_in_db(self, plugin_info: dict):
+    def _update_plugin_in_db(self, plugin_info: dict, force: bool = False):
         """
         Met à jour ou crée un plugin dans la base de données.
         Ne crée une nouvelle entrée que si le plugin n'existe pas déjà.
+        :param force: met à jour l'entrée même si la version n'a pas changé
+                      (manifeste modifié sur disque)
         """
         try:
             # Vérifie si le plugin existe déjà avec le même nom
@@ -260,8 +450,8 @@ class PluginManager:
 
             if existing_plugin:
                 logger.debug(f"Plugin {plugin_info['name']} already exists in DB")
-                # On ne met à jour que si la version est différente
-                if existing_plugin.version != plugin_info['version']:
+                # On ne met à jour que si la version (ou le manifeste) est différente
+                if force or existing_plugin.version != plugin_info['version']:
                     logger.debug(f"Updating plugin version from {existing_plugin.version} to {plugin_info['version']}")
                     existing_plugin.version = plugin_info['version']
                     existing_plugin.description = plugin_info.get('description', '')
@@ -302,7 +492,8 @@ class PluginManager:
 
     def load_plugins(self, only_enabled: bool = True):
         """
-        Charge en mémoire (initialize) tous les plugins présents en DB.
+        Enregistre tous les plugins présents en DB sous forme de wrappers.
+        Les modules Python ne sont importés qu'au premier execute/check_code.
         Si only_enabled=True, ne charge que ceux qui sont enabled.
         """
         logger.debug(f"Loading plugins (only_enabled={only_enabled})")
@@ -319,14 +510,33 @@ class PluginManager:
             wrapper = self._create_plugin_wrapper(plugin)
             if wrapper:
                 logger.debug(f"Created wrapper for {plugin.name}, initializing...")
-                if wrapper.initialize():
+                if self._initialize_wrapper(wrapper, lazy=True):
                     self.loaded_plugins[plugin.name] = wrapper
-                    logger.info(f"Successfully loaded plugin: {plugin.name}")
+                    logger.debug(f"Registered plugin: {plugin.name}")
                 else:
                     logger.error(f"Failed to initialize plugin: {plugin.name}")
             else:
                 logger.error(f"Failed to create wrapper for plugin: {plugin.name}")
 
+    def register_plugins(self, plugin_records) -> int:
+        """
+        Enregistre des wrappers à partir d'enregistrements déjà lus (objets
+        Plugin ou dicts avec name, path et metadata_json), sans accès à la
+        base : utilisé par les processus de calcul du traitement par lot.
+        :return: nombre de plugins enregistrés
+        """
+        registered = 0
+        for record in plugin_records:
+            if isinstance(record, dict):
+                record = SimpleNamespace(**record)
+            wrapper = self._create_plugin_wrapper(record)
+            if wrapper and self._initialize_wrapper(wrapper, lazy=True):
+                self.loaded_plugins[record.name] = wrapper
+                registered += 1
+            else:
+                logger.error(f"Failed to register plugin: {record.name}")
+        return registered
+
     def get_plugin(self, plugin_name: str, force_reload: bool = False) -> Optional[PluginInterface]:
         """
         Récupère un plugin par son nom, le charge si nécessaire
@@ -347,7 +557,8 @@ class PluginManager:
                         return None
                         
                     wrapper = self._create_plugin_wrapper(plugin_record)
-                    if wrapper.initialize():
+                    # Chargement explicite : import immédiat pour remonter les erreurs tout de suite
+                    if wrapper and self._initialize_wrapper(wrapper, lazy=False):
                         self.loaded_plugins[plugin_name] = wrapper
                         self._loading_errors.pop(plugin_name, None)
                     else:
@@ -365,73 +576,93 @@ class PluginManager:
         Exécute un plugin et ajoute une détection de coordonnées GPS si activée.
         Applique également le système de scoring si activé.
         """
+        metrics = get_metrics_service()
+        # Le nom vient de la requête : seuls les plugins connus ont leurs propres séries
+        known = plugin_name in self.loaded_plugins or plugin_name in self._plugin_cache
+        metric_name = plugin_name if known else UNKNOWN_PLUGIN
+        with metrics.timer(metric_name, "total"), tracer.span(f"execute_plugin:{plugin_name}"):
+            return self._execute_plugin(plugin_name, inputs, metrics, metric_name)
+
+    def _execute_plugin(self, plugin_name: str, inputs: Dict[str, Any], metrics,
+                        metric_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Corps de execute_plugin, chaque étape étant chronométrée dans le service de métriques.
+        """
         plugin = self.get_plugin(plugin_name)
         if not plugin:
             logger.error(f"Plugin {plugin_name} non disponible")
+            metrics.record_error(metric_name or plugin_name, "load")
             return None
 
         # Normaliser le texte d'entrée si présent
-        if "text" in inputs and isinstance(inputs["text"], str):
-            inputs["text"] = self._normalize_text(inputs["text"])
-            
-            # Vérifier si le plugin accepte les accents
-            accept_accents = False
-            if hasattr(plugin, 'metadata') and hasattr(plugin.metadata, 'accept_accents'):
-                accept_accents = plugin.metadata.accept_accents
-                
-            if not accept_accents:
-                # Si le plugin n'accepte pas les accents, on désaccentue le texte
-                inputs["text"] = self._remove_accents(inputs["text"])
-                logger.debug(f"Texte désaccentué pour le plugin {plugin_name}")
-            
+        if "text" in inputs and isinstance(inputs["text"], (str, TextView)):
+            with metrics.timer(plugin_name, "normalize"), tracer.span("normalize"):
+                # Vue partagée : les variantes déjà calculées pour ce texte sont réutilisées
+                view = text_view(inputs["text"])
+
+                # Vérifier si le plugin accepte les accents
+                accept_accents = False
+                if hasattr(plugin, 'metadata') and hasattr(plugin.metadata, 'accept_accents'):
+                    accept_accents = plugin.metadata.accept_accents
+
+                if accept_accents:
+                    inputs["text"] = view.normalized
+                else:
+                    # Si le plugin n'accepte pas les accents, on désaccentue le texte
+                    inputs["text"] = view.unaccented
+                    logger.debug(f"Texte désaccentué pour le plugin {plugin_name}")
+
         # Exécute le plugin pour obtenir le texte décodé
-        print(f"[DEBUG] execute_plugin: Exécution du plugin {plugin_name} avec les inputs: {inputs}")
-        result = plugin.execute(inputs)
-        print(f"[DEBUG] execute_plugin: Résultat brut du plugin: {result}")
+        tracer.log("execute_plugin: Exécution du plugin %s avec les inputs: %s", plugin_name, inputs)
+        with metrics.timer(plugin_name, "execute"), tracer.span("execute"):
+            result = plugin.execute(inputs)
+        tracer.log("execute_plugin: Résultat brut du plugin: %s", result)
         
         decoded_text = result.get("text_output")
         if not decoded_text:
             decoded_text = result.get("result", {}).get("text", {}).get("text_output")
             if not decoded_text and "result" in result and "decoded_results" in result["result"]:
                 # Cas spécial pour metadetection qui retourne une liste de résultats
-                print(f"[DEBUG] execute_plugin: Détection de résultats multiples dans metadetection")
+                tracer.log("execute_plugin: Détection de résultats multiples dans metadetection")
                 decoded_results = result["result"]["decoded_results"]
                 if decoded_results and isinstance(decoded_results, list) and len(decoded_results) > 0:
                     # Prendre le premier résultat pour la détection GPS
                     decoded_text = decoded_results[0].get("decoded_text", "")
-                    print(f"[DEBUG] execute_plugin: Utilisation du premier résultat décodé: {decoded_text[:100]}... (tronqué)")
+                    tracer.log("execute_plugin: Utilisation du premier résultat décodé: %.100s... (tronqué)", decoded_text)
             elif not decoded_text and "result" in result and "decoded_text" in result["result"]:
                 # Cas où le texte décodé est directement dans result.decoded_text
                 decoded_text = result["result"]["decoded_text"]
-                print(f"[DEBUG] execute_plugin: Texte décodé trouvé dans result.decoded_text: {decoded_text[:100]}... (tronqué)")
+                tracer.log("execute_plugin: Texte décodé trouvé dans result.decoded_text: %.100s... (tronqué)", decoded_text)
                 
-        print(f"[DEBUG] execute_plugin: Texte décodé final: {decoded_text[:100] if decoded_text else None}... (tronqué)")
+        if tracer.enabled:
+            tracer.log("execute_plugin: Texte décodé final: %s... (tronqué)", decoded_text[:100] if decoded_text else None)
 
         # Vérifie si la détection GPS est activée
         enable_gps = inputs.get("enable_gps_detection", True)
-        print(f"[DEBUG] execute_plugin: Détection GPS activée: {enable_gps}")
+        tracer.log("execute_plugin: Détection GPS activée: %s", enable_gps)
         
         if enable_gps and decoded_text:
-            print(f"[DEBUG] execute_plugin: Lancement de la détection GPS sur le texte décodé")
+            tracer.log("execute_plugin: Lancement de la détection GPS sur le texte décodé")
             # Importer ici pour éviter l'importation circulaire
             from app.routes.coordinates import detect_gps_coordinates, convert_ddm_to_decimal
-            gps_coordinates = detect_gps_coordinates(decoded_text)
-            print(f"[DEBUG] execute_plugin: Résultat de la détection GPS: {gps_coordinates}")
-            
-            # Ajout des coordonnées décimales pour OpenLayers
-            if gps_coordinates.get("exist") and gps_coordinates.get("ddm_lat") and gps_coordinates.get("ddm_lon"):
-                decimal_coords = convert_ddm_to_decimal(gps_coordinates["ddm_lat"], gps_coordinates["ddm_lon"])
-                gps_coordinates["decimal"] = decimal_coords
-                print(f"[DEBUG] execute_plugin: Coordonnées décimales ajoutées: {decimal_coords}")
+            with metrics.timer(plugin_name, "gps_detection"), tracer.span("gps_detection"):
+                gps_coordinates = detect_gps_coordinates(decoded_text)
+                tracer.log("execute_plugin: Résultat de la détection GPS: %s", gps_coordinates)
+
+                # Ajout des coordonnées décimales pour OpenLayers
+                if gps_coordinates.get("exist") and gps_coordinates.get("ddm_lat") and gps_coordinates.get("ddm_lon"):
+                    decimal_coords = convert_ddm_to_decimal(gps_coordinates["ddm_lat"], gps_coordinates["ddm_lon"])
+                    gps_coordinates["decimal"] = decimal_coords
+                    tracer.log("execute_plugin: Coordonnées décimales ajoutées: %s", decimal_coords)
             
             result["coordinates"] = gps_coordinates
         
         # Vérifier si le scoring automatique est activé
         enable_scoring = inputs.get("enable_scoring", True)
-        print(f"[DEBUG] execute_plugin: Scoring automatique activé: {enable_scoring}")
+        tracer.log("execute_plugin: Scoring automatique activé: %s", enable_scoring)
         
         if enable_scoring and decoded_text:
-            print(f"[DEBUG] execute_plugin: Lancement du scoring sur le texte décodé")
+            tracer.log("execute_plugin: Lancement du scoring sur le texte décodé")
             # Obtenir le service de scoring et effectuer l'évaluation
             scoring_service = get_scoring_service()
             
@@ -439,8 +670,9 @@ class PluginManager:
             context = inputs.get("context", {})
             
             # Effectuer le scoring
-            scoring_result = scoring_service.score_text(decoded_text, context)
-            print(f"[DEBUG] execute_plugin: Résultat du scoring: {scoring_result}")
+            with metrics.timer(plugin_name, "scoring"), tracer.span("scoring"):
+                scoring_result = scoring_service.score_text(decoded_text, context)
+            tracer.log("execute_plugin: Résultat du scoring: %s", scoring_result)
             
             # Ajouter les métadonnées de scoring au résultat
             result["scoring"] = scoring_result
@@ -453,7 +685,8 @@ class PluginManager:
                         break
 
         # Convertir toutes les coordonnées DDM en décimal avant de retourner le résultat
-        result = self._convert_all_coordinates(result)
+        with metrics.timer(plugin_name, "convert_coordinates"), tracer.span("convert_coordinates"):
+            result = self._convert_all_coordinates(result)
         
         return result
 
@@ -484,6 +717,104 @@ class PluginManager:
             logger.exception("Erreur lors du rechargement des plugins")
             return False
 
+    def add_reload_listener(self, callback):
+        """
+        Enregistre un callback appelé après le rechargement ou la suppression
+        d'un plugin : callback(plugin_name, old_version, new_version).
+        new_version vaut None si le plugin a été supprimé.
+        Sert à invalider les caches liés à la version d'un plugin.
+        """
+        if callback not in self._reload_listeners:
+            self._reload_listeners.append(callback)
+
+    def remove_reload_listener(self, callback):
+        if callback in self._reload_listeners:
+            self._reload_listeners.remove(callback)
+
+    def _notify_reload(self, plugin_name: str, old_version: Optional[str], new_version: Optional[str]):
+        for callback in list(self._reload_listeners):
+            try:
+                callback(plugin_name, old_version, new_version)
+            except Exception as e:
+                logger.error(f"Reload listener failed for {plugin_name}: {e}")
+
+    def reload_plugin(self, plugin_dir: str) -> Optional[PluginInterface]:
+        """
+        Recharge un seul plugin à partir de son répertoire, sans toucher aux autres.
+
+        Le nouveau wrapper est préparé à part puis remplace l'ancien dans
+        `loaded_plugins` en une seule affectation : les exécutions en cours
+        terminent avec l'ancienne instance. Si le plugin était déjà importé,
+        le nouveau module est importé avant l'échange et l'ancien wrapper est
+        conservé en cas d'échec.
+        """
+        plugin_json_path = os.path.join(plugin_dir, 'plugin.json')
+        try:
+            plugin_info, changed = self._manifest_cache.read(plugin_json_path)
+            self._manifest_cache.save()
+        except Exception as e:
+            logger.error(f"Failed loading {plugin_json_path}: {e}")
+            return None
+
+        plugin_name = plugin_info['name']
+        plugin_info['path'] = plugin_dir
+        old_wrapper = self.loaded_plugins.get(plugin_name)
+        old_info = self._plugin_cache.get(plugin_name) or {}
+        old_version = old_info.get('version')
+
+        try:
+            with self.app.app_context():
+                record = Plugin.query.filter_by(name=plugin_name).first()
+                if record is None or changed or record.path != plugin_dir:
+                    self._update_plugin_in_db(plugin_info, force=True)
+                    record = Plugin.query.filter_by(name=plugin_name).first()
+                if record is None:
+                    self._loading_errors[plugin_name] = "Plugin absent de la base"
+                    return None
+                if not record.enabled:
+                    self.loaded_plugins.pop(plugin_name, None)
+                    self._plugin_cache[plugin_name] = plugin_info
+                    return None
+                wrapper = self._create_plugin_wrapper(record)
+        except Exception as e:
+            logger.exception(f"Erreur lors du rechargement du plugin {plugin_name}")
+            self._loading_errors[plugin_name] = str(e)
+            return None
+
+        was_imported = isinstance(old_wrapper, PythonPluginWrapper) and old_wrapper.is_imported
+        if not wrapper or not self._initialize_wrapper(wrapper, lazy=not was_imported):
+            logger.error(f"Rechargement de {plugin_name} échoué, ancienne version conservée")
+            self._loading_errors[plugin_name] = "Échec du rechargement"
+            return old_wrapper
+
+        self.loaded_plugins[plugin_name] = wrapper
+        self._plugin_cache[plugin_name] = plugin_info
+        self._loading_errors.pop(plugin_name, None)
+        logger.info(f"Plugin {plugin_name} rechargé (version {plugin_info.get('version')})")
+        self._notify_reload(plugin_name, old_version, plugin_info.get('version'))
+        return wrapper
+
+    def remove_plugin(self, plugin_name: str):
+        """
+        Retire un plugin dont le répertoire a disparu (mémoire, cache et base).
+        """
+        self.loaded_plugins.pop(plugin_name, None)
+        old_info = self._plugin_cache.pop(plugin_name, None) or {}
+        self._loading_errors.pop(plugin_name, None)
+        if old_info.get('path'):
+            self._manifest_cache.discard(os.path.join(old_info['path'], 'plugin.json'))
+            self._manifest_cache.save()
+        try:
+            with self.app.app_context():
+                for record in Plugin.query.filter_by(name=plugin_name).all():
+                    db.session.delete(record)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to remove plugin {plugin_name} from DB: {e}")
+        logger.info(f"Plugin {plugin_name} retiré")
+        self._notify_reload(plugin_name, old_info.get('version'), None)
+
     def unload_plugins(self):
         """
         Appelle la méthode cleanup() sur tous les plugins chargés
@@ -521,10 +852,11 @@ class PluginManager:
                     isinstance(coords.get('decimal'), dict) and 
                     (coords['decimal'].get('latitude') is None or coords['decimal'].get('longitude') is None)
                 ):
-                    print(f"[DEBUG] _convert_all_coordinates: Conversion des coordonnées: {coords['ddm_lat']} {coords['ddm_lon']}")
+                    if tracer.enabled:
+                        tracer.log("_convert_all_coordinates: Conversion des coordonnées: %s %s", coords['ddm_lat'], coords['ddm_lon'])
                     decimal_coords = convert_ddm_to_decimal(coords['ddm_lat'], coords['ddm_lon'])
                     coords['decimal'] = decimal_coords
-                    print(f"[DEBUG] _convert_all_coordinates: Coordonnées décimales ajoutées: {decimal_coords}")
+                    tracer.log("_convert_all_coordinates: Coordonnées décimales ajoutées: %s", decimal_coords)
         
         # Parcourir récursivement tous les sous-dictionnaires
         for key, value in result_dict.items():
@@ -543,26 +875,11 @@ class PluginManager:
     def _normalize_text(self, text: str) -> str:
         """
         Normalise le texte avant de l'envoyer aux plugins.
-        Remplace les caractères spéciaux et normalise les espaces.
+        Remplace les espaces insécables et retours à la ligne, et réduit les espaces multiples.
         """
         if not text:
             return ""
-            
-        # Remplacer les espaces insécables par des espaces normaux
-        normalized = text.replace('\xa0', ' ')
-        
-        # Normaliser les retours à la ligne
-        normalized = normalized.replace('\r\n', '\n')
-        
-        # Supprimer les espaces multiples
-        import re
-        normalized = re.sub(r'\s+', ' ', normalized)
-        
-        # Supprimer les espaces en début et fin de chaîne
-        normalized = normalized.strip()
-        
-        logger.debug(f"Texte normalisé: {normalized}")
-        return normalized
+        return text_view(text).normalized
 
     def _remove_accents(self, text: str) -> str:
         """
@@ -571,32 +888,15 @@ class PluginManager:
         """
         if not text:
             return ""
-        
-        import unicodedata
-        # Normalisation NFKD pour décomposer les caractères accentués
-        # puis suppression des marques diacritiques (catégorie Mn)
-        normalized = unicodedata.normalize('NFKD', text)
-        result = ''.join([c for c in normalized if not unicodedata.combining(c)])
-        
-        # Remplacements supplémentaires pour certains caractères spéciaux
-        replacements = {
-            'œ': 'oe',
-            'Œ': 'OE',
-            'æ': 'ae',
-            'Æ': 'AE',
-            'ß': 'ss',
-            '€': 'E',
-            '£': 'L',
-            '¥': 'Y',
-            'ñ': 'n',
-            'Ñ': 'N',
-        }
-        
-        for char, replacement in replacements.items():
-            result = result.replace(char, replacement)
-        
-        logger.debug(f"Texte désaccentué: {result}")
-        return result
+        return strip_accents(text)
+
+    def _initialize_wrapper(self, wrapper: PluginInterface, lazy: bool) -> bool:
+        """
+        Initialise un wrapper ; seuls les wrappers Python savent différer l'import.
+        """
+        if isinstance(wrapper, PythonPluginWrapper):
+            return wrapper.initialize(lazy=lazy)
+        return wrapper.initialize()
 
     def _create_plugin_wrapper(self, plugin_record) -> Optional[PluginInterface]:
         """
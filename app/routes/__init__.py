@@ -8,6 +8,12 @@ from .logs import logs_bp
 from app.routes.ai_routes import ai_bp
 from .settings import settings_bp
 from .multi_solver import multi_solver_bp
+from .metrics import metrics_bp
+from .traces import traces_bp
+from .geodesy import geodesy_bp
+from .search import search_bp
+from .jobs import jobs_bp
+from .zone_batch import zone_batch_bp
 
 blueprints = [
     main,
@@ -19,6 +25,12 @@ blueprints = [
     logs_bp,
     ai_bp,
     settings_bp,
-    multi_solver_bp
+    multi_solver_bp,
+    metrics_bp,
+    traces_bp,
+    geodesy_bp,
+    search_bp,
+    jobs_bp,
+    zone_batch_bp
 ]
 
@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify, render_template, Response
+from flask import Blueprint, request, jsonify, render_template, Response, stream_with_context
 from app.services.ai_service import ai_service
+from app.services.ai_cache_service import get_ai_response_cache
 from app.models.app_config import AppConfig
+import json
 import logging
 import os
+import threading
+import time
 
 # Configurer le logger
 logger = logging.getLogger(__name__)
@@ -35,6 +39,30 @@ def test_ollama_connection():
     result = ai_service.test_ollama_connection(url)
     return jsonify(result)
 
+def _apply_model_choice(settings, model_id):
+    """
+    Applique à `settings` le modèle demandé par le client (en ligne ou local).
+    
+    Returns:
+        Nom lisible du modèle utilisé, ou None si aucun modèle connu n'est demandé
+    """
+    if not model_id:
+        return None
+    # Déterminer si le modèle est en ligne ou local
+    if settings.get('online_models') and model_id in settings['online_models']:
+        settings['mode'] = 'online'
+        settings['online_model'] = model_id
+        return settings['online_models'][model_id].get('name', model_id)
+    if settings.get('local_models') and model_id in settings['local_models']:
+        settings['mode'] = 'local'
+        settings['local_model'] = model_id
+        return settings['local_models'][model_id].get('name', model_id)
+    return None
+
+def _sse(event, data):
+    """Formate un événement Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @ai_bp.route('/chat', methods=['POST'])
 def chat():
     """
@@ -62,21 +90,8 @@ def chat():
         # Si un modèle spécifique est demandé, l'utiliser temporairement
         settings = ai_service.get_settings()
         original_mode = settings.get('mode')
-        original_model = None
-        model_used = None
-        
-        if model_id:
-            # Déterminer si le modèle est en ligne ou local
-            if settings.get('online_models') and model_id in settings['online_models']:
-                original_model = settings.get('online_model')
-                settings['mode'] = 'online'
-                settings['online_model'] = model_id
-                model_used = settings['online_models'][model_id].get('name', model_id)
-            elif settings.get('local_models') and model_id in settings['local_models']:
-                original_model = settings.get('local_model')
-                settings['mode'] = 'local'
-                settings['local_model'] = model_id
-                model_used = settings['local_models'][model_id].get('name', model_id)
+        original_model = settings.get('online_model') if original_mode == 'online' else settings.get('local_model')
+        model_used = _apply_model_choice(settings, model_id)
         
         # Vérifier si on doit utiliser LangGraph
         use_langgraph = settings.get('use_langgraph', True)
@@ -116,6 +131,76 @@ def chat():
             'error': str(e)
         }), 500
 
+@ai_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Variante de /chat qui relaie la réponse fragment par fragment (Server-Sent Events).
+    
+    Même corps de requête que /chat. Événements émis :
+      - start : {"model_used", "used_langgraph"}
+      - token : {"token"} pour chaque fragment reçu du modèle
+      - done  : {"response", "ttft_ms", "total_ms"} ; "response" est le message complet,
+                à conserver dans l'historique de la conversation
+      - error : {"error"}
+    
+    Si le client se déconnecte, le flux est annulé et la connexion au modèle fermée.
+    """
+    data = request.json or {}
+    messages = data.get('messages', [])
+    system_prompt = data.get('system_prompt')
+    use_tools = data.get('use_tools', True)
+    
+    if not messages:
+        return jsonify({
+            'success': False,
+            'error': 'Aucun message fourni'
+        }), 400
+    
+    settings = ai_service.get_settings()
+    model_used = _apply_model_choice(settings, data.get('model_id'))
+    used_langgraph = settings.get('use_langgraph', True) and use_tools
+    if system_prompt and not used_langgraph:
+        settings['system_prompt'] = system_prompt
+    
+    cancel_event = threading.Event()
+    if used_langgraph:
+        # Importer ici pour éviter l'importation circulaire
+        from app.services.langgraph_service import langgraph_service
+        tokens = langgraph_service.stream_chat(messages, system_prompt, cancel_event)
+    else:
+        tokens = ai_service.stream_chat(messages, settings, cancel_event)
+    
+    def generate():
+        parts = []
+        start = time.perf_counter()
+        first_token_ms = None
+        try:
+            yield _sse('start', {'model_used': model_used, 'used_langgraph': used_langgraph})
+            for token in tokens:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(token)
+                yield _sse('token', {'token': token})
+            yield _sse('done', {
+                'response': ''.join(parts),
+                'ttft_ms': round(first_token_ms, 1) if first_token_ms is not None else None,
+                'total_ms': round((time.perf_counter() - start) * 1000, 1),
+            })
+        except GeneratorExit:
+            logger.info(f"Flux de chat annulé par le client après {len(parts)} fragments")
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors du flux de chat IA: {str(e)}")
+            yield _sse('error', {'error': str(e)})
+        finally:
+            cancel_event.set()
+            tokens.close()
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 @ai_bp.route('/settings_panel', methods=['GET'])
 def settings_panel():
     """Rendu du panneau de paramètres IA"""
@@ -651,4 +736,23 @@ def get_provider_api_key(provider):
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500 
+
+@ai_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Statistiques du cache des réponses de l'IA (taux de succès, temps économisé)"""
+    try:
+        return jsonify(get_ai_response_cache().stats())
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture des statistiques du cache IA: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@ai_bp.route('/cache', methods=['DELETE'])
+def clear_cache():
+    """Vide le cache des réponses de l'IA"""
+    try:
+        get_ai_response_cache().clear()
+        return jsonify({'success': True})
+    except Exception as e:
+        logger.error(f"Erreur lors du vidage du cache IA: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,36 +1,36 @@
 import os
 import json
 from flask import Blueprint, jsonify, send_file, request, render_template, current_app
+from app.services.alphabet_catalog_service import get_alphabet_catalog
 
 alphabets_bp = Blueprint('alphabets', __name__)
 
 ALPHABETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'alphabets')
 
+# Durée de cache des ressources demandées avec leur version (?v=...) : elles ne changent jamais
+ASSET_MAX_AGE = 365 * 24 * 3600
+
 def load_alphabet_config(alphabet_id):
-    """Charge la configuration d'un alphabet depuis son dossier."""
-    alphabet_path = os.path.join(ALPHABETS_DIR, alphabet_id, 'alphabet.json')
-    if not os.path.exists(alphabet_path):
-        return None
-        
-    with open(alphabet_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-        # Ajouter l'ID de l'alphabet (nom du dossier)
-        config['id'] = alphabet_id
-        return config
+    """Charge la configuration d'un alphabet depuis le catalogue (copie modifiable)."""
+    return get_alphabet_catalog().get(alphabet_id)
+
+def send_alphabet_asset(alphabet_id, path, **kwargs):
+    """
+    Envoie une ressource d'alphabet avec ETag et Last-Modified (réponse 304 si inchangée).
+    Si l'URL porte la version courante des ressources (?v=...), la réponse est
+    mise en cache durablement ; sinon le navigateur la revalide à chaque fois.
+    """
+    versioned = request.args.get('v') == get_alphabet_catalog().asset_version(alphabet_id)
+    response = send_file(path, max_age=ASSET_MAX_AGE if versioned else None, **kwargs)
+    if versioned:
+        response.cache_control.immutable = True
+    return response
 
 @alphabets_bp.route('/api/alphabets/template', methods=['GET'])
 def get_alphabets_template():
     """Récupère le template complet avec la liste de tous les alphabets disponibles."""
-    alphabets = []
-    
-    # Parcourir le répertoire des alphabets
-    if os.path.exists(ALPHABETS_DIR):
-        for dirname in os.listdir(ALPHABETS_DIR):
-            alphabet_dir = os.path.join(ALPHABETS_DIR, dirname)
-            if os.path.isdir(alphabet_dir):
-                config = load_alphabet_config(dirname)
-                if config:
-                    alphabets.append(config)
+    # Liste indexée en mémoire (rafraîchie si un alphabet.json a changé)
+    alphabets = get_alphabet_catalog().list()
     
     # Récupérer les paramètres
     show_examples = request.args.get('show_examples', 'false').lower() == 'true'
@@ -53,16 +53,8 @@ def get_alphabets_template():
 @alphabets_bp.route('/api/alphabets/list', methods=['GET'])
 def get_alphabets_list():
     """Récupère uniquement la liste des alphabets (contenu) pour les mises à jour HTMX."""
-    alphabets = []
-    
-    # Parcourir le répertoire des alphabets
-    if os.path.exists(ALPHABETS_DIR):
-        for dirname in os.listdir(ALPHABETS_DIR):
-            alphabet_dir = os.path.join(ALPHABETS_DIR, dirname)
-            if os.path.isdir(alphabet_dir):
-                config = load_alphabet_config(dirname)
-                if config:
-                    alphabets.append(config)
+    # Liste indexée en mémoire (rafraîchie si un alphabet.json a changé)
+    alphabets = get_alphabet_catalog().list()
     
     # Récupérer les paramètres
     show_examples = request.args.get('show_examples', 'false').lower() == 'true'
@@ -85,33 +77,36 @@ def get_alphabets_list():
 @alphabets_bp.route('/api/alphabets', methods=['GET'])
 def get_alphabets():
     """Récupère la liste de tous les alphabets disponibles au format JSON."""
-    alphabets = []
-    
-    # Parcourir le répertoire des alphabets
-    if os.path.exists(ALPHABETS_DIR):
-        for dirname in os.listdir(ALPHABETS_DIR):
-            alphabet_dir = os.path.join(ALPHABETS_DIR, dirname)
-            if os.path.isdir(alphabet_dir):
-                config = load_alphabet_config(dirname)
-                if config:
-                    alphabets.append(config)
-    
-    # Retourner le JSON
-    return jsonify(alphabets)
+    # Liste indexée en mémoire (rafraîchie si un alphabet.json a changé)
+    alphabets = get_alphabet_catalog().list()
+    
+    # Retourner le JSON (304 si la liste n'a pas changé)
+    response = jsonify(alphabets)
+    response.add_etag()
+    return response.make_conditional(request)
+
+@alphabets_bp.route('/api/alphabets/<alphabet_id>/manifest', methods=['GET'])
+def get_alphabet_manifest(alphabet_id):
+    """Récupère les URL versionnées de la police ou de tous les glyphes d'un alphabet."""
+    manifest = get_alphabet_catalog().manifest(alphabet_id)
+    if manifest is None:
+        return jsonify({"error": f"Alphabet {alphabet_id} non trouvé"}), 404
+    
+    response = jsonify(manifest)
+    response.set_etag(manifest['asset_version'])
+    return response.make_conditional(request)
 
 @alphabets_bp.route('/api/alphabets/<alphabet_id>/resource/<path:resource_path>')
 def get_alphabet_resource(alphabet_id, resource_path):
     """Récupère une ressource (image ou police) d'un alphabet."""
     resource_full_path = os.path.join(ALPHABETS_DIR, alphabet_id, resource_path)
     
-    # Log pour le débogage
-    current_app.logger.info(f"Requested resource: {resource_full_path}")
-    
-    if not os.path.exists(resource_full_path) or not os.path.isfile(resource_full_path):
+    # Seuls les fichiers indexés de l'alphabet sont servis
+    if not get_alphabet_catalog().has_asset(alphabet_id, resource_path):
         current_app.logger.error(f"Resource not found: {resource_full_path}")
         return jsonify({"error": f"Resource {resource_path} not found"}), 404
         
-    return send_file(resource_full_path)
+    return send_alphabet_asset(alphabet_id, resource_full_path)
 
 @alphabets_bp.route('/api/alphabets/<alphabet_id>/font')
 def get_alphabet_font(alphabet_id):
@@ -127,14 +122,11 @@ def get_alphabet_font(alphabet_id):
     
     font_path = os.path.join(ALPHABETS_DIR, alphabet_id, config['alphabetConfig']['fontFile'])
     
-    # Log pour le débogage
-    current_app.logger.info(f"Loading font: {font_path}")
-    
-    if not os.path.exists(font_path):
+    if not get_alphabet_catalog().has_asset(alphabet_id, config['alphabetConfig']['fontFile']):
         current_app.logger.error(f"Font file not found: {font_path}")
         return jsonify({"error": f"Police {config['alphabetConfig']['fontFile']} non trouvée"}), 404
     
-    return send_file(font_path, mimetype='font/ttf')
+    return send_alphabet_asset(alphabet_id, font_path, mimetype='font/ttf')
 
 @alphabets_bp.route('/api/alphabets/<alphabet_id>/view')
 def view_alphabet(alphabet_id):
@@ -174,9 +166,11 @@ def reorder_alphabet(alphabet_id):
         # Réorganiser les symboles selon le nouvel ordre
         config['symbols'] = [config['symbols'][i] for i in order]
         
-        # Sauvegarder la configuration mise à jour
+        # Sauvegarder la configuration mise à jour (la version des ressources n'est pas persistée)
+        config.pop('asset_version', None)
         with open(os.path.join(alphabet_dir, 'alphabet.json'), 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
+        get_alphabet_catalog().invalidate(alphabet_id)
             
         return jsonify({"status": "success"})
     except Exception as e:
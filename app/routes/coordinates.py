@@ -5,17 +5,25 @@ from flask import Blueprint, request, jsonify
 from app.database import db
 from app.models.geocache import Geocache
 import traceback
-from pyproj import Geod
+import numpy as np
+from app.utils import geodesy
+from app.utils.coordinates import parse_ddm_latitude, parse_ddm_longitude
+from app.services.tracing_service import tracer, traced
+from app.services.formula_engine import compile_formula, FormulaSyntaxError
+from app.services.formula_bruteforce_service import FormulaBruteForceSolver, parse_domain, DEFAULT_MAX_DISTANCE_MILES
 
 coordinates_bp = Blueprint('coordinates', __name__)
 
+# Nombre maximal d'affectations acceptées par /api/calculate_coordinates/batch
+MAX_BATCH_ASSIGNMENTS = 20000
+
 # A PRIORI PLUS UTILISé..... Ne pas l'utiliser.... A supprimer....
 @coordinates_bp.route('/api/geocaches/save/<int:geocache_id>/coordinates', methods=['POST'])
 def save_geocache_coordinates(geocache_id):
     """
     Sauvegarde les coordonnées corrigées d'une géocache.
     """
-    print(f"[DEBUG] Sauvegarde des coordonnées pour la géocache {geocache_id}")
+    tracer.log("Sauvegarde des coordonnées pour la géocache %s", geocache_id)
     try:
         data = request.get_json()
         
@@ -97,182 +105,186 @@ def calculate_coordinates():
         if not formula:
             return jsonify({"error": "Aucune formule fournie"}), 400
         
-        print(f"[DEBUG] Calcul des coordonnées pour la formule: {formula}")
-        print(f"[DEBUG] Variables fournies: {variables}")
-        
-        # Extraire les parties de latitude et longitude (accepte lettres et chiffres)
-        lat_match = re.search(r'([NS])\s*([A-Z0-9]+)°\s*([A-Z0-9]+)\.([A-Z0-9()x*/+-]+)', formula)
-        lon_match = re.search(r'([EW])\s*([A-Z0-9]+)°\s*([A-Z0-9]+)\.([A-Z0-9()x*/+-]+)', formula)
+        tracer.log("Calcul des coordonnées pour la formule: %s, variables: %s", formula, variables)
         
-        if not lat_match or not lon_match:
-            print(f"[ERROR] Format de formule invalide: lat_match={lat_match}, lon_match={lon_match}")
+        # La formule est compilée une seule fois puis mise en cache
+        try:
+            compiled = compile_formula(formula)
+        except FormulaSyntaxError as e:
+            print(f"[ERROR] Format de formule invalide: {formula} ({e})")
             return jsonify({"error": "Format de formule invalide"}), 400
         
-        # Substitution et calcul pour chaque partie
-        lat_dir, lat_deg_raw, lat_min_raw, lat_decimal_raw = lat_match.groups()
-        lon_dir, lon_deg_raw, lon_min_raw, lon_decimal_raw = lon_match.groups()
-        
-        print(f"[DEBUG] Parties de latitude: dir={lat_dir}, deg={lat_deg_raw}, min={lat_min_raw}, decimal={lat_decimal_raw}")
-        print(f"[DEBUG] Parties de longitude: dir={lon_dir}, deg={lon_deg_raw}, min={lon_min_raw}, decimal={lon_decimal_raw}")
-        
-        # Appliquer la substitution sur chaque partie
-        lat_deg = _process_formula_part(lat_deg_raw, variables)
-        lat_min = _process_formula_part(lat_min_raw, variables)
-        lat_decimal = _process_formula_part(lat_decimal_raw, variables)
-        lon_deg = _process_formula_part(lon_deg_raw, variables)
-        lon_min = _process_formula_part(lon_min_raw, variables)
-        lon_decimal = _process_formula_part(lon_decimal_raw, variables)
-        
-        print(f"[DEBUG] Valeurs calculées: lat_deg={lat_deg}, lat_min={lat_min}, lat_decimal={lat_decimal}")
-        print(f"[DEBUG] Valeurs calculées: lon_deg={lon_deg}, lon_min={lon_min}, lon_decimal={lon_decimal}")
-        
-        # Statuts individuels
-        def part_status(val, label):
-            # Vérifie si la valeur contient encore des lettres (résolution partielle)
-            if isinstance(val, str) and re.search(r'[A-Z]', val):
-                # Vérifier si c'est une expression avec des parenthèses qui n'a pas pu être évaluée
-                if '(' in val and ')' in val:
-                    return ("error", f"La partie {label} contient une expression mathématique non évaluable: {val}")
-                return ("partial", f"La partie {label} contient encore des lettres")
-            
-            # Vérifie si la valeur est une expression entre parenthèses (erreur de calcul)
-            if isinstance(val, str) and val.startswith('(') and val.endswith(')'):
-                # C'est une expression qui n'a pas pu être calculée comme un entier
-                return ("error", f"L'expression {val} dans {label} ne donne pas un nombre entier. Vérifiez vos valeurs.")
-            
-            # Vérifie si la valeur est négative
-            if isinstance(val, (int, float)):
-                if int(val) < 0:
-                    return ("error", f"La partie {label} est négative")
-                
-                # Vérification spécifique pour la partie décimale des minutes (format de géocaching)
-                if "décimales" in label:
-                    # Convertir en chaîne pour vérifier le nombre de chiffres
-                    val_str = str(val)
-                    
-                    # Si on a plus de 3 chiffres, c'est une erreur en géocaching
-                    if len(val_str) > 3:
-                        return ("error", f"La partie {label} a plus de 3 chiffres ({val_str}). Ceci indique une erreur dans vos valeurs, car en géocaching, il faut exactement 3 chiffres après le point.")
-            
-            return ("complete", "")
-        
-        lat_deg_status, lat_deg_msg = part_status(lat_deg, "degrés latitude")
-        lat_min_status, lat_min_msg = part_status(lat_min, "minutes latitude")
-        lat_decimal_status, lat_decimal_msg = part_status(lat_decimal, "décimales latitude")
-        lon_deg_status, lon_deg_msg = part_status(lon_deg, "degrés longitude")
-        lon_min_status, lon_min_msg = part_status(lon_min, "minutes longitude")
-        lon_decimal_status, lon_decimal_msg = part_status(lon_decimal, "décimales longitude")
-        
-        # Statut global pour chaque coordonnée
-        lat_status = {"status": "complete", "message": ""}
-        lon_status = {"status": "complete", "message": ""}
+        results = _evaluate_formula_batch(compiled, [variables], origin_lat, origin_lon)
+        tracer.log("Résultat final: %s", results[0])
+        return jsonify(results[0])
         
-        for st, msg in [(lat_deg_status, lat_deg_msg), (lat_min_status, lat_min_msg), (lat_decimal_status, lat_decimal_msg)]:
-            if st == "error":
-                lat_status = {"status": "error", "message": msg}
-                break
-            elif st == "partial" and lat_status["status"] != "error":
-                lat_status = {"status": "partial", "message": msg}
-        for st, msg in [(lon_deg_status, lon_deg_msg), (lon_min_status, lon_min_msg), (lon_decimal_status, lon_decimal_msg)]:
-            if st == "error":
-                lon_status = {"status": "error", "message": msg}
-                break
-            elif st == "partial" and lon_status["status"] != "error":
-                lon_status = {"status": "partial", "message": msg}
-        
-        # Statut global
-        global_status = "complete"
-        if lat_status["status"] != "complete" or lon_status["status"] != "complete":
-            if lat_status["status"] == "error" or lon_status["status"] == "error":
-                global_status = "error"
-            else:
-                global_status = "partial"
-        
-        # Formatage final
-        def format_part(val, digits):
-            if isinstance(val, (int, float)):
-                # Convertir en chaîne
-                val_str = str(val)
-                
-                # Pour les décimales (quand digits=3), on s'assure d'avoir au moins 3 chiffres
-                # mais on ne tronque pas s'il y en a plus (pour afficher l'erreur)
-                if digits == 3:
-                    # Pour des valeurs avec moins de 3 chiffres, on complète avec des zéros
-                    if len(val_str) < 3:
-                        val_str = val_str.zfill(digits)
-                    # Si plus de 3 chiffres, on laisse tel quel pour montrer l'erreur
-                else:
-                    # Pour les autres parties (degrés, minutes), on utilise simplement zfill
-                    val_str = val_str.zfill(digits)
-                
-                return val_str
-            
-            # Si ce n'est pas un nombre, le retourner tel quel
-            return str(val)
-        
-        lat_formatted = f"{lat_dir}{format_part(lat_deg,2)}° {format_part(lat_min,2)}.{format_part(lat_decimal,3)}"
-        lon_formatted = f"{lon_dir}{format_part(lon_deg,3)}° {format_part(lon_min,2)}.{format_part(lon_decimal,3)}"
+    except Exception as e:
+        print(f"[ERROR] Erreur lors du calcul des coordonnées: {str(e)}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@coordinates_bp.route('/api/calculate_coordinates/batch', methods=['POST'])
+def calculate_coordinates_batch():
+    """
+    Calcule les coordonnées d'une formule pour plusieurs affectations de lettres
+    en une seule requête (formule compilée une fois, évaluation vectorisée).
+    
+    Exemple de données attendues:
+    {
+        "formula": "N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)",
+        "assignments": [{"A": 1, "B": 5, ...}, {"A": 2, "B": 5, ...}],
+        "origin_lat": "N49° 18.000",  # optionnel
+        "origin_lon": "E006° 16.000"  # optionnel
+    }
+    
+    Retourne:
+    {
+        "results": [...],  # un résultat par affectation, dans l'ordre, au format de /api/calculate_coordinates
+        "count": 2,
+        "complete_count": 2
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        formula = data.get('formula', '')
+        assignments = data.get('assignments', [])
         
-        print(f"[DEBUG] Coordonnées formatées: {lat_formatted} {lon_formatted}")
+        if not formula:
+            return jsonify({"error": "Aucune formule fournie"}), 400
+        if not isinstance(assignments, list):
+            return jsonify({"error": "Le champ 'assignments' doit être une liste"}), 400
+        if not all(isinstance(assignment, dict) for assignment in assignments):
+            return jsonify({"error": "Chaque affectation doit être un objet {lettre: valeur}"}), 400
+        if len(assignments) > MAX_BATCH_ASSIGNMENTS:
+            return jsonify({"error": f"Trop d'affectations (maximum {MAX_BATCH_ASSIGNMENTS})"}), 400
         
-        result = {
-            "coordinates": f"{lat_formatted} {lon_formatted}",
-            "latitude": lat_formatted,
-            "longitude": lon_formatted,
-            "status": global_status,
-            "lat_status": lat_status,
-            "lon_status": lon_status
-        }
+        try:
+            compiled = compile_formula(formula)
+        except FormulaSyntaxError:
+            return jsonify({"error": "Format de formule invalide"}), 400
         
-        # Ajouter les coordonnées décimales pour l'affichage automatique sur la carte
-        if global_status == "complete":
-            try:
-                decimal_coords = convert_ddm_to_decimal(lat_formatted, lon_formatted)
-                result["decimal_latitude"] = decimal_coords["latitude"]
-                result["decimal_longitude"] = decimal_coords["longitude"]
-                print(f"[DEBUG] Coordonnées décimales calculées: lat={decimal_coords['latitude']}, lon={decimal_coords['longitude']}")
-            except Exception as e:
-                print(f"[WARNING] Erreur lors de la conversion en coordonnées décimales: {str(e)}")
-                # Ne pas faire échouer l'appel si la conversion échoue
+        results = _evaluate_formula_batch(compiled, assignments, data.get('origin_lat'), data.get('origin_lon'))
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "complete_count": sum(1 for result in results if result["status"] == "complete")
+        })
         
-        # Si nous avons des coordonnées d'origine et que les coordonnées calculées sont complètes, 
-        # calculer la distance entre les deux
-        print(f"[DEBUG] Vérification des conditions pour le calcul de distance:")
-        print(f"[DEBUG] - origin_lat: {origin_lat} ({type(origin_lat).__name__ if origin_lat else 'None'})")
-        print(f"[DEBUG] - origin_lon: {origin_lon} ({type(origin_lon).__name__ if origin_lon else 'None'})")
-        print(f"[DEBUG] - global_status: {global_status}")
-        print(f"[DEBUG] - lat_decimal_value: {lat_decimal} ({type(lat_decimal).__name__})")
-        print(f"[DEBUG] - lon_decimal_value: {lon_decimal} ({type(lon_decimal).__name__})")
+    except Exception as e:
+        print(f"[ERROR] Erreur lors du calcul des coordonnées en lot: {str(e)}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@coordinates_bp.route('/api/calculate_coordinates/solve', methods=['POST'])
+def solve_formula_letters():
+    """
+    Recherche par force brute les valeurs des lettres inconnues d'une formule,
+    avec élagage (chiffres entiers, minutes < 60, décimales sur 3 chiffres,
+    règle des 2 miles) et classement des solutions par distance à l'origine.
+    
+    Exemple de données attendues:
+    {
+        "formula": "N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)",
+        "variables": {"A": 1},                  # lettres connues (optionnel)
+        "domains": {"B": "0-9", "C": [1, 2]},  # 0-9 par défaut (optionnel)
+        "origin_lat": "N49° 18.000",            # optionnel
+        "origin_lon": "E006° 16.000",           # optionnel
+        "max_distance_miles": 2,                # optionnel
+        "max_results": 100,                     # optionnel
+        "strict_digits": true,                  # optionnel
+        "timeout": 10                           # optionnel, en secondes
+    }
+    
+    Retourne:
+    {
+        "solutions": [...],  # format de /api/calculate_coordinates + "variables"
+        "count": 42,         # nombre total de solutions trouvées
+        "returned": 42,
+        "evaluated": 12345,  # affectations évaluées après élagage
+        "truncated": false,
+        "elapsed_ms": 12.3
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        formula = data.get('formula', '')
+        if not formula:
+            return jsonify({"error": "Aucune formule fournie"}), 400
         
-        if origin_lat and origin_lon and global_status == "complete" and isinstance(lat_decimal, (int, float)) and isinstance(lon_decimal, (int, float)):
-            try:
-                print(f"[DEBUG] Conditions remplies pour calculer la distance entre les coordonnées")
-                print(f"[DEBUG] Origin lat: {origin_lat}, Origin lon: {origin_lon}")
-                print(f"[DEBUG] Destination lat: {lat_formatted}, Destination lon: {lon_formatted}")
-                distance_info = calculate_distance_between_coords(
-                    origin_lat=origin_lat,
-                    origin_lon=origin_lon,
-                    dest_lat=lat_formatted,
-                    dest_lon=lon_formatted
-                )
-                result["distance_from_origin"] = distance_info
-                print(f"[DEBUG] Distance calculée: {distance_info}")
-            except Exception as e:
-                print(f"[ERROR] Erreur lors du calcul de la distance: {str(e)}")
-                traceback.print_exc()
-        else:
-            print(f"[DEBUG] Calcul de distance impossible: origin_lat={origin_lat}, origin_lon={origin_lon}, global_status={global_status}")
-            print(f"[DEBUG] lat_decimal_value est de type {type(lat_decimal).__name__}: {lat_decimal}")
-            print(f"[DEBUG] lon_decimal_value est de type {type(lon_decimal).__name__}: {lon_decimal}")
+        try:
+            compiled = compile_formula(formula)
+        except FormulaSyntaxError:
+            return jsonify({"error": "Format de formule invalide"}), 400
         
-        print(f"[DEBUG] Résultat final: {result}")
-        return jsonify(result)
+        try:
+            domains = {letter.upper(): parse_domain(spec) for letter, spec in (data.get('domains') or {}).items()}
+            for letter, value in (data.get('variables') or {}).items():
+                if value not in (None, ''):
+                    domains[letter.upper()] = parse_domain(value)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Domaine invalide: {str(e)}"}), 400
+        
+        origin = None
+        origin_lat = data.get('origin_lat')
+        origin_lon = data.get('origin_lon')
+        if origin_lat and origin_lon:
+            origin_coords = convert_ddm_to_decimal(origin_lat, origin_lon)
+            if origin_coords['latitude'] is None or origin_coords['longitude'] is None:
+                return jsonify({"error": "Coordonnées d'origine invalides"}), 400
+            origin = (origin_coords['latitude'], origin_coords['longitude'])
+        
+        solver = FormulaBruteForceSolver(
+            compiled,
+            domains,
+            origin=origin,
+            max_distance_miles=float(data.get('max_distance_miles', DEFAULT_MAX_DISTANCE_MILES)),
+            max_results=min(int(data.get('max_results', 100)), 1000),
+            strict_digits=bool(data.get('strict_digits', True)),
+            timeout=min(float(data.get('timeout', 10)), 60.0),
+        )
+        return jsonify(solver.solve())
         
     except Exception as e:
-        print(f"[ERROR] Erreur lors du calcul des coordonnées: {str(e)}")
+        print(f"[ERROR] Erreur lors de la résolution par force brute: {str(e)}")
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@traced()
+def _evaluate_formula_batch(compiled, assignments, origin_lat=None, origin_lon=None):
+    """
+    Évalue une formule compilée pour une liste d'affectations et construit
+    les réponses (coordonnées formatées, décimales et distance à l'origine).
+    """
+    batch = compiled.evaluate_many(assignments)
+    latitudes, longitudes = batch.decimal_coordinates()
+    complete = batch.complete
+    
+    # Distance à l'origine, calculée en une fois pour toutes les affectations complètes
+    distances = None
+    if origin_lat and origin_lon and complete.any():
+        try:
+            origin = convert_ddm_to_decimal(origin_lat, origin_lon)
+            if origin['latitude'] is not None and origin['longitude'] is not None:
+                indices = np.flatnonzero(complete)
+                meters = geodesy.distances(origin['latitude'], origin['longitude'],
+                                           latitudes[indices], longitudes[indices])
+                distances = dict(zip(indices.tolist(), meters.tolist()))
+        except Exception as e:
+            print(f"[ERROR] Erreur lors du calcul de la distance: {str(e)}")
+            traceback.print_exc()
+    
+    results = []
+    for index in range(batch.size):
+        result = batch.row(index)
+        if complete[index]:
+            # Coordonnées décimales pour l'affichage automatique sur la carte
+            result["decimal_latitude"] = float(latitudes[index])
+            result["decimal_longitude"] = float(longitudes[index])
+            if distances is not None:
+                result["distance_from_origin"] = geodesy.distance_info(distances[index])
+        results.append(result)
+    return results
+
 def calculate_distance_between_coords(origin_lat, origin_lon, dest_lat, dest_lon):
     """
     Calcule la distance entre deux coordonnées au format DDM
@@ -286,201 +298,28 @@ def calculate_distance_between_coords(origin_lat, origin_lon, dest_lat, dest_lon
     Returns:
         dict: Dictionnaire contenant la distance en mètres, en miles et un statut
     """
-    print(f"[DEBUG] *** DÉBUT CALCUL DISTANCE ***")
-    print(f"[DEBUG] Origine: {origin_lat} {origin_lon}")
-    print(f"[DEBUG] Destination: {dest_lat} {dest_lon}")
+    tracer.log("Calcul de distance - origine: %s %s, destination: %s %s", origin_lat, origin_lon, dest_lat, dest_lon)
     
     # Convertir les coordonnées DDM en format décimal
     origin_coords = convert_ddm_to_decimal(origin_lat, origin_lon)
     dest_coords = convert_ddm_to_decimal(dest_lat, dest_lon)
     
-    print(f"[DEBUG] Origine (décimal): lat={origin_coords['latitude']}, lon={origin_coords['longitude']}")
-    print(f"[DEBUG] Destination (décimal): lat={dest_coords['latitude']}, lon={dest_coords['longitude']}")
+    tracer.log("Calcul de distance - origine (décimal): %s, destination (décimal): %s", origin_coords, dest_coords)
     
     if not origin_coords['latitude'] or not origin_coords['longitude'] or not dest_coords['latitude'] or not dest_coords['longitude']:
-        print(f"[ERROR] Conversion des coordonnées en décimal impossible")
+        tracer.log("Calcul de distance - conversion des coordonnées en décimal impossible")
         raise ValueError("Impossible de convertir les coordonnées en format décimal")
     
-    # Calculer la distance avec Geod
-    geod = Geod(ellps="WGS84")
-    _, _, distance_m = geod.inv(
-        origin_coords['longitude'], origin_coords['latitude'],
-        dest_coords['longitude'], dest_coords['latitude']
+    # Calculer la distance avec l'instance Geod partagée
+    distance_m = geodesy.distances(
+        origin_coords['latitude'], origin_coords['longitude'],
+        dest_coords['latitude'], dest_coords['longitude']
     )
     
-    # Convertir en miles (1 mile = 1609.344 mètres)
-    distance_miles = distance_m / 1609.344
-    
-    print(f"[DEBUG] Distance calculée: {distance_m} mètres ({distance_miles} miles)")
-    
-    # Déterminer le statut en fonction de la distance
-    # Moins de 2 miles = ok
-    # Entre 2 et 2.5 miles = warning
-    # Plus de 2.5 miles = far
-    status = "ok"
-    if distance_miles > 2.5:
-        status = "far"
-        print(f"[DEBUG] Statut: FAR - Distance > 2.5 miles")
-    elif distance_miles > 2.0:
-        status = "warning"
-        print(f"[DEBUG] Statut: WARNING - Distance entre 2.0 et 2.5 miles")
-    else:
-        print(f"[DEBUG] Statut: OK - Distance < 2.0 miles")
-    
-    print(f"[DEBUG] *** FIN CALCUL DISTANCE ***")
-    
-    return {
-        "meters": round(distance_m, 2),
-        "miles": round(distance_miles, 2),
-        "status": status
-    }
-
-def _process_formula_part(formula_part, variables):
-    """
-    Traite une partie de formule (généralement la partie décimale des minutes)
-    et remplace les variables par leurs valeurs si disponibles.
-    
-    Args:
-        formula_part: Partie de la formule à traiter (peut être une expression entre parenthèses)
-        variables: Dictionnaire des variables avec leurs valeurs
-        
-    Returns:
-        Le résultat calculé ou l'expression partiellement résolue
-    """
-    print(f"[DEBUG] _process_formula_part: Traitement de '{formula_part}' avec variables {variables}")
-    
-    # Si ce n'est pas une expression entre parenthèses initiale, mais peut contenir des sous-expressions
-    if not formula_part.startswith('('):
-        # Si c'est juste un chiffre, le retourner directement
-        if formula_part.isdigit():
-            return int(formula_part)
-        
-        # Si la formule contient des lettres majuscules, la traiter comme une expression
-        if re.search(r'[A-Z]', formula_part):
-            print(f"[DEBUG] Détection de lettres dans '{formula_part}', traitement comme expression")
-            # Remplacer les lettres par leurs valeurs si disponibles
-            expression = formula_part
-            has_letters_with_values = False
-            
-            for var, value in variables.items():
-                if var in expression:
-                    has_letters_with_values = True
-                    expression = expression.replace(var, str(value))
-            
-            # Si aucune lettre n'a été remplacée, retourner l'expression telle quelle
-            if not has_letters_with_values:
-                print(f"[DEBUG] Aucune variable disponible pour '{formula_part}', retour tel quel")
-                return formula_part
-            
-            # Si l'expression contient des parenthèses après le remplacement, essayer de résoudre les sous-expressions
-            if '(' in expression and ')' in expression:
-                # Chercher toutes les sous-expressions entre parenthèses simples
-                sub_expr_pattern = r'\(([^()]+)\)'
-                while re.search(sub_expr_pattern, expression):
-                    # Évaluer la sous-expression
-                    expression = re.sub(sub_expr_pattern, lambda m: str(_evaluate_math_expression(m.group(1).replace('x', '*'))), expression)
-                    
-                    # Si l'expression contient un marqueur d'erreur, arrêter le traitement
-                    if 'ERR:' in expression:
-                        # Extraire et retourner l'expression originale avec parenthèses
-                        parts = expression.split(':')
-                        if len(parts) >= 3:
-                            return f"({parts[2]})"
-                
-                # Si après résolution des sous-expressions il ne reste plus de lettres, évaluer l'expression complète
-                if not re.search(r'[A-Z]', expression):
-                    result = _evaluate_math_expression(expression)
-                    # Vérifier si le résultat contient un marqueur d'erreur
-                    if isinstance(result, str) and result.startswith('ERR:'):
-                        # Extraire et retourner l'expression originale avec parenthèses
-                        parts = result.split(':')
-                        if len(parts) >= 3:
-                            return f"({parts[2]})"
-                    print(f"[DEBUG] Résultat final: {result}")
-                    return result
-            
-            # Si l'expression contient encore des lettres majuscules, retourner l'expression partiellement résolue
-            if re.search(r'[A-Z]', expression):
-                print(f"[DEBUG] Expression partiellement résolue: '{expression}'")
-                return expression
-            
-            # Sinon, essayer d'évaluer comme une expression mathématique
-            result = _evaluate_math_expression(expression)
-            # Vérifier si le résultat contient un marqueur d'erreur
-            if isinstance(result, str) and result.startswith('ERR:'):
-                # Extraire et retourner l'expression originale avec parenthèses
-                parts = result.split(':')
-                if len(parts) >= 3:
-                    return f"({parts[2]})"
-            print(f"[DEBUG] Expression évaluée: '{expression}' = {result}")
-            return result
-        
-        # Sinon, retourner tel quel
-        return formula_part
-    
-    # Extraire l'expression entre parenthèses
-    expression = formula_part[1:-1] if formula_part.endswith(')') else formula_part[1:]
-    
-    # Remplacer les multiplications 'x' par '*' pour l'évaluation
-    expression = expression.replace('x', '*')
-    
-    # Remplacer les variables par leurs valeurs
-    original_expression = expression
-    for var, value in variables.items():
-        if var in expression:
-            expression = expression.replace(var, str(value))
-    
-    # Vérifier si toutes les variables ont été remplacées
-    # Si l'expression contient encore des lettres majuscules (sauf E pour notation scientifique)
-    if re.search(r'[A-DF-Z]', expression):
-        # Retourner l'expression partiellement résolue
-        return f"({expression})"
-    
-    # Évaluer l'expression mathématique
-    result = _evaluate_math_expression(expression)
-    # Vérifier si le résultat contient un marqueur d'erreur
-    if isinstance(result, str) and result.startswith('ERR:'):
-        # Extraire et retourner l'expression originale avec parenthèses
-        parts = result.split(':')
-        if len(parts) >= 3:
-            return f"({parts[2]})"
-    return result
-
-def _evaluate_math_expression(expression):
-    """
-    Évalue une expression mathématique et vérifie que le résultat est un entier.
+    distance_info = geodesy.distance_info(distance_m)
+    tracer.log("Distance calculée: %s", distance_info)
     
-    Args:
-        expression: L'expression mathématique à évaluer (sans lettres, uniquement des chiffres et opérateurs)
-        
-    Returns:
-        Le résultat arrondi si c'est un nombre entier ou proche d'un entier
-        Sinon, retourne l'expression originale entre parenthèses avec un marqueur d'erreur
-    """
-    print(f"[DEBUG] _evaluate_math_expression: Évaluation de '{expression}'")
-    
-    try:
-        # Évaluer l'expression
-        result = eval(expression)
-        print(f"[DEBUG] _evaluate_math_expression: Résultat brut = {result}")
-        
-        # Vérifier si le résultat est un nombre
-        if isinstance(result, (int, float)):
-            # Vérifier si c'est un entier ou très proche d'un entier (tolérance pour les erreurs de virgule flottante)
-            if abs(result - round(result)) < 1e-10:
-                return round(result)
-            else:
-                # Si c'est une valeur décimale significative, signaler l'erreur mais ne pas lever d'exception
-                error_msg = f"L'expression '{expression}' donne un résultat non entier: {result}"
-                print(f"[ERROR] {error_msg}")
-                # Retourner l'expression originale avec un marqueur spécial pour la gestion des erreurs
-                return f"ERR:NONINTEGER:{expression}"
-    except Exception as e:
-        print(f"[ERROR] Impossible d'évaluer l'expression '{expression}': {str(e)}")
-        # Retourner l'expression originale avec un marqueur d'erreur
-        return f"ERR:SYNTAX:{expression}"
-    
-    return result
+    return distance_info
 
 # ------------------------------------------------------------------------------
 # Configuration : listes/mappings pour les directions (Nord, Est, ...)
@@ -515,10 +354,11 @@ def _format_coordinate(coord_str: str, expected_deg_digits: int) -> str:
     :return: La coordonnée formatée en DDM.
     :raises ValueError: Si la chaîne est trop courte.
     """
-    print(f"[DEBUG] _format_coordinate: Formatage de '{coord_str}' avec {expected_deg_digits} chiffres pour les degrés")
+    tracer.log("_format_coordinate: Formatage de '%s' avec %s chiffres pour les degrés", coord_str, expected_deg_digits)
     
     if len(coord_str) < expected_deg_digits + 2:
-        print(f"[DEBUG] _format_coordinate: Erreur - Chaîne trop courte ({len(coord_str)} < {expected_deg_digits + 2})")
+        if tracer.enabled:
+            tracer.log("_format_coordinate: Erreur - Chaîne trop courte (%s < %s)", len(coord_str), expected_deg_digits + 2)
         raise ValueError("Chaîne de coordonnées trop courte pour le format attendu.")
     
     # Les degrés sont les premiers chiffres
@@ -528,7 +368,7 @@ def _format_coordinate(coord_str: str, expected_deg_digits: int) -> str:
     # Le reste (s'il existe) correspond à la partie décimale des minutes
     decimal_part = coord_str[expected_deg_digits+2:]
     
-    print(f"[DEBUG] _format_coordinate: Décomposition - degrés={deg}, minutes_int={minutes_int}, decimal_part={decimal_part}")
+    tracer.log("_format_coordinate: Décomposition - degrés=%s, minutes_int=%s, decimal_part=%s", deg, minutes_int, decimal_part)
     
     if decimal_part:
         minutes = f"{minutes_int}.{decimal_part}"
@@ -536,40 +376,43 @@ def _format_coordinate(coord_str: str, expected_deg_digits: int) -> str:
         minutes = minutes_int
         
     result = f"{deg}° {minutes}'"
-    print(f"[DEBUG] _format_coordinate: Résultat formaté: {result}")
+    tracer.log("_format_coordinate: Résultat formaté: %s", result)
     return result
 
 # ------------------------------------------------------------------------------
 # Détection du format DMM classique (par exemple "N 48° 33.787' E 006° 38.803'")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_dmm_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
-    print(f"[DEBUG] _detect_dmm_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_dmm_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     dmm_regex = (
         r'([NS])\s*(\d{1,2})\s*[°º]\s*(\d{1,2}(?:\.\d+)?)[\'"]?\s*'
         r'([EW])\s*(\d{1,3})\s*[°º]\s*(\d{1,2}(?:\.\d+)?)[\'"]?'
     )
-    print(f"[DEBUG] _detect_dmm_coordinates: Regex utilisée: {dmm_regex}")
+    tracer.log("_detect_dmm_coordinates: Regex utilisée: %s", dmm_regex)
     match = re.search(dmm_regex, text)
     if match:
-        print(f"[DEBUG] _detect_dmm_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_dmm_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_dir, lat_deg, lat_min, lon_dir, lon_deg, lon_min = match.groups()
         ddm_lat = f"{lat_dir} {lat_deg}° {lat_min}'"
         ddm_lon = f"{lon_dir} {lon_deg}° {lon_min}'"
-        print(f"[DEBUG] _detect_dmm_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_dmm_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         return {
             "exist": True,
             "ddm_lat": ddm_lat,
             "ddm_lon": ddm_lon,
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
-    print("[DEBUG] _detect_dmm_coordinates: Aucun match trouvé")
+    tracer.log("_detect_dmm_coordinates: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format avec tabulations et espaces (ex: "N 48 ° 32 . 296 E 6 ° 40 . 636")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_tabspace_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format avec tabulations et espaces, par exemple :
@@ -578,7 +421,7 @@ def _detect_tabspace_coordinates(text: str) -> Optional[Dict[str, Optional[str]]
     
     Ce format est plus souple et accepte des variations dans les espaces et la ponctuation.
     """
-    print(f"[DEBUG] _detect_tabspace_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_tabspace_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Pattern plus souple qui accepte des variations dans les espaces et la ponctuation
     tabspace_regex = (
@@ -586,18 +429,19 @@ def _detect_tabspace_coordinates(text: str) -> Optional[Dict[str, Optional[str]]
         r'([EW])\s*(\d{1,3})\s*°\s*(\d{1,2})\s*[.,]\s*(\d{1,3})'
     )
     
-    print(f"[DEBUG] _detect_tabspace_coordinates: Regex utilisée: {tabspace_regex}")
+    tracer.log("_detect_tabspace_coordinates: Regex utilisée: %s", tabspace_regex)
     
     match = re.search(tabspace_regex, text, re.DOTALL)
     if match:
-        print(f"[DEBUG] _detect_tabspace_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_tabspace_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_dir, lat_deg, lat_min, lat_sec, lon_dir, lon_deg, lon_min, lon_sec = match.groups()
         
         # Formatage des coordonnées
         ddm_lat = f"{lat_dir} {lat_deg}° {lat_min}.{lat_sec}'"
         ddm_lon = f"{lon_dir} {lon_deg}° {lon_min}.{lon_sec}'"
         
-        print(f"[DEBUG] _detect_tabspace_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_tabspace_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -606,13 +450,14 @@ def _detect_tabspace_coordinates(text: str) -> Optional[Dict[str, Optional[str]]
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_tabspace_coordinates: Aucun match trouvé")
+    tracer.log("_detect_tabspace_coordinates: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format variant (ex : "NORD 4833787 EST 638803")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_variant_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format variant, par exemple :
@@ -624,7 +469,7 @@ def _detect_variant_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
     Pour la latitude, on attend une chaîne de 7 chiffres, et pour la longitude une chaîne de 6 à 8 chiffres.
     Si la longitude comporte moins de 8 chiffres, on la complète avec des zéros à gauche.
     """
-    print(f"[DEBUG] _detect_variant_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_variant_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Construction des patterns pour les directions
     north_pattern = '|'.join(NORTH_VARIANTS)
@@ -633,33 +478,34 @@ def _detect_variant_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
     # Le pattern autorise espaces, retours à la ligne ou "/" comme séparateurs
     pattern = rf"(?P<lat_dir>{north_pattern})\s*[/\n\s]*\s*(?P<lat>\d{{7}})\s*(?P<lon_dir>{east_pattern})\s*[/\n\s]*\s*(?P<lon>\d{{6,8}})"
     
-    print(f"[DEBUG] _detect_variant_coordinates: Pattern utilisé: {pattern}")
+    tracer.log("_detect_variant_coordinates: Pattern utilisé: %s", pattern)
     
     match = re.search(pattern, text)
     if match:
-        print(f"[DEBUG] _detect_variant_coordinates: Match trouvé! Groupes: {match.groupdict()}")
+        if tracer.enabled:
+            tracer.log("_detect_variant_coordinates: Match trouvé! Groupes: %s", match.groupdict())
         lat_dir_raw = match.group("lat_dir")
         lon_dir_raw = match.group("lon_dir")
         lat_digits  = match.group("lat")
         lon_digits  = match.group("lon")
         
-        print(f"[DEBUG] _detect_variant_coordinates: Directions brutes: lat={lat_dir_raw}, lon={lon_dir_raw}")
-        print(f"[DEBUG] _detect_variant_coordinates: Digits: lat={lat_digits}, lon={lon_digits}")
+        tracer.log("_detect_variant_coordinates: Directions brutes: lat=%s, lon=%s", lat_dir_raw, lon_dir_raw)
+        tracer.log("_detect_variant_coordinates: Digits: lat=%s, lon=%s", lat_digits, lon_digits)
         
         # Normalisation des directions pour obtenir "N" et "E"
         lat_dir = DIRECTION_MAP.get(lat_dir_raw, lat_dir_raw[0].upper())
         lon_dir = DIRECTION_MAP.get(lon_dir_raw, lon_dir_raw[0].upper())
         
-        print(f"[DEBUG] _detect_variant_coordinates: Directions normalisées: lat={lat_dir}, lon={lon_dir}")
+        tracer.log("_detect_variant_coordinates: Directions normalisées: lat=%s, lon=%s", lat_dir, lon_dir)
         
         try:
             # Pour la latitude, si nécessaire, compléter à 7 chiffres
             if len(lat_digits) < 7:
                 lat_digits = lat_digits.zfill(7)
             ddm_lat = f"{lat_dir} " + _format_coordinate(lat_digits, expected_deg_digits=2)
-            print(f"[DEBUG] _detect_variant_coordinates: Latitude formatée: {ddm_lat}")
+            tracer.log("_detect_variant_coordinates: Latitude formatée: %s", ddm_lat)
         except ValueError as e:
-            print(f"[DEBUG] _detect_variant_coordinates: Erreur lors du formatage de la latitude: {e}")
+            tracer.log("_detect_variant_coordinates: Erreur lors du formatage de la latitude: %s", e)
             ddm_lat = None
         
         try:
@@ -667,26 +513,27 @@ def _detect_variant_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
             if len(lon_digits) < 8:
                 lon_digits = lon_digits.zfill(8)
             ddm_lon = f"{lon_dir} " + _format_coordinate(lon_digits, expected_deg_digits=3)
-            print(f"[DEBUG] _detect_variant_coordinates: Longitude formatée: {ddm_lon}")
+            tracer.log("_detect_variant_coordinates: Longitude formatée: %s", ddm_lon)
         except ValueError as e:
-            print(f"[DEBUG] _detect_variant_coordinates: Erreur lors du formatage de la longitude: {e}")
+            tracer.log("_detect_variant_coordinates: Erreur lors du formatage de la longitude: %s", e)
             ddm_lon = None
         
         if ddm_lat and ddm_lon:
-            print(f"[DEBUG] _detect_variant_coordinates: Coordonnées complètes détectées: {ddm_lat} {ddm_lon}")
+            tracer.log("_detect_variant_coordinates: Coordonnées complètes détectées: %s %s", ddm_lat, ddm_lon)
             return {
                 "exist": True,
                 "ddm_lat": ddm_lat,
                 "ddm_lon": ddm_lon,
                 "ddm": f"{ddm_lat} {ddm_lon}"
             }
-    print("[DEBUG] _detect_variant_coordinates: Aucun match trouvé ou coordonnées incomplètes")
+    tracer.log("_detect_variant_coordinates: Aucun match trouvé ou coordonnées incomplètes")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format spécifique avec tabulations et points (ex: "N\t48 ° 32 . 296\nE\t6 ° 40 . 636")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_specific_tabpoint_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format très spécifique avec tabulations et points, comme dans l'exemple :
@@ -694,23 +541,24 @@ def _detect_specific_tabpoint_coordinates(text: str) -> Optional[Dict[str, Optio
     
     Cette fonction est optimisée pour ce format particulier.
     """
-    print(f"[DEBUG] _detect_specific_tabpoint_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_specific_tabpoint_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Essayons d'abord avec un pattern très spécifique
     specific_regex = r'N\s*(\d{1,2})\s*°\s*(\d{1,2})\s*\.\s*(\d{1,3}).*?E\s*(\d{1,3})\s*°\s*(\d{1,2})\s*\.\s*(\d{1,3})'
     
-    print(f"[DEBUG] _detect_specific_tabpoint_coordinates: Regex utilisée: {specific_regex}")
+    tracer.log("_detect_specific_tabpoint_coordinates: Regex utilisée: %s", specific_regex)
     
     match = re.search(specific_regex, text, re.DOTALL)
     if match:
-        print(f"[DEBUG] _detect_specific_tabpoint_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_specific_tabpoint_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_deg, lat_min, lat_sec, lon_deg, lon_min, lon_sec = match.groups()
         
         # Formatage des coordonnées
         ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
         ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
         
-        print(f"[DEBUG] _detect_specific_tabpoint_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_specific_tabpoint_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -719,39 +567,40 @@ def _detect_specific_tabpoint_coordinates(text: str) -> Optional[Dict[str, Optio
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_specific_tabpoint_coordinates: Aucun match trouvé")
+    tracer.log("_detect_specific_tabpoint_coordinates: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection simplifiée pour le format exact de l'exemple
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_simplified_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détection simplifiée pour le format exact de l'exemple.
     Cette fonction utilise une approche plus directe pour détecter les coordonnées.
     """
-    print(f"[DEBUG] _detect_simplified_coordinates: Analyse du texte: '{text}'")
+    tracer.log("_detect_simplified_coordinates: Analyse du texte: '%s'", text)
     
     # Extraction des lignes
     lines = text.strip().split('\n')
-    print(f"[DEBUG] _detect_simplified_coordinates: Lignes extraites: {lines}")
+    tracer.log("_detect_simplified_coordinates: Lignes extraites: %s", lines)
     
     if len(lines) >= 2:
         # Vérifier si la première ligne commence par N et la deuxième par E
         lat_line = lines[0].strip()
         lon_line = lines[1].strip()
         
-        print(f"[DEBUG] _detect_simplified_coordinates: Ligne latitude: '{lat_line}'")
-        print(f"[DEBUG] _detect_simplified_coordinates: Ligne longitude: '{lon_line}'")
+        tracer.log("_detect_simplified_coordinates: Ligne latitude: '%s'", lat_line)
+        tracer.log("_detect_simplified_coordinates: Ligne longitude: '%s'", lon_line)
         
         if lat_line.startswith('N') and lon_line.startswith('E'):
             # Extraction des nombres de la latitude
             lat_parts = re.findall(r'\d+', lat_line)
             lon_parts = re.findall(r'\d+', lon_line)
             
-            print(f"[DEBUG] _detect_simplified_coordinates: Parties latitude: {lat_parts}")
-            print(f"[DEBUG] _detect_simplified_coordinates: Parties longitude: {lon_parts}")
+            tracer.log("_detect_simplified_coordinates: Parties latitude: %s", lat_parts)
+            tracer.log("_detect_simplified_coordinates: Parties longitude: %s", lon_parts)
             
             if len(lat_parts) >= 3 and len(lon_parts) >= 3:
                 lat_deg, lat_min, lat_sec = lat_parts[0], lat_parts[1], lat_parts[2]
@@ -761,7 +610,7 @@ def _detect_simplified_coordinates(text: str) -> Optional[Dict[str, Optional[str
                 ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
                 ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
                 
-                print(f"[DEBUG] _detect_simplified_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+                tracer.log("_detect_simplified_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
                 
                 return {
                     "exist": True,
@@ -770,27 +619,29 @@ def _detect_simplified_coordinates(text: str) -> Optional[Dict[str, Optional[str
                     "ddm": f"{ddm_lat} {ddm_lon}"
                 }
     
-    print("[DEBUG] _detect_simplified_coordinates: Aucune coordonnée détectée")
+    tracer.log("_detect_simplified_coordinates: Aucune coordonnée détectée")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection ultra-flexible pour tout format avec N/E et degrés
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_flexible_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détection ultra-flexible pour tout format contenant N/E et des degrés.
     Cette fonction est conçue pour être très tolérante aux variations de format.
     """
-    print(f"[DEBUG] _detect_flexible_coordinates: Analyse du texte: '{text}'")
+    tracer.log("_detect_flexible_coordinates: Analyse du texte: '%s'", text)
     
     # Recherche de N suivi de nombres et de degrés
     lat_match = re.search(r'N\s*(\d{1,2})(?:\s*[°º]|\s+deg|\s+degrees)\s*(\d{1,2})(?:[.,]\s*|\s+)(\d{1,3})', text, re.IGNORECASE)
     # Recherche de E suivi de nombres et de degrés
     lon_match = re.search(r'E\s*(\d{1,3})(?:\s*[°º]|\s+deg|\s+degrees)\s*(\d{1,2})(?:[.,]\s*|\s+)(\d{1,3})', text, re.IGNORECASE)
     
-    print(f"[DEBUG] _detect_flexible_coordinates: Match latitude: {lat_match.groups() if lat_match else None}")
-    print(f"[DEBUG] _detect_flexible_coordinates: Match longitude: {lon_match.groups() if lon_match else None}")
+    if tracer.enabled:
+        tracer.log("_detect_flexible_coordinates: Match latitude: %s", lat_match.groups() if lat_match else None)
+        tracer.log("_detect_flexible_coordinates: Match longitude: %s", lon_match.groups() if lon_match else None)
     
     if lat_match and lon_match:
         lat_deg, lat_min, lat_sec = lat_match.groups()
@@ -800,7 +651,7 @@ def _detect_flexible_coordinates(text: str) -> Optional[Dict[str, Optional[str]]
         ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
         ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
         
-        print(f"[DEBUG] _detect_flexible_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_flexible_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -809,13 +660,14 @@ def _detect_flexible_coordinates(text: str) -> Optional[Dict[str, Optional[str]]
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_flexible_coordinates: Aucune coordonnée détectée")
+    tracer.log("_detect_flexible_coordinates: Aucune coordonnée détectée")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format NORD/EST avec chiffres séparés par des espaces
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_nord_est_format(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format NORD/EST avec chiffres séparés par des espaces, par exemple :
@@ -824,23 +676,24 @@ def _detect_nord_est_format(text: str) -> Optional[Dict[str, Optional[str]]]:
     
     Ce format est spécifique aux coordonnées normalisées après décodage.
     """
-    print(f"[DEBUG] _detect_nord_est_format: Analyse du texte: '{text}'")
+    tracer.log("_detect_nord_est_format: Analyse du texte: '%s'", text)
     
     # Pattern pour détecter NORD/EST suivi de chiffres séparés par des espaces
     nord_est_regex = r'(?:NORD|Nord|nord)\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,3})(?:\s+|\s*[/\n]\s*)(?:EST|Est|est)\s+(\d{1,3})\s+(\d{1,2})\s+(\d{1,3})'
     
-    print(f"[DEBUG] _detect_nord_est_format: Regex utilisée: {nord_est_regex}")
+    tracer.log("_detect_nord_est_format: Regex utilisée: %s", nord_est_regex)
     
     match = re.search(nord_est_regex, text, re.IGNORECASE)
     if match:
-        print(f"[DEBUG] _detect_nord_est_format: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_nord_est_format: Match trouvé! Groupes: %s", match.groups())
         lat_deg, lat_min, lat_sec, lon_deg, lon_min, lon_sec = match.groups()
         
         # Formatage des coordonnées
         ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
         ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
         
-        print(f"[DEBUG] _detect_nord_est_format: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_nord_est_format: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -849,13 +702,14 @@ def _detect_nord_est_format(text: str) -> Optional[Dict[str, Optional[str]]]:
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_nord_est_format: Aucun match trouvé")
+    tracer.log("_detect_nord_est_format: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format NORD/EST avec variations
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_nord_est_variations(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format NORD/EST avec diverses variations possibles, par exemple :
@@ -865,14 +719,15 @@ def _detect_nord_est_variations(text: str) -> Optional[Dict[str, Optional[str]]]
     
     Cette fonction est très flexible et tolérante aux variations de format.
     """
-    print(f"[DEBUG] _detect_nord_est_variations: Analyse du texte: '{text}'")
+    tracer.log("_detect_nord_est_variations: Analyse du texte: '%s'", text)
     
     # Extraction des nombres après NORD et EST
     nord_match = re.search(r'(?:NORD|Nord|nord)[^\d]*(\d{1,2})[^\d]*(\d{1,2})[^\d]*(\d{1,3})', text, re.IGNORECASE)
     est_match = re.search(r'(?:EST|Est|est)[^\d]*(\d{1,3})[^\d]*(\d{1,2})[^\d]*(\d{1,3})', text, re.IGNORECASE)
     
-    print(f"[DEBUG] _detect_nord_est_variations: Match NORD: {nord_match.groups() if nord_match else None}")
-    print(f"[DEBUG] _detect_nord_est_variations: Match EST: {est_match.groups() if est_match else None}")
+    if tracer.enabled:
+        tracer.log("_detect_nord_est_variations: Match NORD: %s", nord_match.groups() if nord_match else None)
+        tracer.log("_detect_nord_est_variations: Match EST: %s", est_match.groups() if est_match else None)
     
     if nord_match and est_match:
         lat_deg, lat_min, lat_sec = nord_match.groups()
@@ -882,7 +737,7 @@ def _detect_nord_est_variations(text: str) -> Optional[Dict[str, Optional[str]]]
         ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
         ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
         
-        print(f"[DEBUG] _detect_nord_est_variations: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_nord_est_variations: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -891,13 +746,14 @@ def _detect_nord_est_variations(text: str) -> Optional[Dict[str, Optional[str]]]
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_nord_est_variations: Aucun match trouvé")
+    tracer.log("_detect_nord_est_variations: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format DMS (degrés, minutes, secondes)
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_dms_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format DMS (degrés, minutes, secondes), par exemple :
@@ -905,7 +761,7 @@ def _detect_dms_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     
     Ce format est couramment utilisé dans le géocaching.
     """
-    print(f"[DEBUG] _detect_dms_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_dms_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Pattern pour détecter le format DMS
     dms_regex = (
@@ -913,11 +769,12 @@ def _detect_dms_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
         r'([EW])\s*(\d{1,3})\s*[°º]\s*(\d{1,2})\s*[\']\s*(\d{1,2}(?:\.\d+)?)[\"\']*'
     )
     
-    print(f"[DEBUG] _detect_dms_coordinates: Regex utilisée: {dms_regex}")
+    tracer.log("_detect_dms_coordinates: Regex utilisée: %s", dms_regex)
     
     match = re.search(dms_regex, text)
     if match:
-        print(f"[DEBUG] _detect_dms_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_dms_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_dir, lat_deg, lat_min, lat_sec, lon_dir, lon_deg, lon_min, lon_sec = match.groups()
         
         # Convertir DMS en DDM
@@ -928,7 +785,7 @@ def _detect_dms_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
         ddm_lat = f"{lat_dir} {lat_deg}° {lat_min_decimal:.3f}'"
         ddm_lon = f"{lon_dir} {lon_deg}° {lon_min_decimal:.3f}'"
         
-        print(f"[DEBUG] _detect_dms_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+        tracer.log("_detect_dms_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
         
         return {
             "exist": True,
@@ -937,13 +794,14 @@ def _detect_dms_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
             "ddm": f"{ddm_lat} {ddm_lon}"
         }
     
-    print("[DEBUG] _detect_dms_coordinates: Aucun match trouvé")
+    tracer.log("_detect_dms_coordinates: Aucun match trouvé")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format avec chiffres romains
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_roman_numerals_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées avec des chiffres romains, par exemple :
@@ -952,7 +810,7 @@ def _detect_roman_numerals_coordinates(text: str) -> Optional[Dict[str, Optional
     
     Cette fonction convertit d'abord les chiffres romains en chiffres arabes.
     """
-    print(f"[DEBUG] _detect_roman_numerals_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_roman_numerals_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Dictionnaire de conversion des chiffres romains
     roman_to_arabic = {
@@ -978,11 +836,12 @@ def _detect_roman_numerals_coordinates(text: str) -> Optional[Dict[str, Optional
     # Rechercher les motifs de chiffres romains
     roman_pattern = r'(NORD|Nord|nord|N)\s+((?:[IVXLCDM]+)\s+(?:[IVXLCDM]+)\s+(?:[IVXLCDM]+))\s+(EST|Est|est|E)\s+((?:[IVXLCDM]+)\s+(?:[IVXLCDM]+)\s+(?:[IVXLCDM]+))'
     
-    print(f"[DEBUG] _detect_roman_numerals_coordinates: Pattern utilisé: {roman_pattern}")
+    tracer.log("_detect_roman_numerals_coordinates: Pattern utilisé: %s", roman_pattern)
     
     match = re.search(roman_pattern, text, re.IGNORECASE)
     if match:
-        print(f"[DEBUG] _detect_roman_numerals_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_roman_numerals_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_dir, lat_romans, lon_dir, lon_romans = match.groups()
         
         # Extraire les chiffres romains individuels
@@ -1000,13 +859,13 @@ def _detect_roman_numerals_coordinates(text: str) -> Optional[Dict[str, Optional
                 lon_min = roman_to_int(lon_parts[1])
                 lon_sec = roman_to_int(lon_parts[2])
                 
-                print(f"[DEBUG] _detect_roman_numerals_coordinates: Conversion - lat: {lat_deg} {lat_min} {lat_sec}, lon: {lon_deg} {lon_min} {lon_sec}")
+                tracer.log("_detect_roman_numerals_coordinates: Conversion - lat: %s %s %s, lon: %s %s %s", lat_deg, lat_min, lat_sec, lon_deg, lon_min, lon_sec)
                 
                 # Formatage des coordonnées
                 ddm_lat = f"N {lat_deg}° {lat_min}.{lat_sec}'"
                 ddm_lon = f"E {lon_deg}° {lon_min}.{lon_sec}'"
                 
-                print(f"[DEBUG] _detect_roman_numerals_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+                tracer.log("_detect_roman_numerals_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
                 
                 return {
                     "exist": True,
@@ -1015,15 +874,16 @@ def _detect_roman_numerals_coordinates(text: str) -> Optional[Dict[str, Optional
                     "ddm": f"{ddm_lat} {ddm_lon}"
                 }
             except Exception as e:
-                print(f"[DEBUG] _detect_roman_numerals_coordinates: Erreur lors de la conversion: {e}")
+                tracer.log("_detect_roman_numerals_coordinates: Erreur lors de la conversion: %s", e)
     
-    print("[DEBUG] _detect_roman_numerals_coordinates: Aucun match trouvé ou erreur de conversion")
+    tracer.log("_detect_roman_numerals_coordinates: Aucun match trouvé ou erreur de conversion")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format numérique pur (ex: "4912123 00612123")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format numérique pur, sans lettres cardinales ni symboles.
@@ -1036,23 +896,24 @@ def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str
     Si origin_coords est fourni, utilise les directions cardinales de ces coordonnées (N/S, E/W)
     plutôt que de supposer N et E par défaut.
     """
-    print(f"[DEBUG] _detect_numeric_only_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
-    print(f"[DEBUG] _detect_numeric_only_coordinates: Coordonnées d'origine: {origin_coords}")
+    tracer.log("_detect_numeric_only_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
+    tracer.log("_detect_numeric_only_coordinates: Coordonnées d'origine: %s", origin_coords)
     
     # Pattern pour capturer deux groupes de chiffres séparés par un espace
     # Premier groupe: exactement 7 chiffres (latitude)
     # Deuxième groupe: 6 à 8 chiffres (longitude)
     numeric_pattern = r'(\d{7})\s+(\d{6,8})'
     
-    print(f"[DEBUG] _detect_numeric_only_coordinates: Pattern utilisé: {numeric_pattern}")
+    tracer.log("_detect_numeric_only_coordinates: Pattern utilisé: %s", numeric_pattern)
     
     match = re.search(numeric_pattern, text)
     if match:
-        print(f"[DEBUG] _detect_numeric_only_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_numeric_only_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_digits = match.group(1)
         lon_digits = match.group(2)
         
-        print(f"[DEBUG] _detect_numeric_only_coordinates: Latitude digits: {lat_digits}, Longitude digits: {lon_digits}")
+        tracer.log("_detect_numeric_only_coordinates: Latitude digits: %s, Longitude digits: %s", lat_digits, lon_digits)
         
         try:
             # Pour la latitude
@@ -1065,14 +926,14 @@ def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str
             
             # Compléter la longitude avec des zéros en tête si nécessaire pour avoir 8 chiffres
             padded_lon_digits = lon_digits.zfill(8)
-            print(f"[DEBUG] _detect_numeric_only_coordinates: Longitude avec padding: {padded_lon_digits}")
+            tracer.log("_detect_numeric_only_coordinates: Longitude avec padding: %s", padded_lon_digits)
             
             # Maintenant nous pouvons découper correctement
             lon_deg = padded_lon_digits[0:3]
             lon_min = padded_lon_digits[3:5]
             lon_dec = padded_lon_digits[5:8]
             
-            print(f"[DEBUG] _detect_numeric_only_coordinates: Découpage - lon_deg={lon_deg}, lon_min={lon_min}, lon_dec={lon_dec}")
+            tracer.log("_detect_numeric_only_coordinates: Découpage - lon_deg=%s, lon_min=%s, lon_dec=%s", lon_deg, lon_min, lon_dec)
             
             # Déterminer les directions cardinales (N/S, E/W) en fonction des coordonnées d'origine
             lat_dir = "N"  # Direction par défaut
@@ -1086,11 +947,11 @@ def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str
                     
                     if origin_lat_match:
                         lat_dir = origin_lat_match.group(1)
-                        print(f"[DEBUG] Direction latitude depuis origine: {lat_dir}")
+                        tracer.log("Direction latitude depuis origine: %s", lat_dir)
                     
                     if origin_lon_match:
                         lon_dir = origin_lon_match.group(1)
-                        print(f"[DEBUG] Direction longitude depuis origine: {lon_dir}")
+                        tracer.log("Direction longitude depuis origine: %s", lon_dir)
                 except Exception as e:
                     print(f"[WARNING] Erreur lors de l'extraction des directions depuis les coordonnées d'origine: {e}")
                     # En cas d'erreur, on garde les directions par défaut
@@ -1099,7 +960,7 @@ def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str
             ddm_lat = f"{lat_dir} {lat_deg}° {lat_min}.{lat_dec}'"
             ddm_lon = f"{lon_dir} {lon_deg}° {lon_min}.{lon_dec}'"
             
-            print(f"[DEBUG] _detect_numeric_only_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+            tracer.log("_detect_numeric_only_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
             
             return {
                 "exist": True,
@@ -1111,13 +972,14 @@ def _detect_numeric_only_coordinates(text: str, origin_coords: Optional[Dict[str
             print(f"[ERROR] _detect_numeric_only_coordinates: Erreur lors du formatage: {e}")
             traceback.print_exc()
     
-    print("[DEBUG] _detect_numeric_only_coordinates: Aucun match trouvé ou erreur de conversion")
+    tracer.log("_detect_numeric_only_coordinates: Aucun match trouvé ou erreur de conversion")
     return None
 
 # ------------------------------------------------------------------------------
 # Détection du format compact sans séparateurs (ex: "N4812123E00612123")
 # ------------------------------------------------------------------------------
 
+@traced()
 def _detect_compact_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]:
     """
     Détecte les coordonnées au format compact sans séparateurs entre les composants, par exemple :
@@ -1128,21 +990,22 @@ def _detect_compact_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
     
     Ce format est très compact et ne contient pas de symboles de degrés ni de minutes.
     """
-    print(f"[DEBUG] _detect_compact_coordinates: Analyse du texte: '{text[:100]}...' (tronqué)")
+    tracer.log("_detect_compact_coordinates: Analyse du texte: '%.100s...' (tronqué)", text)
     
     # Pattern pour détecter le format compact
     # Capture: direction latitude, 7 chiffres, direction longitude, 6-8 chiffres
     # Accepte des espaces optionnels entre les composants
     compact_regex = r'([NS])\s*(\d{7})\s*([EW])\s*(\d{6,8})'
     
-    print(f"[DEBUG] _detect_compact_coordinates: Regex utilisée: {compact_regex}")
+    tracer.log("_detect_compact_coordinates: Regex utilisée: %s", compact_regex)
     
     match = re.search(compact_regex, text, re.IGNORECASE)
     if match:
-        print(f"[DEBUG] _detect_compact_coordinates: Match trouvé! Groupes: {match.groups()}")
+        if tracer.enabled:
+            tracer.log("_detect_compact_coordinates: Match trouvé! Groupes: %s", match.groups())
         lat_dir, lat_digits, lon_dir, lon_digits = match.groups()
         
-        print(f"[DEBUG] _detect_compact_coordinates: Latitude: {lat_dir}{lat_digits}, Longitude: {lon_dir}{lon_digits}")
+        tracer.log("_detect_compact_coordinates: Latitude: %s%s, Longitude: %s%s", lat_dir, lat_digits, lon_dir, lon_digits)
         
         try:
             # Pour la latitude
@@ -1160,7 +1023,7 @@ def _detect_compact_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
             ddm_lat = f"{lat_dir} {lat_deg}° {lat_min}.{lat_dec}'"
             ddm_lon = f"{lon_dir} {lon_deg}° {lon_min}.{lon_dec}'"
             
-            print(f"[DEBUG] _detect_compact_coordinates: Coordonnées formatées: {ddm_lat} {ddm_lon}")
+            tracer.log("_detect_compact_coordinates: Coordonnées formatées: %s %s", ddm_lat, ddm_lon)
             
             return {
                 "exist": True,
@@ -1172,13 +1035,14 @@ def _detect_compact_coordinates(text: str) -> Optional[Dict[str, Optional[str]]]
             print(f"[ERROR] _detect_compact_coordinates: Erreur lors du formatage: {e}")
             traceback.print_exc()
     
-    print("[DEBUG] _detect_compact_coordinates: Aucun match trouvé ou erreur de conversion")
+    tracer.log("_detect_compact_coordinates: Aucun match trouvé ou erreur de conversion")
     return None
 
 # ------------------------------------------------------------------------------
 # Fonction principale de détection multi-format
 # ------------------------------------------------------------------------------
 
+@traced()
 def detect_gps_coordinates(text: str, include_numeric_only: bool = False, origin_coords: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
     """
     Recherche des coordonnées GPS dans un texte en testant plusieurs formats.
@@ -1194,9 +1058,9 @@ def detect_gps_coordinates(text: str, include_numeric_only: bool = False, origin
       - 'ddm_lon': Longitude formatée en DDM.
       - 'ddm': Latitude et longitude combinées.
     """
-    print(f"[DEBUG] detect_gps_coordinates: Début de la détection sur texte de {len(text)} caractères")
-    print(f"[DEBUG] detect_gps_coordinates: Extrait du texte: '{text[:100]}...' (tronqué)")
-    print(f"[DEBUG] detect_gps_coordinates: include_numeric_only={include_numeric_only}, origin_coords={origin_coords}")
+    tracer.log("detect_gps_coordinates: Début de la détection sur texte de %d caractères", len(text))
+    tracer.log("detect_gps_coordinates: Extrait du texte: '%.100s...' (tronqué)", text)
+    tracer.log("detect_gps_coordinates: include_numeric_only=%s, origin_coords=%s", include_numeric_only, origin_coords)
     
     detection_functions = [
         _detect_compact_coordinates,  # Format compact sans séparateurs (ajouté en premier car très spécifique)
@@ -1214,21 +1078,20 @@ def detect_gps_coordinates(text: str, include_numeric_only: bool = False, origin
     
     # Ajouter la détection de coordonnées numériques pures si demandé
     if include_numeric_only:
-        print(f"[DEBUG] detect_gps_coordinates: Détection de coordonnées numériques pures activée")
+        tracer.log("detect_gps_coordinates: Détection de coordonnées numériques pures activée")
         # Pour la détection numérique, on passe les coordonnées d'origine
         result = _detect_numeric_only_coordinates(text, origin_coords)
         if result and result.get("exist"):
-            print(f"[DEBUG] detect_gps_coordinates: Coordonnées numériques pures trouvées: {result}")
+            tracer.log("detect_gps_coordinates: Coordonnées numériques pures trouvées: %s", result)
             return result
     
-    for i, detect_func in enumerate(detection_functions):
-        print(f"[DEBUG] detect_gps_coordinates: Essai de la fonction de détection #{i+1}: {detect_func.__name__}")
+    for detect_func in detection_functions:
         result = detect_func(text)
         if result and result.get("exist"):
-            print(f"[DEBUG] detect_gps_coordinates: Coordonnées trouvées par {detect_func.__name__}: {result}")
+            tracer.log("detect_gps_coordinates: Coordonnées trouvées par %s: %s", detect_func.__name__, result)
             return result
     
-    print("[DEBUG] detect_gps_coordinates: Aucune coordonnée GPS détectée")
+    tracer.log("detect_gps_coordinates: Aucune coordonnée GPS détectée")
     return {
         "exist": False,
         "ddm_lat": None,
@@ -1240,6 +1103,12 @@ def detect_gps_coordinates(text: str, include_numeric_only: bool = False, origin
 # Conversion DDM vers coordonnées décimales pour OpenLayers
 # ------------------------------------------------------------------------------
 
+# Motifs de repli de convert_ddm_to_decimal (recherche dans un texte libre,
+# signe degré obligatoire, minutes hors bornes rejetées)
+_LAT_SEARCH_PATTERN = re.compile(r'([NS])\s*(\d+)\s*[°º]\s*(\d+(?:\.\d+)?)')
+_LON_SEARCH_PATTERN = re.compile(r'([EW])\s*(\d+)\s*[°º]\s*(\d+(?:\.\d+)?)')
+
+@traced()
 def convert_ddm_to_decimal(ddm_lat: str, ddm_lon: str) -> Dict[str, float]:
     """
     Convertit des coordonnées au format DDM (N 48° 33.787' E 006° 38.803') 
@@ -1249,40 +1118,45 @@ def convert_ddm_to_decimal(ddm_lat: str, ddm_lon: str) -> Dict[str, float]:
     :param ddm_lon: Longitude au format DDM (ex: "E 006° 38.803'")
     :return: Dictionnaire avec les clés 'latitude' et 'longitude' en décimal
     """
-    print(f"[DEBUG] convert_ddm_to_decimal: Conversion de {ddm_lat}, {ddm_lon}")
+    tracer.log("convert_ddm_to_decimal: Conversion de %s, %s", ddm_lat, ddm_lon)
     
     result = {'latitude': None, 'longitude': None}
     
     try:
-        # Extraction des composants de la latitude
-        lat_pattern = r'([NS])\s*(\d+)\s*[°º]\s*(\d+(?:\.\d+)?)'
-        lat_match = re.search(lat_pattern, ddm_lat)
-        if lat_match:
-            lat_dir, lat_deg, lat_min = lat_match.groups()
-            lat_decimal = float(lat_deg) + float(lat_min) / 60
-            if lat_dir == 'S':
-                lat_decimal = -lat_decimal
-            result['latitude'] = lat_decimal
-            print(f"[DEBUG] Latitude convertie: {lat_dir}{lat_deg}° {lat_min} -> {lat_decimal}")
-        else:
-            print(f"[ERROR] Format de latitude non reconnu: {ddm_lat}")
-            print(f"[DEBUG] Motif recherché: {lat_pattern}")
-        
-        # Extraction des composants de la longitude
-        lon_pattern = r'([EW])\s*(\d+)\s*[°º]\s*(\d+(?:\.\d+)?)'
-        lon_match = re.search(lon_pattern, ddm_lon)
-        if lon_match:
-            lon_dir, lon_deg, lon_min = lon_match.groups()
-            lon_decimal = float(lon_deg) + float(lon_min) / 60
-            if lon_dir == 'W':
-                lon_decimal = -lon_decimal
-            result['longitude'] = lon_decimal
-            print(f"[DEBUG] Longitude convertie: {lon_dir}{lon_deg}° {lon_min} -> {lon_decimal}")
-        else:
-            print(f"[ERROR] Format de longitude non reconnu: {ddm_lon}")
-            print(f"[DEBUG] Motif recherché: {lon_pattern}")
+        # Chemin rapide : codec strict et mémorisé (formats Geocaching.com usuels)
+        if isinstance(ddm_lat, str):
+            result['latitude'] = parse_ddm_latitude(ddm_lat)
+        if isinstance(ddm_lon, str):
+            result['longitude'] = parse_ddm_longitude(ddm_lon)
+
+        # Repli : recherche tolérante dans un texte plus large (sortie du détecteur, etc.)
+        if result['latitude'] is None:
+            lat_match = _LAT_SEARCH_PATTERN.search(ddm_lat)
+            if lat_match and float(lat_match.group(3)) < 60:
+                lat_dir, lat_deg, lat_min = lat_match.groups()
+                lat_decimal = float(lat_deg) + float(lat_min) / 60
+                if lat_dir == 'S':
+                    lat_decimal = -lat_decimal
+                result['latitude'] = lat_decimal
+                tracer.log("Latitude convertie: %s%s° %s -> %s", lat_dir, lat_deg, lat_min, lat_decimal)
+            else:
+                print(f"[ERROR] Format de latitude non reconnu: {ddm_lat}")
+                tracer.log("Motif recherché: %s", _LAT_SEARCH_PATTERN.pattern)
+        
+        if result['longitude'] is None:
+            lon_match = _LON_SEARCH_PATTERN.search(ddm_lon)
+            if lon_match and float(lon_match.group(3)) < 60:
+                lon_dir, lon_deg, lon_min = lon_match.groups()
+                lon_decimal = float(lon_deg) + float(lon_min) / 60
+                if lon_dir == 'W':
+                    lon_decimal = -lon_decimal
+                result['longitude'] = lon_decimal
+                tracer.log("Longitude convertie: %s%s° %s -> %s", lon_dir, lon_deg, lon_min, lon_decimal)
+            else:
+                print(f"[ERROR] Format de longitude non reconnu: {ddm_lon}")
+                tracer.log("Motif recherché: %s", _LON_SEARCH_PATTERN.pattern)
             
-        print(f"[DEBUG] convert_ddm_to_decimal: Résultat de la conversion: {result}")
+        tracer.log("convert_ddm_to_decimal: Résultat de la conversion: %s", result)
     except Exception as e:
         print(f"[ERROR] convert_ddm_to_decimal: Erreur lors de la conversion: {str(e)}")
         traceback.print_exc()
@@ -1320,9 +1194,9 @@ def detect_coordinates_in_text():
         # Récupérer les coordonnées d'origine (None par défaut)
         origin_coords = data.get('origin_coords')
         
-        print(f"[DEBUG] Analyse du texte pour détecter des coordonnées: '{text[:50]}...' (tronqué)")
-        print(f"[DEBUG] Détection de format numérique pur activée: {include_numeric_only}")
-        print(f"[DEBUG] Coordonnées d'origine fournies: {origin_coords}")
+        tracer.log("Analyse du texte pour détecter des coordonnées: '%.50s...' (tronqué)", text)
+        tracer.log("Détection de format numérique pur activée: %s, coordonnées d'origine: %s",
+                   include_numeric_only, origin_coords)
         
         result = detect_gps_coordinates(text, include_numeric_only=include_numeric_only, origin_coords=origin_coords)
         
@@ -16,6 +16,7 @@ import base64
 import time
 from flask import make_response, send_from_directory
 import math
+import numpy as np
 import xml.etree.ElementTree as ET
 import re
 from flask import Response, stream_with_context
@@ -35,11 +36,17 @@ import psycopg2
 import pytz
 from bs4 import BeautifulSoup
 from app.geocaching_client import GeocachingClient, Coordinates
-from app.utils.coordinates import convert_gc_coords_to_decimal
+from app.utils.coordinates import convert_gc_coords_to_decimal, decimal_to_gc_coords, parse_ddm_many
+from app.utils import geodesy
+from app.services.thumbnail_service import get_thumbnail_service
+from werkzeug.utils import safe_join
 from app.gpx_generator import create_gpx_file, generate_filename, create_gpx_zip
 from app.utils.tools import rot13
 from app.services.formula_questions_service import formula_questions_service
-from app.services.formula_solver_service import formula_solver_service
+from app.services.formula_solver_service import formula_solver_service, DEFAULT_CONCURRENCY, DEFAULT_QUESTION_TIMEOUT
+from app.services.job_queue_service import get_job_queue, register_job_handler, job_file_dir, JobFailed
+from app.routes.jobs import stream_job_events, job_stream_response
+import shutil
 import os
 import re
 import json
@@ -487,32 +494,12 @@ def add_geocache():
                 else:
                     # Fallback au cas où les coordonnées brutes ne sont pas dans le format attendu
                     # Convertir en format Geocaching.com en respectant la direction (N/S/E/W)
-                    lat_deg = int(abs(lat))
-                    lat_min = (abs(lat) - lat_deg) * 60
-                    lon_deg = int(abs(lon))
-                    lon_min = (abs(lon) - lon_deg) * 60
-                    
-                    # Déterminer les directions en fonction du signe
-                    lat_dir = "N" if lat >= 0 else "S"
-                    lon_dir = "E" if lon >= 0 else "W"
-                    
-                    gc_lat = f"{lat_dir} {lat_deg}° {lat_min:.3f}"
-                    gc_lon = f"{lon_dir} {lon_deg}° {lon_min:.3f}"
+                    gc_lat, gc_lon = decimal_to_gc_coords(lat, lon)
                     geocache.set_location(lat, lon, gc_lat=gc_lat, gc_lon=gc_lon)
             else:
                 # Fallback si les coordonnées brutes ne sont pas disponibles
                 # Convertir en format Geocaching.com en respectant la direction (N/S/E/W)
-                lat_deg = int(abs(lat))
-                lat_min = (abs(lat) - lat_deg) * 60
-                lon_deg = int(abs(lon))
-                lon_min = (abs(lon) - lon_deg) * 60
-                
-                # Déterminer les directions en fonction du signe
-                lat_dir = "N" if lat >= 0 else "S"
-                lon_dir = "E" if lon >= 0 else "W"
-                
-                gc_lat = f"{lat_dir} {lat_deg}° {lat_min:.3f}"
-                gc_lon = f"{lon_dir} {lon_deg}° {lon_min:.3f}"
+                gc_lat, gc_lon = decimal_to_gc_coords(lat, lon)
                 geocache.set_location(lat, lon, gc_lat=gc_lat, gc_lon=gc_lon)
 
         # Ajouter les waypoints additionnels
@@ -540,31 +527,11 @@ def add_geocache():
                                 waypoint.set_location(lat, lon, gc_lat=gc_lat, gc_lon=gc_lon)
                             else:
                                 # Fallback : convertir les coordonnees decimales
-                                lat_deg = int(abs(lat))
-                                lat_min = (abs(lat) - lat_deg) * 60
-                                lon_deg = int(abs(lon))
-                                lon_min = (abs(lon) - lon_deg) * 60
-                                
-                                # Déterminer les directions en fonction du signe
-                                lat_dir = "N" if lat >= 0 else "S"
-                                lon_dir = "E" if lon >= 0 else "W"
-                                
-                                gc_lat = f"{lat_dir} {lat_deg}° {lat_min:.3f}"
-                                gc_lon = f"{lon_dir} {lon_deg}° {lon_min:.3f}"
+                                gc_lat, gc_lon = decimal_to_gc_coords(lat, lon)
                                 waypoint.set_location(lat, lon, gc_lat=gc_lat, gc_lon=gc_lon)
                         else:
                             # Pas de format GC, on convertit les coordonnees decimales
-                            lat_deg = int(abs(lat))
-                            lat_min = (abs(lat) - lat_deg) * 60
-                            lon_deg = int(abs(lon))
-                            lon_min = (abs(lon) - lon_deg) * 60
-                            
-                            # Déterminer les directions en fonction du signe
-                            lat_dir = "N" if lat >= 0 else "S"
-                            lon_dir = "E" if lon >= 0 else "W"
-                            
-                            gc_lat = f"{lat_dir} {lat_deg}° {lat_min:.3f}"
-                            gc_lon = f"{lon_dir} {lon_deg}° {lon_min:.3f}"
+                            gc_lat, gc_lon = decimal_to_gc_coords(lat, lon)
                             waypoint.set_location(lat, lon, gc_lat=gc_lat, gc_lon=gc_lon)
                     geocache.additional_waypoints.append(waypoint)
 
@@ -685,39 +652,11 @@ def add_geocache():
         else:
             logger.debug("Aucun attribut reçu du scraper pour cette géocache")
 
-        # Ajouter les images
-        if geocache_data.get('images'):
-            for img_data in geocache_data['images']:
-                if isinstance(img_data, dict):
-                    # Si l'image a une URL, on la télécharge
-                    img_url = img_data.get('url')
-                    if img_url:
-                        try:
-                            response = requests.get(img_url)
-                            if response.status_code == 200:
-                                # Créer le dossier de la geocache si nécessaire
-                                geocache_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], code)
-                                os.makedirs(geocache_folder, exist_ok=True)
-                                
-                                # Générer un nom de fichier unique
-                                ext = img_url.split('.')[-1].lower()
-                                if ext not in current_app.config['ALLOWED_EXTENSIONS']:
-                                    ext = 'jpg'  # Extension par défaut
-                                filename = f"{secrets.token_hex(8)}.{ext}"
-                                
-                                # Sauvegarder l'image dans le dossier de la geocache
-                                img_path = os.path.join(geocache_folder, filename)
-                                with open(img_path, 'wb') as f:
-                                    f.write(response.content)
-                                
-                                # Créer l'entrée dans la base de données
-                                image = GeocacheImage(
-                                    filename=filename,
-                                    original_url=img_url
-                                )
-                                geocache.images.append(image)
-                        except Exception as e:
-                            logger.error(f"Erreur lors du téléchargement de l'image {img_url}: {str(e)}")
+        # Les images sont téléchargées par une tâche de fond une fois la géocache enregistrée
+        image_urls = [
+            img_data.get('url') for img_data in (geocache_data.get('images') or [])
+            if isinstance(img_data, dict) and img_data.get('url')
+        ]
 
         logger.debug(f"Ajout de la géocache {code} à la base de données")
         
@@ -755,11 +694,18 @@ def add_geocache():
             db.session.commit()
             
             logger.debug(f"Géocache {code} ajoutée avec succès, ID: {geocache.id}")
+            images_job_id = None
+            if image_urls:
+                images_job_id = get_job_queue().submit('download_geocache_images', {
+                    'geocache_id': geocache.id,
+                    'urls': image_urls
+                })['id']
             return jsonify({
                 'message': 'Geocache added successfully',
                 'id': geocache.id,
                 'gc_code': geocache.gc_code,
-                'name': geocache.name
+                'name': geocache.name,
+                'images_job_id': images_job_id
             }), 201
         except Exception as e:
             db.session.rollback()
@@ -770,6 +716,54 @@ def add_geocache():
         return jsonify({'error': str(e)}), 500
 
 
+def run_image_download_job(job):
+    """
+    Tâche de fond "download_geocache_images" : télécharge les images d'une
+    géocache ajoutée. L'index de la prochaine image est enregistré dans le
+    checkpoint, pour ne pas retélécharger les précédentes après une reprise.
+    """
+    geocache = Geocache.query.get(job.payload['geocache_id'])
+    if geocache is None:
+        raise JobFailed(f"Géocache {job.payload['geocache_id']} introuvable")
+    urls = job.payload.get('urls') or []
+    checkpoint = job.checkpoint or {}
+    downloaded = checkpoint.get('downloaded', 0)
+    geocache_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], geocache.gc_code)
+
+    for index in range(checkpoint.get('next', 0), len(urls)):
+        job.check_cancelled()
+        img_url = urls[index]
+        try:
+            response = requests.get(img_url, timeout=30)
+            if response.status_code == 200:
+                # Créer le dossier de la geocache si nécessaire
+                os.makedirs(geocache_folder, exist_ok=True)
+                
+                # Générer un nom de fichier unique
+                ext = img_url.split('.')[-1].lower()
+                if ext not in current_app.config['ALLOWED_EXTENSIONS']:
+                    ext = 'jpg'  # Extension par défaut
+                filename = f"{secrets.token_hex(8)}.{ext}"
+                
+                # Sauvegarder l'image dans le dossier de la geocache
+                with open(os.path.join(geocache_folder, filename), 'wb') as f:
+                    f.write(response.content)
+                
+                # Créer l'entrée dans la base de données
+                db.session.add(GeocacheImage(geocache_id=geocache.id, filename=filename, original_url=img_url))
+                db.session.commit()
+                downloaded += 1
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erreur lors du téléchargement de l'image {img_url}: {str(e)}")
+        job.report(int((index + 1) / len(urls) * 100), f"Image {index + 1}/{len(urls)} de {geocache.gc_code}",
+                   checkpoint={'next': index + 1, 'downloaded': downloaded})
+
+    return {'geocache_id': geocache.id, 'downloaded': downloaded, 'total': len(urls)}
+
+
+register_job_handler('download_geocache_images', run_image_download_job)
+
 @geocaches_bp.route('/geocaches/<int:geocache_id>/solved-status', methods=['PUT'])
 def update_solved_status(geocache_id):
     """Met à jour le statut de résolution d'une geocache."""
@@ -1063,10 +1057,37 @@ def get_image_editor(image_id):
     return render_template('image_editor.html', image_url=image_url)
 
 
+def _images_root():
+    """Dossier geocaches_images de l'application."""
+    return getattr(current_app, 'images_folder', None) or \
+        os.path.abspath(os.path.join(current_app.root_path, '..', 'geocaches_images'))
+
+def send_geocache_image(filename, variant=None):
+    """
+    Envoie une image du dossier geocaches_images, ou sa variante réduite
+    (`variant` : 'thumb' ou 'medium') si elle est déjà générée.
+    
+    L'ETag est l'empreinte du contenu : un navigateur qui possède déjà
+    l'image reçoit une réponse 304. Une variante absente est générée en
+    arrière-plan et l'original est servi en attendant.
+    """
+    images_root = _images_root()
+    path = safe_join(images_root, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    
+    thumbnails = get_thumbnail_service(images_root)
+    if variant:
+        ready = thumbnails.get(path, variant)
+        if ready:
+            thumbnail_path, etag = ready
+            return send_file(thumbnail_path, mimetype='image/webp', etag=etag)
+    return send_file(path, etag=thumbnails.image_hash(path))
+
 @geocaches_bp.route('/geocaches_images/<path:filename>')
 def serve_image(filename):
-    """Sert une image depuis le dossier geocaches_images."""
-    return send_from_directory('../geocaches_images', filename, as_attachment=False)
+    """Sert une image depuis le dossier geocaches_images (?size=thumb pour la miniature)."""
+    return send_geocache_image(filename, request.args.get('size'))
 
 
 @geocaches_bp.route('/api/geocaches/images/<int:image_id>/delete', methods=['DELETE'])
@@ -1103,6 +1124,12 @@ def get_geocache_gallery(geocache_id):
     """Renvoie uniquement le HTML de la galerie d'images pour un géocache."""
     geocache = Geocache.query.options(db.joinedload(Geocache.images)).get_or_404(geocache_id)
     
+    # Générer dès maintenant les miniatures manquantes, avant que le navigateur ne les demande
+    images_root = _images_root()
+    get_thumbnail_service(images_root).prefetch(
+        os.path.join(images_root, geocache.gc_code, image.filename) for image in geocache.images
+    )
+    
     return render_template('partials/geocache_gallery.html', geocache=geocache)
 
 
@@ -1333,8 +1360,22 @@ def get_nearby_geocaches(geocache_id):
     # Nous utilisons les propriétés latitude et longitude qui sont calculées à partir du champ location
     nearby_geocaches = []
     
-    # Récupérer toutes les géocaches (sauf celle de référence)
-    all_geocaches = Geocache.query.filter(Geocache.id != geocache_id).all()
+    # Présélection sur les coordonnées texte, analysées en bloc par le codec :
+    # seules les candidates (ou celles sans coordonnées texte lisibles) sont chargées
+    rows = db.session.query(Geocache.id, Geocache.gc_lat, Geocache.gc_lon).filter(Geocache.id != geocache_id).all()
+    candidate_ids = []
+    if rows:
+        lats, lons = parse_ddm_many([row.gc_lat for row in rows], [row.gc_lon for row in rows])
+        margin = 0.001  # les chaînes GC sont arrondies au millième de minute
+        with np.errstate(invalid='ignore'):
+            inside = ((lats >= min_lat - margin) & (lats <= max_lat + margin)
+                      & (lons >= min_lon - margin) & (lons <= max_lon + margin))
+        keep = inside | np.isnan(lats) | np.isnan(lons)
+        candidate_ids = [row.id for row, selected in zip(rows, keep.tolist()) if selected]
+    all_geocaches = []
+    for start in range(0, len(candidate_ids), 900):  # limite de variables SQLite
+        chunk = candidate_ids[start:start + 900]
+        all_geocaches.extend(Geocache.query.filter(Geocache.id.in_(chunk)).all())
     
     # Filtrer manuellement les géocaches qui sont dans la boîte englobante
     for cache in all_geocaches:
@@ -1399,7 +1440,7 @@ def get_nearby_geocaches(geocache_id):
 @geocaches_bp.route('/api/waypoints/project', methods=['POST'])
 def project_waypoint():
     """
-    Projette un waypoint en utilisant le plugin d'orientation
+    Projette un waypoint selon une distance et un azimut depuis le Nord
     """
     try:
         data = request.json
@@ -1417,54 +1458,24 @@ def project_waypoint():
         if not all([gc_lat, gc_lon, distance, bearing_deg]):
             return jsonify({'error': 'Paramètres manquants'}), 400
         
-        # Préparer les entrées pour le plugin
-        coord_str = f"{gc_lat} {gc_lon}"
-        
-        # Récupérer le plugin d'orientation
-        from app import get_plugin_manager
-        plugin_manager = get_plugin_manager()
-        
-        orientation_calculation = plugin_manager.get_plugin('orientation_calculation')
-        
-        if not orientation_calculation:
-            return jsonify({'error': 'Plugin de projection non disponible'}), 500
-        
-        # Exécuter le plugin
-        result = orientation_calculation.execute({
-            'text': coord_str,
-            'bearing_deg': float(bearing_deg),
-            'distance': float(distance),
-            'distance_unit': distance_unit
-        })
+        # Projection directe avec l'instance Geod partagée (voir aussi /api/geodesy/project pour plusieurs points)
+        lat, lon = convert_gc_coords_to_decimal(gc_lat, gc_lon)
+        if lat is None or lon is None:
+            return jsonify({'error': 'Format de coordonnées invalide'}), 400
         
-        # Extraire les nouvelles coordonnées
-        new_coord_str = result.get('text_output', '')
-        new_gc_lat = result.get('gc_lat', '')
-        new_gc_lon = result.get('gc_lon', '')
+        distance_m = float(geodesy.to_meters(float(distance), distance_unit))
+        new_lat, new_lon, _ = geodesy.fwd(lat, lon, float(bearing_deg), distance_m)
+        new_gc_lat, new_gc_lon = decimal_to_gc_coords(float(new_lat), float(new_lon))
         
-        # Vérifier que les coordonnées ont été correctement extraites
-        if new_gc_lat and new_gc_lon:
-            return jsonify({
-                'success': True,
-                'gc_lat': new_gc_lat,
-                'gc_lon': new_gc_lon,
-                'full_coords': new_coord_str
-            }), 200
-        else:
-            # Fallback: essayer de séparer manuellement la chaîne complète
-            parts = new_coord_str.split()
-            if len(parts) >= 6:
-                new_gc_lat = f"{parts[0]} {parts[1]} {parts[2]}"
-                new_gc_lon = f"{parts[3]} {parts[4]} {parts[5]}"
-                return jsonify({
-                    'success': True,
-                    'gc_lat': new_gc_lat,
-                    'gc_lon': new_gc_lon,
-                    'full_coords': new_coord_str
-                }), 200
-            else:
-                return jsonify({'error': 'Format de coordonnées invalide'}), 500
+        return jsonify({
+            'success': True,
+            'gc_lat': new_gc_lat,
+            'gc_lon': new_gc_lon,
+            'full_coords': f"{new_gc_lat} {new_gc_lon}"
+        }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Erreur lors de la projection du waypoint: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -1472,7 +1483,14 @@ def project_waypoint():
 
 @geocaches_bp.route('/api/geocaches/import-gpx', methods=['POST'])
 def import_gpx():
-    """Importe des géocaches depuis un fichier GPX (Pocket Query) ou ZIP."""
+    """
+    Importe des géocaches depuis un fichier GPX (Pocket Query) ou ZIP.
+
+    Le fichier est enregistré puis traité par une tâche de fond ("import_gpx") :
+    la progression est diffusée en NDJSON tant que le client reste connecté,
+    et l'import se poursuit si la connexion est coupée (suivi via /api/jobs/<id>).
+    Avec `background=1`, la tâche est renvoyée immédiatement (202).
+    """
     try:
         # Vérifier si un fichier a été envoyé
         if 'gpxFile' not in request.files:
@@ -1497,271 +1515,31 @@ def import_gpx():
         # Vérifier si l'option de mise à jour des waypoints est activée
         update_existing = request.form.get('updateExisting') == 'on'
         
-        # Utiliser stream_with_context pour envoyer des mises à jour de progression
-        def generate():
-            try:
-                # Statistiques globales
-                total_geocaches_added = 0
-                total_geocaches_skipped = 0
-                total_waypoints_added = 0
-                total_errors = 0
-                total_files = 0
-                processed_files = 0
-                
-                # Vérifier le type de fichier
-                current_app.logger.info(f"Traitement du fichier: {uploaded_file.filename}, type: {uploaded_file.content_type}")
-                
-                if uploaded_file.filename.lower().endswith('.zip'):
-                    yield json.dumps({'message': 'Extraction du fichier ZIP...', 'progress': 5}) + '\n'
-                    
-                    # Créer un fichier temporaire pour le ZIP
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        zip_path = os.path.join(temp_dir, 'upload.zip')
-                        uploaded_file.save(zip_path)
-                        
-                        # Variables pour stocker les fichiers GPX
-                        gpx_files = []
-                        waypoints_files = []
-                        
-                        # Extraire les fichiers GPX du ZIP
-                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                            file_list = zip_ref.namelist()
-                            current_app.logger.info(f"Contenu du ZIP: {file_list}")
-                            
-                            # Identifier les fichiers GPX et les fichiers de waypoints
-                            for filename in file_list:
-                                if filename.lower().endswith('.gpx'):
-                                    # Extraire le fichier
-                                    extracted_path = os.path.join(temp_dir, filename)
-                                    with open(extracted_path, 'wb') as f:
-                                        f.write(zip_ref.read(filename))
-                                    
-                                    # Déterminer si c'est un fichier de waypoints
-                                    if '-wpts' in filename.lower():
-                                        current_app.logger.info(f"Fichier de waypoints détecté: {filename}")
-                                        waypoints_files.append(extracted_path)
-                                    else:
-                                        current_app.logger.info(f"Fichier GPX principal détecté: {filename}")
-                                        gpx_files.append(extracted_path)
-                        
-                        total_files = len(gpx_files) + len(waypoints_files)
-                        
-                        if not gpx_files and not waypoints_files:
-                            current_app.logger.warning("Aucun fichier GPX trouvé dans l'archive ZIP")
-                            yield json.dumps({'error': True, 'message': 'Aucun fichier GPX trouvé dans l\'archive ZIP'}) + '\n'
-                            return
-                            
-                        yield json.dumps({
-                            'message': f'Fichiers trouvés: {len(gpx_files)} fichiers GPX, {len(waypoints_files)} fichiers de waypoints',
-                            'progress': 10
-                        }) + '\n'
-                        
-                        # Traiter d'abord les fichiers GPX principaux
-                        for i, gpx_file_path in enumerate(gpx_files):
-                            try:
-                                # Calculer la progression en fonction du nombre total de fichiers
-                                progress = 10 + int((i / total_files) * 85) if total_files > 0 else 10
-                                
-                                yield json.dumps({
-                                    'message': f'Traitement du fichier {os.path.basename(gpx_file_path)}...',
-                                    'progress': progress
-                                }) + '\n'
-                                
-                                # Traiter le fichier GPX
-                                file_stats = process_gpx_file(gpx_file_path, zone_id, update_existing)
-                                processed_files += 1
-                                
-                                # Mettre à jour les statistiques globales
-                                total_geocaches_added += file_stats['added']
-                                total_geocaches_skipped += file_stats['skipped']
-                                total_waypoints_added += file_stats['waypoints']
-                                total_errors += file_stats['errors']
-                                
-                                # Calculer la progression mise à jour
-                                progress = 10 + int((processed_files / total_files) * 85) if total_files > 0 else 50
-                                
-                                # Envoyer un message de progression
-                                yield json.dumps({
-                                    'progress': progress,
-                                    'message': f"Fichier {os.path.basename(gpx_file_path)} traité: {file_stats['added']} géocaches ajoutées, {file_stats['waypoints']} waypoints"
-                                }) + '\n'
-                                
-                            except Exception as e:
-                                current_app.logger.error(f"Erreur lors du traitement du fichier GPX {gpx_file_path}: {str(e)}")
-                                yield json.dumps({'error': True, 'message': f'Erreur lors du traitement du fichier {os.path.basename(gpx_file_path)}: {str(e)}'}) + '\n'
-                                total_errors += 1
-                                processed_files += 1
-                        
-                        # Traiter ensuite les fichiers de waypoints additionnels
-                        for i, wp_file_path in enumerate(waypoints_files):
-                            try:
-                                # Calculer la progression en fonction du nombre total de fichiers
-                                progress = 10 + int(((len(gpx_files) + i) / total_files) * 85) if total_files > 0 else 75
-                                
-                                yield json.dumps({
-                                    'message': f'Traitement du fichier de waypoints {os.path.basename(wp_file_path)}...',
-                                    'progress': progress
-                                }) + '\n'
-                                
-                                current_app.logger.info(f"Début du traitement du fichier de waypoints: {wp_file_path}")
-                                
-                                # Traiter le fichier de waypoints
-                                file_stats = process_waypoints_file(wp_file_path, zone_id)
-                                processed_files += 1
-                                
-                                current_app.logger.info(f"Résultat du traitement: {file_stats}")
-                                
-                                # Mettre à jour les statistiques globales
-                                total_waypoints_added += file_stats['waypoints']
-                                total_errors += file_stats['errors']
-                                
-                                # Calculer la progression mise à jour
-                                progress = 10 + int((processed_files / total_files) * 85) if total_files > 0 else 85
-                                
-                                # Envoyer un message de progression
-                                yield json.dumps({
-                                    'progress': progress,
-                                    'message': f"Fichier {os.path.basename(wp_file_path)} traité: {file_stats['waypoints']} waypoints ajoutés"
-                                }) + '\n'
-                                
-                            except Exception as e:
-                                current_app.logger.error(f"Erreur lors du traitement du fichier de waypoints {wp_file_path}: {str(e)}")
-                                import traceback
-                                current_app.logger.error(traceback.format_exc())
-                                yield json.dumps({'error': True, 'message': f'Erreur lors du traitement du fichier {os.path.basename(wp_file_path)}: {str(e)}'}) + '\n'
-                                total_errors += 1
-                                processed_files += 1
-                
-                elif uploaded_file.filename.lower().endswith('.gpx'):
-                    # Variables pour stocker les fichiers GPX
-                    gpx_files = []
-                    waypoints_files = []
-                    
-                    # Créer un fichier temporaire pour le GPX
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        gpx_path = os.path.join(temp_dir, 'upload.gpx')
-                        uploaded_file.save(gpx_path)
-                        
-                        # Déterminer si c'est un fichier de waypoints
-                        if '-wpts' in uploaded_file.filename.lower():
-                            current_app.logger.info(f"Fichier GPX de waypoints détecté: {uploaded_file.filename}")
-                            waypoints_files.append(gpx_path)
-                        else:
-                            current_app.logger.info(f"Fichier GPX principal détecté: {uploaded_file.filename}")
-                            gpx_files.append(gpx_path)
-                        
-                        total_files = len(gpx_files) + len(waypoints_files)
-                            
-                        # Traiter d'abord les fichiers GPX principaux
-                        for i, gpx_file_path in enumerate(gpx_files):
-                            try:
-                                # Calculer la progression en fonction du nombre total de fichiers
-                                progress = 10 + int((i / total_files) * 85) if total_files > 0 else 25
-                                
-                                yield json.dumps({
-                                    'message': f'Traitement du fichier {os.path.basename(gpx_file_path)}...',
-                                    'progress': progress
-                                }) + '\n'
-                                
-                                # Traiter le fichier GPX
-                                file_stats = process_gpx_file(gpx_file_path, zone_id, update_existing)
-                                processed_files += 1
-                                
-                                # Mettre à jour les statistiques globales
-                                total_geocaches_added += file_stats['added']
-                                total_geocaches_skipped += file_stats['skipped']
-                                total_waypoints_added += file_stats['waypoints']
-                                total_errors += file_stats['errors']
-                                
-                                # Calculer la progression mise à jour
-                                progress = 10 + int((processed_files / total_files) * 85) if total_files > 0 else 60
-                                
-                                # Envoyer un message de progression
-                                yield json.dumps({
-                                    'progress': progress,
-                                    'message': f"Fichier {os.path.basename(gpx_file_path)} traité: {file_stats['added']} géocaches ajoutées, {file_stats['waypoints']} waypoints"
-                                }) + '\n'
-                                
-                            except Exception as e:
-                                current_app.logger.error(f"Erreur lors du traitement du fichier GPX {gpx_file_path}: {str(e)}")
-                                yield json.dumps({'error': True, 'message': f'Erreur lors du traitement du fichier {os.path.basename(gpx_file_path)}: {str(e)}'}) + '\n'
-                                total_errors += 1
-                                processed_files += 1
-                        
-                        # Traiter ensuite les fichiers de waypoints additionnels
-                        for i, wp_file_path in enumerate(waypoints_files):
-                            try:
-                                # Calculer la progression en fonction du nombre total de fichiers
-                                progress = 10 + int(((len(gpx_files) + i) / total_files) * 85) if total_files > 0 else 75
-                                
-                                yield json.dumps({
-                                    'message': f'Traitement du fichier de waypoints {os.path.basename(wp_file_path)}...',
-                                    'progress': progress
-                                }) + '\n'
-                                
-                                current_app.logger.info(f"Début du traitement du fichier de waypoints: {wp_file_path}")
-                                
-                                # Traiter le fichier de waypoints
-                                file_stats = process_waypoints_file(wp_file_path, zone_id)
-                                processed_files += 1
-                                
-                                current_app.logger.info(f"Résultat du traitement: {file_stats}")
-                                
-                                # Mettre à jour les statistiques globales
-                                total_waypoints_added += file_stats['waypoints']
-                                total_errors += file_stats['errors']
-                                
-                                # Calculer la progression mise à jour
-                                progress = 10 + int((processed_files / total_files) * 85) if total_files > 0 else 85
-                                
-                                # Envoyer un message de progression
-                                yield json.dumps({
-                                    'progress': progress,
-                                    'message': f"Fichier {os.path.basename(wp_file_path)} traité: {file_stats['waypoints']} waypoints ajoutés"
-                                }) + '\n'
-                                
-                            except Exception as e:
-                                current_app.logger.error(f"Erreur lors du traitement du fichier de waypoints {wp_file_path}: {str(e)}")
-                                import traceback
-                                current_app.logger.error(traceback.format_exc())
-                                yield json.dumps({'error': True, 'message': f'Erreur lors du traitement du fichier {os.path.basename(wp_file_path)}: {str(e)}'}) + '\n'
-                                total_errors += 1
-                                processed_files += 1
-                else:
-                    current_app.logger.warning(f"Format de fichier non pris en charge: {uploaded_file.filename}")
-                    yield json.dumps({'error': True, 'message': 'Format de fichier non pris en charge. Utilisez .gpx ou .zip'}) + '\n'
-                    return
-                
-                # Construire le message de résumé
-                summary_message = f'Importation terminée: {total_geocaches_added} géocaches ajoutées, {total_waypoints_added} waypoints additionnels'
-                if total_geocaches_skipped > 0:
-                    summary_message += f', {total_geocaches_skipped} géocaches ignorées'
-                if total_errors > 0:
-                    summary_message += f', {total_errors} erreurs'
-                
-                # Envoyer un résumé final avec un flag spécial pour indiquer que c'est le dernier message
-                current_app.logger.info(f"Importation terminée: {total_geocaches_added} géocaches ajoutées, {total_waypoints_added} waypoints additionnels")
-                yield json.dumps({
-                    'progress': 100,
-                    'message': summary_message,
-                    'final_summary': True,  # Ce flag permet au frontend de savoir que c'est le résumé final à conserver
-                    'stats': {
-                        'geocaches_added': total_geocaches_added,
-                        'geocaches_skipped': total_geocaches_skipped,
-                        'waypoints_added': total_waypoints_added,
-                        'errors': total_errors
-                    }
-                }) + '\n'
-                
-            except Exception as e:
-                current_app.logger.error(f"Erreur lors de l'importation: {str(e)}")
-                import traceback
-                current_app.logger.error(traceback.format_exc())
-                yield json.dumps({'error': True, 'message': f'Erreur: {str(e)}'}) + '\n'
+        current_app.logger.info(f"Traitement du fichier: {uploaded_file.filename}, type: {uploaded_file.content_type}")
+        extension = os.path.splitext(uploaded_file.filename.lower())[1]
+        if extension not in ('.gpx', '.zip'):
+            current_app.logger.warning(f"Format de fichier non pris en charge: {uploaded_file.filename}")
+            return Response(json.dumps({'error': True, 'message': 'Format de fichier non pris en charge. Utilisez .gpx ou .zip'}) + '\n',
+                            content_type='application/x-ndjson')
+        
+        # Le fichier doit survivre à la requête : il est conservé dans le dossier de la tâche
+        work_dir = job_file_dir(f"import_gpx_{uuid.uuid4().hex}")
+        upload_path = os.path.join(work_dir, f'upload{extension}')
+        uploaded_file.save(upload_path)
         
-        # Retourner la réponse en streaming
-        return Response(stream_with_context(generate()), 
-                       content_type='application/json')
+        job = get_job_queue().submit('import_gpx', {
+            'upload_path': upload_path,
+            'work_dir': work_dir,
+            'filename': uploaded_file.filename,
+            'zone_id': zone.id,
+            'update_existing': update_existing
+        }, priority=request.form.get('priority', 0, type=int))
+        
+        if request.form.get('background') in ('1', 'true', 'on'):
+            return jsonify(job), 202
+        
+        # Diffuser la progression au format attendu par le formulaire d'import
+        return job_stream_response(stream_job_events(job['id'], transform=_gpx_import_stream_message))
         
     except Exception as e:
         current_app.logger.error(f"Erreur lors de l'importation: {str(e)}")
@@ -1770,6 +1548,157 @@ def import_gpx():
         return jsonify({'error': str(e)}), 500
 
 
+def _gpx_import_stream_message(job, event):
+    """Convertit un événement de la tâche d'import en message de progression du formulaire."""
+    kind = event.get('type')
+    if kind == 'queued':
+        return {'job_id': job['id'], 'progress': 0, 'message': "Importation en file d'attente..."}
+    if kind == 'progress':
+        return {key: event[key] for key in ('progress', 'message', 'error') if key in event}
+    if kind == 'retry':
+        return {'error': True, 'message': f"Erreur: {event.get('error')} (nouvelle tentative dans {event.get('delay'):.0f} s)"}
+    if kind == 'succeeded':
+        result = event.get('result') or {}
+        return {
+            'progress': 100,
+            'message': result.get('message'),
+            'final_summary': True,  # Ce flag permet au frontend de savoir que c'est le résumé final à conserver
+            'stats': result.get('stats'),
+            'job_id': job['id']
+        }
+    if kind == 'failed':
+        return {'error': True, 'message': f"Erreur: {event.get('error')}"}
+    if kind == 'cancelled':
+        return {'error': True, 'message': 'Importation annulée'}
+    return None
+
+
+def _gpx_import_files(job):
+    """
+    Fichiers à traiter pour une tâche d'import : (fichiers GPX principaux,
+    fichiers de waypoints), chacun sous forme de liste (chemin, nom d'origine).
+    Une archive ZIP est extraite dans le dossier de la tâche (une seule fois).
+    """
+    payload = job.payload
+    if not payload['filename'].lower().endswith('.zip'):
+        files = [(payload['upload_path'], payload['filename'])]
+    else:
+        job.report(5, 'Extraction du fichier ZIP...')
+        extract_dir = os.path.join(payload['work_dir'], 'extracted')
+        os.makedirs(extract_dir, exist_ok=True)
+        files = []
+        with zipfile.ZipFile(payload['upload_path'], 'r') as zip_ref:
+            file_list = zip_ref.namelist()
+            current_app.logger.info(f"Contenu du ZIP: {file_list}")
+            for filename in file_list:
+                if filename.lower().endswith('.gpx'):
+                    # Nom aplati : pas d'écriture hors du dossier de la tâche
+                    extracted_path = os.path.join(extract_dir, f"{len(files)}_{os.path.basename(filename)}")
+                    if not os.path.exists(extracted_path):
+                        with open(extracted_path, 'wb') as f:
+                            f.write(zip_ref.read(filename))
+                    files.append((extracted_path, filename))
+
+    gpx_files = [(path, name) for path, name in files if '-wpts' not in name.lower()]
+    waypoints_files = [(path, name) for path, name in files if '-wpts' in name.lower()]
+    for _, name in gpx_files:
+        current_app.logger.info(f"Fichier GPX principal détecté: {name}")
+    for _, name in waypoints_files:
+        current_app.logger.info(f"Fichier de waypoints détecté: {name}")
+    return gpx_files, waypoints_files
+
+
+def run_gpx_import_job(job):
+    """
+    Tâche de fond "import_gpx" : traite les fichiers GPX principaux puis les
+    fichiers de waypoints. Les fichiers déjà traités et les statistiques sont
+    enregistrés dans le checkpoint, pour reprendre après une interruption.
+    """
+    payload = job.payload
+    zone_id = payload['zone_id']
+    update_existing = payload.get('update_existing', False)
+    checkpoint = job.checkpoint or {}
+    done = list(checkpoint.get('done', []))
+    stats = dict(checkpoint.get('stats') or {
+        'geocaches_added': 0,
+        'geocaches_skipped': 0,
+        'waypoints_added': 0,
+        'errors': 0
+    })
+
+    gpx_files, waypoints_files = _gpx_import_files(job)
+    total_files = len(gpx_files) + len(waypoints_files)
+    if not total_files:
+        current_app.logger.warning("Aucun fichier GPX trouvé dans l'archive ZIP")
+        raise JobFailed("Aucun fichier GPX trouvé dans l'archive ZIP")
+    if payload['filename'].lower().endswith('.zip'):
+        job.report(10, f'Fichiers trouvés: {len(gpx_files)} fichiers GPX, {len(waypoints_files)} fichiers de waypoints')
+
+    # Traiter d'abord les fichiers GPX principaux, puis les fichiers de waypoints additionnels
+    for index, (file_path, filename) in enumerate(gpx_files + waypoints_files):
+        file_key = f"{index}:{filename}"
+        if file_key in done:
+            continue
+        job.check_cancelled()
+
+        is_waypoints_file = index >= len(gpx_files)
+        label = os.path.basename(filename)
+        job.report(10 + int((index / total_files) * 85),
+                   f"Traitement du fichier {'de waypoints ' if is_waypoints_file else ''}{label}...")
+        event = {}
+        try:
+            if is_waypoints_file:
+                current_app.logger.info(f"Début du traitement du fichier de waypoints: {file_path}")
+                file_stats = process_waypoints_file(file_path, zone_id)
+                current_app.logger.info(f"Résultat du traitement: {file_stats}")
+                stats['waypoints_added'] += file_stats['waypoints']
+                stats['errors'] += file_stats['errors']
+                message = f"Fichier {label} traité: {file_stats['waypoints']} waypoints ajoutés"
+            else:
+                file_stats = process_gpx_file(file_path, zone_id, update_existing)
+                stats['geocaches_added'] += file_stats['added']
+                stats['geocaches_skipped'] += file_stats['skipped']
+                stats['waypoints_added'] += file_stats['waypoints']
+                stats['errors'] += file_stats['errors']
+                message = f"Fichier {label} traité: {file_stats['added']} géocaches ajoutées, {file_stats['waypoints']} waypoints"
+        except Exception as e:
+            current_app.logger.error(f"Erreur lors du traitement du fichier {file_path}: {str(e)}")
+            current_app.logger.error(traceback.format_exc())
+            db.session.rollback()
+            stats['errors'] += 1
+            message = f'Erreur lors du traitement du fichier {label}: {str(e)}'
+            event['error'] = True
+
+        done.append(file_key)
+        job.report(10 + int((len(done) / total_files) * 85), message,
+                   checkpoint={'done': done, 'stats': stats}, **event)
+
+    # Indexer les géocaches importées (placées dans la file par les triggers)
+    try:
+        from app.services.search_index_service import get_search_index
+        get_search_index().sync()
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de l'indexation des géocaches importées: {str(e)}")
+
+    # Construire le message de résumé
+    summary_message = f"Importation terminée: {stats['geocaches_added']} géocaches ajoutées, {stats['waypoints_added']} waypoints additionnels"
+    if stats['geocaches_skipped'] > 0:
+        summary_message += f", {stats['geocaches_skipped']} géocaches ignorées"
+    if stats['errors'] > 0:
+        summary_message += f", {stats['errors']} erreurs"
+    current_app.logger.info(summary_message)
+
+    return {'message': summary_message, 'stats': stats}
+
+
+def _cleanup_gpx_import_job(job):
+    """Supprime le fichier importé et les fichiers extraits une fois la tâche terminée."""
+    shutil.rmtree(job['payload'].get('work_dir', ''), ignore_errors=True)
+
+
+register_job_handler('import_gpx', run_gpx_import_job, on_finished=_cleanup_gpx_import_job)
+
+
 def process_gpx_file(gpx_file_path, zone_id, update_existing):
     """Traite un fichier GPX principal et retourne des statistiques."""
     # Statistiques
@@ -2065,13 +1994,7 @@ def process_gpx_file(gpx_file_path, zone_id, update_existing):
                                 favorites_count += 1
             
                 # Convertir les coordonnées en format GC
-                lat_deg = int(lat)
-                lat_min = abs(lat - lat_deg) * 60
-                lon_deg = int(lon)
-                lon_min = abs(lon - lon_deg) * 60
-                
-                gc_lat = f"N {abs(lat_deg)}° {lat_min:.3f}" if lat >= 0 else f"S {abs(lat_deg)}° {lat_min:.3f}"
-                gc_lon = f"E {abs(lon_deg)}° {lon_min:.3f}" if lon >= 0 else f"W {abs(lon_deg)}° {lon_min:.3f}"
+                gc_lat, gc_lon = decimal_to_gc_coords(lat, lon)
                 
                 # Gérer l'owner
                 owner_obj = None
@@ -2551,26 +2474,14 @@ def process_additional_waypoints(geocache, waypoints, ns):
                     existing_wp.prefix = prefix
                     
                     # Convertir les coordonnées en format GC
-                    wp_lat_deg = int(wp_lat)
-                    wp_lat_min = abs(wp_lat - wp_lat_deg) * 60
-                    wp_lon_deg = int(wp_lon)
-                    wp_lon_min = abs(wp_lon - wp_lon_deg) * 60
-                    
-                    wp_gc_lat = f"N {abs(wp_lat_deg)}° {wp_lat_min:.3f}" if wp_lat >= 0 else f"S {abs(wp_lat_deg)}° {wp_lat_min:.3f}"
-                    wp_gc_lon = f"E {abs(wp_lon_deg)}° {wp_lon_min:.3f}" if wp_lon >= 0 else f"W {abs(wp_lon_deg)}° {wp_lon_min:.3f}"
+                    wp_gc_lat, wp_gc_lon = decimal_to_gc_coords(wp_lat, wp_lon)
                     
                     # Mettre à jour la position
                     existing_wp.set_location(wp_lat, wp_lon, gc_lat=wp_gc_lat, gc_lon=wp_gc_lon)
                 else:
                     current_app.logger.debug(f"Création d'un nouveau waypoint {wp_code}")
                     # Convertir les coordonnées en format GC
-                    wp_lat_deg = int(wp_lat)
-                    wp_lat_min = abs(wp_lat - wp_lat_deg) * 60
-                    wp_lon_deg = int(wp_lon)
-                    wp_lon_min = abs(wp_lon - wp_lon_deg) * 60
-                    
-                    wp_gc_lat = f"N {abs(wp_lat_deg)}° {wp_lat_min:.3f}" if wp_lat >= 0 else f"S {abs(wp_lat_deg)}° {wp_lat_min:.3f}"
-                    wp_gc_lon = f"E {abs(wp_lon_deg)}° {wp_lon_min:.3f}" if wp_lon >= 0 else f"W {abs(wp_lon_deg)}° {wp_lon_min:.3f}"
+                    wp_gc_lat, wp_gc_lon = decimal_to_gc_coords(wp_lat, wp_lon)
                     
                     # Créer le waypoint additionnel
                     waypoint = AdditionalWaypoint(
@@ -2663,9 +2574,8 @@ def formula_solver_panel():
                 origin_lat = geocache.gc_lat
                 origin_lon = geocache.gc_lon
                 
-                print(f"[DEBUG][formula_solver_panel] Geocache trouvée: {gc_code}, ID: {geocache_id}")
-                print(f"[DEBUG][formula_solver_panel] Coordonnées d'origine: lat={origin_lat}, lon={origin_lon}")
-                print(f"[DEBUG][formula_solver_panel] Type des coordonnées: lat={type(origin_lat)}, lon={type(origin_lon)}")
+                logger.debug(f"[formula_solver_panel] Geocache trouvée: {gc_code}, ID: {geocache_id}, "
+                             f"coordonnées d'origine: lat={origin_lat!r}, lon={origin_lon!r}")
                 
                 if not origin_lat or not origin_lon:
                     print(f"[WARNING][formula_solver_panel] Coordonnées d'origine manquantes pour la géocache {gc_code}")
@@ -2673,11 +2583,11 @@ def formula_solver_panel():
                 # S'assurer que les coordonnées ont le bon format
                 if origin_lat and not origin_lat.startswith('N') and not origin_lat.startswith('S'):
                     origin_lat = f"N{origin_lat}"
-                    print(f"[DEBUG][formula_solver_panel] Format corrigé de la latitude: {origin_lat}")
+                    logger.debug(f"[formula_solver_panel] Format corrigé de la latitude: {origin_lat}")
                 
                 if origin_lon and not origin_lon.startswith('E') and not origin_lon.startswith('W'):
                     origin_lon = f"E{origin_lon}"
-                    print(f"[DEBUG][formula_solver_panel] Format corrigé de la longitude: {origin_lon}")
+                    logger.debug(f"[formula_solver_panel] Format corrigé de la longitude: {origin_lon}")
                 
                 # Importer et initialiser le plugin formula_parser
                 from plugins.official.formula_parser.main import FormulaParserPlugin
@@ -2712,8 +2622,7 @@ def formula_solver_panel():
             print(f"[ERROR][formula_solver_panel] Erreur lors de la récupération de la géocache: {str(e)}")
             traceback.print_exc()
     
-    print(f"[DEBUG][formula_solver_panel] Coordonnées d'origine finales: lat={origin_lat}, lon={origin_lon}")
-    print(f"[DEBUG][formula_solver_panel] Types des coordonnées finales: lat={type(origin_lat)}, lon={type(origin_lon)}")
+    logger.debug(f"[formula_solver_panel] Coordonnées d'origine finales: lat={origin_lat!r}, lon={origin_lon!r}")
 
     return render_template('formula_solver.html', 
                            geocache_id=geocache_id, 
@@ -3262,6 +3171,64 @@ def solve_formula_questions():
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@geocaches_bp.route('/geocaches/formula-solve-questions-stream', methods=['POST'])
+def solve_formula_questions_stream():
+    """
+    Résout les questions des variables en parallèle (une requête IA par lettre)
+    et renvoie chaque réponse dès qu'elle arrive, une ligne JSON par lettre.
+    
+    Corps : geocache_id, questions (peut inclure "_thematic_context"), gc_code,
+    max_concurrency (optionnel) et timeout en secondes (optionnel).
+    Lignes émises :
+      - {"letter", "answer", "status", "elapsed_ms"[, "error"]} pour chaque lettre
+      - {"done": true, "answers", "total_ms"} à la fin
+      - {"error": true, "message"} en cas d'échec global
+    """
+    data = request.json or {}
+    geocache_id = data.get('geocache_id')
+    questions = data.get('questions', {})
+    gc_code = data.get('gc_code')
+    
+    if not geocache_id:
+        return jsonify({'success': False, 'error': 'ID de géocache manquant'}), 400
+    
+    if not questions:
+        return jsonify({'success': False, 'error': 'Aucune question fournie'}), 400
+    
+    try:
+        max_workers = int(data.get('max_concurrency') or DEFAULT_CONCURRENCY)
+        timeout = float(data.get('timeout') or DEFAULT_QUESTION_TIMEOUT)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Paramètres max_concurrency ou timeout invalides'}), 400
+    
+    geocache = Geocache.query.get(geocache_id)
+    if not geocache:
+        return jsonify({'success': False, 'error': f'Géocache avec ID {geocache_id} introuvable'}), 404
+    
+    def generate():
+        start = time.perf_counter()
+        answers = {}
+        try:
+            for result in formula_solver_service.solve_questions_concurrently(
+                    questions, geocache_id, gc_code or geocache.gc_code,
+                    max_workers=max_workers, timeout=timeout):
+                if result['status'] == 'ok':
+                    answers[result['letter']] = result['answer']
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+            yield json.dumps({
+                'done': True,
+                'answers': answers,
+                'total_ms': round((time.perf_counter() - start) * 1000, 1)
+            }, ensure_ascii=False) + '\n'
+        except Exception as e:
+            logger.error(f"Erreur lors de la résolution parallèle des questions: {str(e)}")
+            yield json.dumps({'error': True, 'message': str(e)}, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), content_type='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 @geocaches_bp.route('/geocaches/formula-solve-single-question', methods=['POST'])
 def solve_formula_single_question():
     """
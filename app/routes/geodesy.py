@@ -0,0 +1,264 @@
+from flask import Blueprint, jsonify, request
+import logging
+import numpy as np
+from app.database import db
+from app.models.geocache import Geocache, Zone
+from app.utils import geodesy
+from app.utils.coordinates import (
+    convert_gc_coords_to_decimal, format_ddm_many, parse_ddm, parse_ddm_many,
+)
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour les calculs géodésiques sur des listes de points
+geodesy_bp = Blueprint('geodesy', __name__, url_prefix='/api/geodesy')
+
+# Nombre maximal de points par requête et de cellules pour une matrice de distances
+MAX_POINTS = 5000
+MAX_MATRIX_CELLS = 1_000_000
+
+
+def parse_points(points, field='points'):
+    """
+    Convertit une liste de points en deux tableaux (latitudes, longitudes) décimaux.
+
+    Formats acceptés pour chaque point :
+      - [lat, lon]
+      - {"latitude": .., "longitude": ..} ou {"lat": .., "lon": ..}
+      - {"gc_lat": "N 48° 51.402", "gc_lon": "E 002° 21.048"}
+      - "N 48° 51.402 E 002° 21.048"
+
+    Raises:
+        ValueError: liste vide, trop longue ou point illisible
+    """
+    if not isinstance(points, list) or not points:
+        raise ValueError(f"Le champ '{field}' doit être une liste de points non vide")
+    if len(points) > MAX_POINTS:
+        raise ValueError(f"Le champ '{field}' est limité à {MAX_POINTS} points")
+
+    latitudes = np.empty(len(points))
+    longitudes = np.empty(len(points))
+    for index, point in enumerate(points):
+        lat = lon = None
+        try:
+            if isinstance(point, (list, tuple)) and len(point) == 2:
+                lat, lon = float(point[0]), float(point[1])
+            elif isinstance(point, dict) and 'gc_lat' in point:
+                lat, lon = convert_gc_coords_to_decimal(point.get('gc_lat'), point.get('gc_lon'))
+            elif isinstance(point, dict):
+                lat = float(point['latitude'] if 'latitude' in point else point['lat'])
+                lon = float(point['longitude'] if 'longitude' in point else point['lon'])
+            elif isinstance(point, str):
+                lat, lon = parse_ddm(point) or (None, None)
+        except (KeyError, TypeError, ValueError):
+            lat = lon = None
+        if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Point invalide dans '{field}' à l'index {index}: {point!r}")
+        latitudes[index] = lat
+        longitudes[index] = lon
+    return latitudes, longitudes
+
+
+def _parse_values(value, name):
+    """Scalaire ou liste de nombres (azimuts, distances) en tableau."""
+    try:
+        values = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        values = None
+    if value is None or values is None or values.ndim > 1 or not np.isfinite(values).all():
+        raise ValueError(f"Le champ '{name}' doit être un nombre ou une liste de nombres")
+    return values
+
+
+def _point_dicts(latitudes, longitudes):
+    results = []
+    formatted = format_ddm_many(latitudes, longitudes)
+    for lat, lon, (gc_lat, gc_lon) in zip(latitudes.tolist(), longitudes.tolist(), formatted):
+        results.append({
+            'latitude': lat,
+            'longitude': lon,
+            'gc_lat': gc_lat,
+            'gc_lon': gc_lon,
+            'coordinates': f"{gc_lat} {gc_lon}",
+        })
+    return results
+
+
+def _two_mile_results(check):
+    return [
+        {
+            'meters': round(meters, 2),
+            'miles': round(miles, 2),
+            'status': status,
+            'valid': valid,
+        }
+        for meters, miles, status, valid in zip(
+            check['meters'].tolist(), check['miles'].tolist(), check['status'].tolist(), check['valid'].tolist()
+        )
+    ]
+
+
+@geodesy_bp.route('/distances', methods=['POST'])
+def compute_distances():
+    """
+    Distances entre des origines et des points : une origine par point,
+    ou une seule origine pour tous les points.
+
+    Exemple : {"origins": ["N 49° 18.000 E 006° 16.000"], "points": [[49.31, 6.27], ...]}
+    """
+    try:
+        data = request.get_json() or {}
+        origin_lats, origin_lons = parse_points(data.get('origins'), 'origins')
+        lats, lons = parse_points(data.get('points'), 'points')
+        if len(origin_lats) not in (1, len(lats)):
+            raise ValueError("Il faut une seule origine ou autant d'origines que de points")
+        azimuths, _, meters = geodesy.inv(origin_lats, origin_lons, lats, lons)
+        distances = []
+        for distance, azimuth in zip(meters.tolist(), azimuths.tolist()):
+            info = geodesy.distance_info(distance)
+            info['bearing_deg'] = round(azimuth % 360.0, 3)
+            distances.append(info)
+        return jsonify({'distances': distances, 'count': len(distances)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des distances: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@geodesy_bp.route('/distance_matrix', methods=['POST'])
+def compute_distance_matrix():
+    """
+    Matrice des distances en mètres entre "points" (lignes) et "targets" (colonnes).
+    Sans "targets", distances des points entre eux.
+    """
+    try:
+        data = request.get_json() or {}
+        lats, lons = parse_points(data.get('points'), 'points')
+        target_lats = target_lons = None
+        if data.get('targets') is not None:
+            target_lats, target_lons = parse_points(data.get('targets'), 'targets')
+        columns = len(target_lats) if target_lats is not None else len(lats)
+        if len(lats) * columns > MAX_MATRIX_CELLS:
+            raise ValueError(f"La matrice est limitée à {MAX_MATRIX_CELLS} cellules")
+        matrix = geodesy.distance_matrix(lats, lons, target_lats, target_lons)
+        return jsonify({'meters': np.round(matrix, 2).tolist(), 'rows': len(lats), 'columns': columns})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul de la matrice de distances: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@geodesy_bp.route('/project', methods=['POST'])
+def project_points():
+    """
+    Projette des points selon un azimut (0° = Nord) et une distance.
+    "bearing_deg" et "distance" sont un nombre ou une liste (un élément par point,
+    ou plusieurs projections d'un point unique).
+
+    Exemple : {"points": ["N 49° 18.000 E 006° 16.000"], "bearing_deg": [0, 90, 180], "distance": 500, "distance_unit": "m"}
+    """
+    try:
+        data = request.get_json() or {}
+        lats, lons = parse_points(data.get('points'), 'points')
+        bearings = _parse_values(data.get('bearing_deg'), 'bearing_deg')
+        meters = geodesy.to_meters(_parse_values(data.get('distance'), 'distance'), data.get('distance_unit', 'm'))
+        try:
+            size = int(np.prod(np.broadcast_shapes(lats.shape, bearings.shape, meters.shape)))
+        except ValueError:
+            raise ValueError("Les listes 'points', 'bearing_deg' et 'distance' doivent avoir la même longueur")
+        if size > MAX_POINTS:
+            raise ValueError(f"La projection est limitée à {MAX_POINTS} points")
+        new_lats, new_lons, _ = geodesy.fwd(lats, lons, bearings, meters)
+        results = _point_dicts(np.atleast_1d(new_lats), np.atleast_1d(new_lons))
+        return jsonify({'results': results, 'count': len(results)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors de la projection des points: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@geodesy_bp.route('/antipodes', methods=['POST'])
+def compute_antipodes():
+    """Antipodes d'une liste de points."""
+    try:
+        data = request.get_json() or {}
+        lats, lons = parse_points(data.get('points'), 'points')
+        results = _point_dicts(*geodesy.antipodes(lats, lons))
+        return jsonify({'results': results, 'count': len(results)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des antipodes: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@geodesy_bp.route('/two_mile_check', methods=['POST'])
+def two_mile_check():
+    """
+    Vérifie la règle des 2 miles pour une liste de points et leurs origines
+    (une origine par point, ou une seule origine pour tous).
+    """
+    try:
+        data = request.get_json() or {}
+        origin_lats, origin_lons = parse_points(data.get('origins'), 'origins')
+        lats, lons = parse_points(data.get('points'), 'points')
+        if len(origin_lats) not in (1, len(lats)):
+            raise ValueError("Il faut une seule origine ou autant d'origines que de points")
+        max_miles = float(data.get('max_miles', geodesy.TWO_MILE_RULE_MILES))
+        check = geodesy.check_two_mile_rule(origin_lats, origin_lons, lats, lons, max_miles)
+        results = _two_mile_results(check)
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'invalid_count': int((~check['valid']).sum()),
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors de la vérification de la règle des 2 miles: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@geodesy_bp.route('/zones/<int:zone_id>/two_mile_check', methods=['GET'])
+def zone_two_mile_check(zone_id):
+    """
+    Vérifie en une passe la règle des 2 miles pour toutes les géocaches d'une zone
+    ayant des coordonnées corrigées (distance entre coordonnées publiées et corrigées).
+    """
+    Zone.query.get_or_404(zone_id)
+    try:
+        rows = (
+            db.session.query(Geocache.id, Geocache.gc_code, Geocache.gc_lat, Geocache.gc_lon,
+                             Geocache.gc_lat_corrected, Geocache.gc_lon_corrected)
+            .join(Geocache.zones)
+            .filter(Zone.id == zone_id, Geocache.gc_lat_corrected.isnot(None))
+            .all()
+        )
+
+        # Analyse en bloc des coordonnées publiées et corrigées
+        lats, lons = parse_ddm_many([row.gc_lat for row in rows], [row.gc_lon for row in rows])
+        corrected_lats, corrected_lons = parse_ddm_many(
+            [row.gc_lat_corrected for row in rows], [row.gc_lon_corrected for row in rows]
+        )
+        valid = ~(np.isnan(lats) | np.isnan(lons) | np.isnan(corrected_lats) | np.isnan(corrected_lons))
+
+        results = []
+        if valid.any():
+            check = geodesy.check_two_mile_rule(lats[valid], lons[valid], corrected_lats[valid], corrected_lons[valid])
+            selected = [row for row, ok in zip(rows, valid.tolist()) if ok]
+            for row, result in zip(selected, _two_mile_results(check)):
+                results.append({'id': row.id, 'gc_code': row.gc_code, **result})
+
+        return jsonify({
+            'zone_id': zone_id,
+            'results': results,
+            'count': len(results),
+            'invalid_count': sum(1 for result in results if not result['valid']),
+        })
+    except Exception as e:
+        logger.error(f"Erreur lors de la vérification des 2 miles pour la zone {zone_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,119 @@
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from app.services.job_queue_service import (
+    get_job_queue, registered_job_kinds, FINISHED_STATUSES,
+)
+import json
+import logging
+import time
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour la file de tâches de fond
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# Temps maximal d'un flux d'événements sans nouvel événement (le client peut se reconnecter avec `after`)
+STREAM_TIMEOUT_SECONDS = 600
+
+
+def stream_job_events(job_id, after_id=0, transform=None):
+    """
+    Générateur NDJSON des événements d'une tâche jusqu'à sa fin.
+
+    Args:
+        job_id: Identifiant de la tâche
+        after_id: Ne renvoyer que les événements postérieurs
+        transform: Fonction optionnelle (job, événement) -> dict ou None pour adapter le format
+    """
+    queue = get_job_queue()
+    # Échéance repoussée à chaque événement : les réveils dus aux autres tâches ne la modifient pas
+    deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job is None:
+            return
+        # Une tâche terminée n'aura plus de nouveaux événements : inutile d'attendre
+        finished = job['status'] in FINISHED_STATUSES
+        events = queue.events(job_id, after_id) if finished else queue.wait_for_events(job_id, after_id)
+        for event in events:
+            after_id = event['event_id']
+            data = transform(job, event) if transform else event
+            if data is not None:
+                yield json.dumps(data, ensure_ascii=False, default=str) + '\n'
+        if finished:
+            return
+        if events:
+            deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+
+
+def job_stream_response(generator):
+    """Réponse HTTP en streaming NDJSON (même en-têtes que les autres flux de l'application)."""
+    return Response(
+        stream_with_context(generator),
+        content_type='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@jobs_bp.route('', methods=['POST'])
+def submit_job():
+    """
+    Soumet une tâche : {"kind": "...", "payload": {...}, "priority": 0}.
+    """
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    if not kind:
+        return jsonify({'error': "Paramètre 'kind' manquant", 'kinds': registered_job_kinds()}), 400
+    try:
+        job = get_job_queue().submit(kind, data.get('payload') or {}, priority=int(data.get('priority', 0)))
+        return jsonify(job), 202
+    except ValueError as e:
+        return jsonify({'error': str(e), 'kinds': registered_job_kinds()}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors de la soumission de la tâche {kind}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@jobs_bp.route('', methods=['GET'])
+def list_jobs():
+    """Liste les tâches récentes (filtres : status, kind, limit)."""
+    jobs = get_job_queue().list_jobs(
+        status=request.args.get('status') or None,
+        kind=request.args.get('kind') or None,
+        limit=min(request.args.get('limit', 50, type=int), 500),
+    )
+    return jsonify({'jobs': jobs})
+
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """État d'une tâche (statut, progression, message, résultat ou erreur)."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': f'Tâche {job_id} introuvable'}), 404
+    return jsonify(job)
+
+
+@jobs_bp.route('/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Demande l'annulation d'une tâche."""
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Tâche {job_id} introuvable'}), 404
+    return jsonify(job)
+
+
+@jobs_bp.route('/<int:job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    """
+    Événements d'une tâche en NDJSON, diffusés jusqu'à sa fin.
+    `after` permet de reprendre après le dernier événement reçu ; `stream=0`
+    renvoie seulement les événements déjà enregistrés (JSON).
+    """
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'error': f'Tâche {job_id} introuvable'}), 404
+    after_id = request.args.get('after', 0, type=int)
+    if request.args.get('stream') == '0':
+        return jsonify({'events': queue.events(job_id, after_id)})
+    return job_stream_response(stream_job_events(job_id, after_id))
@@ -4,6 +4,7 @@ from app.database import db
 from app.models import Note, Geocache, GeocacheNote
 from app.geocaching_client import GeocachingClient, PersonalNotes, GeocachingLogs
 import logging
+from app.services.job_queue_service import get_job_queue, register_job_handler, JobFailed, SUCCEEDED, FAILED, CANCELLED
 
 logs_bp = Blueprint('logs', __name__, url_prefix='/api/logs')
 
@@ -85,16 +86,24 @@ def get_notes_panel():
 
 @logs_bp.route('/logs_panel')
 def get_logs_panel():
-    """Renvoie le template du panneau des logs."""
+    """
+    Renvoie le template du panneau des logs.
+    Avec `jobId` (tâche "refresh_logs"), le panneau affiche l'issue du rafraîchissement.
+    """
     geocache_id = request.args.get('geocacheId')
     if geocache_id:
         geocache = Geocache.query.get_or_404(geocache_id)
         # Pour l'instant, utilisons les logs de la géocache directement
         logs = geocache.logs if hasattr(geocache, 'logs') else []
+        context = {}
+        job_id = request.args.get('jobId', type=int)
+        if job_id is not None:
+            context = _refresh_status_context(get_job_queue().get(job_id))
         return render_template('logs_panel.html', 
                             logs=logs,
                             geocache_id=geocache_id,
-                            geocache_name=geocache.name)
+                            geocache_name=geocache.name,
+                            **context)
     return render_template('logs_panel.html', logs=[], geocache_id=None)
 
 @logs_bp.route('/map_panel')
@@ -202,18 +211,14 @@ def manage_note(note_id):
                         geocache=geocache,
                         geocache_name=geocache.name)
 
-@logs_bp.route('/refresh', methods=['POST'])
-def refresh_logs():
-    """Récupère les logs frais depuis Geocaching.com et les enregistre en base de données."""
-    geocache_id = request.args.get('geocacheId')
-    logging.info(f"Tentative de rafraîchissement des logs pour la géocache ID: {geocache_id}")
-    
-    if not geocache_id:
-        logging.error("Aucun ID de géocache fourni")
-        return "Identifiant de géocache manquant", 400
-    
-    # Récupérer la géocache
-    geocache = Geocache.query.get_or_404(geocache_id)
+def run_refresh_logs_job(job):
+    """
+    Tâche de fond "refresh_logs" : récupère les logs frais depuis Geocaching.com
+    et les enregistre en base de données.
+    """
+    geocache = Geocache.query.get(job.payload['geocache_id'])
+    if geocache is None:
+        raise JobFailed(f"Géocache {job.payload['geocache_id']} introuvable")
     gc_code = geocache.gc_code
     logging.info(f"Géocache trouvée: {gc_code} - {geocache.name}")
     
@@ -221,95 +226,109 @@ def refresh_logs():
     client = GeocachingClient()
     
     # Vérifier si le client est connecté
+    job.report(10, "Connexion à Geocaching.com...")
     if not client.ensure_login():
         logging.error("Impossible de se connecter à Geocaching.com via Firefox")
-        return render_template('logs_panel.html', 
-                            logs=geocache.logs,
-                            geocache_id=geocache_id,
-                            geocache_name=geocache.name,
-                            error="Impossible de se connecter à Geocaching.com. Assurez-vous d'être connecté dans Firefox.")
+        raise JobFailed("Impossible de se connecter à Geocaching.com. Assurez-vous d'être connecté dans Firefox.")
     
     # Récupérer les logs depuis l'API
     logs_api = GeocachingLogs(client)
-    try:
-        logging.info(f"Récupération des logs pour {gc_code}")
-        gc_logs = logs_api.get_logs(gc_code, log_type="ALL", count=20)
-        logging.info(f"Nombre de logs récupérés: {len(gc_logs) if gc_logs else 0}")
-        
-        if not gc_logs:
-            logging.warning(f"Aucun log trouvé pour {gc_code}")
-            return render_template('logs_panel.html', 
-                                logs=geocache.logs,
-                                geocache_id=geocache_id,
-                                geocache_name=geocache.name,
-                                error="Aucun log trouvé pour cette géocache sur Geocaching.com")
-        
-        # Supprimer les anciens logs
-        from app.models.geocache import Log, Owner
-        from app import db
-        
-        # Enregistrer les nouveaux logs
-        existing_logs_by_id = {log.id: log for log in geocache.logs if hasattr(log, 'id')}
+    logging.info(f"Récupération des logs pour {gc_code}")
+    job.report(30, f"Récupération des logs de {gc_code}...")
+    gc_logs = logs_api.get_logs(gc_code, log_type="ALL", count=job.payload.get('count', 20))
+    logging.info(f"Nombre de logs récupérés: {len(gc_logs) if gc_logs else 0}")
+    
+    if not gc_logs:
+        logging.warning(f"Aucun log trouvé pour {gc_code}")
+        raise JobFailed("Aucun log trouvé pour cette géocache sur Geocaching.com")
+    
+    job.check_cancelled()
+    from app.models.geocache import Log, Owner
+    from app.routes.geocaches import normalize_log_type
+    
+    # Enregistrer les nouveaux logs
+    existing_logs_by_id = {log.id: log for log in geocache.logs if hasattr(log, 'id')}
+    
+    for gc_log in gc_logs:
+        # Vérifier si le log existe déjà par son ID
+        log_id = gc_log.get('id')
         
-        for gc_log in gc_logs:
-            # Vérifier si le log existe déjà par son ID
-            log_id = gc_log.get('id')
-            
-            if log_id in existing_logs_by_id:
-                # Mettre à jour le log existant
-                log = existing_logs_by_id[log_id]
-                logging.info(f"Mise à jour du log existant: {log_id}")
-            else:
-                # Créer un nouveau log
-                log = Log()
-                log.id = log_id
-                logging.info(f"Création d'un nouveau log: {log_id}")
-                
-                # Trouver ou créer l'auteur du log
-                author_name = gc_log.get('author')
-                if author_name:
-                    author = Owner.query.filter_by(name=author_name).first()
-                    if not author:
-                        # Pas besoin du paramètre guid qui n'existe pas dans le modèle Owner
-                        author = Owner(name=author_name)
-                        db.session.add(author)
-                        logging.info(f"Création d'un nouvel auteur: {author_name}")
-                    log.author = author
-                
-                geocache.logs.append(log)
-            
-            # Mettre à jour les champs du log
-            log.text = gc_log.get('text', '')
-            log.date = gc_log.get('date')
-            
-            # Normaliser le type de log pour avoir une cohérence
-            log_type = gc_log.get('type', 'unknown')
+        if log_id in existing_logs_by_id:
+            # Mettre à jour le log existant
+            log = existing_logs_by_id[log_id]
+            logging.info(f"Mise à jour du log existant: {log_id}")
+        else:
+            # Créer un nouveau log
+            log = Log()
+            log.id = log_id
+            logging.info(f"Création d'un nouveau log: {log_id}")
             
-            # Importer la fonction de normalisation des types de logs
-            from app.routes.geocaches import normalize_log_type
-            log.log_type = normalize_log_type(log_type)
+            # Trouver ou créer l'auteur du log
+            author_name = gc_log.get('author')
+            if author_name:
+                author = Owner.query.filter_by(name=author_name).first()
+                if not author:
+                    # Pas besoin du paramètre guid qui n'existe pas dans le modèle Owner
+                    author = Owner(name=author_name)
+                    db.session.add(author)
+                    logging.info(f"Création d'un nouvel auteur: {author_name}")
+                log.author = author
             
-        # Enregistrer les modifications
-        db.session.commit()
-        logging.info(f"Logs enregistrés en base de données pour {gc_code}")
+            geocache.logs.append(log)
         
-        # Mettre à jour le nombre de logs
-        geocache.logs_count = len(geocache.logs)
-        db.session.commit()
+        # Mettre à jour les champs du log
+        log.text = gc_log.get('text', '')
+        log.date = gc_log.get('date')
         
-        return render_template('logs_panel.html', 
-                            logs=geocache.logs,
-                            geocache_id=geocache_id,
-                            geocache_name=geocache.name,
-                            success="Logs rafraîchis avec succès")
+        # Normaliser le type de log pour avoir une cohérence
+        log.log_type = normalize_log_type(gc_log.get('type', 'unknown'))
+        
+    # Mettre à jour le nombre de logs et enregistrer les modifications
+    geocache.logs_count = len(geocache.logs)
+    db.session.commit()
+    logging.info(f"Logs enregistrés en base de données pour {gc_code}")
+    
+    return {'geocache_id': geocache.id, 'logs': len(gc_logs)}
+
+
+register_job_handler('refresh_logs', run_refresh_logs_job, max_attempts=2)
+
+
+def _refresh_status_context(job):
+    """Message du panneau des logs selon l'état d'une tâche "refresh_logs"."""
+    if job is None:
+        return {}
+    if job['status'] == SUCCEEDED:
+        return {'success': "Logs rafraîchis avec succès"}
+    if job['status'] == FAILED:
+        return {'error': f"Erreur lors du rafraîchissement des logs: {job['error']}"}
+    if job['status'] == CANCELLED:
+        return {'error': "Rafraîchissement des logs annulé"}
+    return {'success': f"Rafraîchissement des logs en cours en arrière-plan (tâche {job['id']})"}
+
+
+@logs_bp.route('/refresh', methods=['POST'])
+def refresh_logs():
+    """
+    Lance la récupération des logs frais depuis Geocaching.com dans une tâche
+    de fond ("refresh_logs") et répond aussitôt (202) avec la tâche. Le client
+    suit son état via /api/jobs/<id>, puis recharge le panneau avec
+    /api/logs/logs_panel?geocacheId=...&jobId=<id>.
+    """
+    geocache_id = request.args.get('geocacheId')
+    logging.info(f"Tentative de rafraîchissement des logs pour la géocache ID: {geocache_id}")
+    
+    if not geocache_id:
+        logging.error("Aucun ID de géocache fourni")
+        return jsonify({'error': "Identifiant de géocache manquant"}), 400
     
+    # Récupérer la géocache
+    geocache = Geocache.query.get_or_404(geocache_id)
+    
+    try:
+        # Priorité haute : l'utilisateur attend le résultat
+        job = get_job_queue().submit('refresh_logs', {'geocache_id': geocache.id}, priority=10)
+        return jsonify(job), 202
     except Exception as e:
-        from flask import current_app
-        current_app.logger.error(f"Erreur lors du rafraîchissement des logs: {str(e)}")
-        import traceback
-        current_app.logger.error(traceback.format_exc())
-        return render_template('logs_panel.html', 
-                            logs=geocache.logs,
-                            geocache_id=geocache_id,
-                            geocache_name=geocache.name,
-                            error=f"Erreur lors du rafraîchissement des logs: {str(e)}")
+        logging.error(f"Erreur lors du rafraîchissement des logs: {str(e)}")
+        return jsonify({'error': str(e)}), 500
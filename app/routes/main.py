@@ -3,6 +3,7 @@ from app.models.geocache import Geocache
 import base64
 import os
 from flask import send_from_directory, current_app
+from werkzeug.exceptions import HTTPException
 
 main = Blueprint('main', __name__)
 
@@ -83,15 +84,16 @@ def save_edited_image(image_id):
 @main.route('/geocaches_images/<gc_code>/<filename>')
 def serve_geocache_image(gc_code, filename):
     try:
+        # Miniature si demandée (?size=thumb), ETag sur le contenu
+        from app.routes.geocaches import send_geocache_image
+        response = send_geocache_image(f"{gc_code}/{filename}", request.args.get('size'))
         # Ajouter les headers CORS
-        response = send_from_directory(
-            os.path.join(current_app.root_path, 'geocaches_images', gc_code),
-            filename
-        )
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erreur lors de l'envoi de l'image: {str(e)}")
         return jsonify({'error': str(e)}), 500
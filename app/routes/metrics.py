@@ -0,0 +1,51 @@
+from flask import Blueprint, jsonify, request, Response
+from app.services.metrics_service import get_metrics_service
+import logging
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour l'exposition des métriques
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    Expose les métriques des plugins.
+
+    Format texte Prometheus par défaut, JSON si `?format=json`
+    ou si le client demande explicitement `application/json`.
+    """
+    metrics = get_metrics_service()
+    wants_json = (
+        request.args.get('format') == 'json'
+        or request.accept_mimetypes.best == 'application/json'
+    )
+    try:
+        if wants_json:
+            return jsonify(metrics.to_json())
+        return Response(metrics.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export des métriques: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@metrics_bp.route('/json', methods=['GET'])
+def get_metrics_json():
+    """
+    Variante JSON des métriques, utilisée par l'interface.
+    """
+    try:
+        return jsonify(get_metrics_service().to_json())
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export des métriques: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@metrics_bp.route('/reset', methods=['POST'])
+def reset_metrics():
+    """
+    Remet à zéro les métriques collectées.
+    """
+    get_metrics_service().reset()
+    return jsonify({'success': True})
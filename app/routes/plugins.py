@@ -1,5 +1,8 @@
 from flask import Blueprint, render_template, jsonify, request, current_app
 from app.models.plugin_model import Plugin
+from app.models.plugin_result_model import PluginResult
+from app.database import db
+from app.services import plugin_result_service
 import json
 import os
 from app.services.scoring_service import get_scoring_service
@@ -220,6 +223,81 @@ def get_plugin_interface(plugin_name):
         print(f"Error loading plugin interface: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _execute_with_result_store(plugin_manager, plugin, inputs):
+    """
+    Exécute un plugin en réutilisant le résultat enregistré pour la géocache
+    (mêmes entrées, même contenu de la géocache, même version du plugin).
+    Sans `geocache_id` (ou pour une géocache inconnue), ou avec
+    `use_result_store: false`, le plugin est simplement exécuté. Les erreurs
+    (clé `error` ou `status: error`) ne sont pas enregistrées : la prochaine
+    exécution réessaie le plugin.
+    """
+    use_store = str(inputs.pop('use_result_store', True)).lower() not in ('false', '0')
+    try:
+        geocache_id = int(inputs.get('geocache_id') or 0)
+    except (TypeError, ValueError):
+        geocache_id = 0
+    if not geocache_id or not use_store:
+        return plugin_manager.execute_plugin(plugin.name, inputs)
+
+    fingerprint = plugin_result_service.content_fingerprint(geocache_id)
+    if fingerprint is None:
+        return plugin_manager.execute_plugin(plugin.name, inputs)
+
+    plugin_result_service.watch_plugin_manager(plugin_manager)
+    # Empreinte calculée avant l'exécution, qui normalise le texte sur place ; elle inclut le
+    # contenu de la géocache, que certains plugins relisent par geocache_id
+    inputs_hash = plugin_result_service.input_hash(inputs, fingerprint)
+    stored = plugin_result_service.get_result(geocache_id, plugin.name, plugin.version, inputs_hash)
+    if stored is not None:
+        return stored
+
+    result = plugin_manager.execute_plugin(plugin.name, inputs)
+    if isinstance(result, dict) and 'error' not in result and result.get('status') != 'error':
+        try:
+            plugin_result_service.save_result(geocache_id, plugin.name, plugin.version, inputs_hash, result)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error storing plugin result: {str(e)}")
+    return result
+
+@plugins_bp.route('/api/plugins/results', methods=['GET'])
+def get_plugin_results():
+    """
+    Résultats de plugins enregistrés, par confiance décroissante.
+    Filtres : zone_id, geocache_id, plugin, confidence (high, medium ou valeur
+    minimale), with_coordinates=1, limit, offset.
+    """
+    confidence = request.args.get('confidence')
+    if confidence in plugin_result_service.CONFIDENCE_LEVELS:
+        min_confidence = plugin_result_service.CONFIDENCE_LEVELS[confidence]
+    else:
+        try:
+            min_confidence = float(confidence) if confidence else None
+        except ValueError:
+            return jsonify({'error': f'Confiance invalide : {confidence}'}), 400
+    results = plugin_result_service.query_results(
+        zone_id=request.args.get('zone_id', type=int),
+        geocache_id=request.args.get('geocache_id', type=int),
+        plugin_name=request.args.get('plugin') or None,
+        min_confidence=min_confidence,
+        with_coordinates=request.args.get('with_coordinates') in ('1', 'true'),
+        limit=min(request.args.get('limit', 100, type=int), 1000),
+        offset=request.args.get('offset', 0, type=int),
+    )
+    return jsonify({'results': results})
+
+@plugins_bp.route('/api/plugins/results/<int:result_id>', methods=['GET'])
+def get_plugin_result(result_id):
+    """Résultat enregistré complet (décompressé)."""
+    record = PluginResult.query.get(result_id)
+    if record is None:
+        return jsonify({'error': f'Résultat {result_id} introuvable'}), 404
+    data = record.to_dict()
+    data['result'] = plugin_result_service.decode_result(record.result_data)
+    return jsonify(data)
+
 @plugins_bp.route('/api/plugins/<plugin_name>/execute', methods=['POST'])
 def execute_plugin(plugin_name):
     """Exécute le plugin avec les paramètres fournis."""
@@ -260,7 +338,7 @@ def execute_plugin(plugin_name):
         plugin_manager = get_plugin_manager()
         
         try:
-            result = plugin_manager.execute_plugin(plugin_name, converted_inputs)
+            result = _execute_with_result_store(plugin_manager, plugin, converted_inputs)
             
             # Vérifier si le client a demandé du JSON 
             accept_header = request.headers.get('Accept', '')
@@ -508,6 +586,56 @@ def execute_plugin(plugin_name):
         print(f"Error executing plugin: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@plugins_bp.route('/api/plugins/analysis_web_page/stream', methods=['POST'])
+def stream_geocache_analysis():
+    """
+    Exécute la pipeline d'analyse d'une géocache et renvoie le résultat de
+    chaque étape dès qu'elle se termine, une ligne JSON par étape.
+
+    Corps : geocache_id, use_cache (optionnel, vrai par défaut).
+    Lignes émises :
+      - {"step", "status", "elapsed_ms", "result"[, "error"]} pour chaque étape
+      - {"done": true, "combined_results", "primary_coordinates", "total_ms", "cached_steps"} à la fin
+      - {"error": true, "message"} en cas d'échec global
+    """
+    from flask import Response, stream_with_context
+    from app import get_plugin_manager
+    from app.models.geocache import Geocache
+    from app.services.analysis_pipeline_service import get_analysis_pipeline_service
+
+    data = request.get_json(silent=True) or {}
+    geocache_id = data.get('geocache_id')
+    if not geocache_id:
+        return jsonify({'error': "Missing 'geocache_id' in inputs."}), 400
+
+    plugin = Plugin.query.filter_by(name='analysis_web_page').first()
+    if not plugin:
+        return jsonify({'error': 'Plugin non trouvé'}), 404
+
+    geocache = Geocache.query.get(geocache_id)
+    if not geocache:
+        return jsonify({'error': f"Geocache with id {geocache_id} not found."}), 404
+    if not geocache.description:
+        return jsonify({'error': 'No description found for this geocache.'}), 400
+
+    plugin_json_path = os.path.join(plugin.path, 'plugin.json')
+    use_cache = data.get('use_cache', True) not in (False, 'false', '0')
+    plugin_manager = get_plugin_manager()
+
+    def generate():
+        try:
+            for event in get_analysis_pipeline_service().analyze(
+                    geocache, plugin_json_path, plugin_manager, use_cache=use_cache):
+                yield json.dumps(event, ensure_ascii=False, default=str) + '\n'
+        except Exception as e:
+            print(f"Erreur lors de l'analyse de la géocache {geocache_id}: {str(e)}")
+            yield json.dumps({'error': True, 'message': str(e)}, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(generate()), content_type='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 @plugins_bp.route('/geocache-analysis', methods=['GET', 'POST'])
 def geocache_analysis():
     """Renvoie la page d'analyse d'une géocache."""
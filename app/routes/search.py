@@ -0,0 +1,75 @@
+from flask import Blueprint, jsonify, request
+from app.services.search_index_service import get_search_index, KINDS, DEFAULT_LIMIT
+import logging
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour la recherche plein texte
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+@search_bp.route('', methods=['GET'])
+def search_geocaches():
+    """
+    Recherche plein texte dans les descriptions, indices, logs, notes et
+    waypoints des géocaches.
+
+    Paramètres : q (obligatoire), zone_id, cache_type, difficulty_min,
+    difficulty_max, terrain_min, terrain_max, solved, kinds (liste séparée
+    par des virgules parmi name, description, hint, log, note, waypoint),
+    limit.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': "Paramètre 'q' manquant"}), 400
+
+    index = get_search_index()
+    if not index.available:
+        return jsonify({'error': "Index de recherche indisponible (SQLite sans FTS5)"}), 503
+
+    try:
+        kinds = [kind for kind in request.args.get('kinds', '').split(',') if kind]
+        unknown = [kind for kind in kinds if kind not in KINDS]
+        if unknown:
+            return jsonify({'error': f"Types inconnus : {', '.join(unknown)}"}), 400
+        result = index.search(
+            query,
+            zone_id=request.args.get('zone_id', type=int),
+            cache_type=request.args.get('cache_type') or None,
+            difficulty_min=request.args.get('difficulty_min', type=float),
+            difficulty_max=request.args.get('difficulty_max', type=float),
+            terrain_min=request.args.get('terrain_min', type=float),
+            terrain_max=request.args.get('terrain_max', type=float),
+            solved=request.args.get('solved') or None,
+            kinds=kinds or None,
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+        )
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche '{query}': {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@search_bp.route('/status', methods=['GET'])
+def search_status():
+    """
+    État de l'index : disponibilité et nombre de géocaches en attente de réindexation.
+    """
+    index = get_search_index()
+    if not index.available:
+        return jsonify({'available': False, 'pending': 0})
+    return jsonify({'available': True, 'pending': index.pending_count()})
+
+@search_bp.route('/rebuild', methods=['POST'])
+def rebuild_search_index():
+    """
+    Réindexe toutes les géocaches (utile après une modification directe de la base
+    sans les triggers, par exemple une restauration).
+    """
+    index = get_search_index()
+    if not index.available:
+        return jsonify({'error': "Index de recherche indisponible (SQLite sans FTS5)"}), 503
+    try:
+        return jsonify({'success': True, 'indexed': index.rebuild()})
+    except Exception as e:
+        logger.error(f"Erreur lors de la reconstruction de l'index de recherche: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify
+from app.services.tracing_service import tracer
+import logging
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour la consultation des traces de requêtes
+traces_bp = Blueprint('traces', __name__, url_prefix='/api/traces')
+
+@traces_bp.route('', methods=['GET'])
+def list_traces():
+    """
+    Liste les traces récentes (sans le détail des spans).
+    """
+    traces = [
+        {
+            'id': trace.id,
+            'name': trace.root.name,
+            'created_at': trace.created_at,
+            'duration_ms': round(trace.root.duration_ms, 3)
+        }
+        for trace in reversed(tracer.list_traces())
+    ]
+    return jsonify({'traces': traces})
+
+@traces_bp.route('/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """
+    Retourne le détail d'une trace : spans imbriqués, durées et messages.
+    """
+    trace = tracer.get_trace(trace_id)
+    if trace is None:
+        return jsonify({'error': f'Trace {trace_id} introuvable'}), 404
+    try:
+        return jsonify(trace.to_dict())
+    except Exception as e:
+        logger.error(f"Erreur lors de la sérialisation de la trace {trace_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,130 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.models.geocache import Zone
+from app.services.job_queue_service import get_job_queue, register_job_handler, JobFailed
+from app.services import zone_batch_service
+from app.services.zone_batch_service import get_zone_batch_store
+import os
+import logging
+
+# Configurer le logger
+logger = logging.getLogger(__name__)
+
+# Créer un blueprint pour la résolution par lot sur une zone
+zone_batch_bp = Blueprint('zone_batch', __name__, url_prefix='/api/zones')
+
+
+def run_zone_batch_job(job):
+    """
+    Tâche de fond `zone_batch` : exécute un plugin ou une pipeline sur toutes les
+    géocaches d'une zone (payload : zone_id, target, inputs, force, processes).
+    Le point de reprise contient les compteurs ; les géocaches déjà traitées
+    sont retrouvées dans la table des résultats.
+    """
+    payload = job.payload
+    zone_id = int(payload['zone_id'])
+    plugin_records = zone_batch_service.enabled_plugin_records()
+    try:
+        target = zone_batch_service.build_target(payload.get('target'), plugin_records, payload.get('inputs'))
+    except ValueError as e:
+        raise JobFailed(str(e))
+
+    tasks = zone_batch_service.load_zone_tasks(zone_id)
+    job.report(0, f"{len(tasks)} géocaches à analyser avec {target['name']}")
+    worker_config = {
+        'plugins_dir': os.path.join(current_app.config['BASEDIR'], 'plugins'),
+        'plugin_records': plugin_records,
+        'app_config': {key: current_app.config[key] for key in zone_batch_service.APP_CONFIG_KEYS
+                       if key in current_app.config},
+    }
+    processes = payload.get('processes') or current_app.config.get('ZONE_BATCH_PROCESSES')
+    summary = zone_batch_service.run_zone_batch(
+        zone_id, target, tasks, get_zone_batch_store(), worker_config,
+        processes=int(processes) if processes else None,
+        force=bool(payload.get('force')),
+        job=job,
+        plugin_manager=getattr(current_app, 'plugin_manager', None),
+    )
+    summary.update(zone_id=zone_id, target=target['name'], target_version=target['version'])
+    return summary
+
+
+register_job_handler('zone_batch', run_zone_batch_job, max_attempts=2)
+
+
+@zone_batch_bp.route('/<int:zone_id>/batch', methods=['POST'])
+def submit_zone_batch(zone_id):
+    """
+    Lance un lot sur la zone : {"target": "formula_parser", "inputs": {...},
+    "force": false, "processes": null, "priority": 0}. Répond 202 avec la tâche.
+    """
+    data = request.get_json() or {}
+    target = data.get('target')
+    if not target:
+        return jsonify({'error': "Paramètre 'target' manquant"}), 400
+    if Zone.query.get(zone_id) is None:
+        return jsonify({'error': f'Zone {zone_id} introuvable'}), 404
+    try:
+        zone_batch_service.build_target(target, zone_batch_service.enabled_plugin_records())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        job = get_job_queue().submit('zone_batch', {
+            'zone_id': zone_id,
+            'target': target,
+            'inputs': data.get('inputs') or {},
+            'force': bool(data.get('force', False)),
+            'processes': data.get('processes'),
+        }, priority=int(data.get('priority', 0)))
+        return jsonify(job), 202
+    except Exception as e:
+        logger.error(f"Erreur lors du lancement du lot {target} sur la zone {zone_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@zone_batch_bp.route('/<int:zone_id>/batch', methods=['GET'])
+def get_zone_batches(zone_id):
+    """Cibles déjà exécutées sur la zone et nombre de résultats de chacune."""
+    return jsonify({'zone_id': zone_id, 'targets': get_zone_batch_store().summary(zone_id)})
+
+
+@zone_batch_bp.route('/<int:zone_id>/batch', methods=['DELETE'])
+def delete_zone_batch(zone_id):
+    """Supprime les résultats de la zone (d'une seule cible avec `target`)."""
+    deleted = get_zone_batch_store().delete(zone_id, request.args.get('target') or None)
+    return jsonify({'deleted': deleted})
+
+
+@zone_batch_bp.route('/<int:zone_id>/batch/results', methods=['GET'])
+def get_zone_batch_results(zone_id):
+    """
+    Table des résultats d'une cible, triable :
+    target (requis), sort (confidence, coordinates, gc_code, name, elapsed, updated),
+    order (desc/asc), with_coordinates=1, min_confidence, limit, offset.
+    """
+    target = request.args.get('target')
+    if not target:
+        return jsonify({'error': "Paramètre 'target' manquant"}), 400
+    try:
+        page = get_zone_batch_store().results(
+            zone_id, target,
+            sort=request.args.get('sort', 'confidence'),
+            descending=request.args.get('order', 'desc').lower() != 'asc',
+            with_coordinates=request.args.get('with_coordinates') in ('1', 'true'),
+            min_confidence=request.args.get('min_confidence', type=float),
+            limit=min(request.args.get('limit', 100, type=int), 1000),
+            offset=request.args.get('offset', 0, type=int),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    page.update(zone_id=zone_id, target=target)
+    return jsonify(page)
+
+
+@zone_batch_bp.route('/<int:zone_id>/batch/results/<int:geocache_id>', methods=['GET'])
+def get_zone_batch_result(zone_id, geocache_id):
+    """Résultat complet d'une géocache pour une cible (`target`)."""
+    result = get_zone_batch_store().result(zone_id, request.args.get('target', ''), geocache_id)
+    if result is None:
+        return jsonify({'error': 'Aucun résultat pour cette géocache'}), 404
+    return jsonify(result)
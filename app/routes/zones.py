@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, render_template, redirect, url_for
-from app.models.geocache import Zone, Geocache
+from app.models.geocache import Zone
 from app.database import db
+from app.services import zone_membership_service
 from flask import current_app
 
 zones_bp = Blueprint('zones', __name__)
@@ -67,28 +68,16 @@ def add_zone():
 def delete_zone(zone_id):
     """Supprime une zone existante."""
     try:
-        zone = Zone.query.get_or_404(zone_id)
-        
-        # Vérifier si la zone contient des géocaches
-        if zone.geocaches and len(zone.geocaches) > 0:
-            # Pour chaque géocache associée à cette zone
-            for geocache in list(zone.geocaches):  # Utiliser une copie de la liste pour éviter les problèmes de modification pendant l'itération
-                # Vérifier si la géocache appartient uniquement à cette zone
-                if len(geocache.zones) == 1 and geocache.zones[0] == zone:
-                    # Si la géocache n'appartient qu'à cette zone, la supprimer
-                    current_app.logger.info(f"Suppression de la géocache {geocache.id} qui n'appartient qu'à la zone {zone_id}")
-                    db.session.delete(geocache)
-                else:
-                    # Si la géocache appartient à d'autres zones, supprimer seulement la référence à cette zone
-                    current_app.logger.info(f"Suppression de la référence à la zone {zone_id} pour la géocache {geocache.id}")
-                    geocache.zones.remove(zone)
-            
-            # Enregistrer les modifications
-            db.session.commit()
+        Zone.query.get_or_404(zone_id)
         
-        # Supprimer la zone
-        db.session.delete(zone)
+        # Les géocaches qui n'appartiennent qu'à cette zone sont supprimées,
+        # les autres perdent seulement leur référence à la zone
+        result = zone_membership_service.delete_zone(zone_id)
         db.session.commit()
+        current_app.logger.info(
+            f"Zone {zone_id} supprimée : {result['deleted_geocaches']} géocache(s) supprimée(s), "
+            f"{result['detached_geocaches']} détachée(s)"
+        )
         
         # Si la requête est HTMX, renvoyer la liste des zones
         if request.headers.get('HX-Request'):
@@ -181,19 +170,13 @@ def copy_geocaches_to_zone():
         # Vérifier que la zone cible existe
         target_zone = Zone.query.get_or_404(target_zone_id)
 
-        # Récupérer toutes les géocaches à copier
-        geocaches = Geocache.query.filter(Geocache.id.in_(geocache_ids)).all()
-
-        # Ajouter chaque géocache à la zone cible si elle n'y est pas déjà
-        for geocache in geocaches:
-            if target_zone not in geocache.zones:
-                geocache.zones.append(target_zone)
-
+        # Ajout ensembliste : les géocaches déjà présentes sont ignorées
+        copied_count = zone_membership_service.add_geocaches_to_zone(target_zone.id, geocache_ids)
         db.session.commit()
 
         return jsonify({
-            'message': f'{len(geocaches)} géocache(s) copiée(s) avec succès vers la zone {target_zone.name}',
-            'copied_count': len(geocaches)
+            'message': f'{copied_count} géocache(s) copiée(s) avec succès vers la zone {target_zone.name}',
+            'copied_count': copied_count
         })
 
     except Exception as e:
@@ -212,22 +195,107 @@ def remove_geocaches_from_zone(zone_id):
         geocache_ids = data['geocache_ids']
         zone = Zone.query.get_or_404(zone_id)
 
-        # Récupérer toutes les géocaches à supprimer de la zone
-        geocaches = Geocache.query.filter(Geocache.id.in_(geocache_ids)).all()
+        # Suppression ensembliste des associations (les géocaches sont conservées)
+        removed_count = zone_membership_service.remove_geocaches_from_zone(zone.id, geocache_ids)
+        db.session.commit()
+
+        return jsonify({
+            'message': f'{removed_count} géocache(s) supprimée(s) de la zone {zone.name}',
+            'removed_count': removed_count
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error removing geocaches from zone: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-        # Supprimer chaque géocache de la zone
-        for geocache in geocaches:
-            if zone in geocache.zones:
-                geocache.zones.remove(zone)
+@zones_bp.route('/api/geocaches/move-to-zone', methods=['POST'])
+def move_geocaches_to_zone():
+    """Déplace des géocaches d'une zone vers une autre."""
+    try:
+        data = request.get_json()
+        if not data or 'geocache_ids' not in data or 'source_zone_id' not in data or 'target_zone_id' not in data:
+            return jsonify({'error': 'Données manquantes'}), 400
 
+        source_zone = Zone.query.get_or_404(data['source_zone_id'])
+        target_zone = Zone.query.get_or_404(data['target_zone_id'])
+
+        result = zone_membership_service.move_geocaches_to_zone(source_zone.id, target_zone.id, data['geocache_ids'])
         db.session.commit()
 
         return jsonify({
-            'message': f'{len(geocaches)} géocache(s) supprimée(s) de la zone {zone.name}',
-            'removed_count': len(geocaches)
+            'message': f"{result['moved']} géocache(s) déplacée(s) de la zone {source_zone.name} vers la zone {target_zone.name}",
+            'moved_count': result['moved'],
+            'added_count': result['added']
         })
 
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error removing geocaches from zone: {str(e)}")
+        current_app.logger.error(f"Error moving geocaches to zone: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def _parse_geocache_filters(data):
+    """
+    Extrait les filtres de sélection d'une requête JSON.
+
+    Clés acceptées : source_zone_id, cache_types, difficulty_min, difficulty_max,
+    terrain_min, terrain_max, solved et bbox ([lat_min, lon_min, lat_max, lon_max]).
+    """
+    filters = {}
+    if data.get('source_zone_id') is not None:
+        filters['source_zone_id'] = int(data['source_zone_id'])
+    for key in ('cache_types', 'solved'):
+        if data.get(key):
+            values = data[key]
+            filters[key] = [values] if isinstance(values, str) else list(values)
+    for key in ('difficulty_min', 'difficulty_max', 'terrain_min', 'terrain_max'):
+        if data.get(key) is not None:
+            filters[key] = float(data[key])
+    if data.get('bbox') is not None:
+        if len(data['bbox']) != 4:
+            raise ValueError('bbox doit contenir [lat_min, lon_min, lat_max, lon_max]')
+        filters['bbox'] = [float(value) for value in data['bbox']]
+    return filters
+
+@zones_bp.route('/api/zones/<int:zone_id>/geocaches/by-filter', methods=['POST'])
+def update_zone_by_filter(zone_id):
+    """
+    Ajoute à une zone (action "add") ou retire d'une zone (action "remove")
+    toutes les géocaches correspondant aux filtres, sans liste d'identifiants.
+    L'action "count" renvoie seulement le nombre de géocaches correspondant aux filtres.
+    Sans filtre, "add" et "remove" sont refusés (400) sauf avec "all": true.
+    """
+    try:
+        data = request.get_json() or {}
+        action = data.get('action', 'add')
+        if action not in ('add', 'remove', 'count'):
+            return jsonify({'error': f'Action inconnue : {action}'}), 400
+        try:
+            filters = _parse_geocache_filters(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Filtres invalides : {str(e)}'}), 400
+        all_geocaches = data.get('all') is True
+        if action != 'count' and not filters and not all_geocaches:
+            return jsonify({'error': 'Aucun filtre : indiquez au moins un filtre, '
+                                     'ou "all": true pour toutes les géocaches'}), 400
+
+        zone = Zone.query.get_or_404(zone_id)
+
+        if action == 'count':
+            return jsonify({'count': zone_membership_service.count_geocaches(**filters)})
+
+        if action == 'add':
+            count = zone_membership_service.add_geocaches_by_filter(zone.id, all_geocaches=all_geocaches, **filters)
+            message = f'{count} géocache(s) ajoutée(s) à la zone {zone.name}'
+        else:
+            count = zone_membership_service.remove_geocaches_by_filter(zone.id, all_geocaches=all_geocaches,
+                                                                        **filters)
+            message = f'{count} géocache(s) retirée(s) de la zone {zone.name}'
+        db.session.commit()
+
+        return jsonify({'message': message, 'count': count})
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error updating zone {zone_id} by filter: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,279 @@
+"""
+Cache des réponses de l'IA
+
+Les services de formules envoient très souvent exactement les mêmes prompts
+au modèle (même description de géocache à chaque détection de formule ou
+extraction de lettres). Ce module place devant le modèle de chat un cache
+adressé par contenu :
+  - la clé est l'empreinte SHA-256 du modèle, des paramètres qui influent sur
+    la réponse et de la liste de messages normalisée ;
+  - les réponses sont stockées dans une base SQLite locale, avec une durée de
+    vie (TTL) et un nombre maximal d'entrées (éviction des moins récemment
+    utilisées) ;
+  - les requêtes identiques en cours sont fusionnées (single-flight) : un seul
+    appel part vers le modèle, les autres threads attendent son résultat.
+
+Les statistiques (taux de succès, temps d'appel économisé) sont exposées par
+`/api/ai/cache/stats`.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Durée de vie par défaut d'une réponse (7 jours) et taille maximale du cache
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+# Paramètres pris en compte dans la clé (la clé API n'en fait jamais partie)
+KEY_SETTINGS = (
+    'mode', 'ai_provider', 'ai_model', 'online_model', 'local_model', 'model_name',
+    'temperature', 'max_tokens', 'system_prompt', 'use_langgraph',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    latency REAL NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _normalize_content(content: Any) -> str:
+    """Fins de ligne unifiées, espaces de fin de ligne et de bord supprimés."""
+    text = str(content or '').replace('\r\n', '\n').replace('\r', '\n')
+    return '\n'.join(line.rstrip() for line in text.split('\n')).strip()
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Liste de messages réduite aux rôles et contenus normalisés."""
+    return [
+        {
+            'role': str(message.get('role', 'user')).strip().lower(),
+            'content': _normalize_content(message.get('content', '')),
+        }
+        for message in messages
+    ]
+
+
+def make_cache_key(model: str, settings: Optional[Dict[str, Any]], messages: List[Dict[str, Any]]) -> str:
+    """Empreinte du modèle, des paramètres influant sur la réponse et des messages."""
+    settings = settings or {}
+    payload = {
+        'model': model or '',
+        'settings': {name: settings.get(name) for name in KEY_SETTINGS},
+        'messages': normalize_messages(messages),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class _Flight:
+    """Appel en cours vers le modèle, partagé par les requêtes identiques."""
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class AIResponseCache:
+    """
+    Cache SQLite des réponses du modèle, avec TTL, taille bornée
+    et fusion des requêtes identiques en cours.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute(_SCHEMA)
+            self._connection.execute('CREATE INDEX IF NOT EXISTS ix_ai_responses_access ON ai_responses (last_access)')
+            self._connection.commit()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._saved_seconds = 0.0
+        self._model_seconds = 0.0
+
+    # --------------------------------------------------------------------------
+    # Stockage
+    # --------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Réponse en cache encore valide, ou None."""
+        now = self._clock()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT response, created_at, latency FROM ai_responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at, latency = row
+            if now - created_at > self.ttl_seconds:
+                self._connection.execute('DELETE FROM ai_responses WHERE key = ?', (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute(
+                'UPDATE ai_responses SET last_access = ?, hits = hits + 1 WHERE key = ?', (now, key)
+            )
+            self._connection.commit()
+            self._hits += 1
+            self._saved_seconds += latency
+            return response
+
+    def put(self, key: str, response: str, model: str = '', latency: float = 0.0):
+        """Enregistre une réponse et évince les entrées les moins récemment utilisées."""
+        now = self._clock()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO ai_responses (key, model, response, created_at, last_access, latency, hits) '
+                'VALUES (?, ?, ?, ?, ?, ?, 0)',
+                (key, model, response, now, now, latency)
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now: float):
+        self._connection.execute('DELETE FROM ai_responses WHERE created_at < ?', (now - self.ttl_seconds,))
+        count = self._connection.execute('SELECT COUNT(*) FROM ai_responses').fetchone()[0]
+        if count > self.max_entries:
+            self._connection.execute(
+                'DELETE FROM ai_responses WHERE key IN '
+                '(SELECT key FROM ai_responses ORDER BY last_access ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """Vide le cache et remet les statistiques à zéro."""
+        with self._lock:
+            self._connection.execute('DELETE FROM ai_responses')
+            self._connection.commit()
+            self._reset_counters()
+
+    # --------------------------------------------------------------------------
+    # Appels
+    # --------------------------------------------------------------------------
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], model: str = '',
+                       should_store: Callable[[str], bool] = bool) -> str:
+        """
+        Retourne la réponse en cache, ou appelle `compute()` une seule fois
+        pour toutes les requêtes identiques en cours.
+
+        Args:
+            key: clé produite par `make_cache_key`
+            compute: appel réel au modèle
+            model: nom du modèle (informatif)
+            should_store: filtre des réponses à conserver (ex : pas les messages d'erreur)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+            else:
+                flight.waiters += 1
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        # Une requête identique a pu se terminer entre la lecture et l'inscription
+        cached = self.get(key)
+        if cached is not None:
+            flight.result = cached
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+            return cached
+
+        with self._lock:
+            self._misses += 1
+        start = time.perf_counter()
+        latency = 0.0
+        try:
+            flight.result = compute()
+            latency = time.perf_counter() - start
+            if flight.result is not None and should_store(flight.result):
+                self.put(key, flight.result, model, latency)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._model_seconds += latency
+                # Chaque requête fusionnée a évité un appel complet
+                self._saved_seconds += latency * flight.waiters
+            flight.event.set()
+
+    # --------------------------------------------------------------------------
+    # Statistiques
+    # --------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Taux de succès, requêtes fusionnées et temps d'appel économisé."""
+        with self._lock:
+            entries = self._connection.execute('SELECT COUNT(*) FROM ai_responses').fetchone()[0]
+            requests = self._hits + self._misses + self._coalesced
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'requests': requests,
+                'hit_rate': round((self._hits + self._coalesced) / requests, 4) if requests else 0.0,
+                'model_seconds': round(self._model_seconds, 3),
+                'saved_seconds': round(self._saved_seconds, 3),
+            }
+
+
+# Instance singleton
+_ai_response_cache_instance = None
+
+def get_ai_response_cache() -> AIResponseCache:
+    """
+    Retourne l'instance singleton du cache des réponses de l'IA
+    (base `ai_cache.db` à la racine du projet).
+
+    Returns:
+        L'instance du AIResponseCache
+    """
+    global _ai_response_cache_instance
+    if _ai_response_cache_instance is None:
+        basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        _ai_response_cache_instance = AIResponseCache(os.path.join(basedir, 'ai_cache.db'))
+    return _ai_response_cache_instance
@@ -1,11 +1,22 @@
 import os
 import json
 import requests
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterator, Optional, Union
 from langchain_community.chat_models import ChatOpenAI, ChatAnthropic, ChatOllama
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from app.models.app_config import AppConfig
 from langchain_openai import ChatOpenAI as OpenAI
+from app.services.ai_cache_service import get_ai_response_cache, make_cache_key
+
+
+# Délais (s) de connexion et d'attente entre deux fragments pour le flux Ollama
+OLLAMA_CONNECT_TIMEOUT = 5
+OLLAMA_READ_TIMEOUT = 300
+
+
+def _is_cacheable_response(response) -> bool:
+    """Les réponses vides et les messages d'erreur ne sont jamais mis en cache."""
+    return isinstance(response, str) and bool(response.strip()) and not response.startswith('Erreur')
 
 class AIService:
     """Service pour gérer les interactions avec les modèles d'IA"""
@@ -116,7 +127,7 @@ class AIService:
                 base_url=self.ollama_url
             )
     
-    def chat(self, messages, settings=None):
+    def chat(self, messages, settings=None, use_cache=False):
         """
         Envoie une conversation au modèle d'IA et retourne la réponse.
         Cette méthode sert de point d'entrée unique et délègue aux implémentations
@@ -125,6 +136,8 @@ class AIService:
         Args:
             messages: Liste de messages au format {"role": "user"|"assistant", "content": "..."}
             settings: Paramètres optionnels pour l'appel
+            use_cache: Si True, passe par le cache des réponses (prompts déterministes
+                       des services de formules ; jamais pour la conversation libre)
             
         Returns:
             str: Réponse de l'IA
@@ -149,12 +162,28 @@ class AIService:
         # Déterminer si on utilise LangGraph ou LangChain
         use_langgraph = settings.get('use_langgraph', self.use_langgraph)
         
+        model_name = settings.get('model_name', settings.get('ai_model', settings.get('online_model', 'inconnu')))
+        
         print(f"=== APPEL IA ===")
         print(f"Utilisation de LangGraph: {use_langgraph}")
         print(f"Mode: {settings.get('mode', 'online')}")
         print(f"Fournisseur: {settings.get('ai_provider', 'inconnu')}")
-        print(f"Modèle: {settings.get('model_name', settings.get('ai_model', settings.get('online_model', 'inconnu')))}")
+        print(f"Modèle: {model_name}")
+        
+        if use_cache:
+            cache = get_ai_response_cache()
+            key = make_cache_key(model_name, dict(settings, use_langgraph=use_langgraph), messages)
+            return cache.get_or_compute(
+                key,
+                lambda: self._dispatch_chat(messages, settings, use_langgraph),
+                model=model_name,
+                should_store=_is_cacheable_response,
+            )
         
+        return self._dispatch_chat(messages, settings, use_langgraph)
+    
+    def _dispatch_chat(self, messages, settings, use_langgraph):
+        """Appel réel au modèle, via LangGraph ou LangChain."""
         if use_langgraph:
             # Utiliser LangGraph (avec support des outils/plugins)
             # Importer ici pour éviter l'importation circulaire
@@ -414,6 +443,163 @@ class AIService:
         
         return settings
 
+    def _format_online_messages(self, messages, settings):
+        """Convertit la conversation en messages LangChain (message système en tête)."""
+        formatted_messages = []
+        
+        # Ajouter un message système si configuré
+        system_prompt = settings.get('system_prompt', '')
+        if system_prompt:
+            formatted_messages.append(SystemMessage(content=system_prompt))
+            print(f"Message système ajouté: {len(system_prompt)} caractères")
+        
+        # Ajouter les messages de la conversation
+        for msg in messages:
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            
+            if role == 'user':
+                formatted_messages.append(HumanMessage(content=content))
+            elif role == 'assistant':
+                formatted_messages.append(AIMessage(content=content))
+            elif role == 'system':
+                formatted_messages.append(SystemMessage(content=content))
+                
+            print(f"Message {role}: {len(content)} caractères")
+        
+        return formatted_messages
+
+    def _format_local_messages(self, messages, settings):
+        """Convertit la conversation au format de l'API Ollama (message système en tête)."""
+        formatted_messages = []
+        
+        # Ajouter un message système si configuré
+        system_prompt = settings.get('system_prompt', '')
+        if system_prompt:
+            formatted_messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+        
+        # Ajouter les messages de la conversation
+        for msg in messages:
+            formatted_messages.append({
+                "role": msg.get('role', 'user'),
+                "content": msg.get('content', '')
+            })
+        
+        return formatted_messages
+
+    def stream_chat(self, messages, settings=None, cancel_event=None) -> Iterator[str]:
+        """
+        Variante de `chat` (LangChain, sans outils) qui renvoie la réponse
+        morceau par morceau dès sa génération.
+        
+        Args:
+            messages: Liste de messages au format {"role": "user"|"assistant", "content": "..."}
+            settings: Paramètres optionnels pour l'appel
+            cancel_event: threading.Event ; une fois levé, le flux est interrompu
+                          et la connexion au modèle fermée
+            
+        Yields:
+            str: Fragments successifs de la réponse
+        """
+        if settings is None:
+            settings = self.get_settings()
+        
+        if settings.get('mode', 'online') == 'online':
+            return self.stream_online(messages, settings, cancel_event)
+        return self.stream_local(messages, settings, cancel_event)
+
+    def stream_online(self, messages, settings, cancel_event=None) -> Iterator[str]:
+        """
+        Flux de la réponse d'un service en ligne (OpenAI) via `stream` de LangChain
+        
+        Args:
+            messages (list): Liste des messages précédents
+            settings (dict): Paramètres pour cette requête
+            cancel_event: Événement d'annulation optionnel
+        
+        Yields:
+            str: Fragments de la réponse
+        """
+        api_key = settings.get('api_key', '')
+        if not api_key:
+            yield "Erreur: Clé API non configurée. Veuillez configurer votre clé API dans les paramètres."
+            return
+        
+        chat_model = OpenAI(
+            model_name=settings.get('online_model', 'gpt-3.5-turbo'),
+            temperature=settings.get('temperature', 0.7),
+            openai_api_key=api_key,
+            max_tokens=settings.get('max_tokens', 1000),
+            streaming=True
+        )
+        
+        stream = chat_model.stream(self._format_online_messages(messages, settings))
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    print("Flux en ligne interrompu par le client")
+                    break
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            stream.close()
+
+    def stream_local(self, messages, settings, cancel_event=None) -> Iterator[str]:
+        """
+        Flux de la réponse d'Ollama (`"stream": true`, une ligne JSON par fragment)
+        
+        Args:
+            messages (list): Liste des messages précédents
+            settings (dict): Paramètres pour cette requête
+            cancel_event: Événement d'annulation optionnel
+        
+        Yields:
+            str: Fragments de la réponse
+        """
+        model = settings.get('local_model', 'llama2')
+        ollama_url = settings.get('ollama_url', 'http://localhost:11434')
+        
+        response = requests.post(
+            f"{ollama_url}/api/chat",
+            json={
+                "model": model,
+                "messages": self._format_local_messages(messages, settings),
+                "stream": True,
+                "options": {
+                    "temperature": settings.get('temperature', 0.7),
+                    "num_predict": settings.get('max_tokens', 1000)
+                }
+            },
+            stream=True,
+            timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT)
+        )
+        try:
+            if response.status_code != 200:
+                yield f"Erreur: {response.status_code} - {response.text}"
+                return
+            
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    # Fermer la connexion arrête la génération côté Ollama
+                    print("Flux Ollama interrompu par le client")
+                    break
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get('error'):
+                    yield f"Erreur: {data['error']}"
+                    break
+                content = data.get('message', {}).get('content', '')
+                if content:
+                    yield content
+                if data.get('done'):
+                    break
+        finally:
+            response.close()
+
     def chat_online(self, messages, settings):
         """
         Utilise un service en ligne (OpenAI, etc.) pour le chat
@@ -447,27 +633,7 @@ class AIService:
             )
             
             # Préparer les messages pour l'API
-            formatted_messages = []
-            
-            # Ajouter un message système si configuré
-            system_prompt = settings.get('system_prompt', '')
-            if system_prompt:
-                formatted_messages.append(SystemMessage(content=system_prompt))
-                print(f"Message système ajouté: {len(system_prompt)} caractères")
-            
-            # Ajouter les messages de la conversation
-            for msg in messages:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                
-                if role == 'user':
-                    formatted_messages.append(HumanMessage(content=content))
-                elif role == 'assistant':
-                    formatted_messages.append(AIMessage(content=content))
-                elif role == 'system':
-                    formatted_messages.append(SystemMessage(content=content))
-                    
-                print(f"Message {role}: {len(content)} caractères")
+            formatted_messages = self._format_online_messages(messages, settings)
             
             print(f"Envoi de {len(formatted_messages)} messages à l'API")
             
@@ -499,22 +665,7 @@ class AIService:
             ollama_url = settings.get('ollama_url', 'http://localhost:11434')
             
             # Préparer les messages pour l'API
-            formatted_messages = []
-            
-            # Ajouter un message système si configuré
-            system_prompt = settings.get('system_prompt', '')
-            if system_prompt:
-                formatted_messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            
-            # Ajouter les messages de la conversation
-            for msg in messages:
-                formatted_messages.append({
-                    "role": msg.get('role', 'user'),
-                    "content": msg.get('content', '')
-                })
+            formatted_messages = self._format_local_messages(messages, settings)
             
             # Appeler l'API Ollama
             response = requests.post(
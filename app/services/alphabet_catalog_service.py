@@ -0,0 +1,215 @@
+"""
+Catalogue des alphabets
+
+Les routes des alphabets parcouraient le dossier `alphabets/` et relisaient
+chaque `alphabet.json` à chaque requête. Ce module garde en mémoire un index
+des alphabets :
+  - construit au démarrage, puis rafraîchi uniquement pour les alphabets dont
+    un fichier (`alphabet.json` ou une ressource, à n'importe quelle
+    profondeur) a été ajouté, supprimé ou modifié (vérification par `stat`,
+    au plus une fois toutes les `refresh_interval` secondes) ;
+  - chaque alphabet reçoit une version de ses ressources (empreinte des noms,
+    tailles et dates des fichiers), utilisée dans les URL (`?v=...`) pour que
+    les polices et images puissent être mises en cache durablement par le
+    navigateur ;
+  - un manifeste par alphabet liste en une seule réponse l'URL versionnée de
+    la police ou de chaque glyphe.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Intervalle minimal entre deux vérifications des dates de modification (secondes)
+DEFAULT_REFRESH_INTERVAL = 2.0
+
+CONFIG_FILENAME = 'alphabet.json'
+
+
+class _AlphabetEntry:
+    """Alphabet indexé : configuration, signature des fichiers et ressources."""
+
+    __slots__ = ('config', 'signature', 'assets', 'asset_version')
+
+    def __init__(self, config, signature, assets, asset_version):
+        self.config = config
+        self.signature = signature
+        self.assets = assets
+        self.asset_version = asset_version
+
+
+class AlphabetCatalog:
+    """Index en mémoire des alphabets du dossier `alphabets/`."""
+
+    def __init__(self, alphabets_dir: str, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.alphabets_dir = alphabets_dir
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _AlphabetEntry] = {}
+        self._last_check = None
+        self.loads = 0
+        self.refresh(force=True)
+
+    # --------------------------------------------------------------------------
+    # Indexation
+    # --------------------------------------------------------------------------
+
+    def _signature(self, alphabet_dir: str) -> Optional[Tuple]:
+        """
+        (chemin relatif, taille, date de modification) de chaque fichier de
+        l'alphabet, alphabet.json compris. La date d'un dossier ne change pas
+        quand un fichier d'un sous-dossier est remplacé : chaque fichier est
+        donc examiné. Retourne None si alphabet.json est absent.
+        """
+        files = []
+        for root, _, filenames in os.walk(alphabet_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                relative = os.path.relpath(path, alphabet_dir).replace(os.sep, '/')
+                files.append((relative, stat.st_size, stat.st_mtime_ns))
+        if not any(relative == CONFIG_FILENAME for relative, _, _ in files):
+            return None
+        return tuple(sorted(files))
+
+    def _load(self, alphabet_id: str, signature: Tuple) -> Optional[_AlphabetEntry]:
+        alphabet_dir = os.path.join(self.alphabets_dir, alphabet_id)
+        try:
+            with open(os.path.join(alphabet_dir, CONFIG_FILENAME), 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Alphabet {alphabet_id} ignoré : configuration illisible ({str(e)})")
+            return None
+        self.loads += 1
+
+        # Les ressources sont celles relevées par _signature
+        assets = {
+            relative: (size, mtime_ns)
+            for relative, size, mtime_ns in signature
+            if relative != CONFIG_FILENAME
+        }
+        digest = hashlib.sha1(json.dumps(sorted(assets.items())).encode('utf-8')).hexdigest()[:12]
+
+        # Ajouter l'ID de l'alphabet (nom du dossier) et la version des ressources
+        config['id'] = alphabet_id
+        config['asset_version'] = digest
+        return _AlphabetEntry(config, signature, assets, digest)
+
+    def refresh(self, force: bool = False):
+        """Recharge les alphabets ajoutés, supprimés ou modifiés depuis la dernière vérification."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_check is not None and now - self._last_check < self.refresh_interval:
+                return
+            self._last_check = now
+
+            if not os.path.isdir(self.alphabets_dir):
+                self._entries = {}
+                return
+
+            entries = {}
+            for dirname in sorted(os.listdir(self.alphabets_dir)):
+                alphabet_dir = os.path.join(self.alphabets_dir, dirname)
+                if not os.path.isdir(alphabet_dir):
+                    continue
+                signature = self._signature(alphabet_dir)
+                if signature is None:
+                    continue
+                entry = self._entries.get(dirname)
+                if entry is None or entry.signature != signature:
+                    entry = self._load(dirname, signature)
+                if entry is not None:
+                    entries[dirname] = entry
+            self._entries = entries
+
+    def invalidate(self, alphabet_id: Optional[str] = None):
+        """Force le rechargement d'un alphabet (ou de tous) à la prochaine lecture."""
+        with self._lock:
+            if alphabet_id is None:
+                self._entries = {}
+            else:
+                self._entries.pop(alphabet_id, None)
+            self._last_check = None
+
+    # --------------------------------------------------------------------------
+    # Lecture
+    # --------------------------------------------------------------------------
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Configurations de tous les alphabets, triées par identifiant (lecture seule)."""
+        self.refresh()
+        return [entry.config for entry in self._entries.values()]
+
+    def get(self, alphabet_id: str) -> Optional[Dict[str, Any]]:
+        """Copie modifiable de la configuration d'un alphabet, ou None."""
+        entry = self._entry(alphabet_id)
+        return copy.deepcopy(entry.config) if entry else None
+
+    def asset_version(self, alphabet_id: str) -> Optional[str]:
+        """Version des ressources d'un alphabet, ou None s'il n'existe pas."""
+        entry = self._entry(alphabet_id)
+        return entry.asset_version if entry else None
+
+    def has_asset(self, alphabet_id: str, resource_path: str) -> bool:
+        """Indique si le fichier fait partie des ressources indexées de l'alphabet."""
+        entry = self._entry(alphabet_id)
+        return entry is not None and resource_path in entry.assets
+
+    def manifest(self, alphabet_id: str) -> Optional[Dict[str, Any]]:
+        """
+        URL versionnées de la police ou des glyphes d'un alphabet, pour que
+        l'interface les obtienne en une seule requête.
+        """
+        entry = self._entry(alphabet_id)
+        if entry is None:
+            return None
+        config = entry.config.get('alphabetConfig', {})
+        version = entry.asset_version
+        manifest = {
+            'id': alphabet_id,
+            'name': entry.config.get('name'),
+            'type': config.get('type'),
+            'asset_version': version,
+            'font': None,
+            'glyphs': {},
+        }
+        if config.get('type') == 'font':
+            manifest['font'] = f"/api/alphabets/{alphabet_id}/font?v={version}"
+        elif config.get('type') == 'images':
+            image_dir = config.get('imageDir', 'images').strip('/')
+            extension = '.' + config.get('imageFormat', 'png')
+            for relative in sorted(entry.assets):
+                directory, _, filename = relative.rpartition('/')
+                if directory == image_dir and filename.endswith(extension):
+                    glyph = filename[:-len(extension)]
+                    manifest['glyphs'][glyph] = f"/api/alphabets/{alphabet_id}/resource/{relative}?v={version}"
+        return manifest
+
+    def _entry(self, alphabet_id: str) -> Optional[_AlphabetEntry]:
+        self.refresh()
+        return self._entries.get(alphabet_id)
+
+
+# Instance singleton
+_alphabet_catalog_instance = None
+
+def get_alphabet_catalog() -> AlphabetCatalog:
+    """
+    Retourne l'instance singleton du catalogue des alphabets
+    (dossier `alphabets/` à la racine du projet).
+
+    Returns:
+        L'instance du AlphabetCatalog
+    """
+    global _alphabet_catalog_instance
+    if _alphabet_catalog_instance is None:
+        basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        _alphabet_catalog_instance = AlphabetCatalog(os.path.join(basedir, 'alphabets'))
+    return _alphabet_catalog_instance
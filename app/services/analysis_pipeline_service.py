@@ -0,0 +1,394 @@
+"""
+Pipeline d'analyse des pages de géocaches
+
+Le méta-plugin `analysis_web_page` exécutait ses sous-plugins l'un après
+l'autre, relisait son `plugin.json` à chaque analyse et ne renvoyait rien
+avant la fin. Ce module exécute la pipeline comme un graphe de dépendances :
+  - chaque étape déclare les entrées qu'elle reçoit (`inputs`) et les étapes
+    dont elle a besoin (`depends_on`) ; la pipeline est validée (dépendances
+    inconnues, cycles) et mise en cache tant que `plugin.json` ne change pas ;
+  - les étapes indépendantes s'exécutent en parallèle, une étape démarre dès
+    que ses dépendances sont terminées ;
+  - le résultat de chaque étape est mis en cache selon ses entrées (et
+    l'empreinte du contenu de la géocache, description et waypoints, si elle
+    reçoit son ID) et la version du plugin : une géocache inchangée est
+    réanalysée quasi instantanément ;
+  - chaque résultat est produit dès que l'étape se termine, ce qui permet de
+    l'afficher progressivement dans l'interface.
+
+Format d'une étape dans `plugin.json` :
+    {
+        "plugin_name": "formula_parser",
+        "name": "formula_parser",          (optionnel, nom dans les résultats)
+        "inputs": ["text", "geocache_id"], (optionnel, valeur par défaut)
+        "depends_on": [],                  (optionnel)
+        "params": {}                       (optionnel, entrées supplémentaires)
+    }
+Une étape ayant des dépendances reçoit leurs résultats dans
+`inputs["upstream_results"]`.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+# Nombre d'étapes exécutées simultanément
+DEFAULT_PIPELINE_WORKERS = 4
+# Nombre de résultats d'étapes conservés en mémoire
+DEFAULT_RESULT_CACHE_SIZE = 512
+# Entrées transmises à une étape qui n'en déclare pas
+DEFAULT_STEP_INPUTS = ('text', 'geocache_id')
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class PipelineStep:
+    """Étape de la pipeline : un sous-plugin, ses entrées et ses dépendances."""
+    name: str
+    plugin_name: str
+    inputs: Tuple[str, ...] = DEFAULT_STEP_INPUTS
+    depends_on: Tuple[str, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    description: str = ''
+
+
+def parse_pipeline(config_steps: List[Dict[str, Any]]) -> List[PipelineStep]:
+    """
+    Construit les étapes à partir de la section "pipeline" de plugin.json,
+    triées de sorte que chaque étape suive ses dépendances.
+
+    Raises:
+        ValueError: étape sans plugin, nom en double, dépendance inconnue ou cycle
+    """
+    steps = OrderedDict()
+    for config in config_steps or []:
+        plugin_name = config.get('plugin_name')
+        if not plugin_name:
+            raise ValueError(f"Étape de pipeline sans plugin_name : {config}")
+        name = config.get('name', plugin_name)
+        if name in steps:
+            raise ValueError(f"Étape de pipeline en double : {name}")
+        steps[name] = PipelineStep(
+            name=name,
+            plugin_name=plugin_name,
+            inputs=tuple(config.get('inputs', DEFAULT_STEP_INPUTS)),
+            depends_on=tuple(config.get('depends_on', ())),
+            params=dict(config.get('params', {})),
+            description=config.get('description', ''),
+        )
+
+    for step in steps.values():
+        unknown = [dep for dep in step.depends_on if dep not in steps]
+        if unknown:
+            raise ValueError(f"L'étape {step.name} dépend d'étapes inconnues : {', '.join(unknown)}")
+
+    # Tri topologique (en conservant l'ordre de déclaration)
+    ordered = []
+    done = set()
+    while len(ordered) < len(steps):
+        ready = [step for step in steps.values()
+                 if step.name not in done and all(dep in done for dep in step.depends_on)]
+        if not ready:
+            cycle = [name for name in steps if name not in done]
+            raise ValueError(f"Cycle de dépendances dans la pipeline : {', '.join(cycle)}")
+        for step in ready:
+            ordered.append(step)
+            done.add(step.name)
+    return ordered
+
+
+_pipelines: Dict[str, Tuple[Tuple[int, int], List[PipelineStep]]] = {}
+_pipelines_lock = threading.Lock()
+
+
+def load_pipeline(plugin_json_path: str) -> List[PipelineStep]:
+    """Lit la pipeline de plugin.json, relue uniquement si le fichier a changé."""
+    stat = os.stat(plugin_json_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _pipelines_lock:
+        cached = _pipelines.get(plugin_json_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    with open(plugin_json_path, 'r', encoding='utf-8') as f:
+        steps = parse_pipeline(json.load(f).get('pipeline', []))
+    with _pipelines_lock:
+        _pipelines[plugin_json_path] = (signature, steps)
+    return steps
+
+
+def geocache_fingerprint(geocache) -> str:
+    """Empreinte du contenu analysé d'une géocache (description et waypoints)."""
+    waypoints = sorted(
+        (wp.prefix or '', wp.lookup or '', wp.name or '', wp.gc_lat or '', wp.gc_lon or '', wp.note or '')
+        for wp in (getattr(geocache, 'additional_waypoints', None) or [])
+    )
+    payload = json.dumps([geocache.id, geocache.description or '', waypoints], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _stable_hash(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def finalize_results(combined_results: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """
+    Post-traitement des résultats combinés (modifiés sur place) :
+      - une coordonnée détectée à la fois par color_text_detector et
+        formula_parser n'est gardée que dans color_text_detector ;
+      - les coordonnées DDM reçoivent leur équivalent décimal.
+
+    Returns:
+        Les coordonnées décimales principales (première étape qui en a), ou None
+    """
+    color_detector_result = combined_results.get('color_text_detector')
+    formula_parser_result = combined_results.get('formula_parser')
+    if (isinstance(color_detector_result, dict) and
+            isinstance(color_detector_result.get('coordinates'), dict) and
+            color_detector_result['coordinates'].get('exist', False) and
+            isinstance(formula_parser_result, dict) and
+            formula_parser_result.get('coordinates')):
+        normalized_color_coords = color_detector_result['coordinates'].get('ddm', '').strip().replace("'", "")
+        formula_parser_result['coordinates'] = [
+            coord for coord in formula_parser_result['coordinates']
+            if f"{coord.get('north', '')} {coord.get('east', '')}".strip().replace("'", "")
+            not in normalized_color_coords
+        ]
+
+    from app.routes.coordinates import convert_ddm_to_decimal
+    for plugin_name, plugin_result in combined_results.items():
+        if not isinstance(plugin_result, dict):
+            continue
+        coords = plugin_result.get('coordinates')
+        if isinstance(coords, dict) and coords.get('exist', False):
+            if 'decimal' not in coords and coords.get('ddm_lat') and coords.get('ddm_lon'):
+                coords['decimal'] = convert_ddm_to_decimal(coords['ddm_lat'], coords['ddm_lon'])
+            if 'decimal' in coords and coords['decimal'].get('latitude') is not None:
+                return coords['decimal']
+    return None
+
+
+class AnalysisPipelineService:
+    """Exécution parallèle et mise en cache des étapes de la pipeline d'analyse."""
+
+    def __init__(self, max_workers: int = DEFAULT_PIPELINE_WORKERS, cache_size: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._watched_managers = []
+
+    # --------------------------------------------------------------------------
+    # Cache des résultats
+    # --------------------------------------------------------------------------
+
+    def _cache_get(self, key):
+        if key is None:
+            return _MISSING
+        with self._lock:
+            result = self._cache.get(key, _MISSING)
+            if result is not _MISSING:
+                self._cache.move_to_end(key)
+        return _MISSING if result is _MISSING else copy.deepcopy(result)
+
+    def _cache_set(self, key, result):
+        if key is None:
+            return
+        with self._lock:
+            self._cache[key] = copy.deepcopy(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, plugin_name: Optional[str] = None):
+        """Oublie les résultats d'un plugin (ou tous)."""
+        with self._lock:
+            if plugin_name is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == plugin_name]:
+                    del self._cache[key]
+
+    def _on_plugin_reloaded(self, plugin_name, old_version, new_version):
+        # Un plugin rechargé sans changer de version peut produire d'autres résultats
+        self.invalidate(plugin_name)
+
+    def _watch(self, plugin_manager):
+        if plugin_manager in self._watched_managers or not hasattr(plugin_manager, 'add_reload_listener'):
+            return
+        plugin_manager.add_reload_listener(self._on_plugin_reloaded)
+        self._watched_managers.append(plugin_manager)
+
+    @staticmethod
+    def _plugin_version(plugin_manager, plugin_name: str) -> Optional[str]:
+        plugin = plugin_manager.get_plugin(plugin_name)
+        metadata = getattr(plugin, 'metadata', None)
+        return getattr(metadata, 'version', None)
+
+    # --------------------------------------------------------------------------
+    # Exécution
+    # --------------------------------------------------------------------------
+
+    def run(self, steps: List[PipelineStep], context: Dict[str, Any], fingerprint: str,
+            plugin_manager, use_cache: bool = True):
+        """
+        Exécute les étapes (triées par parse_pipeline) et produit le résultat
+        de chacune dès qu'il est disponible.
+
+        Args:
+            steps: étapes de la pipeline
+            context: valeurs disponibles pour les entrées des étapes (text, geocache_id...)
+            fingerprint: empreinte du contenu analysé (clé du cache)
+            plugin_manager: gestionnaire exécutant les sous-plugins
+            use_cache: réutiliser les résultats déjà calculés
+
+        Yields:
+            dict: {"step", "status" ("ok", "cached", "error" ou "skipped"),
+                   "elapsed_ms", "result"} et "error" pour les échecs
+        """
+        self._watch(plugin_manager)
+        app = current_app._get_current_object() if has_app_context() else None
+        results = {}
+        failed = set()
+        remaining = list(steps)
+        pending = {}
+        executor = None
+
+        def execute(step, inputs):
+            if app is None:
+                return plugin_manager.execute_plugin(step.plugin_name, inputs)
+            with app.app_context():
+                return plugin_manager.execute_plugin(step.plugin_name, inputs)
+
+        try:
+            while remaining or pending:
+                # Lancer les étapes dont toutes les dépendances sont terminées
+                launched = False
+                for step in list(remaining):
+                    if any(dep not in results and dep not in failed for dep in step.depends_on):
+                        continue
+                    remaining.remove(step)
+                    launched = True
+                    failed_deps = [dep for dep in step.depends_on if dep in failed]
+                    if failed_deps:
+                        failed.add(step.name)
+                        yield {"step": step.name, "status": "skipped", "elapsed_ms": 0, "result": None,
+                               "error": f"Dépendances en échec : {', '.join(failed_deps)}"}
+                        continue
+
+                    inputs = {key: context[key] for key in step.inputs if key in context}
+                    inputs.update(step.params)
+                    if step.depends_on:
+                        inputs['upstream_results'] = {dep: results[dep] for dep in step.depends_on}
+
+                    key = None
+                    if use_cache:
+                        version = self._plugin_version(plugin_manager, step.plugin_name)
+                        if version is not None:
+                            # Une étape qui reçoit l'ID peut relire la géocache en base :
+                            # son résultat dépend alors de tout le contenu de la géocache
+                            content = fingerprint if 'geocache_id' in inputs else None
+                            key = (step.plugin_name, version, step.name, content, _stable_hash(inputs))
+                    cached = self._cache_get(key)
+                    if cached is not _MISSING:
+                        results[step.name] = cached
+                        yield {"step": step.name, "status": "cached", "elapsed_ms": 0, "result": copy.deepcopy(cached)}
+                        continue
+
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis-pipeline")
+                    future = executor.submit(execute, step, copy.deepcopy(inputs))
+                    pending[future] = (step, key, time.perf_counter())
+
+                if not pending:
+                    if launched:
+                        continue
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, key, started = pending.pop(future)
+                    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Erreur lors de l'étape {step.name} de la pipeline: {str(e)}")
+                        failed.add(step.name)
+                        yield {"step": step.name, "status": "error", "elapsed_ms": elapsed_ms, "result": None,
+                               "error": str(e)}
+                        continue
+                    if result is None:
+                        failed.add(step.name)
+                        yield {"step": step.name, "status": "error", "elapsed_ms": elapsed_ms, "result": None,
+                               "error": f"Plugin {step.plugin_name} indisponible"}
+                        continue
+                    results[step.name] = result
+                    self._cache_set(key, result)
+                    yield {"step": step.name, "status": "ok", "elapsed_ms": elapsed_ms, "result": copy.deepcopy(result)}
+        finally:
+            # Abandonne les étapes encore en file si le client se déconnecte
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def analyze(self, geocache, plugin_json_path: str, plugin_manager, use_cache: bool = True):
+        """
+        Analyse la page d'une géocache avec la pipeline de plugin_json_path.
+
+        Yields:
+            Les événements de run() pour chaque étape, puis
+            {"done": true, "combined_results", "primary_coordinates", "total_ms", "cached_steps"}
+
+        Raises:
+            ValueError: pipeline invalide
+        """
+        start = time.perf_counter()
+        steps = load_pipeline(plugin_json_path)
+        context = {
+            'text': geocache.description,
+            'geocache_id': geocache.id,
+            'gc_code': geocache.gc_code,
+        }
+        results = {}
+        cached_steps = 0
+        for event in self.run(steps, context, geocache_fingerprint(geocache), plugin_manager, use_cache):
+            results[event['step']] = event['result']
+            cached_steps += event['status'] == 'cached'
+            yield event
+
+        # Résultats dans l'ordre de la pipeline (et non dans l'ordre d'arrivée)
+        combined_results = {step.name: results.get(step.name) for step in steps}
+        primary_coordinates = finalize_results(combined_results)
+        if primary_coordinates:
+            combined_results['primary_coordinates'] = primary_coordinates
+        yield {
+            "done": True,
+            "combined_results": combined_results,
+            "primary_coordinates": primary_coordinates,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "cached_steps": cached_steps,
+        }
+
+
+# Instance singleton
+_analysis_pipeline_instance = None
+
+def get_analysis_pipeline_service() -> AnalysisPipelineService:
+    """
+    Retourne l'instance singleton du service de pipeline d'analyse
+
+    Returns:
+        L'instance du AnalysisPipelineService
+    """
+    global _analysis_pipeline_instance
+    if _analysis_pipeline_instance is None:
+        _analysis_pipeline_instance = AnalysisPipelineService()
+    return _analysis_pipeline_instance
@@ -0,0 +1,385 @@
+"""
+Résolution par force brute des lettres inconnues d'une formule de coordonnées
+
+Lorsque quelques lettres d'une formule comme `N49°18.(B-A)(B-C-F)(D+E)` sont
+inconnues, ce service énumère les affectations possibles à partir de domaines
+par lettre et ne garde que celles qui donnent des coordonnées plausibles,
+classées par distance au point d'origine de la cache.
+
+Avant toute énumération, une partie décimale qui compte forcément plus de
+3 chiffres (`E006°16.DEFGH` : cinq éléments concaténés) rend la formule
+insoluble : aucune affectation n'est essayée.
+
+L'énumération suit un plan construit à partir de la formule compilée
+(`formula_engine`) : les sous-expressions sont traitées de la moins coûteuse
+à la plus coûteuse, et chaque étape élague aussitôt les branches impossibles :
+  - chaque élément concaténé doit donner un chiffre entier (0-9),
+  - minutes < 60, décimales sur 3 chiffres, degrés dans les bornes,
+  - la coordonnée doit rester dans le rectangle englobant du rayon autorisé
+    autour de l'origine (règle des 2 miles), dès que degrés et minutes sont connus.
+Les affectations restantes sont contrôlées par lots avec un calcul géodésique
+vectorisé, puis triées par distance. Dès que `max_results` solutions sont
+connues, le rayon de recherche est réduit à la distance de la plus éloignée
+d'entre elles : les branches plus lointaines sont élaguées (le nombre de
+solutions retourné est alors un minorant).
+"""
+
+import logging
+import math
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.formula_engine import COMPLETE, PART_NAMES, CompiledFormula, _Flags, _as_integer, _evaluate
+from app.utils import geodesy
+from app.utils.geodesy import MILE_IN_METERS, TWO_MILE_RULE_MILES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DISTANCE_MILES = TWO_MILE_RULE_MILES
+DEFAULT_MAX_RESULTS = 100
+DEFAULT_TIMEOUT = 10.0
+# Nombre maximal de lignes de la table d'affectations traitées en une fois
+CHUNK_ROWS = 200_000
+# Domaine par défaut d'une lettre inconnue
+DEFAULT_DOMAIN = tuple(range(10))
+
+# Valeur maximale de chaque partie
+PART_BOUNDS = {'lat_deg': 90, 'lat_min': 59, 'lat_dec': 999, 'lon_deg': 180, 'lon_min': 59, 'lon_dec': 999}
+
+
+def parse_domain(spec) -> List[int]:
+    """
+    Convertit une description de domaine en liste d'entiers triée.
+
+    Formats acceptés : 5, "0-9", "1,3,5", "2-4,7", [1, 2, 3], {"min": 0, "max": 9}.
+    """
+    if spec is None or spec == '':
+        return list(DEFAULT_DOMAIN)
+    if isinstance(spec, bool):
+        raise ValueError(f"Domaine invalide : {spec!r}")
+    if isinstance(spec, (int, float)):
+        return [int(spec)]
+    if isinstance(spec, dict):
+        return list(range(int(spec.get('min', 0)), int(spec.get('max', 9)) + 1))
+    if isinstance(spec, (list, tuple)):
+        return sorted({int(value) for value in spec})
+    values = set()
+    for chunk in str(spec).replace(' ', '').split(','):
+        if not chunk:
+            continue
+        if '-' in chunk[1:]:
+            start, end = chunk[0] + chunk[1:].split('-', 1)[0], chunk[1:].split('-', 1)[1]
+            values.update(range(int(start), int(end) + 1))
+        else:
+            values.add(int(chunk))
+    if not values:
+        raise ValueError(f"Domaine vide : {spec!r}")
+    return sorted(values)
+
+
+class _Step:
+    """Étape du plan : lettres ajoutées puis contrôles devenus possibles."""
+
+    __slots__ = ('letters', 'units', 'parts', 'axes')
+
+    def __init__(self, letters, units, parts, axes):
+        self.letters = letters
+        self.units = units
+        self.parts = parts
+        self.axes = axes
+
+
+class FormulaBruteForceSolver:
+    """
+    Énumère les affectations des lettres d'une formule compilée avec élagage.
+    """
+
+    def __init__(self, compiled: CompiledFormula, domains: Mapping[str, Sequence[int]],
+                 origin: Optional[Tuple[float, float]] = None,
+                 max_distance_miles: float = DEFAULT_MAX_DISTANCE_MILES,
+                 max_results: int = DEFAULT_MAX_RESULTS,
+                 strict_digits: bool = True,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        :param compiled: formule compilée
+        :param domains: {lettre: valeurs possibles} (0-9 pour une lettre absente)
+        :param origin: (latitude, longitude) décimales de l'origine, ou None
+        :param max_distance_miles: rayon autorisé autour de l'origine
+        :param max_results: nombre maximal de solutions retournées
+        :param strict_digits: chaque élément concaténé doit donner un seul chiffre
+        :param timeout: durée maximale de l'énumération, en secondes
+        """
+        self.compiled = compiled
+        self.domains = {
+            letter: np.array(sorted(domains.get(letter, DEFAULT_DOMAIN)), dtype=float)
+            for letter in compiled.letters
+        }
+        self.origin = origin
+        self.max_distance_m = max_distance_miles * MILE_IN_METERS
+        self.max_results = max_results
+        self.strict_digits = strict_digits
+        self.timeout = timeout
+        # Rayon de recherche courant : réduit à la distance de la k-ième meilleure
+        # solution dès que max_results solutions ont été trouvées (séparation-évaluation)
+        self.radius_m = self.max_distance_m
+        self.axis_bounds = self._axis_bounds() if origin else None
+        # Parties décimales qui ne peuvent pas tenir sur 3 chiffres, quelles que soient les lettres
+        self.rejected_parts = [name for name in PART_NAMES
+                               if name.endswith('_dec') and compiled.parts[name].min_digits > 3]
+        self.plan = self._build_plan()
+
+        self._deadline = 0.0
+        self._evaluated = 0
+        self._truncated = False
+        self._found = 0
+        self._best: Dict[str, np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # Préparation
+    # ------------------------------------------------------------------
+
+    def _axis_bounds(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Rectangle englobant (valeurs non signées, dans l'hémisphère de la formule)
+        du cercle de rayon max_distance autour de l'origine. Volontairement un peu
+        large : le contrôle exact est fait ensuite par le calcul géodésique.
+        """
+        lat0, lon0 = self.origin
+        lat0 = lat0 if self.compiled.lat_dir == 'N' else -lat0
+        lon0 = lon0 if self.compiled.lon_dir == 'E' else -lon0
+        dlat = self.radius_m / 110_000.0 * 1.01
+        max_abs_lat = min(89.9, abs(lat0) + dlat)
+        dlon = self.radius_m / (111_320.0 * math.cos(math.radians(max_abs_lat))) * 1.01
+        return {'lat': (lat0 - dlat, lat0 + dlat), 'lon': (lon0 - dlon, lon0 + dlon)}
+
+    def _build_plan(self) -> List[_Step]:
+        """
+        Ordonne les sous-expressions : à chaque étape, celle qui ajoute le moins
+        de combinaisons, suivie de tous les contrôles devenus évaluables.
+        """
+        units = []
+        for name, part in self.compiled.parts.items():
+            if self.compiled.parts[name].tree[0] == 'cat':
+                units.extend((node, set(letters), name) for node, letters in part.units())
+            elif part.letters:
+                units.append((None, set(part.letters), name))
+
+        assigned = set()
+        pending_units = list(units)
+        pending_parts = set(PART_NAMES)
+        plan = []
+
+        # Étape initiale : parties constantes (sans lettre)
+        initial_parts = [name for name in PART_NAMES if not self.compiled.parts[name].letters]
+        pending_parts -= set(initial_parts)
+        plan.append(_Step((), [], initial_parts, self._axes_for(initial_parts)))
+
+        while pending_units:
+            def cost(unit):
+                new = unit[1] - assigned
+                return (math.prod(len(self.domains[l]) for l in new) if new else 0, len(new))
+
+            pending_units.sort(key=cost)
+            new_letters = tuple(sorted(pending_units[0][1] - assigned))
+            assigned |= set(new_letters)
+
+            ready_units = [unit for unit in pending_units if unit[1] <= assigned]
+            pending_units = [unit for unit in pending_units if not unit[1] <= assigned]
+            ready_parts = [name for name in PART_NAMES
+                           if name in pending_parts and set(self.compiled.parts[name].letters) <= assigned]
+            pending_parts -= set(ready_parts)
+
+            plan.append(_Step(
+                new_letters,
+                [(node, name) for node, _, name in ready_units if node is not None],
+                ready_parts,
+                self._axes_for(ready_parts),
+            ))
+        return plan
+
+    @staticmethod
+    def _axes_for(parts: Sequence[str]) -> List[str]:
+        return sorted({name.split('_')[0] for name in parts})
+
+    # ------------------------------------------------------------------
+    # Contrôles
+    # ------------------------------------------------------------------
+
+    def _check_unit(self, node, table: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        flags = _Flags(size)
+        values = _as_integer(_evaluate(node, table, size, flags), flags.invalid)
+        with np.errstate(invalid='ignore'):
+            keep = ~flags.invalid & ~flags.negative & (values >= 0)
+            if self.strict_digits:
+                keep &= values <= 9
+        return keep
+
+    def _check_part(self, name: str, table: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        values, status = self.compiled.evaluate_part(name, table, size, strict_digits=self.strict_digits)
+        table['#' + name] = values
+        with np.errstate(invalid='ignore'):
+            return (status == COMPLETE) & (values <= PART_BOUNDS[name])
+
+    def _check_axis(self, axis: str, table: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """Élimine les lignes dont l'intervalle possible sort du rectangle englobant."""
+        deg = table.get(f'#{axis}_deg')
+        if self.axis_bounds is None or deg is None:
+            return np.ones(size, dtype=bool)
+        minutes = table.get(f'#{axis}_min')
+        decimals = table.get(f'#{axis}_dec')
+        low_min = minutes if minutes is not None else 0.0
+        high_min = minutes if minutes is not None else 59.0
+        low_dec = decimals if decimals is not None else 0.0
+        high_dec = decimals if decimals is not None else 999.0
+        low = deg + (low_min + low_dec / 1000.0) / 60.0
+        high = deg + (high_min + high_dec / 1000.0) / 60.0
+        box_low, box_high = self.axis_bounds[axis]
+        return (high >= box_low) & (low <= box_high)
+
+    # ------------------------------------------------------------------
+    # Énumération
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _filter(table: Dict[str, np.ndarray], keep: np.ndarray) -> Dict[str, np.ndarray]:
+        return {key: values[keep] for key, values in table.items()}
+
+    def _expand(self, table: Dict[str, np.ndarray], size: int, letters: Tuple[str, ...]):
+        """Produit cartésien de la table avec les domaines des nouvelles lettres."""
+        if not letters:
+            return table, size
+        grids = np.meshgrid(*[self.domains[letter] for letter in letters], indexing='ij')
+        combos = grids[0].size
+        expanded = {key: np.repeat(values, combos) for key, values in table.items()}
+        for letter, grid in zip(letters, grids):
+            expanded[letter] = np.tile(grid.ravel(), size)
+        return expanded, size * combos
+
+    def _search(self, table: Dict[str, np.ndarray], size: int, step_index: int):
+        if size == 0:
+            return
+        if time.perf_counter() > self._deadline:
+            self._truncated = True
+            return
+        if step_index == len(self.plan):
+            self._collect(table, size)
+            return
+
+        step = self.plan[step_index]
+        combos = math.prod(len(self.domains[letter]) for letter in step.letters)
+        # Découpage en blocs pour borner la mémoire (parcours en profondeur)
+        if size > 1 and size * combos > CHUNK_ROWS:
+            chunk = max(1, CHUNK_ROWS // combos)
+            for start in range(0, size, chunk):
+                sub = {key: values[start:start + chunk] for key, values in table.items()}
+                self._search(sub, min(chunk, size - start), step_index)
+                if self._truncated and time.perf_counter() > self._deadline:
+                    return
+            return
+
+        table, size = self._expand(table, size, step.letters)
+        self._evaluated += size
+        keep = np.ones(size, dtype=bool)
+        for node, _ in step.units:
+            keep &= self._check_unit(node, table, size)
+        for name in step.parts:
+            keep &= self._check_part(name, table, size)
+        for axis in step.axes:
+            keep &= self._check_axis(axis, table, size)
+        if not keep.all():
+            table = self._filter(table, keep)
+            size = int(keep.sum())
+        self._search(table, size, step_index + 1)
+
+    def _collect(self, table: Dict[str, np.ndarray], size: int):
+        """Contrôle exact de la distance, puis conservation des meilleures solutions."""
+        lat = table['#lat_deg'] + (table['#lat_min'] + table['#lat_dec'] / 1000.0) / 60.0
+        lon = table['#lon_deg'] + (table['#lon_min'] + table['#lon_dec'] / 1000.0) / 60.0
+        if self.compiled.lat_dir == 'S':
+            lat = -lat
+        if self.compiled.lon_dir == 'W':
+            lon = -lon
+
+        if self.origin is not None:
+            distances = geodesy.distances(self.origin[0], self.origin[1], lat, lon)
+            keep = distances <= self.radius_m
+        else:
+            distances = np.zeros(size)
+            keep = np.ones(size, dtype=bool)
+
+        found = int(keep.sum())
+        if not found:
+            return
+        self._found += found
+        batch = {letter: table[letter][keep] for letter in self.compiled.letters}
+        batch['#distance'] = distances[keep]
+
+        if not self._best:
+            merged = batch
+        else:
+            merged = {key: np.concatenate([self._best[key], batch[key]]) for key in batch}
+        count = len(merged['#distance'])
+        if count > self.max_results:
+            order = np.argsort(merged['#distance'], kind='stable')[:self.max_results]
+            merged = {key: values[order] for key, values in merged.items()}
+            if self.origin is None:
+                # Sans origine, pas de classement : inutile de continuer l'énumération
+                self._truncated = True
+                self._deadline = 0.0
+        self._best = merged
+        if self.origin is not None and len(merged['#distance']) >= self.max_results:
+            radius = float(merged['#distance'].max())
+            if radius < self.radius_m:
+                self.radius_m = radius
+                self.axis_bounds = self._axis_bounds()
+
+    def solve(self) -> Dict:
+        """
+        Lance l'énumération.
+
+        Returns:
+            Dictionnaire {"solutions": [...], "count", "returned", "evaluated",
+            "truncated", "elapsed_ms", "plan", "rejected_parts"}
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.timeout
+        if self.rejected_parts:
+            logger.info(f"Force brute {self.compiled.formula!r}: parties impossibles {self.rejected_parts}")
+        else:
+            self._search({}, 1, 0)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        solutions = []
+        if self._best:
+            order = np.argsort(self._best['#distance'], kind='stable')
+            assignments = [
+                {letter: int(self._best[letter][i]) for letter in self.compiled.letters}
+                for i in order
+            ]
+            batch = self.compiled.evaluate_many(assignments)
+            latitudes, longitudes = batch.decimal_coordinates()
+            for position, i in enumerate(order):
+                row = batch.row(position)
+                row['variables'] = assignments[position]
+                row['decimal_latitude'] = float(latitudes[position])
+                row['decimal_longitude'] = float(longitudes[position])
+                if self.origin is not None:
+                    row['distance_from_origin'] = geodesy.distance_info(self._best['#distance'][i])
+                solutions.append(row)
+
+        logger.info(
+            f"Force brute {self.compiled.formula!r}: {self._found} solutions, "
+            f"{self._evaluated} affectations évaluées en {elapsed_ms:.1f} ms"
+        )
+        return {
+            'solutions': solutions,
+            'count': self._found,
+            'returned': len(solutions),
+            'evaluated': self._evaluated,
+            'truncated': self._truncated,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'plan': [list(step.letters) for step in self.plan if step.letters],
+            'rejected_parts': self.rejected_parts,
+        }
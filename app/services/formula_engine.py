@@ -0,0 +1,481 @@
+"""
+Moteur de formules de coordonnées pour MysteryAI
+
+Une formule comme `N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)` est
+compilée une seule fois en un arbre syntaxique par partie (degrés, minutes,
+décimales de la latitude et de la longitude) et une table des lettres
+(« slots »). Les formules compilées sont mises en cache par chaîne de formule.
+
+L'évaluation se fait sur des tableaux NumPy : une même formule peut être
+évaluée pour des centaines d'affectations de lettres en un seul passage sur
+l'arbre, au lieu d'une substitution de chaînes et d'un `eval` par requête.
+
+Règles d'évaluation (identiques à celles de /api/calculate_coordinates) :
+  - des éléments juxtaposés sont concaténés chiffre à chiffre :
+    `AB` avec A=1, B=2 vaut 12 et `(B-A)(D+E)` vaut 10 * (B-A) + (D+E) ;
+  - `+ - * / x` sont les opérateurs arithmétiques (`x` = multiplication) ;
+  - chaque sous-expression concaténée doit donner un entier positif ou nul ;
+  - une partie dont une lettre n'a pas de valeur reste « partielle ».
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Extraction des parties de la formule (mêmes motifs que la version historique)
+LAT_PATTERN = re.compile(r'([NS])\s*([A-Z0-9]+)°\s*([A-Z0-9]+)\.([A-Z0-9()x*/+-]+)')
+LON_PATTERN = re.compile(r'([EW])\s*([A-Z0-9]+)°\s*([A-Z0-9]+)\.([A-Z0-9()x*/+-]+)')
+
+PART_NAMES = ('lat_deg', 'lat_min', 'lat_dec', 'lon_deg', 'lon_min', 'lon_dec')
+PART_LABELS = {
+    'lat_deg': 'degrés latitude',
+    'lat_min': 'minutes latitude',
+    'lat_dec': 'décimales latitude',
+    'lon_deg': 'degrés longitude',
+    'lon_min': 'minutes longitude',
+    'lon_dec': 'décimales longitude',
+}
+PART_WIDTHS = {'lat_deg': 2, 'lat_min': 2, 'lat_dec': 3, 'lon_deg': 3, 'lon_min': 2, 'lon_dec': 3}
+
+# Statuts d'évaluation d'une partie
+COMPLETE = 0
+PARTIAL = 1
+NON_INTEGER = 2
+NEGATIVE = 3
+TOO_MANY_DIGITS = 4
+
+# Tolérance pour considérer un résultat flottant comme entier
+INTEGER_TOLERANCE = 1e-9
+
+# Puissances de 10 utilisées pour compter les chiffres d'un entier positif
+_POWERS_OF_TEN = np.array([10.0 ** k for k in range(1, 19)])
+
+_TOKEN_PATTERN = re.compile(r'\d+|[A-Z]|[-+*/x()]')
+
+
+class FormulaSyntaxError(ValueError):
+    """Formule de coordonnées impossible à analyser."""
+
+
+# ------------------------------------------------------------------------------
+# Analyse syntaxique
+# ------------------------------------------------------------------------------
+#
+# Grammaire d'une partie :
+#   expr   := term (('+' | '-') term)*
+#   term   := concat (('*' | 'x' | '/') concat)*
+#   concat := unary unary*            (juxtaposition = concaténation)
+#   unary  := '-' unary | atom
+#   atom   := NOMBRE | LETTRE | '(' expr ')'
+#
+# Les nœuds sont des tuples : ('num', valeur, nb_chiffres), ('var', lettre),
+# ('neg', nœud), ('bin', op, gauche, droite), ('cat', [nœuds]), ('group', nœud).
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _TOKEN_PATTERN.findall(source)
+        if ''.join(self.tokens) != source:
+            raise FormulaSyntaxError(f"Caractère invalide dans '{source}'")
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise FormulaSyntaxError(f"Expression incomplète : '{self.source}'")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.peek() is not None:
+            raise FormulaSyntaxError(f"Symbole inattendu '{self.peek()}' dans '{self.source}'")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in ('+', '-'):
+            op = self.take()
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.concat()
+        while self.peek() in ('*', 'x', '/'):
+            op = self.take()
+            node = ('bin', '/' if op == '/' else '*', node, self.concat())
+        return node
+
+    def concat(self):
+        items = [self.unary()]
+        while self.peek() is not None and (self.peek() == '(' or self.peek()[0].isalnum()) and self.peek() != 'x':
+            items.append(self.unary())
+        return items[0] if len(items) == 1 else ('cat', items)
+
+    def unary(self):
+        if self.peek() == '-':
+            self.take()
+            return ('neg', self.unary())
+        return self.atom()
+
+    def atom(self):
+        token = self.take()
+        if token.isdigit():
+            return ('num', int(token), len(token))
+        if token == '(':
+            node = self.expr()
+            if self.take() != ')':
+                raise FormulaSyntaxError(f"Parenthèse non fermée dans '{self.source}'")
+            return ('group', node)
+        if 'A' <= token <= 'Z':
+            return ('var', token)
+        raise FormulaSyntaxError(f"Symbole inattendu '{token}' dans '{self.source}'")
+
+
+def _collect_letters(node, letters: set):
+    kind = node[0]
+    if kind == 'var':
+        letters.add(node[1])
+    elif kind in ('neg', 'group'):
+        _collect_letters(node[1], letters)
+    elif kind == 'bin':
+        _collect_letters(node[2], letters)
+        _collect_letters(node[3], letters)
+    elif kind == 'cat':
+        for item in node[1]:
+            _collect_letters(item, letters)
+
+
+# ------------------------------------------------------------------------------
+# Évaluation vectorisée
+# ------------------------------------------------------------------------------
+
+def _digit_count(values: np.ndarray) -> np.ndarray:
+    """Nombre de chiffres de chaque entier positif (0 compte pour un chiffre)."""
+    return np.searchsorted(_POWERS_OF_TEN, values, side='right') + 1
+
+
+def _as_integer(values: np.ndarray, invalid: np.ndarray) -> np.ndarray:
+    """Arrondit les valeurs et marque comme invalides celles qui ne sont pas entières."""
+    rounded = np.round(values)
+    with np.errstate(invalid='ignore'):
+        invalid |= ~(np.abs(values - rounded) <= INTEGER_TOLERANCE)
+    return rounded
+
+
+class _Flags:
+    """Masques d'erreurs accumulés pendant l'évaluation d'une partie."""
+
+    __slots__ = ('invalid', 'negative', 'overflow', 'digits', 'strict_digits', 'root')
+
+    def __init__(self, size: int, strict_digits: bool = False, root=None):
+        self.invalid = np.zeros(size, dtype=bool)
+        self.negative = np.zeros(size, dtype=bool)
+        # Élément concaténé de plus d'un chiffre (uniquement si strict_digits)
+        self.overflow = np.zeros(size, dtype=bool)
+        # Nombre total de chiffres de la concaténation `root` (zéros de tête compris),
+        # si la partie est une concaténation ; les concaténations imbriquées
+        # (`(ABCD/10)`) ne comptent pas
+        self.digits = None
+        self.strict_digits = strict_digits
+        self.root = root
+
+
+def _evaluate(node, slots: Mapping[str, np.ndarray], size: int, flags: _Flags) -> np.ndarray:
+    kind = node[0]
+    if kind == 'num':
+        return np.full(size, float(node[1]))
+    if kind == 'var':
+        return slots[node[1]]
+    if kind == 'group':
+        return _evaluate(node[1], slots, size, flags)
+    if kind == 'neg':
+        return -_evaluate(node[1], slots, size, flags)
+    if kind == 'bin':
+        left = _evaluate(node[2], slots, size, flags)
+        right = _evaluate(node[3], slots, size, flags)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if node[1] == '+':
+                return left + right
+            if node[1] == '-':
+                return left - right
+            if node[1] == '*':
+                return left * right
+            result = left / right
+        flags.invalid |= ~np.isfinite(result) & ~np.isnan(left) & ~np.isnan(right)
+        return result
+    # Concaténation : chaque élément doit être un entier positif ou nul
+    result = None
+    total = np.zeros(size, dtype=np.int64)
+    for item in node[1]:
+        values = _as_integer(_evaluate(item, slots, size, flags), flags.invalid)
+        with np.errstate(invalid='ignore'):
+            flags.negative |= values < 0
+            if flags.strict_digits and item[0] != 'num':
+                flags.overflow |= values > 9
+        values = np.where(values < 0, 0.0, values)
+        if item[0] == 'num':
+            digits = np.full(size, item[2])
+        else:
+            digits = _digit_count(np.nan_to_num(values))
+        total += digits
+        result = values if result is None else result * np.power(10.0, digits) + values
+    if node is flags.root:
+        flags.digits = total
+    return result
+
+
+def _substitute(source: str, variables: Mapping[str, int]) -> str:
+    """Remplace les lettres connues par leur valeur (affichage des parties partielles)."""
+    return re.sub(r'[A-Z]', lambda m: str(variables[m.group(0)]) if m.group(0) in variables else m.group(0), source)
+
+
+def normalize_variables(variables: Optional[Mapping]) -> Dict[str, int]:
+    """
+    Ne garde que les lettres ayant une valeur entière exploitable
+    (les valeurs vides ou non numériques sont considérées comme absentes).
+    """
+    normalized = {}
+    for letter, value in (variables or {}).items():
+        if value is None or isinstance(value, bool):
+            continue
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            continue
+        if number != number or number in (float('inf'), float('-inf')):
+            continue
+        normalized[str(letter).strip().upper()] = int(number) if number == int(number) else number
+    return normalized
+
+
+class _CompiledPart:
+    """Une partie (degrés, minutes ou décimales) compilée."""
+
+    __slots__ = ('name', 'source', 'tree', 'letters')
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source
+        self.tree = _Parser(source).parse()
+        letters = set()
+        _collect_letters(self.tree, letters)
+        self.letters = tuple(sorted(letters))
+
+    @property
+    def min_digits(self) -> int:
+        """
+        Nombre minimal de chiffres de la partie : chaque élément concaténé en
+        donne au moins un (les nombres écrits, tous les leurs).
+        """
+        nodes = self.tree[1] if self.tree[0] == 'cat' else [self.tree]
+        return sum(node[2] if node[0] == 'num' else 1 for node in nodes)
+
+    def units(self) -> List[Tuple[object, Tuple[str, ...]]]:
+        """
+        Sous-expressions évaluables indépendamment : les éléments concaténés
+        contenant des lettres (ou la partie entière si elle n'est pas une concaténation).
+        Retourne une liste de (arbre, lettres).
+        """
+        nodes = self.tree[1] if self.tree[0] == 'cat' else [self.tree]
+        units = []
+        for node in nodes:
+            letters = set()
+            _collect_letters(node, letters)
+            if letters:
+                units.append((node, tuple(sorted(letters))))
+        return units
+
+
+class FormulaBatchResult:
+    """
+    Résultat de l'évaluation d'une formule pour N affectations.
+
+    Pour chaque partie : `values[part]` (float64, NaN si partielle) et
+    `status[part]` (COMPLETE, PARTIAL, NON_INTEGER, NEGATIVE, TOO_MANY_DIGITS).
+    """
+
+    def __init__(self, formula: 'CompiledFormula', assignments: List[Dict[str, int]],
+                 values: Dict[str, np.ndarray], status: Dict[str, np.ndarray]):
+        self.formula = formula
+        self.assignments = assignments
+        self.values = values
+        self.status = status
+        self.size = len(assignments)
+
+    @property
+    def complete(self) -> np.ndarray:
+        """Masque des affectations dont les six parties sont complètes et valides."""
+        mask = np.ones(self.size, dtype=bool)
+        for part in PART_NAMES:
+            mask &= self.status[part] == COMPLETE
+        return mask
+
+    def decimal_coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitudes et longitudes décimales (NaN pour les affectations incomplètes)."""
+        complete = self.complete
+        lat = self.values['lat_deg'] + (self.values['lat_min'] + self.values['lat_dec'] / 1000.0) / 60.0
+        lon = self.values['lon_deg'] + (self.values['lon_min'] + self.values['lon_dec'] / 1000.0) / 60.0
+        if self.formula.lat_dir == 'S':
+            lat = -lat
+        if self.formula.lon_dir == 'W':
+            lon = -lon
+        return np.where(complete, lat, np.nan), np.where(complete, lon, np.nan)
+
+    def _part_display(self, part: str, index: int) -> Tuple[str, str, str]:
+        """Retourne (statut, texte affiché, message) pour une partie d'une affectation."""
+        status = int(self.status[part][index])
+        label = PART_LABELS[part]
+        compiled = self.formula.parts[part]
+        if status == PARTIAL:
+            text = _substitute(compiled.source, self.assignments[index])
+            return 'partial', text, f"La partie {label} contient encore des lettres"
+        if status in (NON_INTEGER, NEGATIVE):
+            text = _substitute(compiled.source, self.assignments[index])
+            if status == NEGATIVE:
+                return 'error', text, f"La partie {label} est négative ({text})"
+            return 'error', text, f"L'expression {text} dans {label} ne donne pas un nombre entier. Vérifiez vos valeurs."
+        value = int(self.values[part][index])
+        text = str(value).zfill(PART_WIDTHS[part])
+        if status == TOO_MANY_DIGITS:
+            return 'error', text, (
+                f"La partie {label} a plus de 3 chiffres ({text}). Ceci indique une erreur dans vos valeurs, "
+                f"car en géocaching, il faut exactement 3 chiffres après le point."
+            )
+        return 'complete', text, ''
+
+    def row(self, index: int) -> Dict:
+        """Construit la réponse de /api/calculate_coordinates pour une affectation."""
+        displays = {part: self._part_display(part, index) for part in PART_NAMES}
+
+        def axis_status(parts):
+            axis = {"status": "complete", "message": ""}
+            for part in parts:
+                status, _, message = displays[part]
+                if status == 'error':
+                    return {"status": "error", "message": message}
+                if status == 'partial':
+                    axis = {"status": "partial", "message": message}
+            return axis
+
+        lat_status = axis_status(('lat_deg', 'lat_min', 'lat_dec'))
+        lon_status = axis_status(('lon_deg', 'lon_min', 'lon_dec'))
+        if lat_status["status"] == "complete" and lon_status["status"] == "complete":
+            global_status = "complete"
+        elif "error" in (lat_status["status"], lon_status["status"]):
+            global_status = "error"
+        else:
+            global_status = "partial"
+
+        latitude = f"{self.formula.lat_dir}{displays['lat_deg'][1]}° {displays['lat_min'][1]}.{displays['lat_dec'][1]}"
+        longitude = f"{self.formula.lon_dir}{displays['lon_deg'][1]}° {displays['lon_min'][1]}.{displays['lon_dec'][1]}"
+        return {
+            "coordinates": f"{latitude} {longitude}",
+            "latitude": latitude,
+            "longitude": longitude,
+            "status": global_status,
+            "lat_status": lat_status,
+            "lon_status": lon_status,
+        }
+
+
+class CompiledFormula:
+    """
+    Formule de coordonnées compilée : six parties et une table des lettres.
+    """
+
+    def __init__(self, formula: str):
+        lat_match = LAT_PATTERN.search(formula)
+        lon_match = LON_PATTERN.search(formula)
+        if not lat_match or not lon_match:
+            raise FormulaSyntaxError("Format de formule invalide")
+
+        self.formula = formula
+        self.lat_dir = lat_match.group(1)
+        self.lon_dir = lon_match.group(1)
+        sources = lat_match.groups()[1:] + lon_match.groups()[1:]
+        self.parts: Dict[str, _CompiledPart] = {
+            name: _CompiledPart(name, source) for name, source in zip(PART_NAMES, sources)
+        }
+        letters = set()
+        for part in self.parts.values():
+            letters.update(part.letters)
+        # Table des slots : lettre -> indice de colonne dans une matrice d'affectations
+        self.letters: Tuple[str, ...] = tuple(sorted(letters))
+        self.slots: Dict[str, int] = {letter: i for i, letter in enumerate(self.letters)}
+
+    def evaluate_part(self, name: str, columns: Mapping[str, np.ndarray], size: int,
+                      strict_digits: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Évalue une partie pour des colonnes de valeurs (une par lettre, NaN = absente).
+
+        Args:
+            strict_digits: exige que chaque élément concaténé contenant des lettres
+                           donne un seul chiffre (0-9) ; sinon la partie est NON_INTEGER
+
+        Returns:
+            (valeurs, statuts) : tableaux de taille `size`
+        """
+        part = self.parts[name]
+        missing = np.zeros(size, dtype=bool)
+        for letter in part.letters:
+            missing |= np.isnan(columns[letter])
+        flags = _Flags(size, strict_digits, root=part.tree)
+        result = _as_integer(_evaluate(part.tree, columns, size, flags), flags.invalid)
+
+        status = np.full(size, COMPLETE, dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            flags.negative |= result < 0
+            if name.endswith('_dec'):
+                too_long = result >= 1000
+                if flags.digits is not None:
+                    too_long |= flags.digits > 3
+                status[too_long] = TOO_MANY_DIGITS
+            status[flags.negative] = NEGATIVE
+        status[flags.invalid | flags.overflow] = NON_INTEGER
+        status[missing] = PARTIAL
+        return np.where(missing | flags.invalid | flags.negative, np.nan, result), status
+
+    def evaluate_arrays(self, columns: Mapping[str, np.ndarray], size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Évalue les six parties pour des colonnes de valeurs (une par lettre, NaN = absente).
+
+        Returns:
+            (values, status) : deux dictionnaires {partie: tableau de taille `size`}
+        """
+        values: Dict[str, np.ndarray] = {}
+        status: Dict[str, np.ndarray] = {}
+        for name in self.parts:
+            values[name], status[name] = self.evaluate_part(name, columns, size)
+        return values, status
+
+    def evaluate_many(self, assignments: Sequence[Optional[Mapping]]) -> FormulaBatchResult:
+        """Évalue la formule pour une liste d'affectations de lettres."""
+        normalized = [normalize_variables(variables) for variables in assignments]
+        size = len(normalized)
+        columns = {
+            letter: np.array([variables.get(letter, np.nan) for variables in normalized], dtype=float)
+            for letter in self.letters
+        }
+        values, status = self.evaluate_arrays(columns, size)
+        return FormulaBatchResult(self, normalized, values, status)
+
+    def evaluate(self, variables: Optional[Mapping]) -> FormulaBatchResult:
+        """Évalue la formule pour une seule affectation."""
+        return self.evaluate_many([variables])
+
+
+@lru_cache(maxsize=256)
+def compile_formula(formula: str) -> CompiledFormula:
+    """
+    Compile une formule (résultat mis en cache par chaîne de formule).
+
+    Raises:
+        FormulaSyntaxError: si la formule ne peut pas être analysée
+    """
+    return CompiledFormula(formula)
@@ -65,7 +65,8 @@ Ce contexte sera utilisé pour aider à résoudre des questions liées à cette
                 [
                     {"role": "system", "content": "Tu es un assistant spécialisé dans l'analyse des géocaches."},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                use_cache=True
             )
             
             if not response:
@@ -144,7 +145,8 @@ Ce contexte sera utilisé pour aider à résoudre des questions liées à cette
                 [
                     {"role": "system", "content": "Tu es un assistant spécialisé dans l'analyse des descriptions de géocaches."},
                     {"role": "user", "content": f"{instructions}\n\nCONTENU DE LA GÉOCACHE:\n{prepared_content}"}
-                ]
+                ],
+                use_cache=True
             )
             
             if not response:
@@ -1,8 +1,18 @@
 from app.services.ai_service import ai_service
 from app.models.geocache import Geocache
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from flask import current_app, has_app_context
 import re
+import time
 import traceback
 
+# Résolution parallèle : nombre d'appels simultanés au modèle et durée maximale d'un appel
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 10
+DEFAULT_QUESTION_TIMEOUT = 60.0
+# Intervalle de vérification des délais tant que des questions attendent un worker
+_POLL_INTERVAL = 0.1
+
 class FormulaSolverService:
     """Service pour résoudre les questions des formules de coordonnées avec l'IA"""
     
@@ -39,21 +49,7 @@ class FormulaSolverService:
                 print("Aucun contexte thématique fourni")
             
             # Obtenir le contexte de la géocache si un ID est fourni
-            geocache_context = ""
-            if geocache_id:
-                try:
-                    geocache = Geocache.query.get(geocache_id)
-                    if geocache:
-                        print(f"Informations de géocache trouvées: {gc_code or geocache.gc_code} - {geocache.name}")
-                        cache_type = getattr(geocache, 'cache_type', '') or getattr(geocache, 'type', '')
-                        
-                        geocache_context = f"Cette géocache a pour code GC: {gc_code or geocache.gc_code}. "
-                        geocache_context += f"Son nom est: {geocache.name}. "
-                        if cache_type:
-                            geocache_context += f"Elle est de type: {cache_type}. "
-                        geocache_context += f"Difficulté: {geocache.difficulty}/5, Terrain: {geocache.terrain}/5. "
-                except Exception as e:
-                    print(f"Erreur lors de la récupération de la géocache: {str(e)}")
+            geocache_context = self._geocache_context(geocache_id, gc_code)
             
             # Construire le message pour l'IA avec les questions
             questions_text = ""
@@ -74,7 +70,8 @@ class FormulaSolverService:
                 [
                     {"role": "system", "content": "Tu es un assistant spécialisé dans la résolution de géocaches."},
                     {"role": "user", "content": instructions}
-                ]
+                ],
+                use_cache=True
             )
             
             if not response:
@@ -92,6 +89,146 @@ class FormulaSolverService:
             traceback.print_exc()
             return {"error": f"Erreur lors de la résolution des questions avec l'IA: {str(e)}"}
     
+    def solve_questions_concurrently(self, questions, geocache_id=None, gc_code=None,
+                                     max_workers=DEFAULT_CONCURRENCY, timeout=DEFAULT_QUESTION_TIMEOUT):
+        """
+        Résout les questions en envoyant une requête par lettre, en parallèle,
+        et produit chaque réponse dès qu'elle est disponible.
+        
+        Le contexte thématique (fourni via "_thematic_context" ou extrait une seule
+        fois de la géocache) et le contexte de la géocache sont partagés par toutes
+        les requêtes. La durée totale est ainsi proche de celle de la question la
+        plus lente plutôt que de la somme des questions.
+        
+        Args:
+            questions (dict): Dictionnaire de questions par lettre, peut inclure "_thematic_context"
+            geocache_id (int, optional): ID de la géocache pour le contexte
+            gc_code (str, optional): Code GC de la géocache pour le contexte
+            max_workers (int): Nombre maximal d'appels simultanés au modèle (1 à MAX_CONCURRENCY)
+            timeout (float): Durée maximale d'un appel, en secondes
+            
+        Yields:
+            dict: {"letter", "answer", "status" ("ok", "error" ou "timeout"), "elapsed_ms"}
+                  et "error" pour les statuts autres que "ok"
+        """
+        questions = dict(questions or {})
+        thematic_context = questions.pop("_thematic_context", "")
+        questions = {letter: question for letter, question in questions.items() if question}
+        if not questions:
+            return
+        
+        ai_service._ensure_initialized()
+        if not ai_service.api_key:
+            for letter in questions:
+                yield {"letter": letter, "answer": "", "status": "error", "elapsed_ms": 0,
+                       "error": "Service IA non disponible ou clé API non configurée"}
+            return
+        
+        geocache = self._get_geocache(geocache_id)
+        if not thematic_context and geocache is not None:
+            # Calculé une seule fois pour toutes les lettres
+            from app.services.formula_questions_service import formula_questions_service
+            thematic_context = formula_questions_service.extract_thematic_context(geocache)
+        geocache_context = self._geocache_context(geocache_id, gc_code, geocache)
+        
+        max_workers = max(1, min(int(max_workers or DEFAULT_CONCURRENCY), MAX_CONCURRENCY, len(questions)))
+        timeout = float(timeout or DEFAULT_QUESTION_TIMEOUT)
+        app = current_app._get_current_object() if has_app_context() else None
+        started = {}
+        
+        def run(letter, question):
+            started[letter] = time.perf_counter()
+            if app is None:
+                return self._solve_single_letter(letter, question, thematic_context, geocache_context)
+            with app.app_context():
+                return self._solve_single_letter(letter, question, thematic_context, geocache_context)
+        
+        print(f"Résolution parallèle de {len(questions)} questions ({max_workers} simultanées, délai {timeout}s)")
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="formula-solver")
+        try:
+            pending = {executor.submit(run, letter, question): letter for letter, question in questions.items()}
+            while pending:
+                now = time.perf_counter()
+                deadlines = [started[letter] + timeout for letter in pending.values() if letter in started]
+                wait_for = max(0.0, min(deadlines) - now) if deadlines else timeout
+                if len(deadlines) < len(pending):
+                    wait_for = min(wait_for, _POLL_INTERVAL)
+                done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    letter = pending.pop(future)
+                    elapsed_ms = round((time.perf_counter() - started.get(letter, now)) * 1000, 1)
+                    try:
+                        yield {"letter": letter, "answer": future.result(), "status": "ok", "elapsed_ms": elapsed_ms}
+                    except Exception as e:
+                        print(f"Erreur lors de la résolution de la question {letter}: {str(e)}")
+                        yield {"letter": letter, "answer": "", "status": "error", "elapsed_ms": elapsed_ms,
+                               "error": str(e)}
+                
+                now = time.perf_counter()
+                for future, letter in list(pending.items()):
+                    if letter in started and now - started[letter] >= timeout:
+                        # Le thread termine son appel en arrière-plan, sa réponse est ignorée
+                        del pending[future]
+                        print(f"Délai dépassé pour la question {letter}")
+                        yield {"letter": letter, "answer": "", "status": "timeout",
+                               "elapsed_ms": round((now - started[letter]) * 1000, 1),
+                               "error": f"Pas de réponse après {timeout:g} s"}
+        finally:
+            # Abandonne les questions encore en file si le client se déconnecte
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _solve_single_letter(self, letter, question, thematic_context="", geocache_context=""):
+        """
+        Résout la question d'une seule lettre
+        
+        Returns:
+            str: Réponse générée pour la lettre (chaîne vide si introuvable)
+        """
+        instructions = self._build_ai_instructions({letter: question}, thematic_context, geocache_context)
+        response = ai_service.chat(
+            [
+                {"role": "system", "content": "Tu es un assistant spécialisé dans la résolution de géocaches."},
+                {"role": "user", "content": instructions}
+            ],
+            use_cache=True
+        )
+        if not response:
+            raise ValueError("Pas de réponse de l'IA")
+        return self._extract_json_from_response(response, [letter]).get(letter, "")
+    
+    def _get_geocache(self, geocache_id):
+        """Géocache correspondant à l'ID, ou None"""
+        if not geocache_id:
+            return None
+        try:
+            return Geocache.query.get(geocache_id)
+        except Exception as e:
+            print(f"Erreur lors de la récupération de la géocache: {str(e)}")
+            return None
+    
+    def _geocache_context(self, geocache_id=None, gc_code=None, geocache=None):
+        """
+        Construit la description de la géocache (code, nom, type, difficulté, terrain) ajoutée au prompt
+        
+        Returns:
+            str: Contexte de la géocache, vide si elle est introuvable
+        """
+        if geocache is None:
+            geocache = self._get_geocache(geocache_id)
+        if not geocache:
+            return ""
+        
+        print(f"Informations de géocache trouvées: {gc_code or geocache.gc_code} - {geocache.name}")
+        cache_type = getattr(geocache, 'cache_type', '') or getattr(geocache, 'type', '')
+        
+        geocache_context = f"Cette géocache a pour code GC: {gc_code or geocache.gc_code}. "
+        geocache_context += f"Son nom est: {geocache.name}. "
+        if cache_type:
+            geocache_context += f"Elle est de type: {cache_type}. "
+        geocache_context += f"Difficulté: {geocache.difficulty}/5, Terrain: {geocache.terrain}/5. "
+        return geocache_context
+    
     def _build_ai_instructions(self, questions, thematic_context="", geocache_context=""):
         """
         Crée les instructions à envoyer à l'IA pour la résolution des questions
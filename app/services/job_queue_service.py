@@ -0,0 +1,641 @@
+"""
+File de tâches de fond persistante (SQLite) pour les opérations longues.
+
+Les tâches (import GPX, rafraîchissement des logs, téléchargement d'images...)
+sont enregistrées dans une base SQLite locale (`jobs.db`) et exécutées par un
+petit pool de threads dans le processus de l'application. Une connexion
+HTTP coupée ne perd donc plus le travail et n'immobilise plus un worker web.
+
+Fonctionnalités :
+- priorités (les plus élevées d'abord, puis par ordre de soumission)
+- nouvelles tentatives avec délai croissant en cas d'exception
+- annulation (immédiate en file, coopérative en cours d'exécution)
+- progression et point de reprise (checkpoint) enregistrés à chaque étape :
+  une tâche interrompue par un arrêt de l'application est reprise à partir
+  de son dernier checkpoint
+- bail (lease) des tâches en cours : le processus qui exécute une tâche y
+  inscrit son identifiant et renouvelle régulièrement `heartbeat_at`. Seule
+  une tâche dont le bail a expiré (processus arrêté ou bloqué) est remise en
+  file ; un autre processus partageant `jobs.db` ne reprend donc jamais une
+  tâche encore vivante
+- journal d'événements par tâche, lu par la route de streaming
+
+Chaque type de tâche est associé à une fonction via `register_job_handler`.
+La fonction reçoit un `JobContext` et renvoie un résultat sérialisable en JSON.
+
+Les workers ne sont démarrés que par le processus qui sert l'application
+(`server.py`), pas par chaque appel de `create_app()`.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+# Statuts possibles d'une tâche
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 3
+# Délai avant la n-ième nouvelle tentative : RETRY_DELAY_SECONDS * 2 ** (n - 1)
+RETRY_DELAY_SECONDS = 5.0
+# Intervalle de scrutation de la base (tâches soumises par un autre processus, délais de reprise)
+POLL_INTERVAL_SECONDS = 1.0
+# Les tâches terminées sont purgées au démarrage après ce délai
+RETENTION_SECONDS = 7 * 24 * 3600
+# Intervalle de renouvellement du bail des tâches en cours
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+# Une tâche "running" dont le bail n'a pas été renouvelé depuis ce délai est remise en file
+LEASE_SECONDS = 60.0
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        payload TEXT,
+        checkpoint TEXT,
+        result TEXT,
+        error TEXT,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        run_after REAL NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        updated_at REAL NOT NULL,
+        owner TEXT,
+        heartbeat_at REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs (status, priority DESC, id)",
+    """CREATE TABLE IF NOT EXISTS job_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        data TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_job_events_job ON job_events (job_id, id)",
+]
+
+_JOB_COLUMNS = ('id', 'kind', 'status', 'priority', 'payload', 'checkpoint', 'result', 'error', 'progress',
+                'message', 'attempts', 'max_attempts', 'cancel_requested', 'run_after', 'created_at',
+                'started_at', 'finished_at', 'updated_at', 'owner', 'heartbeat_at')
+_JSON_COLUMNS = ('payload', 'checkpoint', 'result')
+
+
+class JobCancelled(Exception):
+    """Levée par `JobContext.check_cancelled` quand l'annulation de la tâche a été demandée."""
+
+
+class JobFailed(Exception):
+    """Erreur définitive levée par une tâche : elle échoue sans nouvelle tentative."""
+
+
+class _Handler:
+    def __init__(self, function: Callable, max_attempts: int, on_finished: Optional[Callable]):
+        self.function = function
+        self.max_attempts = max_attempts
+        self.on_finished = on_finished
+
+
+# Fonctions d'exécution par type de tâche
+_handlers: Dict[str, _Handler] = {}
+
+
+def register_job_handler(kind: str, function: Callable[['JobContext'], Any],
+                         max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                         on_finished: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    Associe une fonction à un type de tâche.
+
+    Args:
+        kind: Type de tâche (ex. "import_gpx")
+        function: Fonction appelée avec le JobContext ; sa valeur de retour devient le résultat
+        max_attempts: Nombre maximal d'exécutions en cas d'exception
+        on_finished: Appelée avec la tâche (dict) quand elle atteint un statut final,
+                     par exemple pour supprimer des fichiers temporaires
+    """
+    _handlers[kind] = _Handler(function, max(1, int(max_attempts)), on_finished)
+
+
+def registered_job_kinds() -> List[str]:
+    """Types de tâches disponibles."""
+    return sorted(_handlers)
+
+
+class JobContext:
+    """
+    Vue d'une tâche en cours d'exécution, passée à sa fonction.
+
+    Attributs : id, kind, payload, checkpoint (dernier point de reprise ou None), attempt.
+    """
+
+    def __init__(self, queue: 'JobQueue', job: Dict[str, Any]):
+        self._queue = queue
+        self.id = job['id']
+        self.kind = job['kind']
+        self.payload = job['payload'] or {}
+        self.checkpoint = job['checkpoint']
+        self.attempt = job['attempts']
+
+    def report(self, progress: Optional[float] = None, message: Optional[str] = None,
+               checkpoint: Any = None, **data):
+        """
+        Enregistre la progression (0-100), un message et éventuellement un
+        nouveau point de reprise, puis publie un événement "progress".
+        Les arguments supplémentaires sont ajoutés à l'événement.
+        """
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        self._queue._report(self.id, progress, message, checkpoint, data)
+
+    def is_cancelled(self) -> bool:
+        """Indique si l'annulation de la tâche a été demandée."""
+        return self._queue._cancel_requested(self.id)
+
+    def check_cancelled(self):
+        """Lève JobCancelled si l'annulation de la tâche a été demandée."""
+        if self.is_cancelled():
+            raise JobCancelled()
+
+
+class JobQueue:
+    """
+    File de tâches SQLite avec pool de workers.
+    """
+
+    def __init__(self, db_path: str, workers: int = DEFAULT_WORKERS, clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.workers = workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Notifié à chaque changement (nouvelle tâche, événement, statut)
+        self._changed = threading.Condition(threading.Lock())
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._app = None
+        # Identifiant du bail : machine, processus et instance de la file
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            # Bases créées avant l'ajout du bail
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            self._connection.commit()
+
+    # --------------------------------------------------------------------------
+    # Accès à la base
+    # --------------------------------------------------------------------------
+
+    def _row_to_job(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(_JOB_COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] is not None else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def _fetch(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection.execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row)
+
+    def _add_event(self, job_id: int, data: Dict[str, Any]):
+        self._connection.execute(
+            "INSERT INTO job_events (job_id, created_at, data) VALUES (?, ?, ?)",
+            (job_id, self._clock(), json.dumps(data, ensure_ascii=False, default=str))
+        )
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    # --------------------------------------------------------------------------
+    # API publique
+    # --------------------------------------------------------------------------
+
+    def submit(self, kind: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0,
+               max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ajoute une tâche à la file.
+
+        Raises:
+            ValueError: Si aucun gestionnaire n'est enregistré pour ce type
+        """
+        handler = _handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"Type de tâche inconnu : {kind}")
+        now = self._clock()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO jobs (kind, status, priority, payload, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, QUEUED, int(priority), json.dumps(payload or {}, ensure_ascii=False),
+                 int(max_attempts or handler.max_attempts), now, now, now)
+            )
+            job_id = cursor.lastrowid
+            self._add_event(job_id, {'type': 'queued'})
+            self._connection.commit()
+            job = self._fetch(job_id)
+        self._notify()
+        return job
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Tâche par identifiant, ou None."""
+        with self._lock:
+            return self._fetch(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, kind: Optional[str] = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """Tâches les plus récentes, éventuellement filtrées par statut et par type."""
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if kind:
+            conditions.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs {where} ORDER BY id DESC LIMIT ?",
+                params + [int(limit)]
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def events(self, job_id: int, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Événements d'une tâche postérieurs à `after_id` (chacun avec son `event_id`)."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, created_at, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after_id)
+            ).fetchall()
+        return [dict(json.loads(data), event_id=event_id, time=created_at) for event_id, created_at, data in rows]
+
+    def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Annule une tâche : immédiatement si elle est en file, sinon à son
+        prochain appel de `check_cancelled`. Sans effet sur une tâche terminée.
+        """
+        now = self._clock()
+        with self._lock:
+            job = self._fetch(job_id)
+            if job is None or job['status'] in FINISHED_STATUSES:
+                return job
+            if job['status'] == QUEUED:
+                self._connection.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ?, updated_at = ? WHERE id = ?",
+                    (CANCELLED, now, now, job_id)
+                )
+                self._add_event(job_id, {'type': CANCELLED})
+            else:
+                self._connection.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ?", (now, job_id)
+                )
+                self._add_event(job_id, {'type': 'cancel_requested'})
+            self._connection.commit()
+            job = self._fetch(job_id)
+        if job['status'] == CANCELLED:
+            self._finished(job)
+        self._notify()
+        return job
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Attend qu'une tâche soit terminée (ou l'expiration du délai) et la renvoie."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in FINISHED_STATUSES:
+                return job
+            remaining = POLL_INTERVAL_SECONDS if deadline is None else min(POLL_INTERVAL_SECONDS, deadline - time.monotonic())
+            if remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(remaining)
+
+    def wait_for_events(self, job_id: int, after_id: int = 0, timeout: float = POLL_INTERVAL_SECONDS) -> List[Dict[str, Any]]:
+        """Événements postérieurs à `after_id`, en attendant jusqu'à `timeout` s'il n'y en a pas encore."""
+        events = self.events(job_id, after_id)
+        if not events:
+            with self._changed:
+                self._changed.wait(timeout)
+            events = self.events(job_id, after_id)
+        return events
+
+    # --------------------------------------------------------------------------
+    # Exécution
+    # --------------------------------------------------------------------------
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Passe la prochaine tâche exécutable à l'état "running" et la renvoie."""
+        now = self._clock()
+        with self._lock:
+            while True:
+                row = self._connection.execute(
+                    "SELECT id FROM jobs WHERE status = ? AND run_after <= ? ORDER BY priority DESC, id LIMIT 1",
+                    (QUEUED, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                # La condition sur le statut protège d'un autre processus partageant la base
+                cursor = self._connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = COALESCE(started_at, ?), "
+                    "updated_at = ?, owner = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+                    (RUNNING, now, now, self.owner, now, row[0], QUEUED)
+                )
+                if cursor.rowcount:
+                    job = self._fetch(row[0])
+                    self._add_event(job['id'], {'type': 'started', 'attempt': job['attempts']})
+                    self._connection.commit()
+                    return job
+                self._connection.commit()
+
+    def _report(self, job_id: int, progress, message, checkpoint, data):
+        now = self._clock()
+        assignments, params = ["updated_at = ?", "heartbeat_at = ?"], [now, now]
+        if progress is not None:
+            assignments.append("progress = ?")
+            params.append(float(progress))
+        if message is not None:
+            assignments.append("message = ?")
+            params.append(message)
+        if checkpoint is not None:
+            assignments.append("checkpoint = ?")
+            params.append(json.dumps(checkpoint, ensure_ascii=False))
+        event = {'type': 'progress', **data}
+        if progress is not None:
+            event['progress'] = progress
+        if message is not None:
+            event['message'] = message
+        with self._lock:
+            self._connection.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?", params + [job_id])
+            self._add_event(job_id, event)
+            self._connection.commit()
+        self._notify()
+
+    def _cancel_requested(self, job_id: int) -> bool:
+        with self._lock:
+            row = self._connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _complete(self, job_id: int, status: str, event: Dict[str, Any], result=None, error=None,
+                  run_after: Optional[float] = None):
+        now = self._clock()
+        with self._lock:
+            # Le bail doit toujours appartenir à cette file : une tâche reprise
+            # par un autre processus après expiration n'est pas écrasée
+            if status == QUEUED:
+                cursor = self._connection.execute(
+                    "UPDATE jobs SET status = ?, error = ?, run_after = ?, updated_at = ?, heartbeat_at = NULL "
+                    "WHERE id = ? AND status = ? AND owner = ?",
+                    (QUEUED, error, run_after, now, job_id, RUNNING, self.owner)
+                )
+            else:
+                cursor = self._connection.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, progress = CASE WHEN ? THEN 100 ELSE progress END, "
+                    "finished_at = ?, updated_at = ?, heartbeat_at = NULL WHERE id = ? AND status = ? AND owner = ?",
+                    (status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                     error, status == SUCCEEDED, now, now, job_id, RUNNING, self.owner)
+                )
+            if not cursor.rowcount:
+                self._connection.commit()
+                print(f"Tâche {job_id} : bail perdu, résultat ignoré")
+                return
+            self._add_event(job_id, event)
+            self._connection.commit()
+            job = self._fetch(job_id)
+        if status in FINISHED_STATUSES:
+            self._finished(job)
+        self._notify()
+
+    def _finished(self, job: Dict[str, Any]):
+        handler = _handlers.get(job['kind'])
+        if handler is not None and handler.on_finished is not None:
+            try:
+                handler.on_finished(job)
+            except Exception as e:
+                print(f"Erreur lors de la finalisation de la tâche {job['id']} : {str(e)}")
+
+    def _execute(self, job: Dict[str, Any]):
+        handler = _handlers.get(job['kind'])
+        if handler is None:
+            self._complete(job['id'], FAILED, {'type': FAILED, 'error': 'Type de tâche inconnu'},
+                           error=f"Type de tâche inconnu : {job['kind']}")
+            return
+        context = JobContext(self, job)
+        try:
+            if job['cancel_requested']:
+                raise JobCancelled()
+            if self._app is not None:
+                with self._app.app_context():
+                    result = handler.function(context)
+            else:
+                result = handler.function(context)
+        except JobCancelled:
+            self._complete(job['id'], CANCELLED, {'type': CANCELLED})
+        except JobFailed as e:
+            self._complete(job['id'], FAILED, {'type': FAILED, 'error': str(e)}, error=str(e))
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if job['attempts'] < job['max_attempts'] and not self._cancel_requested(job['id']):
+                delay = RETRY_DELAY_SECONDS * 2 ** (job['attempts'] - 1)
+                self._complete(job['id'], QUEUED, {'type': 'retry', 'error': error, 'delay': delay},
+                               error=error, run_after=self._clock() + delay)
+            else:
+                self._complete(job['id'], FAILED, {'type': FAILED, 'error': error}, error=error)
+        else:
+            self._complete(job['id'], SUCCEEDED, {'type': SUCCEEDED, 'result': result}, result=result)
+
+    def run_pending(self) -> int:
+        """Exécute dans le thread courant les tâches exécutables ; renvoie leur nombre."""
+        count = 0
+        while True:
+            job = self._claim()
+            if job is None:
+                return count
+            self._execute(job)
+            count += 1
+
+    def heartbeat(self) -> int:
+        """Renouvelle le bail des tâches exécutées par cette file ; renvoie leur nombre."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND owner = ?",
+                (self._clock(), RUNNING, self.owner)
+            )
+            self._connection.commit()
+        return cursor.rowcount
+
+    def recover(self) -> int:
+        """
+        Remet en file les tâches "running" dont le bail a expiré (processus
+        arrêté ou bloqué pendant leur exécution) ; elles reprendront à partir
+        de leur checkpoint. Les tâches dont le bail est renouvelé ne sont pas
+        touchées, même si elles appartiennent à un autre processus.
+        """
+        now = self._clock()
+        expired = now - LEASE_SECONDS
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM jobs WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (RUNNING, expired)
+            ).fetchall()
+            recovered = 0
+            for (job_id,) in rows:
+                cursor = self._connection.execute(
+                    "UPDATE jobs SET status = ?, run_after = ?, updated_at = ?, owner = NULL, heartbeat_at = NULL "
+                    "WHERE id = ? AND status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (QUEUED, now, now, job_id, RUNNING, expired)
+                )
+                if cursor.rowcount:
+                    self._add_event(job_id, {'type': 'recovered'})
+                    recovered += 1
+            self._connection.commit()
+        return recovered
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        """Supprime les tâches terminées depuis plus de `older_than` secondes."""
+        limit = self._clock() - older_than
+        placeholders = ','.join('?' * len(FINISHED_STATUSES))
+        with self._lock:
+            self._connection.execute(
+                f"DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE status IN ({placeholders}) "
+                f"AND finished_at < ?)", (*FINISHED_STATUSES, limit)
+            )
+            cursor = self._connection.execute(
+                f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?", (*FINISHED_STATUSES, limit)
+            )
+            self._connection.commit()
+        return cursor.rowcount
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"Erreur de la file de tâches : {str(e)}")
+                job = None
+            if job is None:
+                with self._changed:
+                    self._changed.wait(POLL_INTERVAL_SECONDS)
+                continue
+            self._execute(job)
+
+    def _heartbeat_loop(self):
+        while not self._stopping.wait(HEARTBEAT_INTERVAL_SECONDS):
+            try:
+                self.heartbeat()
+                if self.recover():
+                    self._notify()
+            except Exception as e:
+                print(f"Erreur de la file de tâches : {str(e)}")
+
+    def start(self, app=None):
+        """
+        Reprend les tâches dont le bail a expiré et démarre les workers ainsi
+        que le renouvellement des baux (une seule fois).
+        """
+        if self._threads:
+            return
+        self._app = app
+        self._stopping.clear()
+        self.recover()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f'job-worker-{index + 1}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Arrête les workers après leur tâche en cours."""
+        self._stopping.set()
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+# Instance singleton
+_job_queue_instance = None
+
+def get_job_queue() -> JobQueue:
+    """
+    Retourne l'instance singleton de la file de tâches
+    (base `jobs.db` à la racine du projet).
+
+    Returns:
+        L'instance de JobQueue
+    """
+    global _job_queue_instance
+    if _job_queue_instance is None:
+        basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        _job_queue_instance = JobQueue(os.path.join(basedir, 'jobs.db'))
+    return _job_queue_instance
+
+
+_job_queue_start_lock = threading.Lock()
+
+
+def init_job_queue(app):
+    """
+    Démarre les workers de la file de tâches (nombre fixé par JOB_WORKERS),
+    une seule fois par processus.
+    """
+    with _job_queue_start_lock:
+        queue = get_job_queue()
+        if queue._threads:
+            return
+        try:
+            queue.workers = int(app.config.get('JOB_WORKERS', DEFAULT_WORKERS))
+            queue.purge()
+            queue.start(app)
+            print(f"File de tâches démarrée ({queue.workers} worker(s), types : {', '.join(registered_job_kinds())})")
+        except Exception as e:
+            print(f"Erreur lors du démarrage de la file de tâches : {str(e)}")
+
+
+def register_job_queue(app):
+    """
+    Démarre la file de tâches à la première requête servie par le processus.
+
+    Appelée par create_app() : les workers tournent ainsi sous le serveur de
+    développement comme sous gunicorn ou waitress (dans chaque processus
+    worker, après le fork). Le processus parent du rechargeur de Flask, les
+    scripts qui créent l'application (db_cleanup.py...) et les processus de
+    calcul ne servent aucune requête et n'exécutent donc aucune tâche. Les
+    tâches ne sont soumises que par des requêtes : aucune n'attend avant la
+    première.
+    """
+    @app.before_request
+    def start_job_queue():
+        if not get_job_queue()._threads:
+            init_job_queue(app)
+
+
+def job_file_dir(job_key: str) -> str:
+    """Dossier de travail d'une tâche (`job_files/<clé>` à la racine du projet), créé au besoin."""
+    basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    path = os.path.join(basedir, 'job_files', job_key)
+    os.makedirs(path, exist_ok=True)
+    return path
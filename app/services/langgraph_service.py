@@ -15,17 +15,18 @@ sont tous deux activés dans les paramètres de l'application.
 """
 
 import json
-from typing import Dict, List, Any, Optional, TypedDict, Annotated, Sequence, Union, Callable
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage, ToolMessage
+import threading
+from typing import Dict, List, Any, Iterator, Optional, TypedDict, Annotated, Sequence, Union, Callable, Literal, Tuple
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage, BaseMessage, ToolMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 import operator
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 from langchain_openai import ChatOpenAI
 from langchain_community.chat_models import ChatOllama
 from app.models.app_config import AppConfig
 from langchain_core.tools import tool
-from langchain_core.tools import BaseTool
+from langchain_core.tools import BaseTool, StructuredTool
 
 # Prompt système par défaut pour le chat IA
 DEFAULT_SYSTEM_PROMPT = """Tu es un assistant spécialisé dans la résolution d'énigmes de géocaching. 
@@ -42,6 +43,107 @@ Si tu identifies des coordonnées GPS dans le texte déchiffré, mets-les en év
 N'hésite pas à essayer plusieurs outils si nécessaire, et à combiner leurs résultats pour résoudre des énigmes complexes.
 """
 
+# Nombre maximal d'outils exécutés simultanément lorsque le modèle en demande plusieurs dans un même tour
+TOOL_MAX_WORKERS = 4
+
+# Taille maximale du texte renvoyé au modèle par un outil, et nombre de résultats conservés
+TOOL_OUTPUT_MAX_CHARS = 2000
+TOOL_OUTPUT_MAX_RESULTS = 5
+TOOL_OUTPUT_RESULT_CHARS = 300
+
+# Types Python des paramètres déclarés dans "input_types" (plugin.json)
+_INPUT_TYPES = {
+    'string': str,
+    'textarea': str,
+    'number': float,
+    'float': float,
+    'integer': int,
+    'boolean': bool,
+    'checkbox': bool,
+}
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Coupe un texte trop long en indiquant le nombre de caractères omis"""
+    text = str(text)
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}… [{len(text) - max_chars} caractères omis]"
+
+
+def build_plugin_args_schema(plugin_name: str, input_types: Dict[str, Any]) -> type:
+    """
+    Construit le schéma des arguments d'un outil à partir des "input_types" du plugin.
+    
+    Le paramètre "text" est obligatoire, les autres sont optionnels (la valeur par
+    défaut du plugin s'applique). Les listes d'options deviennent des énumérations.
+    """
+    fields = {'text': (str, Field(..., description="Le texte à traiter"))}
+    for name, spec in (input_types or {}).items():
+        if name == 'text':
+            continue
+        if not isinstance(spec, dict):
+            spec = {'type': spec}
+        options = [option for option in (spec.get('options') or []) if isinstance(option, (str, int, bool))]
+        if options:
+            field_type = Literal[tuple(options)]
+        else:
+            field_type = _INPUT_TYPES.get(spec.get('type'), str)
+        description = spec.get('label') or name
+        if spec.get('default') is not None:
+            description += f" (défaut : {spec['default']})"
+        fields[name] = (Optional[field_type], Field(None, description=description))
+    return create_model(f"{plugin_name}_input", **fields)
+
+
+def summarize_plugin_result(plugin_name: str, result: Optional[Dict[str, Any]],
+                            max_chars: int = TOOL_OUTPUT_MAX_CHARS,
+                            max_results: int = TOOL_OUTPUT_MAX_RESULTS) -> str:
+    """
+    Résume le résultat d'un plugin pour le modèle : meilleurs résultats seulement,
+    textes tronqués et taille totale bornée. Un bruteforce peut produire des
+    centaines de résultats qui gonfleraient inutilement le prompt.
+    """
+    if not result:
+        return f"Erreur lors de l'exécution du plugin {plugin_name}"
+    
+    summary = result.get('summary') or {}
+    if result.get('status') == 'error':
+        return f"Erreur du plugin {plugin_name}: {summary.get('message') or 'erreur inconnue'}"
+    
+    lines = []
+    if isinstance(result.get('results'), list):
+        results = sorted(result['results'], key=lambda r: r.get('confidence') or 0, reverse=True)
+        lines.append(f"Résultats de {plugin_name} ({len(results)} au total) :")
+        for item in results[:max_results]:
+            parameters = item.get('parameters') or {}
+            parameters_text = f" ({', '.join(f'{k}={v}' for k, v in parameters.items())})" if parameters else ""
+            confidence = item.get('confidence')
+            confidence_text = f"[confiance {confidence:.2f}] " if isinstance(confidence, (int, float)) else ""
+            lines.append(f"- {confidence_text}{_truncate(item.get('text_output', ''), TOOL_OUTPUT_RESULT_CHARS)}{parameters_text}")
+        if len(results) > max_results:
+            lines.append(f"({len(results) - max_results} autres résultats omis)")
+    elif "text_output" in result:
+        lines.append(f"Résultat de {plugin_name}: {result['text_output']}")
+    elif "bruteforce_solutions" in result:
+        solutions = result["bruteforce_solutions"]
+        lines.append(f"Résultats de bruteforce avec {plugin_name} ({len(solutions)} au total) :")
+        lines.extend(
+            f"- Décalage {sol.get('shift')}: {_truncate(sol.get('decoded_text', ''), TOOL_OUTPUT_RESULT_CHARS)}"
+            for sol in solutions[:max_results]
+        )
+        if len(solutions) > max_results:
+            lines.append(f"({len(solutions) - max_results} autres résultats omis)")
+    else:
+        lines.append(f"Résultat de {plugin_name}: {json.dumps(result, ensure_ascii=False, default=str)}")
+    
+    coordinates = result.get('coordinates') or {}
+    if coordinates.get('exist'):
+        lines.append(f"Coordonnées détectées : {coordinates.get('ddm') or (coordinates.get('ddm_lat', '') + ' ' + coordinates.get('ddm_lon', '')).strip()}")
+    
+    return _truncate("\n".join(lines), max_chars)
+
+
 class ChatState(TypedDict):
     """État du graphe de conversation"""
     messages: Annotated[Sequence[BaseMessage], operator.add]
@@ -65,6 +167,9 @@ class LangGraphService:
         self._graph = None
         self._plugin_manager = None
         self._tools = []
+        # Outils déjà construits : nom du plugin -> (version, outil)
+        self._tool_cache: Dict[str, Tuple[str, BaseTool]] = {}
+        self._tool_cache_lock = threading.Lock()
     
     def _ensure_initialized(self):
         """Charge les paramètres depuis la base de données si ce n'est pas déjà fait"""
@@ -89,12 +194,15 @@ class LangGraphService:
                     # Log pour le débogage
                     print(f"=== DEBUG: LangGraph - Mode local chargé - URL: {self.ollama_url}, Model: {self.model_name} ===")
                 
-                # Initialiser le plugin manager
-                from app import app
-                plugins_dir = AppConfig.get_value('plugins_dir', 'plugins')
-                # Importer PluginManager ici pour éviter l'importation circulaire
-                from app.plugin_manager import PluginManager
-                self._plugin_manager = PluginManager(plugins_dir, app)
+                # Réutiliser le plugin manager de l'application (celui que surveille le rechargement à chaud)
+                from flask import current_app
+                self._plugin_manager = getattr(current_app, 'plugin_manager', None)
+                if self._plugin_manager is None:
+                    plugins_dir = AppConfig.get_value('plugins_dir', 'plugins')
+                    # Importer PluginManager ici pour éviter l'importation circulaire
+                    from app.plugin_manager import PluginManager
+                    self._plugin_manager = PluginManager(plugins_dir, current_app._get_current_object())
+                self._plugin_manager.add_reload_listener(self._on_plugin_reloaded)
                 
                 # Créer les outils à partir des plugins
                 self._create_tools_from_plugins()
@@ -110,7 +218,12 @@ class LangGraphService:
                 pass
     
     def _create_tools_from_plugins(self):
-        """Crée des outils LangChain à partir des plugins disponibles"""
+        """
+        Crée des outils LangChain à partir des plugins activés.
+        
+        Les outils sont mis en cache par version de plugin : seuls les plugins
+        nouveaux ou modifiés depuis le dernier appel sont reconstruits.
+        """
         if not self._plugin_manager:
             print("=== ERROR: Plugin Manager non initialisé ===")
             return
@@ -119,59 +232,51 @@ class LangGraphService:
         from app.models.plugin_model import Plugin
         plugins = Plugin.query.filter_by(enabled=True).all()
         
+        tools = []
         for plugin in plugins:
             try:
-                # Charger les métadonnées du plugin
-                metadata = json.loads(plugin.metadata_json)
-                
-                # Créer une fonction de wrapper pour le plugin
-                def create_plugin_tool(plugin_name):
-                    @tool
-                    def plugin_tool(text: str, **kwargs) -> str:
-                        """
-                        Utilise le plugin {plugin_name} pour traiter le texte.
-                        
-                        Args:
-                            text: Le texte à traiter
-                            **kwargs: Paramètres supplémentaires spécifiques au plugin
-                        
-                        Returns:
-                            Le résultat du traitement
-                        """
-                        inputs = {"text": text, **kwargs}
-                        result = self._plugin_manager.execute_plugin(plugin_name, inputs)
-                        
-                        # Formater la sortie pour qu'elle soit lisible
-                        if result:
-                            if "text_output" in result:
-                                return f"Résultat de {plugin_name}: {result['text_output']}"
-                            elif "bruteforce_solutions" in result:
-                                solutions = result["bruteforce_solutions"]
-                                formatted_solutions = "\n".join([
-                                    f"- Décalage {sol['shift']}: {sol['decoded_text']}"
-                                    for sol in solutions[:5]  # Limiter à 5 solutions pour la lisibilité
-                                ])
-                                return f"Résultats de bruteforce avec {plugin_name}:\n{formatted_solutions}\n..."
-                            else:
-                                return f"Résultat de {plugin_name}: {json.dumps(result, ensure_ascii=False)}"
-                        else:
-                            return f"Erreur lors de l'exécution du plugin {plugin_name}"
-                
-                    # Personnaliser le nom et la description de l'outil
-                    plugin_tool.__name__ = plugin.name
-                    plugin_tool.name = plugin.name
-                    plugin_tool.description = f"{plugin.description}. Utilisez ce plugin pour {plugin.name.replace('_', ' ')}."
-                    
-                    return plugin_tool
-                
-                # Créer l'outil pour ce plugin
-                tool = create_plugin_tool(plugin.name)
-                self._tools.append(tool)
-                
-                print(f"=== DEBUG: Outil créé pour le plugin {plugin.name} ===")
-                
+                tools.append(self._get_plugin_tool(plugin))
             except Exception as e:
                 print(f"=== ERROR: Erreur lors de la création de l'outil pour le plugin {plugin.name}: {str(e)} ===")
+        self._tools = tools
+    
+    def _get_plugin_tool(self, plugin) -> BaseTool:
+        """Outil du plugin, construit une seule fois par version"""
+        with self._tool_cache_lock:
+            cached = self._tool_cache.get(plugin.name)
+            if cached and cached[0] == plugin.version:
+                return cached[1]
+        
+        plugin_tool = self._build_plugin_tool(plugin)
+        with self._tool_cache_lock:
+            self._tool_cache[plugin.name] = (plugin.version, plugin_tool)
+        print(f"=== DEBUG: Outil créé pour le plugin {plugin.name} {plugin.version} ===")
+        return plugin_tool
+    
+    def _build_plugin_tool(self, plugin) -> BaseTool:
+        """Construit l'outil LangChain d'un plugin à partir de ses métadonnées"""
+        metadata = json.loads(plugin.metadata_json or '{}')
+        plugin_name = plugin.name
+        
+        def run_plugin(**kwargs) -> str:
+            # Les paramètres non renseignés gardent la valeur par défaut du plugin
+            inputs = {key: value for key, value in kwargs.items() if value is not None}
+            result = self._plugin_manager.execute_plugin(plugin_name, inputs)
+            return summarize_plugin_result(plugin_name, result)
+        
+        return StructuredTool.from_function(
+            func=run_plugin,
+            name=plugin_name,
+            description=f"{plugin.description}. Utilisez ce plugin pour {plugin_name.replace('_', ' ')}.",
+            args_schema=build_plugin_args_schema(plugin_name, metadata.get('input_types')),
+        )
+    
+    def _on_plugin_reloaded(self, plugin_name: str, old_version: Optional[str], new_version: Optional[str]):
+        """Invalide l'outil d'un plugin rechargé ou supprimé ; le graphe sera reconstruit"""
+        with self._tool_cache_lock:
+            self._tool_cache.pop(plugin_name, None)
+        self._graph = None
+        print(f"=== DEBUG: Outil du plugin {plugin_name} invalidé ({old_version} -> {new_version}) ===")
     
     def _get_llm(self):
         """Retourne le modèle de langage approprié en fonction de la configuration"""
@@ -197,6 +302,15 @@ class LangGraphService:
         """Construit le graphe LangGraph pour le chat"""
         llm = self._get_llm()
         
+        # Rafraîchir la liste des outils (seuls les plugins modifiés sont reconstruits)
+        if self._plugin_manager:
+            self._create_tools_from_plugins()
+        if self._tools:
+            try:
+                llm = llm.bind_tools(self._tools)
+            except NotImplementedError:
+                print(f"=== WARNING: Le modèle {self.model_name} ne prend pas en charge les outils ===")
+        
         # Définir les nœuds du graphe
         def llm_node(state: ChatState) -> ChatState:
             """Nœud pour l'appel au modèle de langage"""
@@ -221,7 +335,8 @@ class LangGraphService:
         
         # Ajouter le nœud d'outils si des outils sont disponibles
         if self._tools:
-            # Créer un nœud d'outils
+            # Créer un nœud d'outils ; les appels d'un même tour s'exécutent en parallèle
+            # (au plus TOOL_MAX_WORKERS, voir _run_config)
             tool_node = ToolNode(self._tools)
             builder.add_node("tools", tool_node)
             
@@ -249,6 +364,41 @@ class LangGraphService:
         
         return self._graph
     
+    def _run_config(self) -> Dict[str, Any]:
+        """Configuration d'exécution du graphe (limite de concurrence du nœud d'outils)"""
+        return {"max_concurrency": TOOL_MAX_WORKERS}
+    
+    def _initial_state(self, messages: List[Dict[str, str]], system_prompt: Optional[str]) -> Dict[str, Any]:
+        """Construit l'état initial du graphe à partir de la conversation"""
+        # Convertir les messages au format LangChain
+        langchain_messages = []
+        
+        # Ajouter les messages de la conversation
+        for msg in messages:
+            if msg["role"] == "user":
+                langchain_messages.append(HumanMessage(content=msg["content"]))
+            elif msg["role"] == "assistant":
+                langchain_messages.append(AIMessage(content=msg["content"]))
+            elif msg["role"] == "system":
+                langchain_messages.append(SystemMessage(content=msg["content"]))
+            elif msg["role"] == "tool":
+                # Gérer les messages d'outils
+                langchain_messages.append(ToolMessage(
+                    content=msg.get("content", ""),
+                    tool_call_id=msg.get("tool_call_id", ""),
+                    name=msg.get("name", "")
+                ))
+        
+        # Utiliser le prompt système par défaut si aucun n'est fourni
+        if not system_prompt:
+            system_prompt = DEFAULT_SYSTEM_PROMPT
+        
+        return {
+            "messages": langchain_messages,
+            "system_prompt": system_prompt,
+            "next": None
+        }
+    
     def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> str:
         """
         Envoie une conversation au modèle d'IA via LangGraph et retourne la réponse
@@ -267,38 +417,11 @@ class LangGraphService:
             if self._graph is None:
                 self._build_graph()
             
-            # Convertir les messages au format LangChain
-            langchain_messages = []
-            
-            # Ajouter les messages de la conversation
-            for msg in messages:
-                if msg["role"] == "user":
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    langchain_messages.append(AIMessage(content=msg["content"]))
-                elif msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                elif msg["role"] == "tool":
-                    # Gérer les messages d'outils
-                    langchain_messages.append(ToolMessage(
-                        content=msg.get("content", ""),
-                        tool_call_id=msg.get("tool_call_id", ""),
-                        name=msg.get("name", "")
-                    ))
-            
-            # Utiliser le prompt système par défaut si aucun n'est fourni
-            if not system_prompt:
-                system_prompt = DEFAULT_SYSTEM_PROMPT
-            
             # Préparer l'état initial
-            initial_state = {
-                "messages": langchain_messages,
-                "system_prompt": system_prompt,
-                "next": None
-            }
+            initial_state = self._initial_state(messages, system_prompt)
             
             # Exécuter le graphe
-            result = self._graph.invoke(initial_state)
+            result = self._graph.invoke(initial_state, self._run_config())
             
             # Extraire la réponse
             final_messages = result["messages"]
@@ -311,5 +434,40 @@ class LangGraphService:
             print(f"Erreur lors de l'appel au modèle d'IA via LangGraph: {str(e)}")
             return f"Erreur: {str(e)}"
 
+    def stream_chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None,
+                    cancel_event=None) -> Iterator[str]:
+        """
+        Variante de `chat` qui renvoie les fragments de la réponse du modèle dès
+        leur génération (mode de flux "messages" de LangGraph). Les appels
+        d'outils s'exécutent normalement entre deux tours du modèle.
+        
+        Args:
+            messages: Liste de messages au format {"role": "user"|"assistant", "content": "..."}
+            system_prompt: Message système optionnel
+            cancel_event: threading.Event ; une fois levé, le graphe est interrompu
+            
+        Yields:
+            Fragments de texte produits par le nœud "llm"
+        """
+        self._ensure_initialized()
+        
+        # Construire le graphe si nécessaire
+        if self._graph is None:
+            self._build_graph()
+        
+        stream = self._graph.stream(self._initial_state(messages, system_prompt), self._run_config(),
+                                    stream_mode="messages")
+        try:
+            for chunk, metadata in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    print("Flux LangGraph interrompu par le client")
+                    break
+                if metadata.get("langgraph_node") != "llm" or not isinstance(chunk, AIMessageChunk):
+                    continue
+                if isinstance(chunk.content, str) and chunk.content:
+                    yield chunk.content
+        finally:
+            stream.close()
+
 # Instance singleton du service
 langgraph_service = LangGraphService() 
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Identification de la langue d'un texte par n-grammes de caractères.
+
+Remplace langdetect dans le service de scoring : langdetect est lent (profils
+complets et échantillonnage aléatoire, rendu déterministe par une graine) et
+son import est lourd. Le modèle ci-dessous est un classifieur bayésien naïf
+sur les n-grammes de 1 à 3 lettres, limité aux langues supportées par le
+scoring. Il est entraîné hors ligne à partir des listes de mots de wordfreq
+(scripts/build_language_model.py) et livré sous forme de tableaux numpy
+(app/resources/language_model.npz, quelques dizaines de Ko).
+
+Le texte est mis en minuscules et désaccentué avant l'extraction des
+n-grammes, comme les textes transmis aux plugins : un texte décodé sans
+accents est classé comme le même texte accentué.
+
+La classification est déterministe. detect_many() classe une liste de
+textes en une seule opération sur les tableaux.
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.text_view import text_view
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources', 'language_model.npz'
+)
+
+# Ordres des n-grammes extraits (lettres, bigrammes, trigrammes)
+NGRAM_ORDERS = (1, 2, 3)
+# N-grammes conservés par langue à l'entraînement
+MAX_NGRAMS_PER_LANGUAGE = 3000
+# Fréquence relative ajoutée à chaque n-gramme (lissage)
+SMOOTHING = 1e-5
+# Mots dont les lignes du modèle sont mémorisées
+WORD_CACHE_SIZE = 65536
+
+_NON_LETTERS = re.compile(r'[^a-z]+')
+
+
+def _letters(text: str) -> str:
+    """Texte en minuscules, sans accents, réduit aux lettres a-z séparées par des espaces."""
+    return _NON_LETTERS.sub(' ', text_view(text).unaccented_lower)
+
+
+def _word_ngrams(word: str) -> List[str]:
+    """N-grammes d'un mot (lettres a-z) encadré d'espaces."""
+    padded = f' {word} '
+    ngrams = []
+    for order in NGRAM_ORDERS:
+        if order == 1:
+            ngrams.extend(word)
+        else:
+            ngrams.extend(padded[start:start + order] for start in range(len(padded) - order + 1))
+    return ngrams
+
+
+def extract_ngrams(text: str) -> List[str]:
+    """N-grammes de caractères d'un texte, chaque mot étant encadré d'espaces."""
+    ngrams = []
+    for word in _letters(text).split():
+        ngrams.extend(_word_ngrams(word))
+    return ngrams
+
+
+class LanguageIdentifier:
+    """
+    Classifieur de langue par n-grammes.
+
+    Attributs :
+        languages: codes des langues (colonnes de log_probs)
+        ngrams: n-grammes connus (lignes de log_probs)
+        log_probs: log-probabilités des n-grammes par langue, tableau (n-grammes × langues)
+    """
+
+    def __init__(self, languages: Sequence[str], ngrams: Sequence[str], log_probs: np.ndarray):
+        self.languages = list(languages)
+        self.ngrams = list(ngrams)
+        self.log_probs = np.asarray(log_probs, dtype=np.float32)
+        self._index = {ngram: row for row, ngram in enumerate(self.ngrams)}
+        # Les mots se répètent beaucoup d'un texte à l'autre : leurs lignes sont mémorisées
+        self._word_rows = lru_cache(maxsize=WORD_CACHE_SIZE)(self._compute_word_rows)
+
+    # ------------------------------------------------------------------
+    # Classification
+
+    def _compute_word_rows(self, word: str) -> Tuple[int, ...]:
+        index = self._index
+        return tuple(row for row in map(index.get, _word_ngrams(word)) if row is not None)
+
+    def _rows(self, text: str) -> List[int]:
+        rows: List[int] = []
+        for word in _letters(text).split():
+            rows.extend(self._word_rows(word))
+        return rows
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Probabilité de chaque langue pour un texte (vide si aucun n-gramme connu).
+        """
+        rows = self._rows(text)
+        if not rows:
+            return {}
+        totals = self.log_probs[rows].sum(axis=0)
+        probabilities = np.exp(totals - totals.max())
+        probabilities /= probabilities.sum()
+        return {language: float(p) for language, p in zip(self.languages, probabilities)}
+
+    def detect(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Langue la plus probable d'un texte, ou default si le texte ne contient aucun n-gramme connu."""
+        rows = self._rows(text)
+        if not rows:
+            return default
+        return self.languages[int(self.log_probs[rows].sum(axis=0).argmax())]
+
+    def detect_many(self, texts: Iterable[str], default: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Langue la plus probable de chaque texte, calculée en une seule passe
+        sur les tableaux (sommes cumulées des lignes de tous les textes).
+        """
+        rows: List[int] = []
+        bounds = [0]
+        for text in texts:
+            rows.extend(self._rows(text))
+            bounds.append(len(rows))
+        if len(bounds) == 1:
+            return []
+
+        cumulative = np.zeros((len(rows) + 1, len(self.languages)), dtype=np.float64)
+        np.cumsum(self.log_probs[rows], axis=0, out=cumulative[1:])
+        bounds = np.asarray(bounds)
+        totals = cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+        best = totals.argmax(axis=1)
+        empty = bounds[1:] == bounds[:-1]
+        return [default if is_empty else self.languages[column] for column, is_empty in zip(best, empty)]
+
+    # ------------------------------------------------------------------
+    # Entraînement et persistance
+
+    @classmethod
+    def train(cls, word_frequencies: Dict[str, Dict[str, float]],
+              max_ngrams_per_language: int = MAX_NGRAMS_PER_LANGUAGE,
+              smoothing: float = SMOOTHING) -> 'LanguageIdentifier':
+        """
+        Entraîne un modèle à partir de fréquences de mots.
+
+        Args:
+            word_frequencies: {langue: {mot: fréquence}} (par exemple wordfreq.word_frequency)
+            max_ngrams_per_language: N-grammes les plus fréquents conservés par langue
+            smoothing: Fréquence relative ajoutée à chaque n-gramme
+        """
+        languages = sorted(word_frequencies)
+        counts: Dict[str, Dict[str, float]] = {}
+        for language in languages:
+            language_counts: Dict[str, float] = {}
+            for word, frequency in word_frequencies[language].items():
+                for ngram in extract_ngrams(word):
+                    language_counts[ngram] = language_counts.get(ngram, 0.0) + frequency
+            counts[language] = language_counts
+
+        vocabulary = set()
+        for language_counts in counts.values():
+            vocabulary.update(sorted(language_counts, key=lambda ngram: (-language_counts[ngram], ngram))
+                              [:max_ngrams_per_language])
+        ngrams = sorted(vocabulary, key=lambda ngram: (len(ngram), ngram))
+
+        log_probs = np.zeros((len(ngrams), len(languages)), dtype=np.float64)
+        for column, language in enumerate(languages):
+            language_counts = counts[language]
+            for order in NGRAM_ORDERS:
+                rows = [row for row, ngram in enumerate(ngrams) if len(ngram) == order]
+                total = sum(count for ngram, count in language_counts.items() if len(ngram) == order) or 1.0
+                frequencies = np.array([language_counts.get(ngrams[row], 0.0) / total for row in rows])
+                log_probs[rows, column] = np.log((frequencies + smoothing) / (1.0 + smoothing * len(rows)))
+        return cls(languages, ngrams, log_probs)
+
+    def save(self, path: str):
+        """Enregistre le modèle (tableaux numpy compressés, log-probabilités en float16)."""
+        np.savez_compressed(
+            path,
+            languages=np.array(self.languages),
+            ngrams=np.array(self.ngrams),
+            log_probs=self.log_probs.astype(np.float16),
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'LanguageIdentifier':
+        """Charge un modèle enregistré par save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['languages'].tolist(), data['ngrams'].tolist(), data['log_probs'])
+
+
+# Singleton pour l'accès global au modèle
+_language_identifier_instance = None
+_language_identifier_loaded = False
+
+
+def get_language_identifier() -> Optional[LanguageIdentifier]:
+    """
+    Retourne le modèle de langue livré avec l'application (chargé une fois).
+
+    Returns:
+        Le LanguageIdentifier, ou None si le modèle est absent ou illisible
+    """
+    global _language_identifier_instance, _language_identifier_loaded
+    if not _language_identifier_loaded:
+        _language_identifier_loaded = True
+        try:
+            _language_identifier_instance = LanguageIdentifier.load()
+            logger.info(f"Modèle de langue chargé ({len(_language_identifier_instance.ngrams)} n-grammes)")
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Erreur lors du chargement du modèle de langue: {e}")
+    return _language_identifier_instance
@@ -0,0 +1,288 @@
+"""
+Service de métriques pour les plugins MysteryAI
+
+Ce module collecte, en mémoire et sans verrou, les compteurs d'appels, les
+compteurs d'erreurs et les histogrammes de latence de chaque étape de
+`PluginManager.execute_plugin` (normalisation, exécution, détection GPS,
+scoring, conversion des coordonnées).
+
+Chaque thread écrit uniquement dans sa propre partition (shard) : aucune
+écriture concurrente n'a lieu sur une même structure, et le coût d'une mesure
+se limite à un `perf_counter()`, un `bisect` et quelques incréments d'entiers.
+L'agrégation des partitions n'est faite qu'au moment de la lecture
+(endpoint `/api/metrics`).
+
+Quand un thread se termine (Werkzeug crée un thread par requête), sa
+partition est fusionnée dans une partition commune puis oubliée : le nombre
+de partitions reste borné par le nombre de threads vivants.
+"""
+
+import itertools
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Bornes supérieures (en secondes) des buckets des histogrammes de latence
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Libellé des plugins inconnus (le nom vient du client : il ne doit pas créer de série)
+UNKNOWN_PLUGIN = '_inconnu'
+
+# Étapes instrumentées dans execute_plugin ('load' ne compte que des erreurs)
+STAGES = ('load', 'normalize', 'execute', 'gps_detection', 'scoring', 'convert_coordinates', 'total')
+
+
+class _Histogram:
+    """Histogramme à buckets fixes (le dernier bucket correspond à +Inf)."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: '_Histogram'):
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.sum += other.sum
+        self.count += other.count
+
+
+class _Shard:
+    """Partition de métriques propre à un thread."""
+
+    __slots__ = ('histograms', 'errors')
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+
+    def merge(self, other: '_Shard'):
+        """Ajoute les mesures d'une autre partition à celle-ci."""
+        for key, histogram in list(other.histograms.items()):
+            target = self.histograms.get(key)
+            if target is None:
+                target = self.histograms[key] = _Histogram()
+            target.merge(histogram)
+        for key, count in list(other.errors.items()):
+            self.errors[key] = self.errors.get(key, 0) + count
+
+
+class _ThreadToken:
+    """Objet conservé dans le stockage local d'un thread : sa destruction signale la fin du thread."""
+
+    __slots__ = ('__weakref__',)
+
+
+class MetricsService:
+    """
+    Collecte les métriques de latence et de débit des plugins.
+
+    Les écritures se font dans une partition locale au thread courant ;
+    `snapshot()` fusionne toutes les partitions pour l'export.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        # Partitions des threads vivants ; celles des threads terminés sont fusionnées dans _retired
+        self._shards: Dict[int, _Shard] = {}
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._shard_ids = itertools.count()
+        self._started_at = time.time()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            shard_id = next(self._shard_ids)
+            with self._lock:
+                self._shards[shard_id] = shard
+            token = _ThreadToken()
+            self._local.shard = shard
+            self._local.token = token
+            # Le stockage local est libéré à la fin du thread : le jeton disparaît avec lui
+            weakref.finalize(token, self._retire, shard_id)
+        return shard
+
+    def _retire(self, shard_id: int):
+        """Fusionne la partition d'un thread terminé dans la partition commune."""
+        with self._lock:
+            shard = self._shards.pop(shard_id, None)
+            if shard is not None:
+                self._retired.merge(shard)
+
+    def _all_shards(self) -> List[_Shard]:
+        with self._lock:
+            retired = _Shard()
+            retired.merge(self._retired)
+            return list(self._shards.values()) + [retired]
+
+    def observe(self, plugin_name: str, stage: str, seconds: float):
+        """Enregistre la durée d'une étape pour un plugin."""
+        histograms = self._shard().histograms
+        key = (plugin_name, stage)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram()
+        histogram.observe(seconds)
+
+    def record_error(self, plugin_name: str, stage: str):
+        """Incrémente le compteur d'erreurs d'une étape pour un plugin."""
+        errors = self._shard().errors
+        key = (plugin_name, stage)
+        errors[key] = errors.get(key, 0) + 1
+
+    @contextmanager
+    def timer(self, plugin_name: str, stage: str):
+        """
+        Mesure la durée du bloc et l'enregistre, y compris en cas d'exception
+        (l'erreur est alors comptabilisée puis propagée).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_error(plugin_name, stage)
+            raise
+        finally:
+            self.observe(plugin_name, stage, time.perf_counter() - start)
+
+    def reset(self):
+        """Vide toutes les métriques collectées."""
+        with self._lock:
+            for shard in list(self._shards.values()) + [self._retired]:
+                shard.histograms.clear()
+                shard.errors.clear()
+        self._started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        """
+        Fusionne les partitions de tous les threads.
+
+        Returns:
+            Dictionnaire {plugin: {"calls", "errors", "stages": {stage: {...}}}}
+        """
+        plugins: Dict[str, Dict] = {}
+
+        def _entry(name):
+            if name not in plugins:
+                plugins[name] = {'calls': 0, 'errors': 0, 'stages': {}}
+            return plugins[name]
+
+        for shard in self._all_shards():
+            # Copies pour ne pas itérer sur un dict modifié par un autre thread
+            for (plugin_name, stage), histogram in list(shard.histograms.items()):
+                stage_data = _entry(plugin_name)['stages'].setdefault(stage, {
+                    'count': 0,
+                    'sum': 0.0,
+                    'errors': 0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+                })
+                stage_data['count'] += histogram.count
+                stage_data['sum'] += histogram.sum
+                for i, value in enumerate(list(histogram.counts)):
+                    stage_data['buckets'][i] += value
+
+            for (plugin_name, stage), count in list(shard.errors.items()):
+                entry = _entry(plugin_name)
+                # Une exception traverse l'étape fautive puis 'total' : on ne la compte qu'une fois
+                if stage in ('total', 'load'):
+                    entry['errors'] += count
+                stage_data = entry['stages'].setdefault(stage, {
+                    'count': 0,
+                    'sum': 0.0,
+                    'errors': 0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+                })
+                stage_data['errors'] += count
+
+        for entry in plugins.values():
+            total = entry['stages'].get('total')
+            if total:
+                entry['calls'] = total['count']
+            for stage_data in entry['stages'].values():
+                count = stage_data['count']
+                stage_data['avg_ms'] = round(stage_data['sum'] * 1000 / count, 3) if count else 0.0
+
+        return plugins
+
+    def to_json(self) -> Dict:
+        """Retourne les métriques sous une forme adaptée à l'interface."""
+        return {
+            'uptime_seconds': round(time.time() - self._started_at, 3),
+            'buckets': list(LATENCY_BUCKETS),
+            'plugins': self.snapshot(),
+        }
+
+    def to_prometheus(self) -> str:
+        """Retourne les métriques au format texte d'exposition Prometheus."""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP mysterai_plugin_calls_total Nombre d\'exécutions de plugin.',
+            '# TYPE mysterai_plugin_calls_total counter',
+        ]
+        for plugin_name in sorted(snapshot):
+            lines.append(f'mysterai_plugin_calls_total{{plugin="{_escape(plugin_name)}"}} {snapshot[plugin_name]["calls"]}')
+
+        lines += [
+            '# HELP mysterai_plugin_errors_total Nombre d\'erreurs par plugin et par étape.',
+            '# TYPE mysterai_plugin_errors_total counter',
+        ]
+        for plugin_name in sorted(snapshot):
+            for stage, data in sorted(snapshot[plugin_name]['stages'].items()):
+                if data['errors']:
+                    lines.append(
+                        f'mysterai_plugin_errors_total{{plugin="{_escape(plugin_name)}",stage="{stage}"}} {data["errors"]}'
+                    )
+
+        lines += [
+            '# HELP mysterai_plugin_stage_duration_seconds Durée des étapes de execute_plugin.',
+            '# TYPE mysterai_plugin_stage_duration_seconds histogram',
+        ]
+        for plugin_name in sorted(snapshot):
+            labels = f'plugin="{_escape(plugin_name)}"'
+            for stage, data in sorted(snapshot[plugin_name]['stages'].items()):
+                cumulative = 0
+                for bound, value in zip(LATENCY_BUCKETS, data['buckets']):
+                    cumulative += value
+                    lines.append(
+                        f'mysterai_plugin_stage_duration_seconds_bucket{{{labels},stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'mysterai_plugin_stage_duration_seconds_bucket{{{labels},stage="{stage}",le="+Inf"}} {data["count"]}'
+                )
+                lines.append(f'mysterai_plugin_stage_duration_seconds_sum{{{labels},stage="{stage}"}} {data["sum"]:.6f}')
+                lines.append(f'mysterai_plugin_stage_duration_seconds_count{{{labels},stage="{stage}"}} {data["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    """Échappe une valeur de label Prometheus."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Instance singleton
+_metrics_service_instance = None
+
+def get_metrics_service() -> MetricsService:
+    """
+    Retourne l'instance singleton du service de métriques.
+
+    Returns:
+        L'instance du MetricsService
+    """
+    global _metrics_service_instance
+    if _metrics_service_instance is None:
+        _metrics_service_instance = MetricsService()
+    return _metrics_service_instance
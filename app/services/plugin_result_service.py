@@ -0,0 +1,253 @@
+"""
+Stockage persistant des résultats de plugins par géocache.
+
+Un résultat est identifié par (géocache, plugin, version du plugin,
+empreinte des entrées) : tant que les paramètres envoyés au plugin sont les
+mêmes et que le plugin n'a pas changé de version, le solveur relit le
+résultat au lieu de relancer l'analyse. L'empreinte des entrées inclut
+celle du contenu de la géocache (description et waypoints, comme le cache
+de la pipeline d'analyse) : les plugins qui relisent la géocache par
+`geocache_id` ne rejouent pas un résultat obtenu avant sa modification.
+
+Les résultats des lots de zone (zone_batch_service) restent dans leur base
+locale, écrite par les processus de calcul ; le résumé d'un résultat
+(confiance, coordonnées) est le même des deux côtés (app.utils.plugin_results).
+
+Le résultat complet est stocké en JSON compact compressé par zlib. La
+meilleure confiance de scoring et les premières coordonnées détectées sont
+extraites dans des colonnes indexées, ce qui permet des requêtes comme
+« toutes les géocaches de la zone X avec une coordonnée décodée de
+confiance élevée » sans décompresser les résultats.
+
+Les résultats d'une ancienne version d'un plugin sont supprimés dès que la
+nouvelle version enregistre un résultat ou que le plugin est rechargé.
+
+Les fonctions ne valident pas la transaction : l'appelant fait le commit.
+"""
+
+import hashlib
+import json
+import threading
+import zlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, exists, select
+
+from app.database import db
+from app.models.geocache import AdditionalWaypoint, Geocache, GeocacheZone
+from app.models.plugin_result_model import PluginResult
+from app.services.analysis_pipeline_service import geocache_fingerprint
+from app.services.scoring_service import ScoringService
+from app.utils.plugin_results import summarize_result
+
+# Niveau de compression zlib (compromis taille / temps pour des résultats de quelques Ko)
+COMPRESSION_LEVEL = 6
+# Entrées qui ne changent pas le résultat d'un plugin (options de présentation)
+IGNORED_INPUTS = ('_format',)
+# Seuils des niveaux de confiance (ceux du service de scoring)
+CONFIDENCE_LEVELS = {
+    'high': ScoringService.CONFIDENCE_THRESHOLD_HIGH,
+    'medium': ScoringService.CONFIDENCE_THRESHOLD_MEDIUM,
+}
+
+# Dernière version vue pour chaque plugin : l'éviction ne s'exécute qu'au changement de version
+_current_versions: Dict[str, str] = {}
+_versions_lock = threading.Lock()
+_watched_managers = []
+
+
+def _session(session):
+    return session if session is not None else db.session
+
+
+def input_hash(inputs: Dict[str, Any], content_fingerprint: Optional[str] = None) -> str:
+    """
+    Empreinte des entrées d'un plugin (ordre des clés indifférent), et du
+    contenu de la géocache si content_fingerprint est fourni.
+    """
+    relevant = {key: value for key, value in (inputs or {}).items() if key not in IGNORED_INPUTS}
+    payload = json.dumps([relevant, content_fingerprint] if content_fingerprint else relevant,
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def content_fingerprint(geocache_id: int, session=None) -> Optional[str]:
+    """
+    Empreinte du contenu d'une géocache (description et waypoints), ou None
+    si elle n'existe pas. Seules les colonnes utiles sont lues.
+    """
+    session = _session(session)
+    row = session.execute(select(Geocache.description).where(Geocache.id == geocache_id)).first()
+    if row is None:
+        return None
+    waypoints = session.execute(
+        select(AdditionalWaypoint.prefix, AdditionalWaypoint.lookup, AdditionalWaypoint.name,
+               AdditionalWaypoint.gc_lat, AdditionalWaypoint.gc_lon, AdditionalWaypoint.note)
+        .where(AdditionalWaypoint.geocache_id == geocache_id)
+    ).all()
+    geocache = SimpleNamespace(id=geocache_id, description=row.description,
+                               additional_waypoints=[SimpleNamespace(**waypoint._mapping) for waypoint in waypoints])
+    return geocache_fingerprint(geocache)
+
+
+def _compact_json(result: Any) -> bytes:
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def decode_result(data: bytes) -> Any:
+    """Relit un résultat stocké (JSON compressé)."""
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def confidence_level(confidence: Optional[float]) -> Optional[str]:
+    """Niveau (high, medium, low) correspondant à une confiance."""
+    if confidence is None:
+        return None
+    for level, threshold in CONFIDENCE_LEVELS.items():
+        if confidence >= threshold:
+            return level
+    return 'low'
+
+
+def get_result(geocache_id: int, plugin_name: str, plugin_version: str, inputs_hash: str,
+               session=None) -> Optional[Any]:
+    """Résultat enregistré pour ces entrées et cette version du plugin, ou None."""
+    data = _session(session).execute(
+        select(PluginResult.result_data).where(
+            PluginResult.geocache_id == geocache_id,
+            PluginResult.plugin_name == plugin_name,
+            PluginResult.plugin_version == plugin_version,
+            PluginResult.input_hash == inputs_hash,
+        )
+    ).scalar()
+    return decode_result(data) if data is not None else None
+
+
+def save_result(geocache_id: int, plugin_name: str, plugin_version: str, inputs_hash: str, result: Any,
+                session=None) -> PluginResult:
+    """
+    Enregistre (ou remplace) le résultat d'un plugin pour une géocache.
+
+    La première fois qu'une version d'un plugin est vue, les résultats des
+    autres versions de ce plugin sont supprimés.
+    """
+    session = _session(session)
+    with _versions_lock:
+        new_version = _current_versions.get(plugin_name) != plugin_version
+        _current_versions[plugin_name] = plugin_version
+    if new_version:
+        evict_stale_versions(plugin_name, plugin_version, session=session)
+
+    confidence, coordinates = summarize_result(result)
+    raw = _compact_json(result)
+    record = session.execute(
+        select(PluginResult).where(
+            PluginResult.geocache_id == geocache_id,
+            PluginResult.plugin_name == plugin_name,
+            PluginResult.plugin_version == plugin_version,
+            PluginResult.input_hash == inputs_hash,
+        )
+    ).scalar_one_or_none()
+    if record is None:
+        record = PluginResult(geocache_id=geocache_id, plugin_name=plugin_name,
+                              plugin_version=plugin_version, input_hash=inputs_hash)
+        session.add(record)
+    record.result_data = zlib.compress(raw, COMPRESSION_LEVEL)
+    record.result_size = len(raw)
+    record.confidence = confidence
+    record.confidence_level = confidence_level(confidence)
+    record.has_coordinates = coordinates is not None
+    record.latitude = coordinates['latitude'] if coordinates else None
+    record.longitude = coordinates['longitude'] if coordinates else None
+    record.coordinates_ddm = (coordinates.get('ddm') or None) if coordinates else None
+    session.flush()
+    return record
+
+
+def evict_stale_versions(plugin_name: str, current_version: Optional[str], session=None) -> int:
+    """
+    Supprime les résultats d'un plugin produits par une autre version que
+    current_version (tous ses résultats si current_version vaut None).
+
+    Returns:
+        Nombre de résultats supprimés
+    """
+    statement = delete(PluginResult).where(PluginResult.plugin_name == plugin_name)
+    if current_version is not None:
+        statement = statement.where(PluginResult.plugin_version != current_version)
+    return _session(session).execute(statement).rowcount or 0
+
+
+def delete_results(geocache_id: int, plugin_name: Optional[str] = None, session=None) -> int:
+    """Supprime les résultats d'une géocache (d'un seul plugin si précisé)."""
+    statement = delete(PluginResult).where(PluginResult.geocache_id == geocache_id)
+    if plugin_name:
+        statement = statement.where(PluginResult.plugin_name == plugin_name)
+    return _session(session).execute(statement).rowcount or 0
+
+
+def query_results(zone_id: Optional[int] = None, geocache_id: Optional[int] = None,
+                  plugin_name: Optional[str] = None, min_confidence: Optional[float] = None,
+                  with_coordinates: bool = False, limit: int = 100, offset: int = 0,
+                  session=None) -> List[Dict[str, Any]]:
+    """
+    Résumés des résultats enregistrés, par confiance décroissante.
+
+    Args:
+        zone_id: Limite aux géocaches de cette zone
+        geocache_id: Limite à une géocache
+        plugin_name: Limite à un plugin
+        min_confidence: Confiance minimale (cf. CONFIDENCE_LEVELS)
+        with_coordinates: Seulement les résultats avec des coordonnées détectées
+
+    Returns:
+        Liste de PluginResult.to_dict() complétés par gc_code et name de la géocache
+    """
+    statement = (
+        select(PluginResult, Geocache.gc_code, Geocache.name)
+        .join(Geocache, Geocache.id == PluginResult.geocache_id)
+    )
+    if zone_id is not None:
+        statement = statement.where(exists().where(
+            GeocacheZone.geocache_id == PluginResult.geocache_id,
+            GeocacheZone.zone_id == zone_id,
+        ))
+    if geocache_id is not None:
+        statement = statement.where(PluginResult.geocache_id == geocache_id)
+    if plugin_name:
+        statement = statement.where(PluginResult.plugin_name == plugin_name)
+    if with_coordinates:
+        statement = statement.where(PluginResult.has_coordinates.is_(True))
+    if min_confidence is not None:
+        statement = statement.where(PluginResult.confidence >= min_confidence)
+    statement = statement.order_by(
+        PluginResult.confidence.is_(None), PluginResult.confidence.desc(), PluginResult.id
+    ).limit(limit).offset(offset)
+
+    results = []
+    for record, gc_code, name in _session(session).execute(statement):
+        item = record.to_dict()
+        item.update(gc_code=gc_code, name=name)
+        results.append(item)
+    return results
+
+
+def watch_plugin_manager(plugin_manager):
+    """Supprime les résultats obsolètes dès qu'un plugin est rechargé avec une autre version ou supprimé."""
+    if plugin_manager in _watched_managers or not hasattr(plugin_manager, 'add_reload_listener'):
+        return
+
+    def on_reload(plugin_name, old_version, new_version):
+        if old_version == new_version:
+            return
+        with plugin_manager.app.app_context():
+            evicted = evict_stale_versions(plugin_name, new_version)
+            db.session.commit()
+        with _versions_lock:
+            _current_versions.pop(plugin_name, None)
+        if evicted:
+            print(f"{evicted} résultat(s) obsolète(s) de {plugin_name} supprimé(s)")
+
+    plugin_manager.add_reload_listener(on_reload)
+    _watched_managers.append(plugin_manager)
@@ -0,0 +1,205 @@
+"""
+Surveillance du répertoire des plugins pour MysteryAI
+
+Ce module détecte les répertoires de plugins modifiés, ajoutés ou supprimés
+et ne recharge que ceux-là (`PluginManager.reload_plugin`), sans interrompre
+les exécutions en cours des autres plugins.
+
+Deux modes de détection :
+  - inotify (via `watchdog`, si le paquet est installé) : les événements du
+    système de fichiers réveillent le thread de surveillance ;
+  - scrutation des mtimes (repli) : le thread compare périodiquement une
+    empreinte (chemin, mtime, taille) des fichiers de chaque plugin.
+
+Dans les deux cas, la décision de recharger repose sur la comparaison des
+empreintes, ce qui filtre les événements parasites (fichiers .pyc, éditeurs).
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    watchdog_available = True
+except ImportError:
+    watchdog_available = False
+
+logger = logging.getLogger(__name__)
+
+# Fichiers et dossiers ignorés dans l'empreinte d'un plugin
+IGNORED_DIRS = {'__pycache__'}
+IGNORED_SUFFIXES = ('.pyc', '.pyo', '.tmp', '.swp', '~')
+
+# Délai laissé aux éditeurs pour terminer leurs écritures après un événement
+DEBOUNCE_SECONDS = 0.3
+
+
+def plugin_fingerprint(plugin_dir: str) -> Tuple:
+    """
+    Empreinte d'un répertoire de plugin : liste triée (chemin relatif, mtime, taille).
+    """
+    entries = []
+    for root, dirs, files in os.walk(plugin_dir):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.')]
+        for filename in files:
+            if filename.startswith('.') or filename.endswith(IGNORED_SUFFIXES):
+                continue
+            path = os.path.join(root, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(path, plugin_dir), stat.st_mtime_ns, stat.st_size))
+    entries.sort()
+    return tuple(entries)
+
+
+def scan_plugin_dirs(plugins_dir: str) -> Dict[str, Tuple]:
+    """Retourne {répertoire de plugin: empreinte} pour tous les plugin.json trouvés."""
+    fingerprints = {}
+    for root, dirs, files in os.walk(plugins_dir):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.')]
+        if 'plugin.json' in files:
+            fingerprints[root] = plugin_fingerprint(root)
+            # Un plugin ne contient pas d'autres plugins
+            dirs[:] = []
+    return fingerprints
+
+
+if watchdog_available:
+    class _WakeupHandler(FileSystemEventHandler):
+        """Réveille le thread de surveillance à chaque événement."""
+
+        def __init__(self, wakeup: threading.Event):
+            super().__init__()
+            self._wakeup = wakeup
+
+        def on_any_event(self, event):
+            self._wakeup.set()
+
+
+class PluginWatcher:
+    """
+    Recharge à chaud les plugins dont les fichiers ont changé.
+    """
+
+    def __init__(self, plugin_manager, interval: float = 1.0, use_inotify: bool = True):
+        """
+        :param plugin_manager: le PluginManager de l'application
+        :param interval: période de scrutation en secondes (mode mtime)
+        :param use_inotify: utiliser watchdog/inotify s'il est disponible
+        """
+        self.plugin_manager = plugin_manager
+        self.plugins_dir = plugin_manager.plugins_dir
+        self.interval = interval
+        self.use_inotify = use_inotify and watchdog_available
+        self._fingerprints: Dict[str, Tuple] = scan_plugin_dirs(self.plugins_dir)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self.use_inotify else 'polling'
+
+    def check_once(self) -> Dict[str, Set[str]]:
+        """
+        Compare l'état du disque avec la dernière empreinte connue et recharge
+        les plugins concernés.
+
+        Returns:
+            Dictionnaire {"reloaded": {...}, "added": {...}, "removed": {...}} (répertoires)
+        """
+        current = scan_plugin_dirs(self.plugins_dir)
+        previous = self._fingerprints
+        added = set(current) - set(previous)
+        removed = set(previous) - set(current)
+        modified = {path for path in set(current) & set(previous) if current[path] != previous[path]}
+
+        for plugin_dir in sorted(removed):
+            plugin_name = self._plugin_name_for(plugin_dir)
+            if plugin_name:
+                self.plugin_manager.remove_plugin(plugin_name)
+
+        for plugin_dir in sorted(added | modified):
+            self.plugin_manager.reload_plugin(plugin_dir)
+
+        self._fingerprints = current
+        if added or removed or modified:
+            logger.info(
+                f"Plugins rechargés à chaud : {len(modified)} modifiés, "
+                f"{len(added)} ajoutés, {len(removed)} supprimés"
+            )
+        return {'reloaded': modified, 'added': added, 'removed': removed}
+
+    def _plugin_name_for(self, plugin_dir: str) -> Optional[str]:
+        for name, info in list(self.plugin_manager._plugin_cache.items()):
+            if info.get('path') == plugin_dir:
+                return name
+        return None
+
+    def start(self):
+        """Démarre le thread de surveillance (et l'observateur inotify le cas échéant)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if self.use_inotify:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_WakeupHandler(self._wakeup), self.plugins_dir, recursive=True)
+                self._observer.start()
+            except Exception as e:
+                logger.warning(f"inotify indisponible, repli sur la scrutation des mtimes : {e}")
+                self._observer = None
+                self.use_inotify = False
+        self._thread = threading.Thread(target=self._run, name='plugin-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Surveillance des plugins démarrée ({self.mode}) sur {self.plugins_dir}")
+
+    def stop(self):
+        """Arrête la surveillance."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.use_inotify:
+                # Scrutation de secours très espacée, au cas où un événement serait perdu
+                if self._wakeup.wait(timeout=max(self.interval, 30.0)):
+                    self._stop.wait(DEBOUNCE_SECONDS)
+            else:
+                self._stop.wait(self.interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"Erreur lors de la surveillance des plugins : {e}")
+
+
+def start_plugin_watcher(app) -> Optional[PluginWatcher]:
+    """
+    Démarre la surveillance des plugins si PLUGIN_HOT_RELOAD est activé.
+    Le watcher est accessible via `app.plugin_watcher`.
+    """
+    if not app.config.get('PLUGIN_HOT_RELOAD'):
+        return None
+    watcher = PluginWatcher(
+        app.plugin_manager,
+        interval=float(app.config.get('PLUGIN_HOT_RELOAD_INTERVAL', 1.0)),
+    )
+    watcher.start()
+    app.plugin_watcher = watcher
+    return watcher
@@ -12,18 +12,16 @@ import json
 import os
 from typing import Dict, List, Tuple, Union, Optional, Set
 from app.models.app_config import AppConfig
-import langdetect
-import wordninja
 import pickle
-from langdetect import DetectorFactory
-from langdetect.detector import LangDetectException
 import wordfreq
+from app.services.tracing_service import traced
+from app.services.language_identifier import get_language_identifier
+from app.services.word_segmenter import get_word_segmenter
+from app.utils.text_view import TextView, text_view
 
 # Configurer le logger
 logger = logging.getLogger(__name__)
 
-# Configurer langdetect pour être déterministe
-DetectorFactory.seed = 0
 
 class ScoringService:
     """
@@ -107,9 +105,6 @@ class ScoringService:
         self._bloom_filters = {}
         self._zipf_frequencies = {}
         
-        # Initialiser wordninja une fois pour éviter de recharger le modèle à chaque appel
-        self._wordninja = wordninja
-        
         # Les modèles seront chargés à la demande
         self._load_resources()
     
@@ -156,12 +151,13 @@ class ScoringService:
         """
         return AppConfig.get_value('enable_auto_scoring', True)
     
-    def score_text(self, text: str, context: Optional[Dict] = None) -> Dict:
+    @traced()
+    def score_text(self, text: Union[str, TextView], context: Optional[Dict] = None) -> Dict:
         """
         Évalue la pertinence d'un texte déchiffré en lui attribuant un score de confiance.
         
         Args:
-            text: Le texte à évaluer
+            text: Le texte à évaluer (ou sa TextView, dont les variantes sont réutilisées)
             context: Contexte optionnel (coordonnées de géocache, région, etc.)
             
         Returns:
@@ -176,6 +172,9 @@ class ScoringService:
                 "status": "disabled"
             }
         
+        view = text_view(text)
+        text = view.raw
+        
         # Tracer le temps d'exécution
         start_time = time.time()
         
@@ -235,7 +234,7 @@ class ScoringService:
             }
         
         # 2. Normalisation
-        candidates = self._normalize_text(text)
+        candidates = self._normalize_text(view)
         
         # Préparer le résultat final
         result = {
@@ -258,9 +257,12 @@ class ScoringService:
         best_candidate = None
         best_score = -1
         
-        for candidate_text in candidates:
+        # Langue de tous les candidats en un seul passage dans le modèle
+        candidate_languages = self._detect_languages(candidates)
+        
+        for candidate_text, candidate_language in zip(candidates, candidate_languages):
             # 3.1 Détection de langue et segmentation si nécessaire
-            lang, segments = self._detect_and_segment(candidate_text)
+            lang, segments = self._detect_and_segment(candidate_text, candidate_language)
             
             # 3.2 Calculer le score lexical et collecter les fréquences Zipf
             lexical_score, found_words = self._compute_lexical_score(segments, lang)
@@ -328,6 +330,7 @@ class ScoringService:
         logger.info(f"Scoring terminé en {execution_time}ms avec score={result['score']}")
         return result
     
+    @traced()
     def _prefilter_text(self, text: str) -> Dict:
         """
         Applique un pré-filtrage ultra-léger pour rejeter les textes peu prometteurs.
@@ -394,91 +397,112 @@ class ScoringService:
         
         return {"passed": True}
     
-    def _normalize_text(self, text: str) -> List[str]:
+    @traced()
+    def _normalize_text(self, text: Union[str, TextView]) -> List[str]:
         """
         Normalise le texte et génère différentes variantes (candidats).
         
+        Les variantes sont celles de la TextView partagée du texte : elles ne
+        sont calculées qu'une fois, même si le texte est évalué plusieurs fois.
+        
         Args:
-            text: Le texte à normaliser
+            text: Le texte à normaliser (ou sa TextView)
             
         Returns:
             Liste des candidats générés
         """
+        view = text_view(text)
+        text = view.raw
         candidates = []
         
         # Ajouter le texte original
         candidates.append(text)
         
         # Candidat sans doubles espaces
-        no_double_spaces = re.sub(r'\s+', ' ', text).strip()
+        no_double_spaces = view.normalized
         if no_double_spaces != text:
             candidates.append(no_double_spaces)
         
         # Candidat sans espaces
-        no_spaces = text.replace(' ', '')
+        no_spaces = view.no_spaces
         if no_spaces != text and no_spaces != no_double_spaces:
             candidates.append(no_spaces)
         
         # Candidat avec compression des espaces entre lettres (H E L L O -> HELLO)
-        spaced_letters_pattern = r'(?<!\S)(\S)(?:\s+)(\S)(?:\s+)(\S)(?:\s+)(\S)(?:\s+)(\S)(?!\S)'
-        compressed_spaces = re.sub(spaced_letters_pattern, r'\1\2\3\4\5', text)
+        compressed_spaces = view.joined_letters
         if compressed_spaces != text and compressed_spaces not in candidates:
             candidates.append(compressed_spaces)
         
         return candidates[:4]  # Limiter à 4 candidats maximum
     
-    def _detect_and_segment(self, text: str) -> Tuple[str, List[str]]:
+    @traced()
+    def _detect_languages(self, texts: List[str]) -> List[str]:
         """
-        Détecte la langue du texte et le segmente si nécessaire.
+        Détecte la langue de plusieurs textes en un seul appel au modèle de langue.
+        
+        Un texte trop court pour une détection fiable (< 20 caractères) ou sans
+        n-gramme reconnu est considéré comme français, de même que tous les
+        textes si le modèle de langue est absent.
         
         Args:
-            text: Le texte à analyser
+            texts: Les textes à analyser
             
         Returns:
-            Un tuple contenant la langue détectée et la liste des segments
+            La langue détectée pour chaque texte
         """
+        languages = ["fr"] * len(texts)  # Par défaut français
+        identifier = get_language_identifier()
+        if identifier is None:
+            return languages
+        
         # Normalisation du texte pour la détection de langue
-        normalized_text = text.lower()
+        normalized_texts = [text.lower() for text in texts]
+        long_texts = [i for i, text in enumerate(normalized_texts) if len(text) >= 20]
+        detected_languages = identifier.detect_many([normalized_texts[i] for i in long_texts], default="fr")
         
-        # Détection de langue avec langdetect
-        try:
-            # Texte trop court pour une détection fiable
-            if len(normalized_text) < 20:
-                lang = "fr"  # Par défaut français
-            else:
-                # Tentative de détection de langue
-                detected = langdetect.detect(normalized_text)
-                
-                # Vérifier si la langue détectée est supportée, sinon fallback sur 'fr'
-                if detected in self.SUPPORTED_LANGUAGES:
-                    lang = detected
-                else:
-                    lang = "fr"
+        # Liste de mots spécifiquement français
+        fr_specific = ['est', 'et', 'dans', 'avec', 'pour', 'vous', 'nous', 'ils', 'sont', 'mais', 'très']
+        
+        for i, detected in zip(long_texts, detected_languages):
+            languages[i] = detected
+            
+            # Double vérification pour les cas ambigus français/anglais
+            if detected == 'en':
+                # Compter les mots spécifiquement français
+                fr_words_count = sum(1 for word in normalized_texts[i].split() if word in fr_specific)
                 
-                # Double vérification pour les cas ambigus français/anglais
-                if detected in ['en', 'fr']:
-                    # Liste de mots spécifiquement français
-                    fr_specific = ['est', 'et', 'dans', 'avec', 'pour', 'vous', 'nous', 'ils', 'sont', 'mais', 'très']
-                    
-                    # Compter les mots spécifiquement français
-                    fr_words_count = sum(1 for word in normalized_text.split() if word in fr_specific)
-                    
-                    # Si plusieurs mots spécifiquement français sont présents, forcer la langue à français
-                    if fr_words_count >= 2 and detected == 'en':
-                        lang = "fr"
-                        logger.debug(f"Langue forcée à français en raison de {fr_words_count} mots spécifiques")
-        except LangDetectException:
-            lang = "fr"  # Par défaut français en cas d'erreur
+                # Si plusieurs mots spécifiquement français sont présents, forcer la langue à français
+                if fr_words_count >= 2:
+                    languages[i] = "fr"
+                    logger.debug(f"Langue forcée à français en raison de {fr_words_count} mots spécifiques")
+        
+        return languages
+    
+    @traced()
+    def _detect_and_segment(self, text: str, language: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Détecte la langue du texte et le segmente si nécessaire.
+        
+        Args:
+            text: Le texte à analyser
+            language: Langue déjà détectée (par _detect_languages), pour ne pas la recalculer
+            
+        Returns:
+            Un tuple contenant la langue détectée et la liste des segments
+        """
+        lang = language or self._detect_languages([text])[0]
         
         # Si le texte contient des espaces, utiliser ces espaces comme segmentation
         if ' ' in text:
             segments = text.split()
         else:
-            # Utiliser wordninja pour segmenter le texte sans espaces
-            segments = self._wordninja.split(text)
+            # Segmenter le texte sans espaces avec le lexique de la langue détectée
+            segmenter = get_word_segmenter(lang)
+            segments = segmenter.segment(text) if segmenter else [text]
         
         return lang, segments
     
+    @traced()
     def _compute_lexical_score(self, segments: List[str], language: str) -> Tuple[float, List[str]]:
         """
         Calcule le score lexical basé sur la reconnaissance de mots dans un dictionnaire.
@@ -587,6 +611,7 @@ class ScoringService:
         
         return geocaching_terms
     
+    @traced()
     def _compute_language_score(self, segments: List[str], language: str) -> Tuple[float, List[str]]:
         """
         Calcule le score pour une langue spécifique.
@@ -675,6 +700,7 @@ class ScoringService:
         
         return lexical_score, found_words
     
+    @traced()
     def _check_gps_coordinates(self, text: str) -> Tuple[float, Dict]:
         """
         Vérifie la présence de coordonnées GPS dans le texte.
@@ -0,0 +1,425 @@
+"""
+Index de recherche plein texte des géocaches (SQLite FTS5)
+
+Ce module indexe, pour chaque géocache, son nom et son code GC, le texte de
+sa description, son indice, ses logs, ses notes et les notes de ses
+waypoints :
+  - la table virtuelle `search_index` (FTS5, tokenizer `unicode61` avec
+    suppression des accents) contient le texte ; la table
+    `search_index_rows` associe chaque ligne à sa géocache, à son type
+    (name, description, hint, log, note, waypoint) et à l'objet source ;
+  - des triggers SQLite placent dans `search_index_queue` l'ID de toute
+    géocache dont le contenu indexé change (y compris via des requêtes SQL
+    en masse) ; `sync()` réindexe uniquement ces géocaches, par lots. Aucune
+    reconstruction complète n'est nécessaire après un import ;
+  - à la première initialisation, toutes les géocaches existantes sont
+    placées dans la file et indexées progressivement.
+
+La recherche classe les résultats avec bm25, renvoie un extrait surligné de
+chaque correspondance et accepte des filtres (zone, type, difficulté,
+terrain, statut de résolution).
+
+L'index n'est disponible qu'avec SQLite compilé avec FTS5 ; sinon le service
+est désactivé et `available` vaut False.
+"""
+
+import html
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.exc import OperationalError
+
+# Version du schéma : une nouvelle version reconstruit l'index
+SCHEMA_VERSION = '1'
+# Nombre de géocaches réindexées par transaction
+SYNC_BATCH_SIZE = 500
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Nombre de correspondances lues par géocache renvoyée
+HITS_PER_RESULT = 10
+SNIPPET_TOKENS = 16
+
+KINDS = ('name', 'description', 'hint', 'log', 'note', 'waypoint')
+
+# Marqueurs temporaires du surlignage (remplacés après échappement HTML)
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS search_index_rows (
+        id INTEGER PRIMARY KEY,
+        geocache_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        source_id INTEGER
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_rows_geocache ON search_index_rows (geocache_id)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        content, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    "CREATE TABLE IF NOT EXISTS search_index_queue (geocache_id INTEGER PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS search_index_meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+# (nom, table, événement, ID(s) de géocache à placer dans la file)
+_TRIGGERS = [
+    ('geocache_ai', 'geocache', 'AFTER INSERT', 'SELECT NEW.id'),
+    ('geocache_au', 'geocache', 'AFTER UPDATE OF name, gc_code, description, hints', 'SELECT NEW.id'),
+    ('geocache_ad', 'geocache', 'AFTER DELETE', 'SELECT OLD.id'),
+    ('log_ai', 'log', 'AFTER INSERT', 'SELECT NEW.geocache_id'),
+    ('log_au', 'log', 'AFTER UPDATE OF text, geocache_id', 'SELECT NEW.geocache_id UNION SELECT OLD.geocache_id'),
+    ('log_ad', 'log', 'AFTER DELETE', 'SELECT OLD.geocache_id'),
+    ('waypoint_ai', 'additional_waypoint', 'AFTER INSERT', 'SELECT NEW.geocache_id'),
+    ('waypoint_au', 'additional_waypoint', 'AFTER UPDATE OF note, name, geocache_id',
+     'SELECT NEW.geocache_id UNION SELECT OLD.geocache_id'),
+    ('waypoint_ad', 'additional_waypoint', 'AFTER DELETE', 'SELECT OLD.geocache_id'),
+    ('geocache_note_ai', 'geocache_note', 'AFTER INSERT', 'SELECT NEW.geocache_id'),
+    ('geocache_note_ad', 'geocache_note', 'AFTER DELETE', 'SELECT OLD.geocache_id'),
+    ('note_au', 'note', 'AFTER UPDATE OF content',
+     'SELECT geocache_id FROM geocache_note WHERE note_id = NEW.id'),
+    ('note_ad', 'note', 'BEFORE DELETE',
+     'SELECT geocache_id FROM geocache_note WHERE note_id = OLD.id'),
+]
+
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACES_RE = re.compile(r'\s+')
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def html_to_text(content: Optional[str]) -> str:
+    """Texte brut d'un contenu HTML (sans balises, scripts ni styles)."""
+    if not content:
+        return ''
+    text = _SCRIPT_STYLE_RE.sub(' ', content)
+    text = _TAG_RE.sub(' ', text)
+    return _SPACES_RE.sub(' ', html.unescape(text)).strip()
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Convertit la saisie de l'utilisateur en requête FTS5 : tous les mots
+    doivent être présents, le dernier pouvant être incomplet (recherche au fil
+    de la frappe). Les opérateurs FTS5 saisis sont ignorés.
+    """
+    terms = _TERM_RE.findall(query or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _highlight(snippet: str) -> str:
+    """Échappe l'extrait puis remplace les marqueurs par <mark>."""
+    return html.escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+class SearchIndex:
+    """Index FTS5 des contenus des géocaches, maintenu par triggers et file de réindexation."""
+
+    def __init__(self, connect: Callable[[], Any]):
+        """
+        Args:
+            connect: fonction retournant une connexion DBAPI à la base SQLite principale
+        """
+        self._connect = connect
+        self._lock = threading.Lock()
+        self.available = False
+
+    # --------------------------------------------------------------------------
+    # Schéma
+    # --------------------------------------------------------------------------
+
+    def ensure_schema(self) -> bool:
+        """
+        Crée les tables et triggers de l'index s'ils n'existent pas. À la
+        première initialisation (ou après un changement de SCHEMA_VERSION),
+        toutes les géocaches sont placées dans la file de réindexation.
+
+        Returns:
+            True si l'index est disponible
+        """
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            try:
+                for statement in _SCHEMA:
+                    cursor.execute(statement)
+            except sqlite3.OperationalError as e:
+                print(f"Index de recherche désactivé (FTS5 indisponible) : {str(e)}")
+                connection.rollback()
+                self.available = False
+                return False
+
+            for name, table, event, select in _TRIGGERS:
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS search_index_{name} {event} ON {table} BEGIN "
+                    f"INSERT OR IGNORE INTO search_index_queue (geocache_id) {select}; END"
+                )
+
+            cursor.execute("SELECT value FROM search_index_meta WHERE key = 'schema_version'")
+            row = cursor.fetchone()
+            if row is None or row[0] != SCHEMA_VERSION:
+                cursor.execute("DELETE FROM search_index")
+                cursor.execute("DELETE FROM search_index_rows")
+                cursor.execute("INSERT OR IGNORE INTO search_index_queue (geocache_id) SELECT id FROM geocache")
+                cursor.execute(
+                    "INSERT OR REPLACE INTO search_index_meta (key, value) VALUES ('schema_version', ?)",
+                    (SCHEMA_VERSION,)
+                )
+            connection.commit()
+            self.available = True
+            return True
+        finally:
+            connection.close()
+
+    # --------------------------------------------------------------------------
+    # Réindexation incrémentale
+    # --------------------------------------------------------------------------
+
+    def pending_count(self) -> int:
+        """Nombre de géocaches en attente de réindexation."""
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM search_index_queue")
+            return cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+    def sync(self, max_batches: Optional[int] = None, blocking: bool = True) -> int:
+        """
+        Réindexe les géocaches de la file, par lots de SYNC_BATCH_SIZE.
+
+        Args:
+            max_batches: nombre maximal de lots traités (None = toute la file)
+            blocking: si False, ne fait rien lorsqu'une autre synchronisation est en cours
+
+        Returns:
+            Nombre de géocaches réindexées
+        """
+        if not self.available:
+            return 0
+        if not self._lock.acquire(blocking=blocking):
+            return 0
+        total = 0
+        try:
+            connection = self._connect()
+            try:
+                batches = 0
+                while max_batches is None or batches < max_batches:
+                    indexed = self._sync_batch(connection)
+                    if not indexed:
+                        break
+                    total += indexed
+                    batches += 1
+            finally:
+                connection.close()
+        finally:
+            self._lock.release()
+        return total
+
+    def _sync_batch(self, connection) -> int:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT geocache_id FROM search_index_queue LIMIT ?", (SYNC_BATCH_SIZE,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return 0
+            placeholders = ','.join('?' * len(ids))
+            # Retirés de la file avant la lecture : une modification concurrente les y replacera
+            cursor.execute(f"DELETE FROM search_index_queue WHERE geocache_id IN ({placeholders})", ids)
+            cursor.execute(
+                f"DELETE FROM search_index WHERE rowid IN "
+                f"(SELECT id FROM search_index_rows WHERE geocache_id IN ({placeholders}))", ids
+            )
+            cursor.execute(f"DELETE FROM search_index_rows WHERE geocache_id IN ({placeholders})", ids)
+
+            rows = []
+            cursor.execute(
+                f"SELECT id, name, gc_code, description, hints FROM geocache WHERE id IN ({placeholders})", ids
+            )
+            for geocache_id, name, gc_code, description, hints in cursor.fetchall():
+                rows.append((geocache_id, 'name', geocache_id, f"{gc_code or ''} {name or ''}".strip()))
+                rows.append((geocache_id, 'description', geocache_id, html_to_text(description)))
+                rows.append((geocache_id, 'hint', geocache_id, hints or ''))
+            cursor.execute(f"SELECT geocache_id, id, text FROM log WHERE geocache_id IN ({placeholders})", ids)
+            rows.extend((geocache_id, 'log', log_id, html_to_text(text)) for geocache_id, log_id, text in cursor.fetchall())
+            cursor.execute(
+                f"SELECT gn.geocache_id, n.id, n.content FROM geocache_note gn JOIN note n ON n.id = gn.note_id "
+                f"WHERE gn.geocache_id IN ({placeholders})", ids
+            )
+            rows.extend((geocache_id, 'note', note_id, content or '') for geocache_id, note_id, content in cursor.fetchall())
+            cursor.execute(
+                f"SELECT geocache_id, id, name, note FROM additional_waypoint WHERE geocache_id IN ({placeholders})", ids
+            )
+            rows.extend(
+                (geocache_id, 'waypoint', waypoint_id, f"{name or ''} {html_to_text(note)}".strip())
+                for geocache_id, waypoint_id, name, note in cursor.fetchall()
+            )
+
+            for geocache_id, kind, source_id, content in rows:
+                if not content:
+                    continue
+                cursor.execute(
+                    "INSERT INTO search_index_rows (geocache_id, kind, source_id) VALUES (?, ?, ?)",
+                    (geocache_id, kind, source_id)
+                )
+                cursor.execute("INSERT INTO search_index (rowid, content) VALUES (?, ?)", (cursor.lastrowid, content))
+            connection.commit()
+            return len(ids)
+        except Exception:
+            connection.rollback()
+            raise
+
+    def rebuild(self):
+        """Replace toutes les géocaches dans la file puis les réindexe."""
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("INSERT OR IGNORE INTO search_index_queue (geocache_id) SELECT id FROM geocache")
+            connection.commit()
+        finally:
+            connection.close()
+        return self.sync()
+
+    # --------------------------------------------------------------------------
+    # Recherche
+    # --------------------------------------------------------------------------
+
+    def search(self, query: str, zone_id: Optional[int] = None, cache_type: Optional[str] = None,
+               difficulty_min: Optional[float] = None, difficulty_max: Optional[float] = None,
+               terrain_min: Optional[float] = None, terrain_max: Optional[float] = None,
+               solved: Optional[str] = None, kinds: Optional[List[str]] = None,
+               limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """
+        Recherche les géocaches dont un contenu indexé correspond à la requête.
+        Un lot de la file de réindexation est traité avant la recherche, sauf si
+        une synchronisation est déjà en cours (rebuild, import GPX) ou si la base
+        est verrouillée par un autre écrivain : la recherche ne l'attend pas et
+        porte sur l'index tel qu'il est.
+
+        Returns:
+            {"query", "results": [{"geocache_id", "gc_code", "name", "cache_type",
+             "difficulty", "terrain", "solved", "score", "matches": [{"kind", "source_id", "snippet"}]}],
+             "total_ms"}
+        """
+        start = time.perf_counter()
+        match = build_match_query(query)
+        if not self.available or match is None:
+            return {"query": query, "results": [], "total_ms": 0.0}
+        try:
+            self.sync(max_batches=1, blocking=False)
+        except (sqlite3.OperationalError, OperationalError) as e:
+            # Le lot reste dans la file et sera repris à la prochaine synchronisation
+            print(f"Index de recherche : synchronisation reportée ({str(e)})")
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+        conditions = ["search_index MATCH ?"]
+        params: List[Any] = [match]
+        if zone_id is not None:
+            conditions.append("EXISTS (SELECT 1 FROM geocache_zone gz WHERE gz.geocache_id = g.id AND gz.zone_id = ?)")
+            params.append(zone_id)
+        for column, operator, value in (('cache_type', '=', cache_type), ('solved', '=', solved),
+                                        ('difficulty', '>=', difficulty_min), ('difficulty', '<=', difficulty_max),
+                                        ('terrain', '>=', terrain_min), ('terrain', '<=', terrain_max)):
+            if value is not None:
+                conditions.append(f"g.{column} {operator} ?")
+                params.append(value)
+        if kinds:
+            kinds = [kind for kind in kinds if kind in KINDS]
+            conditions.append(f"r.kind IN ({','.join('?' * len(kinds))})")
+            params.extend(kinds)
+
+        sql = (
+            "SELECT r.geocache_id, r.kind, r.source_id, bm25(search_index) AS score, "
+            f"snippet(search_index, 0, ?, ?, '…', {SNIPPET_TOKENS}), "
+            "g.gc_code, g.name, g.cache_type, g.difficulty, g.terrain, g.solved "
+            "FROM search_index "
+            "JOIN search_index_rows r ON r.id = search_index.rowid "
+            "JOIN geocache g ON g.id = r.geocache_id "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY score LIMIT ?"
+        )
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, [_MARK_START, _MARK_END] + params + [limit * HITS_PER_RESULT])
+            hits = cursor.fetchall()
+        finally:
+            connection.close()
+
+        # Regrouper les correspondances par géocache (ordre de la meilleure correspondance)
+        results: Dict[int, Dict[str, Any]] = {}
+        for geocache_id, kind, source_id, score, snippet, gc_code, name, ctype, difficulty, terrain, status in hits:
+            result = results.get(geocache_id)
+            if result is None:
+                if len(results) >= limit:
+                    continue
+                result = results[geocache_id] = {
+                    "geocache_id": geocache_id,
+                    "gc_code": gc_code,
+                    "name": name,
+                    "cache_type": ctype,
+                    "difficulty": difficulty,
+                    "terrain": terrain,
+                    "solved": status,
+                    "score": round(-score, 4),
+                    "matches": [],
+                }
+            result["matches"].append({"kind": kind, "source_id": source_id, "snippet": _highlight(snippet)})
+
+        return {
+            "query": query,
+            "results": list(results.values()),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+
+# Instance singleton
+_search_index_instance = None
+
+def get_search_index() -> SearchIndex:
+    """
+    Retourne l'instance singleton de l'index de recherche
+    (connexions brutes de la base principale de l'application).
+
+    Returns:
+        L'instance du SearchIndex
+    """
+    global _search_index_instance
+    if _search_index_instance is None:
+        from app.database import db
+        _search_index_instance = SearchIndex(lambda: db.engine.raw_connection())
+    return _search_index_instance
+
+
+def init_search_index(app):
+    """Crée le schéma de l'index au démarrage (base SQLite uniquement)."""
+    from app.database import db
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("Index de recherche désactivé : base principale non SQLite")
+            return
+        try:
+            index = get_search_index()
+            if not index.ensure_schema():
+                return
+            pending = index.pending_count()
+        except Exception as e:
+            print(f"Erreur lors de l'initialisation de l'index de recherche : {str(e)}")
+            return
+
+    if pending:
+        # Première indexation (ou rattrapage) en arrière-plan pour ne pas retarder le démarrage
+        def run():
+            with app.app_context():
+                try:
+                    print(f"Index de recherche : {index.sync()} géocache(s) indexée(s)")
+                except Exception as e:
+                    print(f"Erreur lors de l'indexation des géocaches : {str(e)}")
+
+        threading.Thread(target=run, name='search-index', daemon=True).start()
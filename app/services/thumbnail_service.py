@@ -0,0 +1,165 @@
+"""
+Service de miniatures des images de géocaches
+
+La galerie affichait les originaux en pleine résolution (souvent plusieurs
+mégaoctets par spoiler). Ce module produit des variantes réduites :
+  - chaque variante est identifiée par l'empreinte SHA-1 du contenu de
+    l'image source et par sa taille ; elle est enregistrée une fois pour
+    toutes dans `geocaches_images/.thumbnails/` ;
+  - la génération (Pillow) se fait dans un pool de threads en arrière-plan :
+    tant qu'une miniature n'est pas prête, l'original est servi ;
+  - l'empreinte sert aussi d'ETag, ce qui permet de répondre 304 aux
+    navigateurs qui ont déjà l'image.
+
+Sans Pillow, le service reste utilisable : aucune miniature n'est produite
+et les originaux sont servis avec leur ETag.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Largeur maximale (en pixels) de chaque variante
+VARIANTS = {
+    'thumb': 320,
+    'medium': 1024,
+}
+
+THUMBNAILS_DIRNAME = '.thumbnails'
+THUMBNAIL_QUALITY = 80
+DEFAULT_WORKERS = 2
+
+
+class ThumbnailService:
+    """Génération et cache disque des variantes réduites des images."""
+
+    def __init__(self, images_root: str, cache_dir: Optional[str] = None, workers: int = DEFAULT_WORKERS):
+        self.images_root = images_root
+        self.cache_dir = cache_dir or os.path.join(images_root, THUMBNAILS_DIRNAME)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+        self._lock = threading.Lock()
+        self._pending: Dict[str, object] = {}
+        # Empreintes déjà calculées : chemin -> (taille, date de modification, empreinte)
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+
+    @property
+    def available(self) -> bool:
+        return PIL_AVAILABLE
+
+    # --------------------------------------------------------------------------
+    # Empreintes
+    # --------------------------------------------------------------------------
+
+    def image_hash(self, path: str) -> str:
+        """Empreinte SHA-1 du contenu, recalculée seulement si le fichier a changé."""
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+        image_hash = digest.hexdigest()
+        self._hashes[path] = (stat.st_size, stat.st_mtime_ns, image_hash)
+        return image_hash
+
+    def thumbnail_path(self, image_hash: str, variant: str) -> str:
+        """Chemin de la variante dans le cache disque."""
+        return os.path.join(self.cache_dir, image_hash[:2], f"{image_hash}_{VARIANTS[variant]}.webp")
+
+    # --------------------------------------------------------------------------
+    # Variantes
+    # --------------------------------------------------------------------------
+
+    def get(self, source_path: str, variant: str, wait: bool = False) -> Optional[Tuple[str, str]]:
+        """
+        Retourne (chemin, empreinte) de la variante si elle est prête, sinon
+        planifie sa génération et retourne None (l'appelant sert alors l'original).
+
+        Args:
+            source_path: image d'origine
+            variant: clé de VARIANTS
+            wait: attendre la fin de la génération plutôt que de retourner None
+        """
+        if variant not in VARIANTS or not PIL_AVAILABLE:
+            return None
+        image_hash = self.image_hash(source_path)
+        target = self.thumbnail_path(image_hash, variant)
+        if os.path.exists(target):
+            return target, f"{image_hash}-{variant}"
+
+        future = self._schedule(source_path, target, VARIANTS[variant])
+        if wait:
+            future.result()
+            if os.path.exists(target):
+                return target, f"{image_hash}-{variant}"
+        return None
+
+    def prefetch(self, source_paths, variant: str = 'thumb'):
+        """Planifie la génération des variantes manquantes (ex : au rendu d'une galerie)."""
+        if variant not in VARIANTS or not PIL_AVAILABLE:
+            return
+        for source_path in source_paths:
+            try:
+                target = self.thumbnail_path(self.image_hash(source_path), variant)
+            except OSError:
+                continue
+            if not os.path.exists(target):
+                self._schedule(source_path, target, VARIANTS[variant])
+
+    def _schedule(self, source_path: str, target: str, width: int):
+        with self._lock:
+            future = self._pending.get(target)
+            if future is None:
+                future = self._executor.submit(self._generate, source_path, target, width)
+                self._pending[target] = future
+                future.add_done_callback(lambda _: self._forget(target))
+            return future
+
+    def _forget(self, target: str):
+        with self._lock:
+            self._pending.pop(target, None)
+
+    def _generate(self, source_path: str, target: str, width: int):
+        """Réduit l'image et l'écrit de façon atomique dans le cache disque."""
+        try:
+            with Image.open(source_path) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+                image.thumbnail((width, width * 4))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                temporary = f"{target}.{threading.get_ident()}.tmp"
+                image.save(temporary, 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+                os.replace(temporary, target)
+        except Exception as e:
+            print(f"Erreur lors de la génération de la miniature de {source_path}: {str(e)}")
+
+
+# Instance singleton
+_thumbnail_service_instance = None
+
+def get_thumbnail_service(images_root: Optional[str] = None) -> ThumbnailService:
+    """
+    Retourne l'instance singleton du service de miniatures
+    (dossier `geocaches_images/` à la racine du projet par défaut).
+
+    Returns:
+        L'instance du ThumbnailService
+    """
+    global _thumbnail_service_instance
+    if _thumbnail_service_instance is None:
+        if images_root is None:
+            basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+            images_root = os.path.join(basedir, 'geocaches_images')
+        _thumbnail_service_instance = ThumbnailService(images_root)
+    return _thumbnail_service_instance
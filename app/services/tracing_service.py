@@ -0,0 +1,274 @@
+"""
+Service de traçage des requêtes pour MysteryAI
+
+Ce module enregistre des spans imbriqués (exécution de plugin → détection GPS →
+fonctions `_detect_*` → scoring → segmentation, etc.) pour une requête donnée,
+afin d'obtenir le détail des temps passés dans chaque étape.
+
+Le traçage est activé requête par requête :
+  - via l'en-tête HTTP `X-MysterAI-Trace: 1`,
+  - ou par échantillonnage (`TRACE_SAMPLE_RATE`, entre 0 et 1).
+
+Les messages de débogage ne sont formatés que pour le thread qui porte une
+trace, au moment de l'appel : les arguments (dictionnaires d'entrée, résultats
+de plugin) ne sont pas conservés par référence, une modification ultérieure
+n'apparaît donc pas dans la trace. Lorsque aucune trace n'est en cours, chaque
+appel se résume au test du booléen `tracer.enabled`.
+"""
+
+import functools
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+TRACE_HEADER = 'X-MysterAI-Trace'
+TRACE_ID_HEADER = 'X-MysterAI-Trace-Id'
+
+# Nombre maximal de traces conservées pour /api/traces/<id>
+MAX_STORED_TRACES = 200
+# Longueur maximale d'un message formaté
+MAX_MESSAGE_LENGTH = 500
+
+
+class Span:
+    """Intervalle de temps nommé, pouvant contenir des sous-spans et des messages."""
+
+    __slots__ = ('name', 'attrs', 'start', 'end', 'children', 'events', 'parent')
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, attrs: Optional[Dict] = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.children: List['Span'] = []
+        self.events: List[tuple] = []
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict:
+        """Convertit le span (et ses enfants) en dictionnaire, en formatant les messages."""
+        return {
+            'name': self.name,
+            'attrs': self.attrs,
+            'offset_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round(self.duration_ms, 3),
+            'events': [
+                {'offset_ms': round((at - origin) * 1000, 3), 'message': message}
+                for at, message in self.events
+            ],
+            'children': [child.to_dict(origin) for child in self.children],
+        }
+
+
+class Trace:
+    """Ensemble des spans enregistrés pendant une requête."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.created_at = time.time()
+        self.root = Span(name)
+        self.current = self.root
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'created_at': self.created_at,
+            'duration_ms': round(self.root.duration_ms, 3),
+            'root': self.root.to_dict(self.root.start),
+        }
+
+    def server_timing(self) -> str:
+        """Résumé des spans de premier niveau au format de l'en-tête Server-Timing."""
+        totals: Dict[str, float] = OrderedDict()
+        for child in self.root.children:
+            key = ''.join(c if c.isalnum() or c in '_-' else '_' for c in child.name)
+            totals[key] = totals.get(key, 0.0) + child.duration_ms
+        parts = [f'{name};dur={duration:.2f}' for name, duration in totals.items()]
+        parts.append(f'total;dur={self.root.duration_ms:.2f}')
+        return ', '.join(parts)
+
+
+class _SpanContext:
+    """Gestionnaire de contexte ouvrant un span dans la trace courante."""
+
+    __slots__ = ('_trace', '_name', '_attrs', '_span')
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict):
+        self._trace = trace
+        self._name = name
+        self._attrs = attrs
+        self._span = None
+
+    def __enter__(self):
+        parent = self._trace.current
+        self._span = Span(self._name, parent, self._attrs)
+        parent.children.append(self._span)
+        self._trace.current = self._span
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.end = time.perf_counter()
+        if exc_type is not None:
+            self._span.attrs['error'] = f'{exc_type.__name__}: {exc}'
+        self._trace.current = self._span.parent
+        return False
+
+
+class _NoopSpan:
+    """Span vide utilisé lorsque le traçage est inactif."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Point d'entrée du traçage.
+
+    `enabled` vaut True dès qu'au moins une trace est en cours dans le processus ;
+    la trace elle-même est rattachée au thread qui traite la requête.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._traces: 'OrderedDict[str, Trace]' = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Cycle de vie des traces
+    # ------------------------------------------------------------------
+
+    def start_trace(self, name: str) -> Trace:
+        """Démarre une trace pour le thread courant."""
+        trace = Trace(name)
+        self._local.trace = trace
+        with self._lock:
+            self._active += 1
+            self.enabled = True
+        return trace
+
+    def finish_trace(self) -> Optional[Trace]:
+        """Termine la trace du thread courant et la conserve pour consultation."""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return None
+        self._local.trace = None
+        trace.root.end = time.perf_counter()
+        with self._lock:
+            self._active -= 1
+            self.enabled = self._active > 0
+            self._traces[trace.id] = trace
+            while len(self._traces) > MAX_STORED_TRACES:
+                self._traces.popitem(last=False)
+        return trace
+
+    def get_trace(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(trace_id)
+
+    def list_traces(self) -> List[Trace]:
+        return list(self._traces.values())
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+
+    def span(self, name: str, **attrs):
+        """
+        Ouvre un span imbriqué dans la trace courante.
+        Retourne un gestionnaire de contexte vide si aucune trace n'est active.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return _NOOP_SPAN
+        return _SpanContext(trace, name, attrs)
+
+    def log(self, message: str, *args):
+        """
+        Ajoute un message au span courant. Le formatage (`message % args`)
+        n'a lieu que si le thread courant porte une trace.
+        """
+        if not self.enabled:
+            return
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.current.events.append((time.perf_counter(), _format_message(message, args)))
+
+
+def traced(name: Optional[str] = None):
+    """
+    Décorateur ouvrant un span autour de la fonction décorée.
+    Sans trace active, le surcoût se limite au test de `tracer.enabled`.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _format_message(message: str, args: tuple) -> str:
+    try:
+        text = message % args if args else message
+    except (TypeError, ValueError):
+        text = f'{message} {args!r}'
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = text[:MAX_MESSAGE_LENGTH] + '... (tronqué)'
+    return text
+
+
+# Instance singleton du traceur
+tracer = Tracer()
+
+
+def init_tracing(app):
+    """
+    Enregistre les hooks Flask qui démarrent et terminent une trace
+    lorsque la requête le demande (en-tête ou échantillonnage).
+    """
+    from flask import request
+
+    sample_rate = float(app.config.get('TRACE_SAMPLE_RATE', 0.0) or 0.0)
+
+    @app.before_request
+    def _start_request_trace():
+        requested = request.headers.get(TRACE_HEADER, '').lower() in ('1', 'true', 'yes', 'on')
+        if requested or (sample_rate > 0 and random.random() < sample_rate):
+            tracer.start_trace(f'{request.method} {request.path}')
+
+    @app.after_request
+    def _finish_request_trace(response):
+        trace = tracer.finish_trace()
+        if trace is not None:
+            response.headers[TRACE_ID_HEADER] = trace.id
+            response.headers['Server-Timing'] = trace.server_timing()
+        return response
+
+    @app.teardown_request
+    def _cleanup_request_trace(exc):
+        # Si after_request n'a pas été appelé (exception), ne pas laisser la trace ouverte
+        tracer.finish_trace()
@@ -0,0 +1,263 @@
+"""
+Segmentation en mots des textes sans espaces, par langue.
+
+Remplace wordninja dans le service de scoring. wordninja n'a qu'un modèle
+anglais : un texte décodé français ou allemand sans espaces y est découpé
+en fragments (« PRESDELARIVIERE » → PRE S DELA RIVI ERE), ce qui fait
+chuter la couverture lexicale du scoring.
+
+Chaque langue a son propre lexique, tiré des mêmes listes wordfreq que les
+filtres de Bloom du scoring (les LEXICON_SIZE mots les plus fréquents, en
+minuscules et sans accents). Le coût d'un mot est -log de sa fréquence ; la
+segmentation retenue est celle de coût total minimal (programmation
+dynamique). Une suite de lettres inconnues forme un seul segment.
+
+Les mots d'une ou deux lettres sont exclus du lexique, sauf les mots de
+liaison de chaque langue (SHORT_WORDS : à, y, de, la...). wordfreq contient
+toutes les lettres isolées et beaucoup de sigles de deux lettres : avec eux,
+n'importe quel texte se découpe en fragments « reconnus », et un mauvais
+décalage de César (BOX NO J F YE C KE Z SONNE...) obtient une meilleure
+couverture lexicale que le bon.
+
+Le lexique est stocké dans un trie à plat : un dictionnaire d'entiers
+(nœud, lettre) → nœud fils et un tableau des coûts par nœud. Les mots
+possibles à chaque position sont trouvés en descendant le trie, sans
+découper de sous-chaînes.
+
+Les segmentations de chaque bloc de lettres sont mémorisées dans un cache
+LRU borné par langue, indexé par le bloc entier (pas de réutilisation des
+sous-blocs) : les variantes d'un même texte (casse, accents, ponctuation)
+et un même texte évalué par plusieurs plugins ne sont segmentés qu'une
+fois. Les candidats d'une force brute ont des blocs tous différents et
+n'en profitent pas.
+"""
+
+import logging
+import math
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.text_view import strip_accents
+
+logger = logging.getLogger(__name__)
+
+# Mots du lexique par langue (taille des filtres de Bloom du scoring)
+LEXICON_SIZE = 20000
+# Coût d'une lettre hors lexique
+UNKNOWN_LETTER_COST = 25.0
+# Blocs de lettres dont la segmentation est mémorisée, par langue
+MEMO_SIZE = 4096
+# Longueur minimale des mots du lexique, hors mots courts de la langue
+MIN_WORD_LENGTH = 3
+# Mots d'une ou deux lettres conservés dans le lexique de chaque langue (sans accents)
+SHORT_WORDS = {
+    'fr': {'a', 'y', 'au', 'ce', 'de', 'du', 'en', 'et', 'il', 'je', 'la', 'le', 'ma', 'me', 'ne', 'ni',
+           'on', 'ou', 'sa', 'se', 'si', 'ta', 'te', 'tu', 'un', 'va', 'vu'},
+    'en': {'a', 'i', 'am', 'an', 'as', 'at', 'be', 'by', 'do', 'go', 'he', 'if', 'in', 'is', 'it', 'me',
+           'my', 'no', 'of', 'on', 'or', 'so', 'to', 'up', 'us', 'we'},
+    'de': {'am', 'an', 'da', 'du', 'er', 'es', 'im', 'in', 'ja', 'ob', 'so', 'um', 'wo', 'zu'},
+    'es': {'a', 'e', 'o', 'u', 'y', 'al', 'de', 'el', 'en', 'es', 'la', 'le', 'lo', 'me', 'mi', 'ni',
+           'no', 'se', 'si', 'su', 'te', 'tu', 'un', 'ya', 'yo'},
+    'it': {'a', 'e', 'i', 'o', 'ci', 'da', 'di', 'ha', 'il', 'in', 'la', 'le', 'lo', 'ma', 'mi', 'ne',
+           'se', 'si', 'su', 'ti', 'tu', 'un'},
+    'nl': {'al', 'de', 'en', 'er', 'ik', 'in', 'is', 'je', 'na', 'nu', 'of', 'om', 'op', 'te', 'we',
+           'ze', 'zo'},
+    'pt': {'a', 'e', 'o', 'ao', 'as', 'da', 'de', 'do', 'em', 'eu', 'ja', 'na', 'no', 'os', 'ou', 'se',
+           'um'},
+}
+
+_ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+_SYMBOLS = {letter: index + 1 for index, letter in enumerate(_ALPHABET)}
+_FANOUT = len(_ALPHABET) + 1
+_TOKENS = re.compile(r'[a-z]+|[0-9]+')
+_NON_LETTERS = re.compile(r'[^a-z]')
+
+
+def _lexicon_key(word: str) -> str:
+    """Forme d'un mot dans le lexique : minuscules, sans accents."""
+    return strip_accents(word.lower())
+
+
+class WordSegmenter:
+    """
+    Segmenteur d'une langue, construit à partir de fréquences de mots.
+    """
+
+    def __init__(self, word_frequencies: Dict[str, float], memo_size: int = MEMO_SIZE,
+                 short_words: Iterable[str] = ()):
+        """
+        Args:
+            word_frequencies: {mot: fréquence} (les mots sont mis en minuscules et désaccentués ;
+                les mots contenant autre chose que des lettres a-z sont ignorés)
+            memo_size: Nombre de blocs dont la segmentation est mémorisée
+            short_words: Mots de moins de MIN_WORD_LENGTH lettres à conserver (les autres sont ignorés)
+        """
+        short_words = {_lexicon_key(word) for word in short_words}
+        frequencies: Dict[str, float] = {}
+        for word, frequency in word_frequencies.items():
+            key = _lexicon_key(word)
+            if (key and frequency > 0 and not _NON_LETTERS.search(key)
+                    and (len(key) >= MIN_WORD_LENGTH or key in short_words)):
+                frequencies[key] = frequencies.get(key, 0.0) + frequency
+
+        self._children: Dict[int, int] = {}
+        costs = [math.inf]
+        for word, frequency in frequencies.items():
+            node = 0
+            for letter in word:
+                edge = node * _FANOUT + _SYMBOLS[letter]
+                child = self._children.get(edge)
+                if child is None:
+                    child = self._children[edge] = len(costs)
+                    costs.append(math.inf)
+                node = child
+            costs[node] = -math.log(frequency)
+        self._costs = array('d', costs)
+        self.size = len(frequencies)
+
+        self.memo_size = memo_size
+        self._memo: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def cost(self, word: str) -> Optional[float]:
+        """Coût d'un mot du lexique, ou None s'il est inconnu."""
+        node = 0
+        children = self._children
+        for letter in _lexicon_key(word):
+            node = children.get(node * _FANOUT + _SYMBOLS.get(letter, 0))
+            if node is None:
+                return None
+        cost = self._costs[node]
+        return None if math.isinf(cost) else cost
+
+    def segment(self, text: str) -> List[str]:
+        """
+        Découpe un texte sans espaces en mots (minuscules, sans accents).
+
+        Les chiffres forment des segments à part ; les autres caractères
+        (ponctuation, espaces) séparent les blocs et ne sont pas renvoyés.
+        """
+        segments: List[str] = []
+        for token in _TOKENS.findall(_lexicon_key(text)):
+            if token[0].isdigit():
+                segments.append(token)
+            else:
+                segments.extend(self._segment_letters(token))
+        return segments
+
+    def segment_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """Segmente plusieurs textes (les blocs communs ne sont calculés qu'une fois)."""
+        return [self.segment(text) for text in texts]
+
+    def _segment_letters(self, block: str) -> Tuple[str, ...]:
+        with self._memo_lock:
+            words = self._memo.get(block)
+            if words is not None:
+                self._memo.move_to_end(block)
+                self.memo_hits += 1
+                return words
+            self.memo_misses += 1
+
+        words = self._best_segmentation(block)
+
+        with self._memo_lock:
+            self._memo[block] = words
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return words
+
+    def _best_segmentation(self, block: str) -> Tuple[str, ...]:
+        """Segmentation de coût minimal d'un bloc de lettres a-z."""
+        length = len(block)
+        children = self._children
+        costs = self._costs
+        symbols = [_SYMBOLS[letter] for letter in block]
+
+        best = [math.inf] * (length + 1)
+        previous = [0] * (length + 1)
+        known = [False] * (length + 1)  # le segment qui se termine ici est un mot du lexique
+        best[0] = 0.0
+        for start in range(length):
+            base = best[start]
+            if base == math.inf:
+                continue
+            # Lettre inconnue
+            if base + UNKNOWN_LETTER_COST < best[start + 1]:
+                best[start + 1] = base + UNKNOWN_LETTER_COST
+                previous[start + 1] = start
+                known[start + 1] = False
+            # Mots du lexique commençant à cette position
+            node = 0
+            for end in range(start, length):
+                node = children.get(node * _FANOUT + symbols[end])
+                if node is None:
+                    break
+                total = base + costs[node]
+                if total < best[end + 1]:
+                    best[end + 1] = total
+                    previous[end + 1] = start
+                    known[end + 1] = True
+
+        # Reconstruction, en regroupant les lettres inconnues consécutives
+        words: List[str] = []
+        end = length
+        unknown_end = None
+        while end > 0:
+            start = previous[end]
+            if known[end]:
+                if unknown_end is not None:
+                    words.append(block[end:unknown_end])
+                    unknown_end = None
+                words.append(block[start:end])
+            elif unknown_end is None:
+                unknown_end = end
+            end = start
+        if unknown_end is not None:
+            words.append(block[:unknown_end])
+        words.reverse()
+        return tuple(words)
+
+
+# Segmenteurs par langue, construits à la première utilisation
+_word_segmenters: Dict[str, Optional[WordSegmenter]] = {}
+_word_segmenters_lock = threading.Lock()
+
+
+def build_word_segmenter(language: str, size: int = LEXICON_SIZE) -> WordSegmenter:
+    """
+    Construit le segmenteur d'une langue à partir des size mots les plus
+    fréquents de wordfreq (mots courts limités à SHORT_WORDS).
+    """
+    import wordfreq
+
+    words = wordfreq.top_n_list(language, size)
+    if not words:
+        raise ValueError(f"Langue non disponible dans wordfreq: {language}")
+    return WordSegmenter({word: wordfreq.word_frequency(word, language) for word in words},
+                         short_words=SHORT_WORDS.get(language, ()))
+
+
+def get_word_segmenter(language: str) -> Optional[WordSegmenter]:
+    """
+    Retourne le segmenteur d'une langue (construit une fois par langue).
+
+    Returns:
+        Le WordSegmenter, ou None si la langue n'a pas de lexique
+    """
+    segmenter = _word_segmenters.get(language, False)
+    if segmenter is not False:
+        return segmenter
+    with _word_segmenters_lock:
+        if language not in _word_segmenters:
+            try:
+                _word_segmenters[language] = build_word_segmenter(language)
+                logger.info(f"Segmenteur {language} construit ({_word_segmenters[language].size} mots)")
+            except (ImportError, LookupError, ValueError) as e:
+                logger.error(f"Erreur lors de la construction du segmenteur {language}: {e}")
+                _word_segmenters[language] = None
+        return _word_segmenters[language]
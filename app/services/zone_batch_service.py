@@ -0,0 +1,512 @@
+"""
+Résolution par lot : un plugin ou une pipeline exécuté sur toutes les géocaches d'une zone.
+
+Le lot s'exécute comme une tâche de fond (`zone_batch`) de la file de tâches :
+  - les descriptions sont traitées en parallèle par un pool de processus
+    (`ProcessPoolExecutor`, méthode spawn), un processus par cœur par défaut.
+    Chaque processus enregistre ses propres wrappers de plugins à partir des
+    enregistrements lus par le processus principal et, si une configuration
+    est fournie, ouvre un contexte d'application minimal sur la même base
+    (sans `create_app()` : ni file de tâches, ni surveillance des plugins,
+    ni synchronisation de la base des plugins) ;
+  - une géocache dont l'empreinte du contenu (description et waypoints) et
+    la version du plugin n'ont pas changé depuis son dernier résultat réussi
+    n'est pas retraitée ;
+  - les résultats sont enregistrés par paquets dans une base SQLite locale
+    (`zone_batch.db`) en même temps que le point de reprise de la tâche :
+    une tâche interrompue repart des géocaches qui n'ont pas encore de
+    résultat ;
+  - chaque résultat est résumé par sa meilleure confiance de scoring et ses
+    premières coordonnées détectées, colonnes indexées sur lesquelles
+    l'interface trie la table des résultats.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.plugin_results import summarize_result
+
+# Types de cible
+PLUGIN = 'plugin'
+PIPELINE = 'pipeline'
+
+# Statuts d'un résultat
+OK = 'ok'
+ERROR = 'error'
+
+# Nombre de résultats enregistrés (avec le point de reprise) par transaction
+SAVE_EVERY = 20
+# Nombre maximal de géocaches envoyées d'un coup à un processus
+MAX_CHUNKSIZE = 8
+# Clés de configuration transmises aux processus pour ouvrir la base de l'application
+APP_CONFIG_KEYS = ('SQLALCHEMY_DATABASE_URI', 'SQLALCHEMY_BINDS', 'SQLALCHEMY_ENGINE_OPTIONS',
+                   'SQLALCHEMY_TRACK_MODIFICATIONS', 'BASEDIR')
+
+# Tris proposés par la table des résultats (colonne principale, départage)
+SORTS = {
+    'confidence': ('confidence', 'latitude IS NULL'),
+    'coordinates': ('latitude IS NOT NULL', 'confidence IS NULL, confidence DESC'),
+    'gc_code': ('gc_code', None),
+    'name': ('name', None),
+    'elapsed': ('elapsed_ms', None),
+    'updated': ('updated_at', None),
+}
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS batch_results (
+        zone_id INTEGER NOT NULL,
+        target TEXT NOT NULL,
+        geocache_id INTEGER NOT NULL,
+        gc_code TEXT,
+        name TEXT,
+        fingerprint TEXT NOT NULL,
+        target_version TEXT NOT NULL,
+        status TEXT NOT NULL,
+        confidence REAL,
+        latitude REAL,
+        longitude REAL,
+        coordinates TEXT,
+        result TEXT,
+        error TEXT,
+        elapsed_ms REAL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (zone_id, target, geocache_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_batch_results_confidence ON batch_results (zone_id, target, confidence)",
+    "CREATE INDEX IF NOT EXISTS idx_batch_results_latitude ON batch_results (zone_id, target, latitude)",
+]
+
+_ROW_COLUMNS = ('geocache_id', 'gc_code', 'name', 'fingerprint', 'target_version', 'status', 'confidence',
+                'latitude', 'longitude', 'coordinates', 'result', 'error', 'elapsed_ms')
+_LIST_COLUMNS = ('geocache_id', 'gc_code', 'name', 'status', 'confidence', 'latitude', 'longitude',
+                 'coordinates', 'error', 'elapsed_ms', 'target_version', 'updated_at')
+
+
+class ZoneBatchStore:
+    """
+    Table des résultats des lots (SQLite), une ligne par (zone, cible, géocache).
+    """
+
+    def __init__(self, db_path: str, clock=time.time):
+        self.db_path = db_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self._connection.commit()
+
+    def signatures(self, zone_id: int, target: str) -> Dict[int, Tuple[str, str, str]]:
+        """{geocache_id: (empreinte, version de la cible, statut)} des résultats enregistrés."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT geocache_id, fingerprint, target_version, status FROM batch_results "
+                "WHERE zone_id = ? AND target = ?", (zone_id, target)
+            ).fetchall()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def now(self) -> float:
+        """Horodatage utilisé pour `updated_at`."""
+        return self._clock()
+
+    def updated_since(self, zone_id: int, target: str, since: float) -> Dict[int, Tuple[str, bool]]:
+        """{geocache_id: (statut, coordonnées trouvées)} des résultats enregistrés depuis since."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT geocache_id, status, latitude IS NOT NULL FROM batch_results "
+                "WHERE zone_id = ? AND target = ? AND updated_at >= ?", (zone_id, target, since)
+            ).fetchall()
+        return {row[0]: (row[1], bool(row[2])) for row in rows}
+
+    def save(self, zone_id: int, target: str, rows: Iterable[Dict[str, Any]]):
+        """Enregistre (ou remplace) des résultats en une transaction."""
+        now = self._clock()
+        values = []
+        for row in rows:
+            values.append((zone_id, target) + tuple(
+                json.dumps(row[column], ensure_ascii=False, default=str)
+                if column in ('coordinates', 'result') and row.get(column) is not None else row.get(column)
+                for column in _ROW_COLUMNS
+            ) + (now,))
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO batch_results (zone_id, target, {', '.join(_ROW_COLUMNS)}, updated_at) "
+                f"VALUES ({', '.join('?' * (len(_ROW_COLUMNS) + 3))})", values
+            )
+            self._connection.commit()
+
+    def delete(self, zone_id: int, target: Optional[str] = None, geocache_ids: Optional[Iterable[int]] = None) -> int:
+        """Supprime les résultats d'une zone (d'une cible, de certaines géocaches)."""
+        query = "DELETE FROM batch_results WHERE zone_id = ?"
+        params: List[Any] = [zone_id]
+        if target is not None:
+            query += " AND target = ?"
+            params.append(target)
+        with self._lock:
+            if geocache_ids is None:
+                deleted = self._connection.execute(query, params).rowcount
+            else:
+                deleted = sum(
+                    self._connection.execute(query + " AND geocache_id = ?", params + [geocache_id]).rowcount
+                    for geocache_id in geocache_ids
+                )
+            self._connection.commit()
+        return deleted
+
+    def results(self, zone_id: int, target: str, sort: str = 'confidence', descending: bool = True,
+                with_coordinates: bool = False, min_confidence: Optional[float] = None,
+                limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+        """
+        Page de la table des résultats, sans le résultat complet de chaque géocache.
+
+        Les valeurs absentes (pas de confiance, pas de coordonnées) sont
+        toujours placées en fin de liste.
+
+        Raises:
+            ValueError: tri inconnu
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Tri inconnu : {sort} (disponibles : {', '.join(SORTS)})")
+        where = "zone_id = ? AND target = ?"
+        params: List[Any] = [zone_id, target]
+        if with_coordinates:
+            where += " AND latitude IS NOT NULL"
+        if min_confidence is not None:
+            where += " AND confidence >= ?"
+            params.append(float(min_confidence))
+        direction = 'DESC' if descending else 'ASC'
+        primary, secondary = SORTS[sort]
+        order = f"{primary} IS NULL, {primary} {direction}"
+        if secondary:
+            order += f", {secondary}"
+        with self._lock:
+            total = self._connection.execute(f"SELECT COUNT(*) FROM batch_results WHERE {where}", params).fetchone()[0]
+            rows = self._connection.execute(
+                f"SELECT {', '.join(_LIST_COLUMNS)} FROM batch_results WHERE {where} "
+                f"ORDER BY {order}, gc_code LIMIT ? OFFSET ?", params + [int(limit), int(offset)]
+            ).fetchall()
+        items = []
+        for row in rows:
+            item = dict(zip(_LIST_COLUMNS, row))
+            item['coordinates'] = json.loads(item['coordinates']) if item['coordinates'] else None
+            items.append(item)
+        return {'total': total, 'results': items}
+
+    def result(self, zone_id: int, target: str, geocache_id: int) -> Optional[Dict[str, Any]]:
+        """Résultat complet d'une géocache, ou None."""
+        columns = _ROW_COLUMNS + ('updated_at',)
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(columns)} FROM batch_results WHERE zone_id = ? AND target = ? AND geocache_id = ?",
+                (zone_id, target, geocache_id)
+            ).fetchone()
+        if row is None:
+            return None
+        item = dict(zip(columns, row))
+        for column in ('coordinates', 'result'):
+            item[column] = json.loads(item[column]) if item[column] else None
+        return item
+
+    def summary(self, zone_id: int) -> List[Dict[str, Any]]:
+        """Cibles déjà exécutées sur une zone, avec le nombre de résultats de chaque sorte."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT target, COUNT(*), SUM(status = 'ok'), SUM(status = 'error'), SUM(latitude IS NOT NULL), "
+                "MAX(confidence), MAX(updated_at) FROM batch_results WHERE zone_id = ? GROUP BY target ORDER BY target",
+                (zone_id,)
+            ).fetchall()
+        return [
+            {'target': row[0], 'results': row[1], 'ok': row[2] or 0, 'errors': row[3] or 0,
+             'with_coordinates': row[4] or 0, 'best_confidence': row[5], 'updated_at': row[6]}
+            for row in rows
+        ]
+
+
+# ------------------------------------------------------------------------------
+# Cible et géocaches
+# ------------------------------------------------------------------------------
+
+def _pipeline_version(metadata: Dict[str, Any], versions: Dict[str, str]) -> str:
+    """Version d'une pipeline : la sienne et celles de tous ses sous-plugins."""
+    from app.services.analysis_pipeline_service import parse_pipeline
+    parts = [metadata.get('version', '')]
+    parts += [f"{step.plugin_name}:{versions.get(step.plugin_name, '?')}"
+              for step in parse_pipeline(metadata.get('pipeline', []))]
+    return f"{metadata.get('version', '')}+{hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]}"
+
+
+def build_target(name: str, plugin_records: List[Dict[str, Any]], inputs: Optional[Dict[str, Any]] = None
+                 ) -> Dict[str, Any]:
+    """
+    Décrit la cible d'un lot à partir des enregistrements des plugins actifs
+    (dicts name, path, metadata_json).
+
+    Raises:
+        ValueError: plugin inconnu ou désactivé
+    """
+    records = {record['name']: record for record in plugin_records}
+    if name not in records:
+        raise ValueError(f"Plugin {name} introuvable ou désactivé")
+    metadata = json.loads(records[name]['metadata_json'] or '{}')
+    target = {'name': name, 'kind': PLUGIN, 'version': metadata.get('version', ''), 'inputs': dict(inputs or {})}
+    if metadata.get('pipeline'):
+        versions = {}
+        for record in plugin_records:
+            versions[record['name']] = json.loads(record['metadata_json'] or '{}').get('version', '')
+        target.update(kind=PIPELINE, version=_pipeline_version(metadata, versions),
+                      plugin_json=os.path.join(records[name]['path'], 'plugin.json'))
+    return target
+
+
+def enabled_plugin_records() -> List[Dict[str, Any]]:
+    """Enregistrements des plugins actifs, transmissibles aux processus de calcul."""
+    from app.models.plugin_model import Plugin
+    return [{'name': plugin.name, 'path': plugin.path, 'metadata_json': plugin.metadata_json}
+            for plugin in Plugin.query.filter_by(enabled=True).all()]
+
+
+# Champs des waypoints additionnels transmis aux processus de calcul (ceux de l'empreinte)
+WAYPOINT_FIELDS = ('prefix', 'lookup', 'name', 'gc_lat', 'gc_lon', 'note')
+
+
+def load_zone_tasks(zone_id: int) -> List[Dict[str, Any]]:
+    """
+    Une tâche par géocache de la zone : identifiants, description, waypoints
+    additionnels et empreinte du contenu.
+    """
+    from sqlalchemy.orm import load_only, selectinload
+    from app.models.geocache import Geocache, Zone
+    from app.services.analysis_pipeline_service import geocache_fingerprint
+
+    geocaches = (
+        Geocache.query
+        .filter(Geocache.zones.any(Zone.id == zone_id))
+        .options(load_only(Geocache.id, Geocache.gc_code, Geocache.name, Geocache.description),
+                 selectinload(Geocache.additional_waypoints))
+        .order_by(Geocache.id)
+        .all()
+    )
+    return [{
+        'geocache_id': geocache.id,
+        'gc_code': geocache.gc_code,
+        'name': geocache.name,
+        'description': geocache.description or '',
+        'waypoints': [{field: getattr(waypoint, field) for field in WAYPOINT_FIELDS}
+                      for waypoint in geocache.additional_waypoints],
+        'fingerprint': geocache_fingerprint(geocache),
+    } for geocache in geocaches]
+
+
+# ------------------------------------------------------------------------------
+# Traitement d'une géocache (dans un processus de calcul ou dans le processus courant)
+# ------------------------------------------------------------------------------
+
+_pipeline_service = None
+
+
+def _run_pipeline(plugin_manager, target: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+    global _pipeline_service
+    from app.services.analysis_pipeline_service import AnalysisPipelineService
+    if _pipeline_service is None:
+        # Les géocaches sont déjà réparties entre les processus : étapes exécutées l'une après l'autre
+        _pipeline_service = AnalysisPipelineService(max_workers=1)
+    # Même contenu que la géocache en base (description et waypoints), donc même empreinte ;
+    # les plugins qui ont besoin des waypoints complets les relisent par geocache_id
+    geocache = SimpleNamespace(id=task['geocache_id'], gc_code=task['gc_code'],
+                               description=task['description'],
+                               additional_waypoints=[SimpleNamespace(**waypoint)
+                                                     for waypoint in task.get('waypoints') or []])
+    for event in _pipeline_service.analyze(geocache, target['plugin_json'], plugin_manager, use_cache=False):
+        if event.get('done'):
+            return {'combined_results': event['combined_results'],
+                    'primary_coordinates': event['primary_coordinates']}
+    return {}
+
+
+def process_geocache(plugin_manager, target: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+    """Exécute la cible sur une géocache et renvoie la ligne de résultat correspondante."""
+    start = time.perf_counter()
+    row = {key: task.get(key) for key in ('geocache_id', 'gc_code', 'name', 'fingerprint')}
+    row['target_version'] = target['version']
+    try:
+        if target['kind'] == PIPELINE:
+            result = _run_pipeline(plugin_manager, target, task)
+        else:
+            inputs = dict(target.get('inputs') or {})
+            inputs.update(text=task['description'], geocache_id=task['geocache_id'])
+            result = plugin_manager.execute_plugin(target['name'], inputs)
+            if result is None:
+                raise RuntimeError(f"Plugin {target['name']} non disponible")
+        confidence, coordinates = summarize_result(result)
+        row.update(status=OK, result=result, confidence=confidence, coordinates=coordinates,
+                   latitude=coordinates['latitude'] if coordinates else None,
+                   longitude=coordinates['longitude'] if coordinates else None)
+    except Exception as e:
+        row.update(status=ERROR, error=str(e))
+    row['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return row
+
+
+def build_plugin_manager(worker_config: Dict[str, Any]):
+    """Gestionnaire de plugins sans accès à la base, construit à partir des enregistrements transmis."""
+    from app.plugin_manager import PluginManager
+    plugin_manager = PluginManager(worker_config['plugins_dir'])
+    plugin_manager.register_plugins(worker_config['plugin_records'])
+    return plugin_manager
+
+
+_worker_plugin_manager = None
+
+
+def _init_worker(worker_config: Dict[str, Any]):
+    """
+    Initialisation d'un processus de calcul : les wrappers des plugins transmis
+    (import différé, sans lecture du dossier ni de la base des plugins) et, si
+    configuré, une application Flask réduite à la base de données pour les
+    plugins qui lisent la géocache (`Geocache.query`) ou appellent d'autres
+    plugins (`current_app.plugin_manager`). Rien n'est démarré ni écrit.
+    """
+    global _worker_plugin_manager
+    _worker_plugin_manager = build_plugin_manager(worker_config)
+    if worker_config.get('app_config'):
+        from flask import Flask
+        from app.database import db
+        app = Flask(__name__)
+        app.config.update(worker_config['app_config'])
+        db.init_app(app)
+        # Certains plugins appellent d'autres plugins via current_app.plugin_manager
+        app.plugin_manager = _worker_plugin_manager
+        _worker_plugin_manager.app = app
+        app.app_context().push()
+
+
+def _run_task(target: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+    return process_geocache(_worker_plugin_manager, target, task)
+
+
+def _execute(target: Dict[str, Any], tasks: List[Dict[str, Any]], processes: int,
+             worker_config: Dict[str, Any], plugin_manager=None) -> Iterator[Dict[str, Any]]:
+    """Produit la ligne de résultat de chaque tâche, dans l'ordre des tâches."""
+    if processes > 1 and len(tasks) > 1:
+        processes = min(processes, len(tasks))
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            # spawn : l'application a des threads (workers, surveillance des plugins) qu'un fork copierait mal
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(worker_config,),
+        )
+        try:
+            chunksize = max(1, min(MAX_CHUNKSIZE, len(tasks) // (processes * 4)))
+            yield from executor.map(_run_task, repeat(target), tasks, chunksize=chunksize)
+        finally:
+            # Annulation ou erreur : les géocaches pas encore envoyées aux processus sont abandonnées
+            executor.shutdown(wait=True, cancel_futures=True)
+        return
+
+    if plugin_manager is None:
+        plugin_manager = build_plugin_manager(worker_config)
+    for task in tasks:
+        yield process_geocache(plugin_manager, target, task)
+
+
+def run_zone_batch(zone_id: int, target: Dict[str, Any], tasks: List[Dict[str, Any]], store: ZoneBatchStore,
+                   worker_config: Dict[str, Any], processes: Optional[int] = None, force: bool = False,
+                   job=None, plugin_manager=None) -> Dict[str, Any]:
+    """
+    Exécute la cible sur les géocaches d'une zone et enregistre les résultats.
+
+    Args:
+        zone_id: Zone traitée
+        target: Cible décrite par build_target
+        tasks: Géocaches de la zone (cf. load_zone_tasks)
+        store: Table des résultats
+        worker_config: {"plugins_dir", "plugin_records", "app_config"} pour les processus de calcul
+        processes: Nombre de processus (par défaut un par cœur ; 1 = processus courant)
+        force: Retraiter aussi les géocaches inchangées
+        job: JobContext de la tâche de fond (progression, point de reprise, annulation)
+        plugin_manager: Gestionnaire utilisé quand le lot s'exécute dans le processus courant
+
+    Returns:
+        {"total", "processed", "skipped", "errors", "with_coordinates", "processes"}
+    """
+    processes = processes or os.cpu_count() or 1
+    previous = store.signatures(zone_id, target['name'])
+    current_ids = {task['geocache_id'] for task in tasks}
+    # Géocaches retirées de la zone depuis le dernier lot
+    stale = [geocache_id for geocache_id in previous if geocache_id not in current_ids]
+    if stale:
+        store.delete(zone_id, target['name'], stale)
+
+    checkpoint = (job.checkpoint if job is not None else None) or {}
+    started_at = checkpoint.get('started_at')
+    # Reprise : les géocaches enregistrées depuis le début du lot ne sont ni retraitées (même
+    # avec force ou en erreur) ni recomptées ; les compteurs sont relus dans la table
+    resumed = {}
+    if started_at is not None:
+        saved = store.updated_since(zone_id, target['name'], started_at)
+        resumed = {geocache_id: row for geocache_id, row in saved.items() if geocache_id in current_ids}
+    else:
+        started_at = store.now()
+    pending = [task for task in tasks if task['geocache_id'] not in resumed and (
+        force or previous.get(task['geocache_id']) != (task['fingerprint'], target['version'], OK))]
+    processed = len(resumed)
+    errors = sum(1 for status, _ in resumed.values() if status == ERROR)
+    with_coordinates = sum(1 for _, has_coordinates in resumed.values() if has_coordinates)
+    # Les géocaches traitées avant une interruption ne comptent pas comme ignorées
+    skipped = len(tasks) - len(pending) - processed
+    total = len(tasks)
+
+    def report(buffer):
+        store.save(zone_id, target['name'], buffer)
+        buffer.clear()
+        if job is not None:
+            done = processed + skipped
+            job.report(done * 100 / total if total else 100,
+                       f"{done}/{total} géocaches ({errors} erreur(s))",
+                       checkpoint={'started_at': started_at, 'processed': processed, 'errors': errors,
+                                   'with_coordinates': with_coordinates})
+            job.check_cancelled()
+
+    buffer = []
+    for row in _execute(target, pending, processes, worker_config, plugin_manager):
+        buffer.append(row)
+        processed += 1
+        errors += row['status'] == ERROR
+        with_coordinates += row.get('latitude') is not None
+        if len(buffer) >= SAVE_EVERY:
+            report(buffer)
+    report(buffer)
+
+    return {'total': total, 'processed': processed, 'skipped': skipped, 'errors': errors,
+            'with_coordinates': with_coordinates, 'processes': min(processes, max(len(pending), 1))}
+
+
+# Instance singleton
+_zone_batch_store_instance = None
+
+def get_zone_batch_store() -> ZoneBatchStore:
+    """
+    Retourne l'instance singleton de la table des résultats
+    (base `zone_batch.db` à la racine du projet).
+
+    Returns:
+        L'instance de ZoneBatchStore
+    """
+    global _zone_batch_store_instance
+    if _zone_batch_store_instance is None:
+        basedir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        _zone_batch_store_instance = ZoneBatchStore(os.path.join(basedir, 'zone_batch.db'))
+    return _zone_batch_store_instance
@@ -0,0 +1,228 @@
+"""
+Opérations ensemblistes sur l'appartenance des géocaches aux zones.
+
+Les ajouts, retraits et déplacements de géocaches entre zones s'exécutent
+directement sur la table d'association ``geocache_zone`` par des requêtes
+INSERT ... SELECT et DELETE ... WHERE, sans charger les géocaches ni leurs
+collections ``zones`` dans l'ORM. Les listes d'identifiants sont découpées
+en lots pour rester sous la limite de variables de SQLite, et la sélection
+par filtre (type, difficulté, terrain, statut, emprise) reste entièrement
+dans la base.
+
+Les fonctions ne valident pas la transaction : l'appelant fait le commit.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import and_, delete, exists, func, insert, literal, select
+
+from app.database import db
+from app.models.geocache import (
+    AdditionalWaypoint, Checker, Geocache, GeocacheAttribute, GeocacheImage,
+    GeocacheNote, GeocacheZone, Log, Zone,
+)
+from app.models.plugin_result_model import PluginResult
+
+# Nombre d'identifiants par requête (SQLite limite le nombre de paramètres liés)
+CHUNK_SIZE = 500
+
+# Tables dépendantes supprimées avec une géocache (miroir des cascades de l'ORM)
+_DEPENDENT_TABLES = (
+    AdditionalWaypoint.__table__, Checker.__table__, GeocacheImage.__table__, Log.__table__,
+    GeocacheAttribute.__table__, GeocacheNote.__table__, GeocacheZone.__table__, PluginResult.__table__,
+)
+
+_geocache_zone = GeocacheZone.__table__
+_geocache = Geocache.__table__
+# Alias utilisé dans les sous-requêtes de filtre, pour ne pas les corréler à la table modifiée
+_membership = _geocache_zone.alias('membership')
+
+
+def _chunks(ids: Iterable[Any], size: int = CHUNK_SIZE) -> Iterator[List[int]]:
+    """Découpe une liste d'identifiants (dédoublonnés, entiers) en lots."""
+    unique = sorted({int(value) for value in ids})
+    for start in range(0, len(unique), size):
+        yield unique[start:start + size]
+
+
+def _session(session):
+    return session if session is not None else db.session
+
+
+def _insert_into_zone(session, zone_id: int, selection) -> int:
+    """Ajoute à la zone les géocaches de la sélection qui n'y sont pas encore."""
+    ids = selection.where(~exists().where(and_(
+        _membership.c.geocache_id == _geocache.c.id,
+        _membership.c.zone_id == zone_id,
+    )))
+    statement = insert(_geocache_zone).from_select(
+        ['geocache_id', 'zone_id', 'added_at'],
+        ids.with_only_columns(_geocache.c.id, literal(zone_id), literal(datetime.now(timezone.utc))),
+    )
+    return session.execute(statement).rowcount or 0
+
+
+def add_geocaches_to_zone(zone_id: int, geocache_ids: Iterable[Any], session=None) -> int:
+    """
+    Ajoute des géocaches à une zone.
+
+    Les identifiants inexistants et les géocaches déjà présentes sont ignorés.
+
+    Returns:
+        Nombre d'associations créées
+    """
+    session = _session(session)
+    added = 0
+    for chunk in _chunks(geocache_ids):
+        added += _insert_into_zone(session, zone_id, select(_geocache.c.id).where(_geocache.c.id.in_(chunk)))
+    return added
+
+
+def remove_geocaches_from_zone(zone_id: int, geocache_ids: Iterable[Any], session=None) -> int:
+    """
+    Retire des géocaches d'une zone (les géocaches elles-mêmes sont conservées).
+
+    Returns:
+        Nombre d'associations supprimées
+    """
+    session = _session(session)
+    removed = 0
+    for chunk in _chunks(geocache_ids):
+        removed += session.execute(delete(_geocache_zone).where(
+            _geocache_zone.c.zone_id == zone_id,
+            _geocache_zone.c.geocache_id.in_(chunk),
+        )).rowcount or 0
+    return removed
+
+
+def move_geocaches_to_zone(source_zone_id: int, target_zone_id: int, geocache_ids: Iterable[Any],
+                           session=None) -> Dict[str, int]:
+    """
+    Déplace des géocaches d'une zone vers une autre.
+
+    Seules les géocaches présentes dans la zone source sont déplacées.
+
+    Returns:
+        {"moved": nombre de géocaches retirées de la source, "added": nombre ajoutées à la cible}
+    """
+    session = _session(session)
+    moved = added = 0
+    if source_zone_id == target_zone_id:
+        return {"moved": 0, "added": 0}
+    for chunk in _chunks(geocache_ids):
+        in_source = select(_geocache.c.id).where(
+            _geocache.c.id.in_(chunk),
+            exists().where(and_(_membership.c.geocache_id == _geocache.c.id,
+                                _membership.c.zone_id == source_zone_id)),
+        )
+        added += _insert_into_zone(session, target_zone_id, in_source)
+        moved += session.execute(delete(_geocache_zone).where(
+            _geocache_zone.c.zone_id == source_zone_id,
+            _geocache_zone.c.geocache_id.in_(chunk),
+        )).rowcount or 0
+    return {"moved": moved, "added": added}
+
+
+def select_geocaches(source_zone_id: Optional[int] = None, cache_types: Optional[Sequence[str]] = None,
+                     difficulty_min: Optional[float] = None, difficulty_max: Optional[float] = None,
+                     terrain_min: Optional[float] = None, terrain_max: Optional[float] = None,
+                     solved: Optional[Sequence[str]] = None, bbox: Optional[Sequence[float]] = None):
+    """
+    Construit la requête SELECT des identifiants de géocaches correspondant aux filtres.
+
+    Args:
+        source_zone_id: Limite aux géocaches de cette zone
+        cache_types: Types de cache acceptés
+        difficulty_min, difficulty_max, terrain_min, terrain_max: Bornes D/T incluses
+        solved: Statuts de résolution acceptés
+        bbox: Emprise [lat_min, lon_min, lat_max, lon_max] en degrés décimaux
+
+    Returns:
+        Requête SQLAlchemy (non exécutée) sélectionnant ``geocache.id``
+    """
+    conditions = []
+    if source_zone_id is not None:
+        conditions.append(exists().where(and_(_membership.c.geocache_id == _geocache.c.id,
+                                              _membership.c.zone_id == source_zone_id)))
+    if cache_types:
+        conditions.append(_geocache.c.cache_type.in_(list(cache_types)))
+    if solved:
+        conditions.append(_geocache.c.solved.in_(list(solved)))
+    for column, minimum, maximum in ((_geocache.c.difficulty, difficulty_min, difficulty_max),
+                                     (_geocache.c.terrain, terrain_min, terrain_max)):
+        if minimum is not None:
+            conditions.append(column >= minimum)
+        if maximum is not None:
+            conditions.append(column <= maximum)
+    if bbox is not None:
+        lat_min, lon_min, lat_max, lon_max = (float(value) for value in bbox)
+        conditions.append(func.ST_Y(_geocache.c.location).between(lat_min, lat_max))
+        conditions.append(func.ST_X(_geocache.c.location).between(lon_min, lon_max))
+    return select(_geocache.c.id).where(*conditions)
+
+
+def count_geocaches(session=None, **filters) -> int:
+    """Compte les géocaches correspondant aux filtres de :func:`select_geocaches`."""
+    selection = select_geocaches(**filters).subquery()
+    return _session(session).execute(select(func.count()).select_from(selection)).scalar() or 0
+
+
+def _require_filters(filters: Dict[str, Any], all_geocaches: bool):
+    """Refuse une modification sans filtre, qui porterait sur toutes les géocaches, sauf demande explicite."""
+    if not all_geocaches and all(value is None or value == [] for value in filters.values()):
+        raise ValueError("Aucun filtre : la sélection porterait sur toutes les géocaches (all_geocaches=True)")
+
+
+def add_geocaches_by_filter(target_zone_id: int, session=None, all_geocaches: bool = False, **filters) -> int:
+    """
+    Ajoute à une zone toutes les géocaches correspondant aux filtres, en une requête.
+    Sans filtre, lève ValueError sauf si all_geocaches est vrai.
+    """
+    _require_filters(filters, all_geocaches)
+    return _insert_into_zone(_session(session), target_zone_id, select_geocaches(**filters))
+
+
+def remove_geocaches_by_filter(zone_id: int, session=None, all_geocaches: bool = False, **filters) -> int:
+    """
+    Retire d'une zone toutes ses géocaches correspondant aux filtres, en une requête.
+    Sans filtre, lève ValueError sauf si all_geocaches est vrai.
+    """
+    _require_filters(filters, all_geocaches)
+    return _session(session).execute(delete(_geocache_zone).where(
+        _geocache_zone.c.zone_id == zone_id,
+        _geocache_zone.c.geocache_id.in_(select_geocaches(**filters)),
+    )).rowcount or 0
+
+
+def delete_zone(zone_id: int, session=None) -> Dict[str, int]:
+    """
+    Supprime une zone.
+
+    Les géocaches qui n'appartiennent qu'à cette zone sont supprimées avec
+    leurs logs, waypoints, checkers, images et associations ; les autres
+    perdent seulement leur référence à la zone.
+
+    Returns:
+        {"deleted_geocaches": ..., "detached_geocaches": ...}
+    """
+    session = _session(session)
+    other_zone = _geocache_zone.alias('other_zone')
+    orphan_ids = session.execute(
+        select(_geocache_zone.c.geocache_id).where(
+            _geocache_zone.c.zone_id == zone_id,
+            ~exists().where(and_(other_zone.c.geocache_id == _geocache_zone.c.geocache_id,
+                                 other_zone.c.zone_id != zone_id)),
+        )
+    ).scalars().all()
+
+    for chunk in _chunks(orphan_ids):
+        for table in _DEPENDENT_TABLES:
+            session.execute(delete(table).where(table.c.geocache_id.in_(chunk)))
+        session.execute(delete(_geocache).where(_geocache.c.id.in_(chunk)))
+
+    detached = session.execute(delete(_geocache_zone).where(_geocache_zone.c.zone_id == zone_id)).rowcount or 0
+    session.execute(delete(Zone.__table__).where(Zone.__table__.c.id == zone_id))
+    # Les objets déjà chargés dans la session ne reflètent plus la base
+    session.expire_all()
+    return {"deleted_geocaches": len(orphan_ids), "detached_geocaches": detached}
@@ -0,0 +1,525 @@
+#!/usr/bin/env python
+"""
+Suite de benchmarks de MysteryAI.
+
+Mesure les temps d'exécution :
+  - de `execute` et `check_code` de chaque plugin officiel,
+  - de `ScoringService.score_text`,
+  - de la segmentation des textes sans espaces (comparée à wordninja),
+  - de `detect_gps_coordinates`,
+  - de `process_gpx_file` sur des GPX de plusieurs milliers de caches,
+  - des endpoints de liste des zones.
+
+Utilisation :
+    python -m app.tools.benchmark run --output benchmarks/baseline.json
+    python -m app.tools.benchmark run --output benchmarks/current.json --only scoring,coordinates
+    python -m app.tools.benchmark compare benchmarks/baseline.json benchmarks/current.json --threshold 0.2
+
+La commande `compare` retourne un code de sortie 1 si au moins un benchmark
+est plus lent que la référence au-delà du seuil (20 % par défaut).
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from unittest.mock import patch
+
+# Ajouter le répertoire racine au PYTHONPATH pour permettre l'import depuis app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.tools.benchmark_corpus import ROOT_DIR, caesar, generate_corpus, generate_gpx
+
+PLUGINS_DIR = os.path.join(ROOT_DIR, 'plugins', 'official')
+
+# Plugins exclus : dépendance réseau ou base de données, ou méta-plugins
+# qui appellent d'autres plugins (mesurés indirectement)
+EXCLUDED_PLUGINS = {
+    'what3words': 'appel réseau',
+    'analysis_web_page': 'méta-plugin (base de données)',
+    'additional_waypoints_analyzer': 'base de données',
+    'metadetection': 'méta-plugin (PluginManager)',
+}
+
+# Corpus utilisé en entrée de chaque plugin (par défaut : textes en clair)
+PLUGIN_CORPUS = {
+    'caesar_code': 'caesar',
+    'affine_code': 'caesar',
+    'morse_code': 'morse',
+    'hexadecimal_to_decimal': 'hex',
+    'base_converter': 'hex',
+    'roman_code': 'roman',
+    'color_text_detector': 'descriptions',
+    'html_comments_finder': 'descriptions',
+    'image_alt_text_extractor': 'descriptions',
+    'formula_parser': 'descriptions',
+    'antipode': 'ddm',
+    'projection_calculation': 'ddm',
+    'orientation_calculation': 'coordinates',
+}
+
+# Plugins dont le texte d'entrée ne s'appelle pas 'text'
+PLUGIN_TEXT_FIELD = {
+    'antipode': 'coordinates',
+    'projection_calculation': 'coordinate_str',
+}
+
+# Paramètres de check_code alimentés par un autre champ de plugin.json
+CHECK_CODE_ALIASES = {
+    'base': 'source_base',
+}
+
+DEFAULT_THRESHOLD = 0.2
+
+
+# ------------------------------------------------------------------------------
+# Mesure
+# ------------------------------------------------------------------------------
+
+def measure(func: Callable, items: Iterable, repeat: int = 3, max_items: Optional[int] = None) -> Dict:
+    """
+    Exécute `func(item)` sur chaque élément, `repeat` fois, et retourne les
+    statistiques par opération (en millisecondes).
+    """
+    items = list(items)[:max_items] if max_items else list(items)
+    timings = []
+    errors = 0
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            try:
+                func(item)
+            except Exception:
+                errors += 1
+            timings.append((time.perf_counter() - start) * 1000)
+    if not timings:
+        return {'error': 'aucun élément à mesurer'}
+    timings.sort()
+    return {
+        'ops': len(timings),
+        'errors': errors,
+        'median_ms': round(statistics.median(timings), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'min_ms': round(timings[0], 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'total_ms': round(sum(timings), 3),
+    }
+
+
+def measure_once(func: Callable) -> Dict:
+    """Mesure une opération unique (ex : import GPX complet)."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    stats = {'ops': 1, 'errors': 0, 'median_ms': round(elapsed, 3), 'mean_ms': round(elapsed, 3),
+             'min_ms': round(elapsed, 3), 'p95_ms': round(elapsed, 3), 'total_ms': round(elapsed, 3)}
+    if isinstance(result, dict):
+        stats['details'] = result
+    return stats
+
+
+# ------------------------------------------------------------------------------
+# Benchmarks
+# ------------------------------------------------------------------------------
+
+def _load_plugin(plugin_dir: str):
+    """Importe le main.py d'un plugin et instancie sa classe *Plugin."""
+    with open(os.path.join(plugin_dir, 'plugin.json'), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    entry_point = os.path.join(plugin_dir, metadata.get('entry_point', 'main.py'))
+    spec = importlib.util.spec_from_file_location(f"bench_{metadata['name']}", entry_point)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for attr in dir(module):
+        obj = getattr(module, attr)
+        if isinstance(obj, type) and attr.endswith('Plugin') and obj.__module__ == module.__name__:
+            return metadata, obj()
+    raise ImportError(f"Aucune classe Plugin dans {entry_point}")
+
+
+def _default_inputs(metadata: Dict) -> Dict:
+    """Construit les paramètres par défaut d'un plugin à partir de son plugin.json."""
+    inputs = {}
+    for key, spec in metadata.get('input_types', {}).items():
+        if isinstance(spec, dict) and 'default' in spec:
+            inputs[key] = spec['default']
+    inputs['mode'] = 'decode'
+    # Le scoring et la détection GPS sont mesurés séparément
+    inputs['enable_scoring'] = False
+    inputs['enable_gps_detection'] = False
+    return inputs
+
+
+def bench_plugins(corpus: Dict, repeat: int) -> Dict:
+    results = {}
+    for name in sorted(os.listdir(PLUGINS_DIR)):
+        plugin_dir = os.path.join(PLUGINS_DIR, name)
+        if not os.path.isfile(os.path.join(plugin_dir, 'plugin.json')):
+            continue
+        if name in EXCLUDED_PLUGINS:
+            results[f'plugin.{name}.execute'] = {'skipped': EXCLUDED_PLUGINS[name]}
+            continue
+        try:
+            metadata, plugin = _load_plugin(plugin_dir)
+        except Exception as e:
+            results[f'plugin.{name}.execute'] = {'error': f'chargement impossible: {e}'}
+            continue
+
+        corpus_key = PLUGIN_CORPUS.get(name, 'plain_texts')
+        texts = corpus['encoded'][corpus_key] if corpus_key in corpus['encoded'] else corpus[corpus_key]
+        base_inputs = _default_inputs(metadata)
+        text_field = PLUGIN_TEXT_FIELD.get(name, 'text')
+
+        results[f'plugin.{name}.execute'] = measure(
+            lambda text: plugin.execute(dict(base_inputs, **{text_field: text})), texts, repeat
+        )
+
+        check_code = getattr(plugin, 'check_code', None)
+        if callable(check_code):
+            kwargs = {}
+            for key in inspect.signature(check_code).parameters:
+                source = CHECK_CODE_ALIASES.get(key, key)
+                if source in base_inputs and key != 'text':
+                    kwargs[key] = base_inputs[source]
+            results[f'plugin.{name}.check_code'] = measure(
+                lambda text: check_code(text, **kwargs), texts, repeat
+            )
+    return results
+
+
+def bench_scoring(corpus: Dict, repeat: int) -> Dict:
+    from app.services.scoring_service import ScoringService
+    with patch.object(ScoringService, 'is_scoring_enabled', return_value=True):
+        service = ScoringService()
+        texts = corpus['plain_texts'] + corpus['encoded']['caesar']
+        return {
+            'scoring.score_text.plain': measure(service.score_text, corpus['plain_texts'], repeat),
+            'scoring.score_text.encoded': measure(service.score_text, corpus['encoded']['caesar'], repeat),
+            'scoring.score_text.all': measure(service.score_text, texts, 1),
+        }
+
+
+def _word_recall(words: List[str], segments: List[str]) -> int:
+    """Nombre de mots d'origine retrouvés parmi les segments."""
+    remaining = list(segments)
+    found = 0
+    for word in words:
+        if word in remaining:
+            remaining.remove(word)
+            found += 1
+    return found
+
+
+def bench_segmentation(corpus: Dict, repeat: int) -> Dict:
+    """
+    Segmentation des textes en clair et des 26 décalages de César des
+    fragments chiffrés, espaces supprimés. Les décalages sont segmentés mémo
+    vidé : les candidats d'une vraie force brute n'ont aucun bloc en commun.
+    Les détails donnent la part des mots d'origine retrouvés (textes en
+    clair) pour chaque segmenteur.
+    """
+    from app.services.word_segmenter import get_word_segmenter
+    from app.utils.text_view import strip_accents
+
+    segmenters = {'fr': get_word_segmenter('fr'), 'en': get_word_segmenter('en')}
+    # Les textes d'indice pair du corpus sont en français, les autres en anglais
+    plain = [(('fr', 'en')[i % 2], [w for w in strip_accents(text.lower()).split() if w.isalpha()])
+             for i, text in enumerate(corpus['plain_texts'])]
+    bruteforce = [caesar(text, shift).replace(' ', '') for text in corpus['encoded']['caesar'] for shift in range(26)]
+
+    def segment(item):
+        language, text = item
+        return segmenters[language].segment(text)
+
+    def segment_cold(item):
+        segmenters[item[0]]._memo.clear()
+        return segment(item)
+
+    def recall(split):
+        details = {}
+        for language in segmenters:
+            samples = [words for lang, words in plain if lang == language]
+            found = sum(_word_recall(words, split(language, ''.join(words))) for words in samples)
+            details[f'recall_{language}'] = round(found / max(1, sum(len(words) for words in samples)), 4)
+        return details
+
+    results = {}
+    for segmenter in segmenters.values():
+        segmenter._memo.clear()
+    results['segmentation.segment.plain'] = measure(segment, [(lang, ''.join(words)) for lang, words in plain], 1)
+    results['segmentation.segment.bruteforce'] = measure(segment_cold, [('fr', text) for text in bruteforce], repeat)
+    results['segmentation.segment.recall'] = measure_once(
+        lambda: recall(lambda language, text: segmenters[language].segment(text)))
+
+    try:
+        import wordninja
+    except ImportError:
+        results['segmentation.wordninja'] = {'skipped': 'wordninja non installé'}
+        return results
+    results['segmentation.wordninja.plain'] = measure(wordninja.split, [''.join(words) for _, words in plain], 1)
+    results['segmentation.wordninja.bruteforce'] = measure(wordninja.split, bruteforce, repeat)
+    results['segmentation.wordninja.recall'] = measure_once(
+        lambda: recall(lambda language, text: [w.lower() for w in wordninja.split(text)]))
+    return results
+
+
+BENCH_FORMULA = 'N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)'
+
+
+def _rows(batch) -> List[Dict]:
+    return [batch.row(i) for i in range(batch.size)]
+
+
+def bench_coordinates(corpus: Dict, repeat: int) -> Dict:
+    from app.routes.coordinates import convert_ddm_to_decimal, detect_gps_coordinates
+    from app.services.formula_engine import compile_formula
+    from app.services.formula_bruteforce_service import FormulaBruteForceSolver
+    from app.utils import geodesy
+    from app.utils.coordinates import format_ddm_many, parse_ddm, parse_ddm_many
+
+    assignments = [
+        {'A': a, 'B': b, 'C': c, 'D': 3, 'E': 4, 'F': 1}
+        for a in range(10) for b in range(5, 10) for c in range(10)
+    ]
+    rng = random.Random(0)
+    points = [(49.0 + rng.random(), 6.0 + rng.random()) for _ in range(300)]
+    codec_lats = [rng.uniform(-80, 80) for _ in range(1000)]
+    codec_lons = [rng.uniform(-179, 179) for _ in range(1000)]
+    ddm_pairs = format_ddm_many(codec_lats, codec_lons)
+    ddm_strings = [f"{gc_lat} {gc_lon}" for gc_lat, gc_lon in ddm_pairs]
+    return {
+        'coordinates.formula.single': measure(
+            lambda variables: compile_formula(BENCH_FORMULA).evaluate(variables).row(0), assignments[:100], repeat
+        ),
+        'coordinates.formula.batch_500': measure(
+            lambda batch: _rows(compile_formula(BENCH_FORMULA).evaluate_many(batch)), [assignments], repeat
+        ),
+        'coordinates.formula.solve_6_letters': measure(
+            lambda formula: FormulaBruteForceSolver(
+                compile_formula(formula), {}, origin=(49.3, 6 + 16 / 60), max_results=100
+            ).solve(),
+            [BENCH_FORMULA], repeat
+        ),
+        'coordinates.geodesy.distance_matrix_300': measure(
+            lambda pts: geodesy.distance_matrix([p[0] for p in pts], [p[1] for p in pts]), [points], repeat
+        ),
+        'coordinates.codec.parse_uncached': measure(parse_ddm.__wrapped__, ddm_strings[:200], repeat),
+        'coordinates.codec.parse_cached': measure(parse_ddm, ddm_strings[:200], repeat),
+        'coordinates.codec.legacy_convert_ddm': measure(
+            lambda pair: convert_ddm_to_decimal(*pair), ddm_pairs[:200], repeat
+        ),
+        'coordinates.codec.parse_many_1000': measure(parse_ddm_many, [ddm_strings], repeat),
+        'coordinates.codec.format_many_1000': measure(
+            lambda values: format_ddm_many(*values), [(codec_lats, codec_lons)], repeat
+        ),
+        'coordinates.detect.variants': measure(detect_gps_coordinates, corpus['coordinates'], repeat),
+        'coordinates.detect.plain_texts': measure(detect_gps_coordinates, corpus['plain_texts'], repeat),
+        'coordinates.detect.numeric_only': measure(
+            lambda text: detect_gps_coordinates(text, include_numeric_only=True), corpus['coordinates'], repeat
+        ),
+    }
+
+
+def _create_bench_app(workdir: str):
+    """Application Flask minimale, avec des bases SQLite temporaires."""
+    from flask import Flask
+    from app.config import Config
+    from app.database import db
+    from app.routes.geocaches import geocaches_bp
+    from app.routes.zones import zones_bp
+
+    app = Flask('benchmark', template_folder=os.path.join(ROOT_DIR, 'templates'))
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    app.config['SQLALCHEMY_BINDS'] = {
+        'plugins': 'sqlite:///' + os.path.join(workdir, 'plugins.db'),
+        'config': 'sqlite:///' + os.path.join(workdir, 'config.db'),
+    }
+    db.init_app(app)
+    app.register_blueprint(geocaches_bp)
+    app.register_blueprint(zones_bp)
+    return app
+
+
+def bench_gpx_and_zones(gpx_sizes: List[int], seed: int) -> Dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            from app.database import db
+            from app.models.geocache import Zone
+            from app.routes.geocaches import process_gpx_file
+
+            app = _create_bench_app(workdir)
+            with app.app_context():
+                db.create_all()
+        except Exception as e:
+            message = f'environnement indisponible: {e.__class__.__name__}: {str(e).splitlines()[0]}'
+            for size in gpx_sizes:
+                results[f'gpx.process_gpx_file.{size}'] = {'error': message}
+            results['zones.list'] = {'error': message}
+            return results
+
+        zone_ids = []
+        for size in gpx_sizes:
+            gpx_path = generate_gpx(os.path.join(workdir, f'bench_{size}.gpx'), size, seed)
+            with app.app_context():
+                zone = Zone(name=f'bench-{size}', description='Benchmark')
+                db.session.add(zone)
+                db.session.commit()
+                zone_ids.append(zone.id)
+                try:
+                    results[f'gpx.process_gpx_file.{size}'] = measure_once(
+                        lambda: process_gpx_file(gpx_path, zone.id, False)
+                    )
+                except Exception as e:
+                    results[f'gpx.process_gpx_file.{size}'] = {'error': str(e)}
+
+        client = app.test_client()
+        results['zones.api_list'] = measure(lambda _: client.get('/api/zones'), range(20), 1)
+        results['zones.html_list'] = measure(lambda _: client.get('/zones'), range(20), 1)
+        for size, zone_id in zip(gpx_sizes, zone_ids):
+            results[f'zones.api_detail.{size}'] = measure(lambda _: client.get(f'/api/zones/{zone_id}'), range(20), 1)
+            results[f'zones.geocaches.{size}'] = measure(
+                lambda _: client.get(f'/api/zones/{zone_id}/geocaches'), range(5), 1
+            )
+    return results
+
+
+SUITES = {
+    'plugins': lambda args, corpus: bench_plugins(corpus, args.repeat),
+    'scoring': lambda args, corpus: bench_scoring(corpus, args.repeat),
+    'segmentation': lambda args, corpus: bench_segmentation(corpus, args.repeat),
+    'coordinates': lambda args, corpus: bench_coordinates(corpus, args.repeat),
+    'gpx': lambda args, corpus: bench_gpx_and_zones(args.gpx_sizes, args.seed),
+}
+
+
+# ------------------------------------------------------------------------------
+# Comparaison
+# ------------------------------------------------------------------------------
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare deux fichiers de résultats (médianes par opération).
+
+    Returns:
+        Liste de lignes {name, baseline_ms, current_ms, ratio, status}
+        où status vaut 'regression', 'improvement', 'ok' ou 'missing'.
+    """
+    rows = []
+    base_benchmarks = baseline.get('benchmarks', {})
+    current_benchmarks = current.get('benchmarks', {})
+    for name in sorted(set(base_benchmarks) | set(current_benchmarks)):
+        base = base_benchmarks.get(name, {})
+        cur = current_benchmarks.get(name, {})
+        if 'median_ms' not in base or 'median_ms' not in cur:
+            rows.append({'name': name, 'baseline_ms': base.get('median_ms'), 'current_ms': cur.get('median_ms'),
+                         'ratio': None, 'status': 'missing'})
+            continue
+        ratio = cur['median_ms'] / base['median_ms'] if base['median_ms'] > 0 else 1.0
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline_ms': base['median_ms'], 'current_ms': cur['median_ms'],
+                     'ratio': round(ratio, 3), 'status': status})
+    return rows
+
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+
+def run(args) -> int:
+    selected = args.only.split(',') if args.only else list(SUITES)
+    corpus = generate_corpus(seed=args.seed, scale=args.scale)
+    benchmarks = {}
+    for suite in selected:
+        print(f"=== Benchmark {suite} ===")
+        start = time.perf_counter()
+        benchmarks.update(SUITES[suite](args, corpus))
+        print(f"    terminé en {time.perf_counter() - start:.1f}s")
+
+    output = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'scale': args.scale,
+            'repeat': args.repeat,
+            'suites': selected,
+        },
+        'benchmarks': benchmarks,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+
+    for name, stats in sorted(benchmarks.items()):
+        if 'median_ms' in stats:
+            print(f"{name:55s} {stats['median_ms']:>10.3f} ms  (p95 {stats['p95_ms']:.3f} ms, {stats['ops']} ops)")
+        else:
+            print(f"{name:55s} {stats.get('skipped') or stats.get('error')}")
+    print(f"Résultats enregistrés dans {args.output}")
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    for row in rows:
+        if row['status'] == 'missing':
+            continue
+        marker = {'regression': '!!', 'improvement': '++'}.get(row['status'], '  ')
+        print(f"{marker} {row['name']:55s} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms  x{row['ratio']}")
+
+    regressions = [row for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        return 1
+    print("Aucune régression détectée")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de MysteryAI")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Exécute les benchmarks et écrit un fichier JSON")
+    run_parser.add_argument('--output', default=os.path.join(ROOT_DIR, 'benchmarks', 'results.json'))
+    run_parser.add_argument('--only', help=f"Suites à exécuter, séparées par des virgules ({', '.join(SUITES)})")
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--scale', type=int, default=1)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--gpx-sizes', type=lambda v: [int(x) for x in v.split(',')], default=[1000, 5000])
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser('compare', help="Compare deux fichiers de résultats")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="Ralentissement toléré (0.2 = 20 %%)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+Générateur de corpus synthétique déterministe pour les benchmarks.
+
+Le corpus couvre :
+  - des descriptions de géocaches (HTML, FR/EN, coordonnées cachées, commentaires),
+  - des fragments encodés (César, Morse, hexadécimal, chiffres romains),
+  - des variantes d'écriture de coordonnées (et une liste DDM canonique),
+  - des fichiers GPX de plusieurs milliers de caches, construits à partir de
+    l'échantillon `25622928.gpx` fourni avec le dépôt.
+
+Toutes les données dépendent uniquement de la graine (`seed`) et de l'échelle :
+deux exécutions avec les mêmes paramètres produisent exactement le même corpus.
+"""
+
+import copy
+import os
+import random
+import xml.etree.ElementTree as ET
+from typing import Dict, List
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+SAMPLE_GPX = os.path.join(ROOT_DIR, '25622928.gpx')
+
+GPX_NS = 'http://www.topografix.com/GPX/1/0'
+GROUNDSPEAK_NS = 'http://www.groundspeak.com/cache/1/0/1'
+
+FR_WORDS = [
+    'le', 'la', 'les', 'une', 'des', 'cache', 'est', 'dans', 'avec', 'pour', 'vous', 'nous',
+    'trouver', 'chercher', 'arbre', 'pont', 'rivière', 'forêt', 'chemin', 'église', 'pierre',
+    'nord', 'est', 'sud', 'ouest', 'mètres', 'boîte', 'sous', 'derrière', 'près', 'vieux',
+    'énigme', 'résoudre', 'coordonnées', 'finale', 'indice', 'mystère', 'village', 'château'
+]
+EN_WORDS = [
+    'the', 'a', 'cache', 'is', 'in', 'with', 'for', 'you', 'we', 'find', 'search', 'tree',
+    'bridge', 'river', 'forest', 'path', 'church', 'stone', 'north', 'east', 'south', 'west',
+    'meters', 'box', 'under', 'behind', 'near', 'old', 'puzzle', 'solve', 'coordinates',
+    'final', 'hint', 'mystery', 'village', 'castle'
+]
+
+MORSE_TABLE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.', 'G': '--.',
+    'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..', 'M': '--', 'N': '-.',
+    'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.', 'S': '...', 'T': '-', 'U': '..-',
+    'V': '...-', 'W': '.--', 'X': '-..-', 'Y': '-.--', 'Z': '--..',
+    '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-', '5': '.....',
+    '6': '-....', '7': '--...', '8': '---..', '9': '----.'
+}
+
+ROMAN_VALUES = [
+    (1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+    (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')
+]
+
+
+# ------------------------------------------------------------------------------
+# Encodeurs simples (indépendants des plugins pour ne pas fausser les mesures)
+# ------------------------------------------------------------------------------
+
+def caesar(text: str, shift: int) -> str:
+    result = []
+    for char in text:
+        if 'a' <= char <= 'z':
+            result.append(chr((ord(char) - 97 + shift) % 26 + 97))
+        elif 'A' <= char <= 'Z':
+            result.append(chr((ord(char) - 65 + shift) % 26 + 65))
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def morse(text: str) -> str:
+    words = []
+    for word in text.upper().split():
+        words.append(' '.join(MORSE_TABLE[c] for c in word if c in MORSE_TABLE))
+    return ' / '.join(w for w in words if w)
+
+
+def roman(number: int) -> str:
+    result = ''
+    for value, symbol in ROMAN_VALUES:
+        while number >= value:
+            result += symbol
+            number -= value
+    return result
+
+
+# ------------------------------------------------------------------------------
+# Coordonnées
+# ------------------------------------------------------------------------------
+
+def random_coordinates(rng: random.Random) -> Dict:
+    """Tire des coordonnées DDM plausibles (Europe de l'Ouest)."""
+    return {
+        'lat_deg': rng.randint(43, 51),
+        'lat_min': rng.randint(0, 59),
+        'lat_dec': rng.randint(0, 999),
+        'lon_deg': rng.randint(0, 9),
+        'lon_min': rng.randint(0, 59),
+        'lon_dec': rng.randint(0, 999),
+    }
+
+
+def coordinate_variants(c: Dict) -> List[str]:
+    """Retourne plusieurs écritures d'une même coordonnée."""
+    return [
+        f"N {c['lat_deg']}° {c['lat_min']:02d}.{c['lat_dec']:03d}' E {c['lon_deg']:03d}° {c['lon_min']:02d}.{c['lon_dec']:03d}'",
+        f"N {c['lat_deg']} ° {c['lat_min']:02d} . {c['lat_dec']:03d} E {c['lon_deg']} ° {c['lon_min']:02d} . {c['lon_dec']:03d}",
+        f"NORD {c['lat_deg']} {c['lat_min']:02d} {c['lat_dec']:03d} EST {c['lon_deg']} {c['lon_min']:02d} {c['lon_dec']:03d}",
+        f"N{c['lat_deg']}{c['lat_min']:02d}{c['lat_dec']:03d}E{c['lon_deg']:03d}{c['lon_min']:02d}{c['lon_dec']:03d}",
+        f"N {c['lat_deg']}° {c['lat_min']}' {c['lat_dec'] % 60}\" E {c['lon_deg']}° {c['lon_min']}' {c['lon_dec'] % 60}\"",
+        f"Les coordonnées finales sont N{c['lat_deg']}°{c['lat_min']:02d}.{c['lat_dec']:03d} E{c['lon_deg']:03d}°{c['lon_min']:02d}.{c['lon_dec']:03d} bonne chance",
+    ]
+
+
+# ------------------------------------------------------------------------------
+# Textes
+# ------------------------------------------------------------------------------
+
+def sentence(rng: random.Random, words: List[str], length: int) -> str:
+    return ' '.join(rng.choice(words) for _ in range(length))
+
+
+def generate_descriptions(rng: random.Random, count: int) -> List[str]:
+    """Descriptions HTML de géocaches, avec du texte caché et des commentaires."""
+    descriptions = []
+    for i in range(count):
+        words = FR_WORDS if i % 2 == 0 else EN_WORDS
+        coords = coordinate_variants(random_coordinates(rng))
+        paragraphs = [f'<p>{sentence(rng, words, rng.randint(20, 60))}</p>' for _ in range(rng.randint(3, 8))]
+        paragraphs.insert(
+            rng.randint(0, len(paragraphs)),
+            f'<span style="color:#ffffff;background-color:#ffffff">{coords[0]}</span>'
+        )
+        paragraphs.append(f'<!-- {coords[rng.randint(0, len(coords) - 1)]} -->')
+        paragraphs.append(f'<img src="img{i}.jpg" alt="{sentence(rng, words, 5)}" title="{sentence(rng, words, 3)}">')
+        descriptions.append('<div class="UserSuppliedContent">' + '\n'.join(paragraphs) + '</div>')
+    return descriptions
+
+
+def generate_plain_texts(rng: random.Random, count: int) -> List[str]:
+    """Textes en clair (FR/EN), certains contenant des coordonnées."""
+    texts = []
+    for i in range(count):
+        words = FR_WORDS if i % 2 == 0 else EN_WORDS
+        text = sentence(rng, words, rng.randint(6, 30))
+        if i % 3 == 0:
+            text += ' ' + coordinate_variants(random_coordinates(rng))[0]
+        texts.append(text)
+    return texts
+
+
+def generate_encoded_fragments(rng: random.Random, count: int) -> Dict[str, List[str]]:
+    """Fragments encodés, regroupés par type d'encodage."""
+    fragments = {'caesar': [], 'morse': [], 'hex': [], 'roman': []}
+    for i in range(count):
+        words = FR_WORDS if i % 2 == 0 else EN_WORDS
+        clear = sentence(rng, words, rng.randint(4, 12))
+        fragments['caesar'].append(caesar(clear, rng.randint(1, 25)))
+        fragments['morse'].append(morse(clear))
+        fragments['hex'].append(' '.join(format(ord(c), '02x') for c in clear))
+        fragments['roman'].append(' '.join(roman(rng.randint(1, 3999)) for _ in range(rng.randint(2, 8))))
+    return fragments
+
+
+# ------------------------------------------------------------------------------
+# GPX
+# ------------------------------------------------------------------------------
+
+def generate_gpx(path: str, cache_count: int, seed: int = 42, sample_path: str = SAMPLE_GPX) -> str:
+    """
+    Écrit un fichier GPX de `cache_count` caches en dupliquant les waypoints
+    de l'échantillon avec de nouveaux codes GC et des coordonnées décalées.
+    """
+    rng = random.Random(seed)
+    ET.register_namespace('', GPX_NS)
+    ET.register_namespace('groundspeak', GROUNDSPEAK_NS)
+    ET.register_namespace('xsi', 'http://www.w3.org/2001/XMLSchema-instance')
+    ET.register_namespace('xsd', 'http://www.w3.org/2001/XMLSchema')
+
+    tree = ET.parse(sample_path)
+    root = tree.getroot()
+    templates = root.findall(f'{{{GPX_NS}}}wpt')
+    for waypoint in templates:
+        root.remove(waypoint)
+
+    for index in range(cache_count):
+        waypoint = copy.deepcopy(templates[index % len(templates)])
+        lat = float(waypoint.get('lat')) + rng.uniform(-0.5, 0.5)
+        lon = float(waypoint.get('lon')) + rng.uniform(-0.5, 0.5)
+        waypoint.set('lat', f'{lat:.6f}')
+        waypoint.set('lon', f'{lon:.6f}')
+
+        gc_code = f'GCB{index:05X}'
+        name_elem = waypoint.find(f'{{{GPX_NS}}}name')
+        if name_elem is not None:
+            name_elem.text = gc_code
+        cache_elem = waypoint.find(f'{{{GROUNDSPEAK_NS}}}cache')
+        if cache_elem is not None:
+            cache_elem.set('id', str(90000000 + index))
+        root.append(waypoint)
+
+    tree.write(path, encoding='utf-8', xml_declaration=True)
+    return path
+
+
+def generate_corpus(seed: int = 42, scale: int = 1) -> Dict:
+    """
+    Construit le corpus complet en mémoire.
+
+    Args:
+        seed: Graine du générateur pseudo-aléatoire
+        scale: Facteur multiplicatif du nombre d'échantillons
+    """
+    rng = random.Random(seed)
+    coordinates = []
+    ddm = []
+    for _ in range(50 * scale):
+        c = random_coordinates(rng)
+        coordinates.extend(coordinate_variants(c))
+        ddm.append(f"N {c['lat_deg']}° {c['lat_min']:02d}.{c['lat_dec']:03d} E {c['lon_deg']:03d}° {c['lon_min']:02d}.{c['lon_dec']:03d}")
+    return {
+        'seed': seed,
+        'scale': scale,
+        'descriptions': generate_descriptions(rng, 20 * scale),
+        'plain_texts': generate_plain_texts(rng, 50 * scale),
+        'encoded': generate_encoded_fragments(rng, 30 * scale),
+        'coordinates': coordinates,
+        'ddm': ddm,
+    }
@@ -1,7 +1,137 @@
 """
 Utilitaires pour la manipulation des coordonnées
+
+Le codec DDM (degrés, minutes décimales) est le point d'entrée unique pour
+convertir les chaînes au format Geocaching.com ("N 48° 51.402 E 002° 21.048")
+en degrés décimaux et inversement :
+  - l'analyse est stricte (hémisphère attendu, degrés et minutes séparés et dans
+    leurs bornes) et mémorisée dans un cache borné, les mêmes chaînes revenant
+    sans cesse (imports GPX, cartes, plugins) ;
+  - le formatage travaille en millièmes de minute entiers, ce qui évite les
+    "60.000" produits par l'arrondi des minutes ;
+  - `parse_ddm_many` et `format_ddm_many` traitent des listes entières et
+    renvoient/acceptent des tableaux NumPy.
 """
 
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Nombre de chaînes mémorisées par le codec
+PARSE_CACHE_SIZE = 8192
+
+# Degrés et minutes séparés par le signe degré ou une espace : "N 4851.402" est ambigu
+_AXIS = r"\s*(\d{1,3})(?:\s*[°º]\s*|\s+)(\d{1,2}(?:[.,]\d+)?)\s*['′]?\s*"
+_LATITUDE_PATTERN = re.compile(r"^\s*([NSns])" + _AXIS + r"$")
+_LONGITUDE_PATTERN = re.compile(r"^\s*([EWew])" + _AXIS + r"$")
+_PAIR_PATTERN = re.compile(r"^\s*([NSns])" + _AXIS + r",?\s*([EWew])" + _AXIS + r"$")
+
+_AXIS_LIMITS = {'N': 90, 'S': 90, 'E': 180, 'W': 180}
+
+
+def _ddm_value(hemisphere: str, degrees: str, minutes: str) -> Optional[float]:
+    hemisphere = hemisphere.upper()
+    value_minutes = float(minutes.replace(',', '.'))
+    if value_minutes >= 60:
+        return None
+    value = int(degrees) + value_minutes / 60.0
+    if value > _AXIS_LIMITS[hemisphere]:
+        return None
+    return -value if hemisphere in ('S', 'W') else value
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_ddm_latitude(text: str) -> Optional[float]:
+    """Analyse "N 48° 51.402" en degrés décimaux (None si invalide)."""
+    match = _LATITUDE_PATTERN.match(text)
+    return _ddm_value(*match.groups()) if match else None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_ddm_longitude(text: str) -> Optional[float]:
+    """Analyse "E 002° 21.048" en degrés décimaux (None si invalide)."""
+    match = _LONGITUDE_PATTERN.match(text)
+    return _ddm_value(*match.groups()) if match else None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_ddm(text: str) -> Optional[Tuple[float, float]]:
+    """Analyse "N 48° 51.402 E 002° 21.048" en (latitude, longitude), ou None si invalide."""
+    match = _PAIR_PATTERN.match(text)
+    if not match:
+        return None
+    groups = match.groups()
+    lat = _ddm_value(*groups[:3])
+    lon = _ddm_value(*groups[3:])
+    if lat is None or lon is None:
+        return None
+    return lat, lon
+
+
+def _format_axis(value: float, positive: str, negative: str) -> str:
+    hemisphere = positive if value >= 0 else negative
+    thousandths = int(round(abs(value) * 60000))
+    degrees, rest = divmod(thousandths, 60000)
+    return f"{hemisphere} {degrees}° {rest // 1000}.{rest % 1000:03d}"
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def format_ddm(lat: float, lon: float) -> Tuple[str, str]:
+    """Formate des degrés décimaux en ("N 48° 51.402", "E 2° 21.048")."""
+    return _format_axis(lat, 'N', 'S'), _format_axis(lon, 'E', 'W')
+
+
+def parse_ddm_many(latitudes: Iterable[str], longitudes: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Analyse une liste de coordonnées.
+
+    Args:
+        latitudes: chaînes de latitude, ou chaînes complètes si `longitudes` est None
+        longitudes: chaînes de longitude correspondantes (optionnel)
+
+    Returns:
+        (latitudes, longitudes) : tableaux de flottants, NaN pour les entrées invalides
+    """
+    if longitudes is None:
+        parsed = [parse_ddm(text) if isinstance(text, str) else None for text in latitudes]
+        lats = [point[0] if point else np.nan for point in parsed]
+        lons = [point[1] if point else np.nan for point in parsed]
+    else:
+        lats = [parse_ddm_latitude(text) if isinstance(text, str) else None for text in latitudes]
+        lons = [parse_ddm_longitude(text) if isinstance(text, str) else None for text in longitudes]
+    return np.array(lats, dtype=float), np.array(lons, dtype=float)
+
+
+def format_ddm_many(latitudes, longitudes) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Formate des tableaux de degrés décimaux en couples (gc_lat, gc_lon).
+    Les valeurs NaN donnent (None, None).
+    """
+    lats = np.asarray(latitudes, dtype=float).reshape(-1)
+    lons = np.asarray(longitudes, dtype=float).reshape(-1)
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    # Millièmes de minute entiers : la retenue sur les degrés est exacte
+    lat_units = np.rint(np.abs(np.where(valid, lats, 0.0)) * 60000).astype(np.int64)
+    lon_units = np.rint(np.abs(np.where(valid, lons, 0.0)) * 60000).astype(np.int64)
+    lat_hemispheres = np.where(lats >= 0, 'N', 'S').tolist()
+    lon_hemispheres = np.where(lons >= 0, 'E', 'W').tolist()
+
+    results = []
+    for i, (lat_unit, lon_unit, ok) in enumerate(zip(lat_units.tolist(), lon_units.tolist(), valid.tolist())):
+        if not ok:
+            results.append((None, None))
+            continue
+        lat_deg, lat_rest = divmod(lat_unit, 60000)
+        lon_deg, lon_rest = divmod(lon_unit, 60000)
+        results.append((
+            f"{lat_hemispheres[i]} {lat_deg}° {lat_rest // 1000}.{lat_rest % 1000:03d}",
+            f"{lon_hemispheres[i]} {lon_deg}° {lon_rest // 1000}.{lon_rest % 1000:03d}",
+        ))
+    return results
+
+
 def convert_gc_coords_to_decimal(gc_lat, gc_lon):
     """Convertit des coordonnées au format Geocaching.com en coordonnées décimales
     
@@ -12,32 +142,11 @@ def convert_gc_coords_to_decimal(gc_lat, gc_lon):
     Retourne:
     - (latitude_decimal, longitude_decimal) ou (None, None) en cas d'erreur
     """
-    try:
-        lat_decimal = None
-        lon_decimal = None
-        
-        if gc_lat and gc_lon:
-            # Latitude
-            lat_parts = gc_lat.split('°')
-            if len(lat_parts) == 2:
-                lat_deg = float(lat_parts[0].replace('N', '').replace('S', '').strip())
-                lat_min = float(lat_parts[1].strip())
-                lat_decimal = lat_deg + (lat_min / 60)
-                if 'S' in gc_lat:
-                    lat_decimal = -lat_decimal
-            
-            # Longitude
-            lon_parts = gc_lon.split('°')
-            if len(lon_parts) == 2:
-                lon_deg = float(lon_parts[0].replace('E', '').replace('W', '').strip())
-                lon_min = float(lon_parts[1].strip())
-                lon_decimal = lon_deg + (lon_min / 60)
-                if 'W' in gc_lon:
-                    lon_decimal = -lon_decimal
-        
-        return lat_decimal, lon_decimal
-    except Exception:
+    if not gc_lat or not gc_lon:
         return None, None
+    lat_decimal = parse_ddm_latitude(gc_lat) if isinstance(gc_lat, str) else None
+    lon_decimal = parse_ddm_longitude(gc_lon) if isinstance(gc_lon, str) else None
+    return lat_decimal, lon_decimal
 
 def decimal_to_gc_coords(lat, lon):
     """Convertit des coordonnées décimales en format Geocaching.com
@@ -47,20 +156,6 @@ def decimal_to_gc_coords(lat, lon):
     - gc_lon: "E 002° 21.048" ou "W 002° 21.048"
     """
     try:
-        # Déterminer les hémisphères
-        lat_hem = "N" if lat >= 0 else "S"
-        lon_hem = "E" if lon >= 0 else "W"
-        
-        # Convertir en degrés et minutes
-        lat_deg = int(abs(lat))
-        lat_min = (abs(lat) - lat_deg) * 60
-        lon_deg = int(abs(lon))
-        lon_min = (abs(lon) - lon_deg) * 60
-        
-        # Formater les coordonnées
-        gc_lat = f"{lat_hem} {lat_deg}° {lat_min:.3f}"
-        gc_lon = f"{lon_hem} {lon_deg}° {lon_min:.3f}"
-        
-        return gc_lat, gc_lon
-    except Exception:
-        return None, None 
\ No newline at end of file
+        return format_ddm(float(lat), float(lon))
+    except (TypeError, ValueError, OverflowError):
+        return None, None
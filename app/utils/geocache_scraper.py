@@ -3,6 +3,7 @@ import requests
 from bs4 import BeautifulSoup
 from typing import Optional, Dict, Any, Tuple, List
 from app.utils.logger import setup_logger
+from app.utils.coordinates import parse_ddm
 import sys
 
 # Configuration de l'encodage pour la sortie console
@@ -508,6 +509,11 @@ def parse_coordinates(coords_text: str) -> tuple[float, float]:
     Convertit les coordonnées textuelles en latitude/longitude
     Format attendu: "N 49° 13.123 E 002° 34.456" ou similaire
     """
+    # Chemin rapide : codec strict et mémorisé, sans journalisation par appel
+    parsed = parse_ddm(coords_text) if isinstance(coords_text, str) else None
+    if parsed is not None:
+        return parsed
+
     logger.debug(f"Parsing des coordonnées: {coords_text}")
     try:
         # Séparation des parties latitude et longitude
@@ -0,0 +1,149 @@
+"""
+Calculs géodésiques partagés (ellipsoïde WGS84)
+
+Une seule instance de `Geod` est construite pour toute l'application. Les
+fonctions acceptent indifféremment des scalaires ou des tableaux NumPy
+(règles de diffusion habituelles) afin de traiter des centaines de points
+en un seul appel : matrices de distances, projections multiples, antipodes
+et contrôle de la règle des 2 miles sur une zone entière.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+from pyproj import Geod
+
+# Instance partagée : la construction d'un Geod coûte plus cher qu'un calcul de distance
+WGS84 = Geod(ellps="WGS84")
+
+MILE_IN_METERS = 1609.344
+
+# Règle des 2 miles : au-delà de 2 miles "warning", au-delà de 2.5 miles "far"
+TWO_MILE_RULE_MILES = 2.0
+FAR_THRESHOLD_MILES = 2.5
+
+DISTANCE_UNITS = {
+    'm': 1.0,
+    'km': 1000.0,
+    'mile': MILE_IN_METERS,
+    'miles': MILE_IN_METERS,
+}
+
+
+def to_meters(distance, unit: str = 'm'):
+    """
+    Convertit une distance (scalaire ou tableau) en mètres.
+
+    Raises:
+        ValueError: si l'unité est inconnue
+    """
+    factor = DISTANCE_UNITS.get(str(unit).lower())
+    if factor is None:
+        raise ValueError(f"Unité de distance inconnue: '{unit}'")
+    return np.asarray(distance, dtype=float) * factor
+
+
+def _broadcast(*values) -> Tuple[np.ndarray, ...]:
+    return np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in values))
+
+
+def _call(method, *arrays: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Appelle Geod.inv/fwd sur des tableaux de même forme et restitue cette forme.
+    pyproj traite un tableau d'un élément comme un scalaire : on lui passe alors des flottants.
+    """
+    shape = arrays[0].shape
+    size = arrays[0].size
+    if size == 0:
+        return tuple(np.empty(shape) for _ in range(3))
+    if size == 1:
+        results = method(*(float(array.reshape(-1)[0]) for array in arrays))
+        return tuple(np.full(shape, float(value)) for value in results)
+    results = method(*(np.ascontiguousarray(array.reshape(-1)) for array in arrays))
+    return tuple(np.asarray(value, dtype=float).reshape(shape) for value in results)
+
+
+def inv(lat1, lon1, lat2, lon2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Problème inverse : azimut aller, azimut retour et distance (m) entre deux séries de points.
+
+    Returns:
+        (azimuts, azimuts_retour, distances) de la forme diffusée des entrées
+    """
+    lat1, lon1, lat2, lon2 = _broadcast(lat1, lon1, lat2, lon2)
+    return _call(WGS84.inv, lon1, lat1, lon2, lat2)
+
+
+def fwd(lat, lon, azimuth, distance_m) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Problème direct : projette des points selon un azimut (0° = Nord) et une distance en mètres.
+
+    Returns:
+        (latitudes, longitudes, azimuts_retour) de la forme diffusée des entrées
+    """
+    lat, lon, azimuth, distance_m = _broadcast(lat, lon, azimuth, distance_m)
+    lon2, lat2, back_azimuth = _call(WGS84.fwd, lon, lat, azimuth, distance_m)
+    return lat2, lon2, back_azimuth
+
+
+def distances(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distances en mètres entre deux séries de points (ou un point et une série)."""
+    return inv(lat1, lon1, lat2, lon2)[2]
+
+
+def distance_matrix(lats_a, lons_a, lats_b=None, lons_b=None) -> np.ndarray:
+    """
+    Matrice des distances (m) entre les points A (lignes) et les points B (colonnes).
+    Sans points B, matrice des distances des points A entre eux.
+    """
+    lats_a = np.asarray(lats_a, dtype=float).reshape(-1)
+    lons_a = np.asarray(lons_a, dtype=float).reshape(-1)
+    if lats_b is None:
+        lats_b, lons_b = lats_a, lons_a
+    lats_b = np.asarray(lats_b, dtype=float).reshape(-1)
+    lons_b = np.asarray(lons_b, dtype=float).reshape(-1)
+    return distances(lats_a[:, None], lons_a[:, None], lats_b[None, :], lons_b[None, :])
+
+
+def antipodes(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """Antipodes : latitude opposée, longitude décalée de 180°."""
+    lat, lon = _broadcast(lat, lon)
+    return -lat, np.where(lon > 0, lon - 180.0, lon + 180.0)
+
+
+def distance_status(distance_m) -> np.ndarray:
+    """Statut de la règle des 2 miles ("ok", "warning", "far") pour chaque distance."""
+    miles = np.asarray(distance_m, dtype=float) / MILE_IN_METERS
+    return np.where(miles > FAR_THRESHOLD_MILES, 'far',
+                    np.where(miles > TWO_MILE_RULE_MILES, 'warning', 'ok'))
+
+
+def distance_info(distance_m: float) -> Dict:
+    """
+    Distance en mètres et en miles, avec le statut de la règle des 2 miles :
+    moins de 2 miles = ok, entre 2 et 2.5 miles = warning, au-delà = far.
+    """
+    distance_m = float(distance_m)
+    return {
+        "meters": round(distance_m, 2),
+        "miles": round(distance_m / MILE_IN_METERS, 2),
+        "status": str(distance_status(distance_m)),
+    }
+
+
+def check_two_mile_rule(origin_lats, origin_lons, lats, lons,
+                        max_miles: float = TWO_MILE_RULE_MILES) -> Dict[str, np.ndarray]:
+    """
+    Vérifie en une passe que chaque point est à moins de `max_miles` de son origine
+    (une origine par point, ou une seule origine pour tous).
+
+    Returns:
+        {"meters", "miles", "status", "valid"} : tableaux d'un élément par point
+    """
+    meters = distances(origin_lats, origin_lons, lats, lons)
+    return {
+        'meters': meters,
+        'miles': meters / MILE_IN_METERS,
+        'status': distance_status(meters),
+        'valid': meters <= max_miles * MILE_IN_METERS,
+    }
@@ -0,0 +1,164 @@
+"""
+Document HTML partagé entre les plugins d'analyse de page
+
+Le méta-plugin `analysis_web_page` transmet la même description HTML à
+plusieurs sous-plugins (`color_text_detector`, `html_comments_finder`,
+`image_alt_text_extractor`...). Chacun reconstruisait son propre arbre
+BeautifulSoup avec `html.parser`. Ce module analyse le HTML une seule fois :
+  - l'arbre est construit avec lxml s'il est installé (nettement plus
+    rapide), sinon avec `html.parser` ;
+  - les vues utiles aux plugins (éléments stylés, commentaires, images,
+    liens, texte brut) sont calculées à la première demande puis conservées ;
+  - les documents récents sont gardés dans un petit cache LRU indexé par le
+    HTML source : les sous-plugins d'une même analyse, qui reçoivent le même
+    texte, réutilisent donc le même document.
+
+Les vues sont en lecture seule (tuples, namedtuples, styles en
+MappingProxyType) : un plugin ne peut pas modifier ce que verront les suivants.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Nombre de documents conservés dans le cache
+DEFAULT_CACHE_SIZE = 16
+
+# Classe de la div contenant la description rédigée par le propriétaire
+USER_CONTENT_CLASS = 'UserSuppliedContent'
+
+StyledText = namedtuple('StyledText', ['tag', 'style', 'text'])
+ImageInfo = namedtuple('ImageInfo', ['src', 'alt', 'title'])
+LinkInfo = namedtuple('LinkInfo', ['href', 'text'])
+
+
+def parse_inline_style(style_str: str) -> Dict[str, str]:
+    """
+    Transforme la chaîne style="color:#FFF; background:#FFFFFF;"
+    en dictionnaire : {"color": "#fff", "background": "#ffffff"}
+    """
+    style_dict = {}
+    for prop in style_str.split(';'):
+        prop = prop.strip()
+        if ':' not in prop:
+            continue
+        key, value = prop.split(':', 1)
+        style_dict[key.strip().lower()] = value.strip().lower()
+    return style_dict
+
+
+class HtmlDocument:
+    """Arbre HTML analysé une fois, avec ses vues calculées à la demande."""
+
+    def __init__(self, html: str, parser: Optional[str] = None):
+        self.html = html
+        self.parser = parser or HTML_PARSER
+        self.soup = BeautifulSoup(html, self.parser)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def _view(self, key, compute):
+        if key not in self._views:
+            with self._lock:
+                if key not in self._views:
+                    self._views[key] = compute()
+        return self._views[key]
+
+    def styled_texts(self) -> Tuple[StyledText, ...]:
+        """Éléments portant un attribut style, avec le style analysé et leur texte."""
+        return self._view('styled_texts', lambda: tuple(
+            StyledText(elem.name, MappingProxyType(parse_inline_style(elem['style'])), elem.get_text().strip())
+            for elem in self.soup.find_all(style=True)
+        ))
+
+    def comments(self, container_class: Optional[str] = USER_CONTENT_CLASS) -> Optional[Tuple[str, ...]]:
+        """
+        Commentaires HTML (texte nettoyé, non vide) de la div `container_class`,
+        ou de tout le document si `container_class` vaut None.
+        Retourne None si la div n'existe pas.
+        """
+        def compute():
+            root = self.soup
+            if container_class is not None:
+                root = self.soup.find('div', class_=container_class)
+                if root is None:
+                    return None
+            nodes = root.find_all(string=lambda text: isinstance(text, Comment))
+            return tuple(text for text in (str(node).strip() for node in nodes) if text)
+        return self._view(('comments', container_class), compute)
+
+    def images(self) -> Tuple[ImageInfo, ...]:
+        """Balises <img> : src, alt et title (chaînes nettoyées, éventuellement vides)."""
+        return self._view('images', lambda: tuple(
+            ImageInfo(img.get('src', '').strip(), img.get('alt', '').strip(), img.get('title', '').strip())
+            for img in self.soup.find_all('img')
+        ))
+
+    def links(self) -> Tuple[LinkInfo, ...]:
+        """Liens <a href> avec leur texte."""
+        return self._view('links', lambda: tuple(
+            LinkInfo(a['href'].strip(), a.get_text(' ', strip=True))
+            for a in self.soup.find_all('a', href=True)
+        ))
+
+    def plain_text(self) -> str:
+        """Texte visible du document (sans balises, scripts ni styles)."""
+        def compute():
+            texts = (
+                node.strip() for node in self.soup.find_all(string=True)
+                if type(node) is NavigableString and node.parent.name not in ('script', 'style')
+            )
+            return ' '.join(text for text in texts if text)
+        return self._view('plain_text', compute)
+
+
+_documents = OrderedDict()
+_documents_lock = threading.Lock()
+# Verrous des documents en cours d'analyse, par HTML source
+_parsing = {}
+
+
+def get_html_document(html: str) -> HtmlDocument:
+    """
+    Retourne le document analysé pour ce HTML, en réutilisant celui d'un
+    plugin précédent si le même texte a déjà été analysé.
+    """
+    with _documents_lock:
+        document = _documents.get(html)
+        if document is not None:
+            _documents.move_to_end(html)
+            return document
+        # Les plugins d'une pipeline s'exécutent en parallèle : un seul analyse la page
+        parsing_lock = _parsing.setdefault(html, threading.Lock())
+
+    with parsing_lock:
+        try:
+            with _documents_lock:
+                document = _documents.get(html)
+            if document is None:
+                document = HtmlDocument(html)
+            with _documents_lock:
+                _documents[html] = document
+                _documents.move_to_end(html)
+                while len(_documents) > DEFAULT_CACHE_SIZE:
+                    _documents.popitem(last=False)
+        finally:
+            # Même si l'analyse échoue, le verrou ne doit pas rester dans _parsing
+            with _documents_lock:
+                _parsing.pop(html, None)
+    return document
+
+
+def clear_html_documents():
+    """Vide le cache des documents analysés."""
+    with _documents_lock:
+        _documents.clear()
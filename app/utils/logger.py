@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 from loguru import logger
 
@@ -8,6 +9,12 @@ def setup_logger():
     # Format des logs
     log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
     
+    # Console uniquement dans les processus de calcul (traitement par lot) : le
+    # fichier est ouvert en mode "w" et ne doit pas être tronqué par chaque processus
+    if multiprocessing.parent_process() is not None:
+        logger.add(lambda msg: print(msg, flush=True), format=log_format, level="DEBUG")
+        return logger
+
     # Créer le dossier logs s'il n'existe pas
     if not os.path.exists('logs'):
         os.makedirs('logs')
@@ -0,0 +1,40 @@
+"""
+Résumé des résultats de plugins et de pipelines.
+
+Partagé par le stockage des résultats par géocache (plugin_result_service)
+et la résolution par lot d'une zone (zone_batch_service). Ce module ne
+dépend que de la bibliothèque standard : il est importé par les processus
+de calcul du traitement par lot.
+"""
+
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+
+def summarize_result(result: Any) -> Tuple[Optional[float], Optional[Dict[str, Any]]]:
+    """
+    Résume un résultat de plugin ou de pipeline : meilleure confiance de
+    scoring et premières coordonnées détectées (parcours en largeur, les
+    valeurs les moins imbriquées d'abord).
+    """
+    confidence = None
+    coordinates = None
+    queue = deque([result])
+    while queue:
+        value = queue.popleft()
+        if isinstance(value, list):
+            queue.extend(value)
+            continue
+        if not isinstance(value, dict):
+            continue
+        scoring = value.get('scoring')
+        if isinstance(scoring, dict) and isinstance(scoring.get('score'), (int, float)):
+            confidence = max(confidence, float(scoring['score'])) if confidence is not None else float(scoring['score'])
+        coords = value.get('coordinates')
+        if coordinates is None and isinstance(coords, dict) and coords.get('exist'):
+            decimal = coords.get('decimal') or {}
+            if decimal.get('latitude') is not None and decimal.get('longitude') is not None:
+                coordinates = {'ddm': coords.get('ddm'), 'latitude': decimal['latitude'],
+                               'longitude': decimal['longitude']}
+        queue.extend(value.values())
+    return confidence, coordinates
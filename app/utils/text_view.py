@@ -0,0 +1,188 @@
+"""
+Variantes normalisées d'un texte, calculées une seule fois.
+
+Le gestionnaire de plugins, le service de scoring et plusieurs plugins
+dérivaient chacun les mêmes variantes d'un texte (espaces normalisés, sans
+accents, en minuscules, sans espaces...). Dans metadetection ou un lot sur
+une zone, le même texte repasse ainsi des dizaines de fois par les mêmes
+transformations.
+
+`TextView` est une vue immuable d'un texte qui calcule chaque variante à la
+première demande et la mémorise. `text_view()` renvoie la même vue pour un
+même texte (cache LRU), de sorte qu'une variante n'est calculée qu'une fois
+par texte, quel que soit le nombre de plugins qui la demandent.
+
+La suppression des accents passe par une table `str.translate` précalculée
+pour les alphabets latins ; la décomposition NFKD complète n'est utilisée
+que pour les caractères absents de la table.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Callable, Dict, Union
+
+# Nombre de vues conservées par text_view()
+TEXT_VIEW_CACHE_SIZE = 256
+
+# Remplacements appliqués après la suppression des diacritiques
+EXTRA_REPLACEMENTS = {
+    'œ': 'oe',
+    'Œ': 'OE',
+    'æ': 'ae',
+    'Æ': 'AE',
+    'ß': 'ss',
+    '€': 'E',
+    '£': 'L',
+    '¥': 'Y',
+    'ñ': 'n',
+    'Ñ': 'N',
+}
+
+# Plages précalculées : Latin-1, Latin étendu A/B, Latin étendu additionnel
+_TABLE_RANGES = ((0x80, 0x250), (0x1E00, 0x1F00))
+
+_SPACED_LETTERS = re.compile(r'(?<!\S)(\S)(?:\s+)(\S)(?:\s+)(\S)(?:\s+)(\S)(?:\s+)(\S)(?!\S)')
+_NON_WORD = re.compile(r'[^\w\s]')
+
+
+def _strip_accents_slow(text: str) -> str:
+    """Décomposition NFKD, suppression des marques diacritiques, puis remplacements."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    result = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    for char, replacement in EXTRA_REPLACEMENTS.items():
+        result = result.replace(char, replacement)
+    return result
+
+
+def _build_accent_table():
+    table = {}
+    stable = set()
+    code_points = [cp for start, end in _TABLE_RANGES for cp in range(start, end)]
+    code_points += [ord(char) for char in EXTRA_REPLACEMENTS]
+    for code_point in code_points:
+        char = chr(code_point)
+        mapped = _strip_accents_slow(char)
+        if mapped == char:
+            stable.add(char)
+        else:
+            table[code_point] = mapped
+    # Caractères inchangés après traduction : inutile de passer par NFKD
+    stable.update(chr(cp) for cp in range(0x80))
+    for mapped in table.values():
+        stable.update(mapped)
+    return table, frozenset(stable)
+
+
+_ACCENT_TABLE, _STABLE_CHARS = _build_accent_table()
+
+
+def strip_accents(text: str) -> str:
+    """Supprime les accents (et remplace œ, æ, ß...) d'un texte."""
+    if not text or text.isascii():
+        return text or ''
+    result = text.translate(_ACCENT_TABLE)
+    if not result.isascii() and not _STABLE_CHARS.issuperset(result):
+        # Caractères hors table (ligatures, formes de compatibilité, diacritiques isolés)
+        result = _strip_accents_slow(result)
+    return result
+
+
+class TextView:
+    """
+    Vue immuable d'un texte et de ses variantes, chacune calculée à la
+    première demande puis mémorisée.
+
+    Variantes :
+        raw: texte d'origine
+        normalized: blancs (dont espaces insécables et retours à la ligne)
+            réduits à une espace, sans blancs en début et fin
+        unaccented: normalized sans accents
+        lower, unaccented_lower: versions en minuscules
+        no_spaces: raw sans les espaces
+        words: raw sans ponctuation, mots séparés par une espace
+        joined_letters: raw avec les lettres espacées regroupées (H E L L O -> HELLO)
+    """
+
+    __slots__ = ('_raw', '_variants')
+
+    def __init__(self, raw: str):
+        object.__setattr__(self, '_raw', raw or '')
+        object.__setattr__(self, '_variants', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TextView est immuable")
+
+    def __str__(self):
+        return self._raw
+
+    def __repr__(self):
+        return f"TextView({self._raw[:40]!r}{'...' if len(self._raw) > 40 else ''})"
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __eq__(self, other):
+        if isinstance(other, TextView):
+            return self._raw == other._raw
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._raw)
+
+    def _variant(self, name: str, compute: Callable[[], str]) -> str:
+        variants: Dict[str, str] = self._variants
+        value = variants.get(name)
+        if value is None:
+            value = variants[name] = compute()
+        return value
+
+    @property
+    def raw(self) -> str:
+        return self._raw
+
+    @property
+    def normalized(self) -> str:
+        def compute():
+            value = ' '.join(self._raw.split())
+            if value != self._raw:
+                # Le texte normalisé, s'il est repassé à text_view(), n'est pas renormalisé
+                text_view(value)._variants.setdefault('normalized', value)
+            return value
+        return self._variant('normalized', compute)
+
+    @property
+    def unaccented(self) -> str:
+        return self._variant('unaccented', lambda: strip_accents(self.normalized))
+
+    @property
+    def lower(self) -> str:
+        return self._variant('lower', lambda: self.normalized.lower())
+
+    @property
+    def unaccented_lower(self) -> str:
+        return self._variant('unaccented_lower', lambda: self.unaccented.lower())
+
+    @property
+    def no_spaces(self) -> str:
+        return self._variant('no_spaces', lambda: self._raw.replace(' ', ''))
+
+    @property
+    def words(self) -> str:
+        return self._variant('words', lambda: ' '.join(_NON_WORD.sub('', self._raw).split()))
+
+    @property
+    def joined_letters(self) -> str:
+        return self._variant('joined_letters', lambda: _SPACED_LETTERS.sub(r'\1\2\3\4\5', self._raw))
+
+
+@lru_cache(maxsize=TEXT_VIEW_CACHE_SIZE)
+def _cached_view(text: str) -> TextView:
+    return TextView(text)
+
+
+def text_view(text: Union[str, TextView, None]) -> TextView:
+    """Vue partagée d'un texte : le même texte renvoie la même vue (et ses variantes déjà calculées)."""
+    if isinstance(text, TextView):
+        return text
+    return _cached_view(text or '')
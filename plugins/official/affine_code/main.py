@@ -13,6 +13,12 @@ except ImportError:
     scoring_service_available = False
     print("Module de scoring non disponible, utilisation du scoring legacy uniquement")
 
+# Variantes de texte partagées avec le gestionnaire de plugins et le scoring
+try:
+    from app.utils.text_view import text_view
+except ImportError:
+    text_view = None
+
 class AffineCodePlugin:
     """
     Plugin pour encoder/décoder du texte avec le chiffre affine.
@@ -165,11 +171,15 @@ class AffineCodePlugin:
         Returns:
             Le texte nettoyé prêt pour le scoring
         """
-        # Supprimer tout caractère non-alphanumérique (sauf espaces)
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Supprimer les espaces multiples
-        text = re.sub(r'\s+', ' ', text).strip()
+        if text_view is not None:
+            # Variante mémorisée : le texte n'est nettoyé qu'une fois
+            text = text_view(text).words
+        else:
+            # Supprimer tout caractère non-alphanumérique (sauf espaces)
+            text = re.sub(r'[^\w\s]', '', text)
+            
+            # Supprimer les espaces multiples
+            text = re.sub(r'\s+', ' ', text).strip()
         
         print(f"Texte nettoyé pour scoring: {text}")
         return text
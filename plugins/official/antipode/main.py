@@ -1,5 +1,11 @@
 import re
 
+# Codec DDM partagé de l'application (repli sur l'analyse locale hors application)
+try:
+    from app.utils.coordinates import parse_ddm as shared_parse_ddm
+except ImportError:
+    shared_parse_ddm = None
+
 class AntipodePlugin:
     """
     Plugin permettant de :
@@ -25,6 +31,11 @@ class AntipodePlugin:
         
         Retourne (lat, lon) en float
         """
+        if shared_parse_ddm is not None:
+            parsed = shared_parse_ddm(coord_str)
+            if parsed is not None:
+                return parsed
+
         pattern = r"""
             ^\s*([NS])\s+(\d{1,2})°\s+(\d{1,2}\.\d+)\s+
             ([EW])\s+(\d{1,3})°\s+(\d{1,2}\.\d+)
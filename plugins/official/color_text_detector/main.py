@@ -1,5 +1,5 @@
 import re
-from bs4 import BeautifulSoup
+from app.utils.html_analysis import get_html_document
 
 class ColorTextDetectorPlugin:
     """
@@ -13,8 +13,9 @@ class ColorTextDetectorPlugin:
 
     def execute(self, inputs):
         """
-        Récupère le HTML depuis inputs["html"], parse avec BeautifulSoup,
-        et recherche tous les éléments dont la color == background-color (inline style).
+        Récupère le HTML depuis inputs["text"], utilise le document analysé partagé
+        (voir app/utils/html_analysis.py) et recherche tous les éléments dont la
+        color == background-color (inline style).
         
         Retourne les résultats dans le format standardisé:
         {
@@ -41,15 +42,11 @@ class ColorTextDetectorPlugin:
                 "coordinates": {"exist": False}
             }
 
-        soup = BeautifulSoup(html_content, "html.parser")
         findings = []
 
-        # Trouver tous les éléments avec un attribut 'style'
-        all_styled_elements = soup.find_all(style=True)
-
-        for elem in all_styled_elements:
-            style_attr = elem["style"]
-            style_dict = self._parse_inline_style(style_attr)
+        # Tous les éléments avec un attribut 'style' (style déjà analysé)
+        for elem in get_html_document(html_content).styled_texts():
+            style_dict = elem.style
 
             # Extraire la color et background-color
             text_color = style_dict.get("color", "").lower().strip()
@@ -68,7 +65,7 @@ class ColorTextDetectorPlugin:
 
             # Si les couleurs sont identiques ou très proches
             if norm_text_color and norm_bg_color and self._colors_are_similar(norm_text_color, norm_bg_color):
-                text_content = elem.get_text().strip()
+                text_content = elem.text
                 if text_content:  # On ne garde que les éléments avec du texte
                     findings.append({
                         "type": "hidden_text",
@@ -100,24 +97,6 @@ class ColorTextDetectorPlugin:
     # Méthodes internes
     # ----------------------------------------------------------------
 
-    def _parse_inline_style(self, style_str):
-        """
-        Transforme la chaîne style="color:#FFF; background:#FFFFFF;" 
-        en dictionnaire : {"color": "#FFF", "background": "#FFFFFF"}
-        """
-        style_dict = {}
-        # Chaque propriété est généralement séparée par ;
-        properties = style_str.split(";")
-        for prop in properties:
-            prop = prop.strip()
-            if ":" not in prop:
-                continue
-            key, value = prop.split(":", 1)
-            key = key.strip().lower()        # ex: "color"
-            value = value.strip().lower()    # ex: "#ffffff"
-            style_dict[key] = value
-        return style_dict
-
     def _normalize_color(self, color_str):
         """
         Convertit une couleur hex (ou nommée) en une forme normalisée pour comparer.
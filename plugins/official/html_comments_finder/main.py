@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup, Comment
+from app.utils.html_analysis import get_html_document
 from app.routes.coordinates import detect_gps_coordinates
 
 class HtmlCommentsFinderPlugin:
@@ -16,7 +16,8 @@ class HtmlCommentsFinderPlugin:
     def execute(self, inputs):
         """
         Récupère le HTML depuis inputs["text"] et cherche tous les commentaires 
-        (<!-- ... -->) dans la div class="UserSuppliedContent" via BeautifulSoup.
+        (<!-- ... -->) dans la div class="UserSuppliedContent" du document analysé
+        partagé (voir app/utils/html_analysis.py).
         Détecte également les coordonnées GPS dans ces commentaires.
 
         Retourne le format standardisé :
@@ -44,26 +45,19 @@ class HtmlCommentsFinderPlugin:
                 "coordinates": {"exist": False}
             }
 
-        soup = BeautifulSoup(html_content, "html.parser")
         findings = []
         coordinates_result = None
 
-        # 1. Trouver la div .UserSuppliedContent
-        container = soup.find("div", class_="UserSuppliedContent")
-        if not container:
+        # 1. Récupérer les commentaires de la div .UserSuppliedContent
+        comments = get_html_document(html_content).comments("UserSuppliedContent")
+        if comments is None:
             return {
                 "findings": [],
                 "coordinates": {"exist": False}
             }
 
-        # 2. Récupérer tous les commentaires à l'intérieur de ce container
-        comment_nodes = container.find_all(string=lambda text: isinstance(text, Comment))
-
-        # 3. Analyser chaque commentaire
-        for comment in comment_nodes:
-            comment_text = str(comment).strip()
-            if not comment_text:
-                continue
+        # 2. Analyser chaque commentaire
+        for comment_text in comments:
 
             # Vérifier si le commentaire contient des coordonnées
             coords = detect_gps_coordinates(comment_text)
@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from app.utils.html_analysis import get_html_document
 from app.routes.coordinates import detect_gps_coordinates
 
 class ImageAltTitleExtractorPlugin:
@@ -45,23 +45,15 @@ class ImageAltTitleExtractorPlugin:
                 "coordinates": {"exist": False}
             }
 
-        soup = BeautifulSoup(html_content, "html.parser")
         findings = []
         coordinates_result = None
 
-        # Trouver toutes les balises <img> dans le document
-        img_tags = soup.find_all("img")
-
-        for img in img_tags:
-            src = img.get("src", "").strip()
-            
+        # Toutes les balises <img> du document analysé partagé
+        for src, alt, title in get_html_document(html_content).images():
             # Exclure les images dont le src correspond à une source exclue
             if any(excluded in src for excluded in self.excluded_sources):
                 continue
 
-            alt = img.get("alt", "").strip()
-            title = img.get("title", "").strip()
-
             # Vérifier les coordonnées dans alt et title
             if alt:
                 coords = detect_gps_coordinates(alt)
@@ -2,6 +2,18 @@ import re
 from pyproj import Geod
 from typing import Dict, Optional, List, Any
 
+# Instance Geod partagée de l'application (repli sur une instance locale hors application)
+try:
+    from app.utils.geodesy import WGS84 as SHARED_GEOD
+except ImportError:
+    SHARED_GEOD = None
+
+# Codec DDM partagé de l'application (repli sur l'analyse locale hors application)
+try:
+    from app.utils.coordinates import parse_ddm as shared_parse_ddm
+except ImportError:
+    shared_parse_ddm = None
+
 class MovePointPlugin:
     """
     Plugin pour :
@@ -18,7 +30,7 @@ class MovePointPlugin:
         )
 
         # Objet Geod pour les calculs sur ellipsoïde WGS84
-        self.geod = Geod(ellps="WGS84")
+        self.geod = SHARED_GEOD or Geod(ellps="WGS84")
 
     def parse_coord(self, coord_str: str):
         """
@@ -28,6 +40,11 @@ class MovePointPlugin:
         
         Retourne (lat_dec, lon_dec) en degrés décimaux.
         """
+        if shared_parse_ddm is not None:
+            parsed = shared_parse_ddm(coord_str)
+            if parsed is not None:
+                return parsed
+
         pattern = r"""
             ^\s*([NS])\s+(\d{1,2})°\s+(\d{1,2}\.\d+)\s+
             ([EW])\s+(\d{1,3})°\s+(\d{1,2}\.\d+)
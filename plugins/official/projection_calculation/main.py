@@ -1,6 +1,23 @@
 import re
+from functools import lru_cache
 from pyproj import CRS, Transformer
 
+# Codec DDM partagé de l'application (repli sur l'analyse locale hors application)
+try:
+    from app.utils.coordinates import parse_ddm as shared_parse_ddm
+except ImportError:
+    shared_parse_ddm = None
+
+
+@lru_cache(maxsize=64)
+def _get_transformer(target: str) -> Transformer:
+    """
+    Transformer WGS84 -> CRS cible, construit une seule fois par CRS
+    (la construction coûte bien plus cher que la transformation d'un point).
+    """
+    # always_xy=True => on passe (lon, lat) en argument
+    return Transformer.from_crs(CRS.from_epsg(4326), CRS.from_string(target), always_xy=True)
+
 class ProjectionPlugin:
     """
     Plugin permettant de :
@@ -27,6 +44,11 @@ class ProjectionPlugin:
         
         Retourne (lat, lon) en float
         """
+        if shared_parse_ddm is not None:
+            parsed = shared_parse_ddm(coord_str)
+            if parsed is not None:
+                return parsed
+
         # Regex pour capturer : 
         # 1) La lettre N ou S
         # 2) Degrés (dd ou ddd)
@@ -86,36 +108,19 @@ class ProjectionPlugin:
 
         Retourne (x, y)
         """
-        # 1. Définir le CRS source (WGS84 lat-lon)
-        crs_src = CRS.from_epsg(4326)  # WGS84
-
-        # 2. Définir le CRS cible
-        #    Si on a un code EPSG (ex: 'EPSG:32631'), on l'utilise directement.
-        #    Sinon, on peut gérer un cas 'UTM' générique. 
-        #    (Ici, on suppose que l'utilisateur passe un vrai code EPSG 
-        #     ou 'UTM' + zone => il faut le parser.)
-        
+        # Si on a un code EPSG (ex: 'EPSG:32631'), on l'utilise directement.
+        # Pour 'UTM', la zone est calculée à partir de la longitude :
+        # zone = floor((lon+180)/6) + 1, epsg = 326XX (on suppose l'hémisphère nord).
+        # Sinon, on revient sur WGS84 (pas de projection).
         if target_projection.upper().startswith("EPSG:"):
-            crs_dst = CRS.from_string(target_projection)
+            target = target_projection
         elif target_projection.upper() == "UTM":
-            # Par exemple, calculer la zone en fonction de la longitude
-            # => zone = floor((lon+180)/6) + 1
-            # => epsg = 326XX pour hémisphère nord ou 327XX pour sud
-            # Pour simplifier, on suppose qu'on est dans l'hémisphère nord
             zone = int((lon + 180) / 6) + 1
-            epsg_code = 32600 + zone  
-            # S'il faut gérer l'hémisphère sud: if lat < 0, epsg_code = 32700 + zone
-            crs_dst = CRS.from_epsg(epsg_code)
+            target = f"EPSG:{32600 + zone}"
         else:
-            # Par défaut, on revient sur WGS84 (pas de projection)
-            crs_dst = crs_src
-
-        # 3. Créer le Transformer
-        transformer = Transformer.from_crs(crs_src, crs_dst, always_xy=True)
-        # always_xy=True => on passe (lon, lat) en argument
+            return lon, lat
 
-        x, y = transformer.transform(lon, lat)
-        return x, y
+        return _get_transformer(target.upper()).transform(lon, lat)
 
     def execute(self, inputs: dict):
         """
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Script pour entraîner le modèle d'identification de langue du scoring
+(app/resources/language_model.npz) à partir des listes de mots de wordfreq.
+
+Un mot sur cinq (choisi par empreinte CRC32, donc toujours le même) est
+exclu de l'entraînement. Avec --evaluate, des phrases tirées de ces mots
+exclus, pondérées par leur fréquence, forment un corpus de validation sur
+lequel le modèle est comparé à langdetect (précision et temps par texte).
+
+Usage :
+    python scripts/build_language_model.py
+    python scripts/build_language_model.py --evaluate 300
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+# Ajouter le répertoire parent au path pour pouvoir importer l'application
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wordfreq
+
+from app.services.language_identifier import DEFAULT_MODEL_PATH, MAX_NGRAMS_PER_LANGUAGE, LanguageIdentifier
+from app.services.scoring_service import ScoringService
+
+# Mots lus par langue dans wordfreq
+WORDS_PER_LANGUAGE = 30000
+# Un mot sur HELD_OUT_MODULO est réservé à la validation
+HELD_OUT_MODULO = 5
+
+
+def is_held_out(word):
+    return zlib.crc32(word.encode('utf-8')) % HELD_OUT_MODULO == 0
+
+
+def load_word_frequencies(languages, words_per_language):
+    """Fréquences wordfreq des mots de chaque langue, séparées en entraînement et validation."""
+    training, held_out = {}, {}
+    for language in languages:
+        training[language], held_out[language] = {}, {}
+        for word in wordfreq.top_n_list(language, words_per_language):
+            frequency = wordfreq.word_frequency(word, language)
+            (held_out if is_held_out(word) else training)[language][word] = frequency
+    return training, held_out
+
+
+def build_corpus(held_out, sentences_per_language, words_per_sentence=(4, 12), seed=0):
+    """Phrases tirées des mots de validation selon leur fréquence : [(langue, texte)]."""
+    rng = random.Random(seed)
+    corpus = []
+    for language in sorted(held_out):
+        words = sorted(held_out[language])
+        weights = [held_out[language][word] for word in words]
+        for _ in range(sentences_per_language):
+            length = rng.randint(*words_per_sentence)
+            corpus.append((language, ' '.join(rng.choices(words, weights=weights, k=length))))
+    return corpus
+
+
+def evaluate(identifier, corpus):
+    """Précision et temps moyen par texte du modèle et de langdetect sur le corpus."""
+    languages = set(identifier.languages)
+    report = {}
+
+    identifier._word_rows.cache_clear()
+    start = time.perf_counter()
+    predictions = identifier.detect_many([text for _, text in corpus])
+    report['modèle (lot)'] = (predictions, time.perf_counter() - start)
+
+    identifier._word_rows.cache_clear()
+    start = time.perf_counter()
+    predictions = [identifier.detect(text) for _, text in corpus]
+    report['modèle'] = (predictions, time.perf_counter() - start)
+
+    try:
+        import langdetect
+        from langdetect import DetectorFactory
+        DetectorFactory.seed = 0
+        start = time.perf_counter()
+        predictions = []
+        for _, text in corpus:
+            try:
+                detected = langdetect.detect(text)
+            except langdetect.LangDetectException:
+                detected = None
+            predictions.append(detected if detected in languages else None)
+        report['langdetect'] = (predictions, time.perf_counter() - start)
+    except ImportError:
+        print("langdetect non installé : comparaison ignorée")
+
+    for name, (predictions, elapsed) in report.items():
+        correct = sum(1 for (language, _), predicted in zip(corpus, predictions) if predicted == language)
+        print(f"{name:>14} : précision {correct / len(corpus):.1%}, "
+              f"{elapsed / len(corpus) * 1e6:.0f} µs par texte")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help="Fichier du modèle")
+    parser.add_argument('--words', type=int, default=WORDS_PER_LANGUAGE, help="Mots lus par langue")
+    parser.add_argument('--max-ngrams', type=int, default=MAX_NGRAMS_PER_LANGUAGE,
+                        help="N-grammes conservés par langue")
+    parser.add_argument('--evaluate', type=int, default=0, metavar='N',
+                        help="Évaluer sur N phrases de validation par langue")
+    args = parser.parse_args()
+
+    languages = sorted(ScoringService.SUPPORTED_LANGUAGES)
+    training, held_out = load_word_frequencies(languages, args.words)
+    identifier = LanguageIdentifier.train(training, max_ngrams_per_language=args.max_ngrams)
+    identifier.save(args.output)
+    print(f"Modèle enregistré dans {args.output} : {len(identifier.ngrams)} n-grammes, "
+          f"{len(languages)} langues, {os.path.getsize(args.output) // 1024} Ko")
+
+    if args.evaluate:
+        evaluate(LanguageIdentifier.load(args.output), build_corpus(held_out, args.evaluate))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,18 @@
 from app import create_app
 
-app = create_app()
 
-@app.route('/test')
 def test():
     return 'Test route works!'
 
+
 if __name__ == '__main__':
+    # L'application n'est créée que lorsque ce fichier est exécuté : les processus
+    # de calcul (spawn) réimportent __main__ et ne doivent pas la reconstruire
+    app = create_app()
+    app.add_url_rule('/test', 'test', test)
+
     print("Routes enregistrées :")
     for rule in app.url_map.iter_rules():
         print(f"{rule.endpoint}: {rule.rule}")
+    # La file de tâches démarre à la première requête, dans le processus enfant du rechargeur
     app.run(host='0.0.0.0', port=3000, debug=True)
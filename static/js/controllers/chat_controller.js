@@ -32,6 +32,9 @@
             // Initialiser l'objet conversations
             this.conversations = {};
             
+            // Flux de réponse en cours, par chat (annulés à la fermeture du chat)
+            this.streamControllers = {};
+            
             // Créer un premier chat s'il n'y en a pas
             if (this.chatListTarget.children.length === 0) {
                 this.addChat();
@@ -191,7 +194,8 @@
                 tabToRemove.remove();
                 chatToRemove.remove();
                 
-                // Supprimer la conversation
+                // Interrompre une réponse en cours et supprimer la conversation
+                this.streamControllers[chatId]?.abort();
                 delete this.conversations[chatId];
                 
                 // S'il n'y a plus de chats, en créer un nouveau
@@ -271,121 +275,195 @@
             // Récupérer le modèle actif
             const activeModel = document.getElementById('ai-model-selector')?.value || null;
             
-            // Envoyer la requête à l'API
-            fetch('/api/ai/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    messages: this.conversations[chatId],
-                    model_id: activeModel,
-                    use_tools: true  // Activer l'utilisation des outils
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                // Supprimer l'indicateur de frappe
-                const typingIndicator = messagesContainer.querySelector('.typing');
-                if (typingIndicator) {
-                    typingIndicator.remove();
-                }
-                
-                if (data.success) {
-                    // Ajouter la réponse à l'interface
-                    const responseElement = document.createElement('div');
-                    responseElement.className = 'chat-message system';
-                    
-                    // Formater la réponse avec Markdown si nécessaire
-                    let formattedResponse = this.escapeHtml(data.response);
-                    
-                    // Remplacer les blocs de code
-                    formattedResponse = formattedResponse.replace(/```(\w*)([\s\S]*?)```/g, (match, language, code) => {
-                        return `<pre class="code-block ${language}"><code>${this.escapeHtml(code.trim())}</code></pre>`;
-                    });
-                    
-                    // Remplacer les lignes de code inline
-                    formattedResponse = formattedResponse.replace(/`([^`]+)`/g, '<code>$1</code>');
-                    
-                    // Remplacer les sauts de ligne
-                    formattedResponse = formattedResponse.replace(/\n/g, '<br>');
-                    
-                    // Ajouter le badge du modèle si disponible
-                    let modelBadge = '';
-                    if (data.model_used) {
-                        modelBadge = `<div class="model-badge">${data.model_used}</div>`;
-                    }
-                    
-                    // Ajouter le badge LangGraph si utilisé
-                    let langGraphBadge = '';
-                    if (data.used_langgraph) {
-                        langGraphBadge = `<div class="langgraph-badge">LangGraph</div>`;
-                    }
-                    
-                    responseElement.innerHTML = `
-                        <div class="message-content">
-                            ${formattedResponse}
-                        </div>
-                        <div class="message-badges">
-                            ${modelBadge}
-                            ${langGraphBadge}
-                        </div>
-                    `;
-                    
-                    messagesContainer.appendChild(responseElement);
-                    
-                    // Ajouter la réponse à la conversation
-                    this.conversations[chatId].push({
-                        role: "assistant",
-                        content: data.response
-                    });
-                    
-                    // Vérifier s'il y a des appels d'outils dans la réponse
-                    if (data.response.includes("Je vais utiliser un outil") || 
-                        data.response.includes("J'utilise l'outil") ||
-                        data.response.includes("Résultat de ")) {
-                        
-                        // Ajouter un badge d'outil
-                        const toolBadge = document.createElement('div');
-                        toolBadge.className = 'tool-badge';
-                        toolBadge.textContent = 'Outil utilisé';
-                        responseElement.querySelector('.message-badges').appendChild(toolBadge);
-                    }
-                } else {
-                    // Afficher l'erreur
-                    const errorElement = document.createElement('div');
-                    errorElement.className = 'chat-message error';
-                    errorElement.innerHTML = `
-                        <div class="message-content">
-                            Erreur: ${data.error || 'Une erreur est survenue lors de la communication avec l\'IA.'}
-                        </div>
-                    `;
-                    messagesContainer.appendChild(errorElement);
-                }
-                
-                // Faire défiler vers le bas
-                messagesContainer.scrollTop = messagesContainer.scrollHeight;
-            })
-            .catch(error => {
-                // Supprimer l'indicateur de frappe
+            // Envoyer la requête à l'API (réponse relayée fragment par fragment)
+            this.streamResponse(chatId, messagesContainer, activeModel);
+        }
+        
+        /**
+         * Envoie la conversation à /api/ai/chat/stream et affiche la réponse
+         * au fur et à mesure de sa génération (Server-Sent Events).
+         * Le message complet est ajouté à l'historique à la fin du flux.
+         * @param {number} chatId - Identifiant du chat
+         * @param {HTMLElement} messagesContainer - Conteneur des messages du chat
+         * @param {string|null} activeModel - Modèle sélectionné
+         */
+        async streamResponse(chatId, messagesContainer, activeModel) {
+            // Annuler un flux précédent encore en cours sur ce chat
+            this.streamControllers[chatId]?.abort();
+            const controller = new AbortController();
+            this.streamControllers[chatId] = controller;
+            
+            let responseElement = null;
+            let contentElement = null;
+            let text = '';
+            let start = null;
+            
+            const removeTyping = () => {
                 const typingIndicator = messagesContainer.querySelector('.typing');
                 if (typingIndicator) {
                     typingIndicator.remove();
                 }
-                
-                // Afficher l'erreur
+            };
+            
+            const showError = (message) => {
+                removeTyping();
                 const errorElement = document.createElement('div');
                 errorElement.className = 'chat-message error';
                 errorElement.innerHTML = `
                     <div class="message-content">
-                        Erreur de connexion: ${error.message}
+                        ${this.escapeHtml(message)}
                     </div>
                 `;
                 messagesContainer.appendChild(errorElement);
-                
-                // Faire défiler vers le bas
                 messagesContainer.scrollTop = messagesContainer.scrollHeight;
+            };
+            
+            const handleEvent = (event, data) => {
+                if (event === 'start') {
+                    start = data;
+                } else if (event === 'token') {
+                    if (!responseElement) {
+                        // Premier fragment : remplacer l'indicateur de frappe par la réponse
+                        removeTyping();
+                        responseElement = document.createElement('div');
+                        responseElement.className = 'chat-message system';
+                        responseElement.innerHTML = `<div class="message-content"></div><div class="message-badges"></div>`;
+                        contentElement = responseElement.querySelector('.message-content');
+                        messagesContainer.appendChild(responseElement);
+                    }
+                    text += data.token;
+                    contentElement.textContent = text;
+                    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                } else if (event === 'done') {
+                    this.renderAssistantMessage(messagesContainer, responseElement, data.response, start || {});
+                    // Ajouter la réponse complète à la conversation
+                    this.conversations[chatId]?.push({
+                        role: "assistant",
+                        content: data.response
+                    });
+                } else if (event === 'error') {
+                    showError(`Erreur: ${data.error || 'Une erreur est survenue lors de la communication avec l\'IA.'}`);
+                }
+            };
+            
+            try {
+                const response = await fetch('/api/ai/chat/stream', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Accept': 'text/event-stream'
+                    },
+                    body: JSON.stringify({
+                        messages: this.conversations[chatId],
+                        model_id: activeModel,
+                        use_tools: true  // Activer l'utilisation des outils
+                    }),
+                    signal: controller.signal
+                });
+                
+                if (!response.ok || !response.body) {
+                    const data = await response.json().catch(() => ({}));
+                    showError(`Erreur: ${data.error || response.statusText}`);
+                    return;
+                }
+                
+                // Lecture du flux : les événements sont séparés par une ligne vide
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let separator;
+                    while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                        const rawEvent = buffer.slice(0, separator);
+                        buffer = buffer.slice(separator + 2);
+                        let event = 'message';
+                        let data = '';
+                        rawEvent.split('\n').forEach(line => {
+                            if (line.startsWith('event: ')) event = line.slice(7);
+                            else if (line.startsWith('data: ')) data += line.slice(6);
+                        });
+                        handleEvent(event, data ? JSON.parse(data) : {});
+                    }
+                }
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    showError(`Erreur de connexion: ${error.message}`);
+                }
+            } finally {
+                removeTyping();
+                if (this.streamControllers[chatId] === controller) {
+                    delete this.streamControllers[chatId];
+                }
+            }
+        }
+        
+        /**
+         * Affiche la réponse finale formatée (blocs de code, badges)
+         * @param {HTMLElement} messagesContainer - Conteneur des messages du chat
+         * @param {HTMLElement|null} responseElement - Élément créé pendant le flux, s'il existe
+         * @param {string} response - Réponse complète
+         * @param {Object} meta - Informations de l'événement "start"
+         */
+        renderAssistantMessage(messagesContainer, responseElement, response, meta) {
+            if (!responseElement) {
+                responseElement = document.createElement('div');
+                responseElement.className = 'chat-message system';
+                messagesContainer.appendChild(responseElement);
+            }
+            
+            // Formater la réponse avec Markdown si nécessaire
+            let formattedResponse = this.escapeHtml(response);
+            
+            // Remplacer les blocs de code
+            formattedResponse = formattedResponse.replace(/```(\w*)([\s\S]*?)```/g, (match, language, code) => {
+                return `<pre class="code-block ${language}"><code>${this.escapeHtml(code.trim())}</code></pre>`;
             });
+            
+            // Remplacer les lignes de code inline
+            formattedResponse = formattedResponse.replace(/`([^`]+)`/g, '<code>$1</code>');
+            
+            // Remplacer les sauts de ligne
+            formattedResponse = formattedResponse.replace(/\n/g, '<br>');
+            
+            // Ajouter le badge du modèle si disponible
+            let modelBadge = '';
+            if (meta.model_used) {
+                modelBadge = `<div class="model-badge">${meta.model_used}</div>`;
+            }
+            
+            // Ajouter le badge LangGraph si utilisé
+            let langGraphBadge = '';
+            if (meta.used_langgraph) {
+                langGraphBadge = `<div class="langgraph-badge">LangGraph</div>`;
+            }
+            
+            responseElement.innerHTML = `
+                <div class="message-content">
+                    ${formattedResponse}
+                </div>
+                <div class="message-badges">
+                    ${modelBadge}
+                    ${langGraphBadge}
+                </div>
+            `;
+            
+            // Vérifier s'il y a des appels d'outils dans la réponse
+            if (response.includes("Je vais utiliser un outil") || 
+                response.includes("J'utilise l'outil") ||
+                response.includes("Résultat de ")) {
+                
+                // Ajouter un badge d'outil
+                const toolBadge = document.createElement('div');
+                toolBadge.className = 'tool-badge';
+                toolBadge.textContent = 'Outil utilisé';
+                responseElement.querySelector('.message-badges').appendChild(toolBadge);
+            }
+            
+            // Faire défiler vers le bas
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
         }
         
         /**
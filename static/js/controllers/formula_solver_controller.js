@@ -1074,8 +1074,8 @@
                 const allCombinations = this.generateAllCombinations(variables);
                 console.log(`${allCombinations.length} combinaisons générées:`, allCombinations);
                 
-                // Limite pour éviter de surcharger le serveur (max 50 combinaisons)
-                const maxCombinations = 50;
+                // Limite d'affichage (le calcul se fait en une seule requête groupée)
+                const maxCombinations = 500;
                 const combinationsToProcess = allCombinations.slice(0, maxCombinations);
                 
                 // Affichage d'un message si certaines combinaisons sont ignorées
@@ -1101,32 +1101,26 @@
                 // Collecter les données pour tous les points
                 const mapPoints = [];
                 
-                // Traiter chaque combinaison
-                Promise.all(combinationsToProcess.map(combination => {
-                    // Créer les données à envoyer à l'API
-                    const requestData = {
+                // Traiter toutes les combinaisons en une seule requête (formule compilée côté serveur)
+                fetch('/api/calculate_coordinates/batch', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'X-Requested-With': 'XMLHttpRequest',
+                    },
+                    body: JSON.stringify({
                         formula: formula,
-                        variables: combination,
-                        ...originData,
-                        timestamp: new Date().getTime() // Pour éviter le cache
-                    };
-                    
-                    // Appeler l'API pour calculer les coordonnées
-                    return fetch('/api/calculate_coordinates', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                            'X-Requested-With': 'XMLHttpRequest',
-                        },
-                        body: JSON.stringify(requestData),
-                    })
-                    .then(response => {
-                        if (!response.ok) {
-                            throw new Error(`Erreur HTTP ${response.status}: ${response.statusText}`);
-                        }
-                        return response.json();
-                    });
-                }))
+                        assignments: combinationsToProcess,
+                        ...originData
+                    }),
+                })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`Erreur HTTP ${response.status}: ${response.statusText}`);
+                    }
+                    return response.json();
+                })
+                .then(batch => batch.results)
                 .then(results => {
                     // Supprimer le message de traitement
                     processingMsg.remove();
@@ -2065,9 +2059,15 @@
             
             this.showSolvingWithAI();
             
-            console.log("Envoi de la requête de résolution avec l'IA...");
+            console.log("Envoi de la requête de résolution parallèle avec l'IA...");
+            
+            // Chaque lettre est résolue par une requête séparée ; les réponses arrivent
+            // une par une (une ligne JSON par lettre) et sont affichées immédiatement
+            Object.keys(questions)
+                .filter(letter => letter !== '_thematic_context')
+                .forEach(letter => this.showSingleQuestionLoading(letter));
             
-            fetch('/geocaches/formula-solve-questions', {
+            fetch('/geocaches/formula-solve-questions-stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -2078,13 +2078,19 @@
                     gc_code: this.gcCodeValue
                 }),
             })
-            .then(response => response.json())
-            .then(data => {
+            .then(response => {
+                if (!response.ok) {
+                    return response.json().then(data => {
+                        throw new Error(data.error || `Erreur HTTP: ${response.status}`);
+                    });
+                }
+                return this.readSolveStream(response);
+            })
+            .then(summary => {
                 this.hideSolvingWithAI();
                 
-                if (data.success) {
-                    console.log("Réponses reçues du serveur:", data.answers);
-                    this.updateLettersWithAnswers(data.answers);
+                if (summary && summary.done) {
+                    console.log(`Réponses reçues du serveur en ${summary.total_ms} ms:`, summary.answers);
                     
                     // Afficher un message de réussite temporaire
                     const statusElement = document.getElementById('extraction-status');
@@ -2099,17 +2105,56 @@
                         }, 5000);
                     }
                 } else {
-                    console.error('Erreur lors de la résolution des questions:', data.error);
-                    alert(`Erreur: ${data.error || 'Une erreur s\'est produite lors de la résolution des questions'}`);
+                    const message = (summary && summary.message) || 'Une erreur s\'est produite lors de la résolution des questions';
+                    console.error('Erreur lors de la résolution des questions:', message);
+                    alert(`Erreur: ${message}`);
                 }
             })
             .catch(error => {
                 this.hideSolvingWithAI();
+                Object.keys(questions).forEach(letter => this.hideSingleQuestionLoading(letter));
                 console.error('Erreur lors de la requête:', error);
-                alert('Erreur de Connexion: Impossible de se connecter au serveur pour résoudre les questions');
+                alert(`Erreur de Connexion: ${error.message || 'Impossible de se connecter au serveur pour résoudre les questions'}`);
             });
         }
         
+        // Lire le flux de réponses (une ligne JSON par lettre, puis un résumé final)
+        async readSolveStream(response) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let summary = null;
+            
+            const handleLine = (line) => {
+                if (!line.trim()) return;
+                const event = JSON.parse(line);
+                if (event.letter) {
+                    this.hideSingleQuestionLoading(event.letter);
+                    if (event.status === 'ok') {
+                        this.updateLettersWithAnswers({ [event.letter]: event.answer });
+                        if (event.answer) {
+                            this.showSingleQuestionSuccess(event.letter, event.answer);
+                        }
+                    } else {
+                        this.showSingleQuestionError(event.letter, event.error || event.status);
+                    }
+                } else if (event.done || event.error) {
+                    summary = event;
+                }
+            };
+            
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleLine);
+            }
+            handleLine(buffer);
+            return summary;
+        }
+        
         // Mettre à jour les lettres avec les réponses de l'IA
         updateLettersWithAnswers(answers) {
             // Parcourir chaque lettre et mettre à jour sa valeur
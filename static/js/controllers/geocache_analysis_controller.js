@@ -55,45 +55,66 @@
                     console.warn("Erreur lors de la récupération du paramètre, utilisation de la valeur par défaut:", settingError);
                 }
                 
-                // Tester avec une autre approche - XMLHttpRequest au lieu de fetch
-                const xhr = new XMLHttpRequest();
-                xhr.open('POST', '/api/plugins/analysis_web_page/execute');
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.setRequestHeader('Accept', 'application/json');
-                xhr.onload = () => {
-                    console.log("XHR onload, status:", xhr.status);
-                    if (xhr.status === 200) {
-                        console.log("Réponse XHR reçue:", xhr.responseText);
-                        try {
-                            const data = JSON.parse(xhr.responseText);
-                            this.displayResults(data);
-                        } catch (e) {
-                            console.error("Erreur de parsing JSON:", e);
-                            this.showError("Erreur de parsing JSON: " + e.message);
-                        }
-                    } else {
-                        console.error("Erreur XHR:", xhr.status, xhr.responseText);
-                        this.showError(`Erreur ${xhr.status}: ${xhr.responseText}`);
-                    }
-                };
-                xhr.onerror = (e) => {
-                    console.error("Erreur réseau XHR:", e);
-                    this.showError("Erreur réseau: impossible de contacter le serveur");
-                };
-                
-                const payload = JSON.stringify({
-                    geocache_id: geocacheId,
-                    _format: 'json'
+                // Analyse en flux : chaque étape de la pipeline est affichée dès qu'elle se termine
+                const response = await fetch('/api/plugins/analysis_web_page/stream', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Accept': 'application/x-ndjson'
+                    },
+                    body: JSON.stringify({ geocache_id: geocacheId })
                 });
-                console.log("Envoi XHR avec payload:", payload);
-                xhr.send(payload);
+                if (!response.ok) {
+                    const data = await response.json().catch(() => ({}));
+                    throw new Error(data.error || `Erreur ${response.status}`);
+                }
+
+                const summary = await this.readAnalysisStream(response);
+                if (summary && summary.done) {
+                    console.log(`Analyse terminée en ${summary.total_ms} ms (${summary.cached_steps} étape(s) en cache)`);
+                    this.displayResults(summary);
+                } else {
+                    this.showError((summary && summary.message) || "L'analyse a été interrompue");
+                }
             } catch (error) {
                 console.error('Erreur complète:', error);
                 this.showError(error.message);
             }
         }
 
-        displayResults(data) {
+        // Lire le flux de l'analyse (une ligne JSON par étape, puis un résumé final)
+        async readAnalysisStream(response) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            const partial = {};
+            let buffer = '';
+            let summary = null;
+
+            const handleLine = (line) => {
+                if (!line.trim()) return;
+                const event = JSON.parse(line);
+                if (event.step) {
+                    console.log(`Étape ${event.step}: ${event.status} (${event.elapsed_ms} ms)`);
+                    partial[event.step] = event.result;
+                    this.displayResults({ combined_results: partial }, { partial: true });
+                } else if (event.done || event.error) {
+                    summary = event;
+                }
+            };
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleLine);
+            }
+            handleLine(buffer);
+            return summary;
+        }
+
+        displayResults(data, { partial = false } = {}) {
             this.hideLoading()
             this.errorTarget.classList.add('hidden')
             this.resultsTarget.classList.remove('hidden')
@@ -136,7 +157,8 @@
                 console.log("État de autoCorrectEnabled:", this.autoCorrectEnabled);
                 
                 // Sauvegarder automatiquement les premières coordonnées si auto_correct est activé
-                if (this.autoCorrectEnabled && coordinates.length > 0) {
+                // (uniquement sur le résultat final, pas sur les résultats partiels)
+                if (this.autoCorrectEnabled && !partial && coordinates.length > 0) {
                     console.log("Auto-correction activée, sauvegarde automatique des coordonnées:", coordinates[0]);
                     
                     // Vérifier que les coordonnées sont bien au format attendu
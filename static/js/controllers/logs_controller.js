@@ -84,19 +84,59 @@ export default class extends Controller {
             icon.classList.add('animate-spin');
         }
         
-        // Appeler l'API pour rafraîchir les logs
-        htmx.ajax('POST', `/api/logs/refresh?geocacheId=${geocacheId}`, {
-            target: '#logs-panel',
-            swap: 'innerHTML',
-            complete: () => {
-                // Restaurer le bouton après le chargement
-                button.classList.remove('opacity-50');
-                button.disabled = false;
-                if (icon) {
-                    icon.classList.remove('animate-spin');
+        const indicator = document.getElementById('loading-indicator');
+        if (indicator) {
+            indicator.classList.add('htmx-request');
+        }
+
+        const restore = () => {
+            // Restaurer le bouton une fois le panneau rechargé
+            button.classList.remove('opacity-50');
+            button.disabled = false;
+            if (icon) {
+                icon.classList.remove('animate-spin');
+            }
+            if (indicator) {
+                indicator.classList.remove('htmx-request');
+            }
+        };
+
+        // La route lance une tâche de fond et répond aussitôt (202) : on suit la tâche
+        // via /api/jobs/<id>, puis on recharge le panneau avec l'issue du rafraîchissement
+        fetch(`/api/logs/refresh?geocacheId=${geocacheId}`, { method: 'POST' })
+            .then(response => response.json().then(data => {
+                if (!response.ok) {
+                    throw new Error(data.error || `HTTP ${response.status}`);
                 }
-                console.log('Logs rafraîchis pour la géocache:', geocacheId);
+                return data;
+            }))
+            .then(job => this.waitForJob(job.id))
+            .then(job => {
+                console.log('Logs rafraîchis pour la géocache:', geocacheId, job.status);
+                return htmx.ajax('GET', `/api/logs/logs_panel?geocacheId=${geocacheId}&jobId=${job.id}`, {
+                    target: '#logs-panel',
+                    swap: 'innerHTML'
+                });
+            })
+            .catch(error => {
+                console.error('Erreur lors du rafraîchissement des logs:', error);
+                this.loadLogs(geocacheId);
+            })
+            .finally(restore);
+    }
+
+    async waitForJob(jobId) {
+        const finished = ['succeeded', 'failed', 'cancelled'];
+        while (true) {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error || `HTTP ${response.status}`);
             }
-        });
+            if (finished.includes(job.status)) {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
     }
 } 
\ No newline at end of file
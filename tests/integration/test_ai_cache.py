@@ -0,0 +1,158 @@
+"""
+Tests pour le cache des réponses de l'IA.
+
+Ce module vérifie les clés adressées par contenu, la durée de vie, l'éviction,
+la fusion des requêtes identiques en cours et l'intégration avec
+AIService.chat, à l'aide d'un modèle local factice.
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services import ai_service as ai_service_module
+from app.services.ai_cache_service import AIResponseCache, make_cache_key
+from app.services.ai_service import AIService
+
+MESSAGES = [
+    {'role': 'system', 'content': 'Tu es un assistant spécialisé dans l\'analyse des géocaches.'},
+    {'role': 'user', 'content': 'Quel est le thème de GC12345 ?'},
+]
+SETTINGS = {'mode': 'online', 'ai_provider': 'openai', 'temperature': 0.7}
+
+
+class StubModel:
+    """Modèle local factice : compte les appels et simule une latence."""
+
+    def __init__(self, delay=0.0, response='Thème : les phares bretons.'):
+        self.delay = delay
+        self.response = response
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AIResponseCache(str(tmp_path / 'ai_cache.db'), ttl_seconds=60, max_entries=3, clock=FakeClock())
+
+
+class TestCacheKey:
+    """Tests pour les clés adressées par contenu."""
+
+    def test_normalized_messages(self):
+        """Vérifie que les différences d'espaces et de fins de ligne ne changent pas la clé."""
+        noisy = [
+            {'role': 'SYSTEM', 'content': '  Tu es un assistant spécialisé dans l\'analyse des géocaches.  '},
+            {'role': 'user', 'content': 'Quel est le thème de GC12345 ?\r\n'},
+        ]
+        assert make_cache_key('gpt-4o', SETTINGS, noisy) == make_cache_key('gpt-4o', SETTINGS, MESSAGES)
+
+    def test_model_and_settings(self):
+        """Vérifie que le modèle et les paramètres influents changent la clé, pas la clé API."""
+        key = make_cache_key('gpt-4o', SETTINGS, MESSAGES)
+        assert make_cache_key('gpt-4', SETTINGS, MESSAGES) != key
+        assert make_cache_key('gpt-4o', dict(SETTINGS, temperature=0.0), MESSAGES) != key
+        assert make_cache_key('gpt-4o', dict(SETTINGS, api_key='sk-secret'), MESSAGES) == key
+
+
+class TestAIResponseCache:
+    """Tests pour le stockage et les appels."""
+
+    def test_hit_and_stats(self, cache):
+        """Vérifie qu'un second appel identique est servi par le cache."""
+        model = StubModel()
+        first = cache.get_or_compute('k', model)
+        second = cache.get_or_compute('k', model)
+        assert first == second == model.response
+        assert model.calls == 1
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+        assert stats['hit_rate'] == 0.5
+
+    def test_ttl(self, cache):
+        """Vérifie qu'une réponse expirée est recalculée."""
+        model = StubModel()
+        cache.get_or_compute('k', model)
+        cache._clock.now += 61
+        cache.get_or_compute('k', model)
+        assert model.calls == 2
+
+    def test_eviction(self, cache):
+        """Vérifie l'éviction des entrées les moins récemment utilisées."""
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key)
+            cache._clock.now += 1
+        cache.get('a')
+        cache._clock.now += 1
+        cache.put('d', 'd')
+        assert cache.stats()['entries'] == 3
+        assert cache.get('b') is None
+        assert cache.get('a') == 'a'
+
+    def test_errors_not_stored(self, cache):
+        """Vérifie que les réponses filtrées et les exceptions ne sont pas mises en cache."""
+        model = StubModel(response='Erreur: quota dépassé')
+        cache.get_or_compute('k', model, should_store=lambda r: not r.startswith('Erreur'))
+        assert cache.get('k') is None
+
+        def failing():
+            raise RuntimeError('réseau indisponible')
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute('k', failing)
+        assert cache.get('k') is None
+
+    def test_single_flight(self, cache):
+        """Vérifie que des requêtes identiques simultanées ne déclenchent qu'un appel."""
+        model = StubModel(delay=0.2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', model)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert model.calls == 1
+        assert results == [model.response] * 8
+        stats = cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] + stats['coalesced'] == 7
+        assert stats['saved_seconds'] > 0
+
+
+class TestAIServiceChat:
+    """Tests pour AIService.chat avec le cache."""
+
+    def test_use_cache(self, tmp_path, monkeypatch):
+        """Vérifie que seuls les appels avec use_cache=True passent par le cache."""
+        cache = AIResponseCache(str(tmp_path / 'ai_cache.db'))
+        monkeypatch.setattr(ai_service_module, 'get_ai_response_cache', lambda: cache)
+        model = StubModel()
+        service = AIService()
+        monkeypatch.setattr(service, '_dispatch_chat', lambda messages, settings, use_langgraph: model())
+        settings = dict(SETTINGS, ai_model='gpt-4o', use_langgraph=False)
+
+        service.chat(MESSAGES, dict(settings), use_cache=True)
+        service.chat(MESSAGES, dict(settings), use_cache=True)
+        assert model.calls == 1
+        service.chat(MESSAGES, dict(settings))
+        assert model.calls == 2
+        service.chat(MESSAGES, dict(settings, ai_model='gpt-4'), use_cache=True)
+        assert model.calls == 3
@@ -0,0 +1,180 @@
+"""
+Tests pour le flux des réponses de l'IA.
+
+Ce module vérifie, face à un serveur HTTP local qui imite l'API de chat
+d'Ollama en mode flux, que les fragments sont relayés dès leur réception
+(temps jusqu'au premier fragment), que l'endpoint SSE /api/ai/chat/stream
+renvoie le message complet et que la déconnexion du client ferme la
+connexion au modèle.
+"""
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.services.ai_service import AIService, ai_service
+from app.routes.ai_routes import ai_bp
+
+TOKENS = ['Le ', 'thème ', 'est ', 'la ', 'mer.']
+TOKEN_DELAY = 0.15
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """
+    Imite POST /api/chat d'Ollama : réponse HTTP/1.1 découpée (chunked),
+    une ligne JSON par fragment, espacées de TOKEN_DELAY.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _write_chunk(self, payload):
+        data = (json.dumps(payload) + '\n').encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            for token in TOKENS:
+                self._write_chunk({'message': {'role': 'assistant', 'content': token}, 'done': False})
+                self.server.sent += 1
+                time.sleep(TOKEN_DELAY)
+            self._write_chunk({'done': True})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+            self.server.completed = True
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllamaHandler)
+    server.requests = []
+    server.sent = 0
+    server.completed = False
+    server.aborted = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _settings(url):
+    return {'mode': 'local', 'local_model': 'llama3', 'ollama_url': url, 'use_langgraph': False,
+            'temperature': 0.2, 'system_prompt': 'Tu es un assistant.'}
+
+
+class TestStreamLocal:
+    """Tests pour AIService.stream_local."""
+
+    def test_time_to_first_token(self, ollama_url):
+        """Vérifie que le premier fragment arrive bien avant la fin de la génération."""
+        server, url = ollama_url
+        start = time.perf_counter()
+        first = None
+        parts = []
+        for token in AIService().stream_chat([{'role': 'user', 'content': 'Thème ?'}], _settings(url)):
+            if first is None:
+                first = time.perf_counter() - start
+            parts.append(token)
+        total = time.perf_counter() - start
+
+        assert ''.join(parts) == ''.join(TOKENS)
+        assert first < TOKEN_DELAY * 2
+        assert total >= TOKEN_DELAY * (len(TOKENS) - 1)
+        body = server.requests[0]
+        assert body['stream'] is True
+        assert body['messages'][0] == {'role': 'system', 'content': 'Tu es un assistant.'}
+        assert body['options']['temperature'] == 0.2
+
+    def test_cancellation_closes_connection(self, ollama_url):
+        """Vérifie que l'annulation ferme la connexion et interrompt le serveur."""
+        server, url = ollama_url
+        cancel = threading.Event()
+        stream = AIService().stream_local([{'role': 'user', 'content': 'Thème ?'}], _settings(url), cancel)
+        assert next(stream) == TOKENS[0]
+        cancel.set()
+        assert list(stream) == []
+
+        deadline = time.time() + 3
+        while not server.aborted and not server.completed and time.time() < deadline:
+            time.sleep(0.05)
+        assert server.aborted
+        assert server.sent < len(TOKENS)
+
+
+class TestChatStreamApi:
+    """Tests pour l'endpoint /api/ai/chat/stream."""
+
+    @pytest.fixture
+    def client(self, ollama_url, monkeypatch):
+        _, url = ollama_url
+        monkeypatch.setattr(ai_service, 'get_settings', lambda: _settings(url))
+        app = Flask(__name__)
+        app.register_blueprint(ai_bp)
+        return app.test_client()
+
+    @staticmethod
+    def _events(body):
+        events = []
+        for raw in body.strip().split('\n\n'):
+            lines = raw.split('\n')
+            events.append((lines[0][len('event: '):], json.loads(lines[1][len('data: '):])))
+        return events
+
+    def test_stream_events(self, client):
+        """Vérifie la séquence start / token / done et le message complet."""
+        response = client.post('/api/ai/chat/stream', json={
+            'messages': [{'role': 'user', 'content': 'Thème ?'}],
+            'use_tools': False,
+        })
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = self._events(response.get_data(as_text=True))
+
+        assert events[0] == ('start', {'model_used': None, 'used_langgraph': False})
+        assert [data['token'] for name, data in events if name == 'token'] == TOKENS
+        name, done = events[-1]
+        assert name == 'done'
+        assert done['response'] == ''.join(TOKENS)
+        assert done['ttft_ms'] < done['total_ms']
+
+    def test_client_disconnect(self, client, ollama_url):
+        """Vérifie que la fermeture de la réponse par le client annule le flux."""
+        server, _ = ollama_url
+        response = client.post('/api/ai/chat/stream', json={
+            'messages': [{'role': 'user', 'content': 'Thème ?'}],
+            'use_tools': False,
+        }, buffered=False)
+        chunks = iter(response.response)
+        assert b'event: start' in next(chunks)
+        assert b'event: token' in next(chunks)
+        response.close()
+
+        deadline = time.time() + 3
+        while not server.aborted and not server.completed and time.time() < deadline:
+            time.sleep(0.05)
+        assert server.aborted
+
+    def test_empty_messages(self, client):
+        """Vérifie la réponse 400 sans message."""
+        response = client.post('/api/ai/chat/stream', json={'messages': []})
+        assert response.status_code == 400
@@ -0,0 +1,161 @@
+"""
+Tests pour le catalogue des alphabets.
+
+Ce module vérifie l'index en mémoire (aucune relecture tant que rien ne
+change, rafraîchissement sur modification), le manifeste des glyphes et les
+en-têtes de cache HTTP des ressources (ETag, 304, cache durable des URL
+versionnées).
+"""
+import pytest
+import sys
+import os
+import json
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.routes import alphabets as alphabets_routes
+from app.services import alphabet_catalog_service
+from app.services.alphabet_catalog_service import AlphabetCatalog
+
+
+def _write_alphabet(root, alphabet_id, config, files):
+    alphabet_dir = root / alphabet_id
+    alphabet_dir.mkdir()
+    (alphabet_dir / 'alphabet.json').write_text(json.dumps(config), encoding='utf-8')
+    for relative, content in files.items():
+        path = alphabet_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+@pytest.fixture
+def alphabets_dir(tmp_path):
+    root = tmp_path / 'alphabets'
+    root.mkdir()
+    _write_alphabet(root, 'braille', {
+        'name': 'Braille',
+        'alphabetConfig': {'type': 'font', 'fontFile': 'fonts/braille.ttf'},
+    }, {'fonts/braille.ttf': b'\x00\x01ttf'})
+    _write_alphabet(root, 'chappe', {
+        'name': 'Chappe',
+        'alphabetConfig': {'type': 'images', 'imageFormat': 'png', 'imageDir': 'images'},
+    }, {'images/a.png': b'png-a', 'images/b.png': b'png-b', 'notes.txt': b'x'})
+    return root
+
+
+@pytest.fixture
+def catalog(alphabets_dir):
+    return AlphabetCatalog(str(alphabets_dir), refresh_interval=0)
+
+
+class TestAlphabetCatalog:
+    """Tests pour l'index en mémoire."""
+
+    def test_list_without_reload(self, catalog):
+        """Vérifie que les lectures successives ne relisent pas les fichiers."""
+        assert [a['id'] for a in catalog.list()] == ['braille', 'chappe']
+        loads = catalog.loads
+        for _ in range(5):
+            catalog.list()
+            catalog.get('chappe')
+        assert catalog.loads == loads
+
+    def test_refresh_on_change(self, catalog, alphabets_dir):
+        """Vérifie la prise en compte d'une modification, d'un ajout et d'une suppression."""
+        version = catalog.asset_version('chappe')
+        config_path = alphabets_dir / 'chappe' / 'alphabet.json'
+        config = json.loads(config_path.read_text(encoding='utf-8'))
+        config['name'] = 'Chappe (télégraphe)'
+        config_path.write_text(json.dumps(config), encoding='utf-8')
+        os.utime(config_path, ns=(1, 1))
+        assert catalog.get('chappe')['name'] == 'Chappe (télégraphe)'
+
+        (alphabets_dir / 'chappe' / 'images' / 'c.png').write_bytes(b'png-c')
+        assert catalog.asset_version('chappe') != version
+        assert 'c' in catalog.manifest('chappe')['glyphs']
+
+        _write_alphabet(alphabets_dir, 'ath', {'name': 'Ath', 'alphabetConfig': {'type': 'font'}}, {})
+        assert catalog.get('ath') is not None
+        (alphabets_dir / 'braille' / 'alphabet.json').unlink()
+        assert catalog.get('braille') is None
+
+    def test_refresh_on_replaced_asset(self, catalog, alphabets_dir):
+        """Vérifie qu'une ressource remplacée en place change la version, même si les dossiers n'ont pas changé."""
+        version = catalog.asset_version('chappe')
+        images_dir = alphabets_dir / 'chappe' / 'images'
+        dir_stats = [os.stat(path) for path in (alphabets_dir / 'chappe', images_dir)]
+
+        (images_dir / 'a.png').write_bytes(b'png-a, v2')
+        for path, stat in zip((alphabets_dir / 'chappe', images_dir), dir_stats):
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert catalog.asset_version('chappe') != version
+
+        loads = catalog.loads
+        catalog.list()
+        assert catalog.loads == loads
+
+    def test_get_returns_copy(self, catalog):
+        """Vérifie que modifier la configuration obtenue n'altère pas l'index."""
+        config = catalog.get('chappe')
+        config['alphabetConfig']['type'] = 'font'
+        assert catalog.get('chappe')['alphabetConfig']['type'] == 'images'
+
+    def test_manifest(self, catalog):
+        """Vérifie les URL versionnées de la police et des glyphes."""
+        version = catalog.asset_version('chappe')
+        manifest = catalog.manifest('chappe')
+        assert manifest['glyphs'] == {
+            'a': f"/api/alphabets/chappe/resource/images/a.png?v={version}",
+            'b': f"/api/alphabets/chappe/resource/images/b.png?v={version}",
+        }
+        assert catalog.manifest('braille')['font'] == f"/api/alphabets/braille/font?v={catalog.asset_version('braille')}"
+        assert catalog.manifest('inconnu') is None
+
+
+class TestAlphabetAssetsApi:
+    """Tests pour les en-têtes de cache des routes d'alphabets."""
+
+    @pytest.fixture
+    def client(self, catalog, alphabets_dir, monkeypatch):
+        monkeypatch.setattr(alphabet_catalog_service, '_alphabet_catalog_instance', catalog)
+        monkeypatch.setattr(alphabets_routes, 'ALPHABETS_DIR', str(alphabets_dir))
+        app = Flask(__name__)
+        app.register_blueprint(alphabets_routes.alphabets_bp)
+        return app.test_client()
+
+    def test_versioned_resource_is_immutable(self, client, catalog):
+        """Vérifie le cache durable d'une ressource demandée avec sa version."""
+        version = catalog.asset_version('chappe')
+        response = client.get(f"/api/alphabets/chappe/resource/images/a.png?v={version}")
+        assert response.status_code == 200
+        assert response.data == b'png-a'
+        assert response.cache_control.max_age == alphabets_routes.ASSET_MAX_AGE
+        assert response.cache_control.immutable
+
+    def test_unversioned_resource_revalidated(self, client):
+        """Vérifie la revalidation (ETag / Last-Modified, 304) sans version dans l'URL."""
+        response = client.get('/api/alphabets/chappe/resource/images/a.png')
+        assert response.cache_control.no_cache
+        assert response.headers.get('ETag') and response.headers.get('Last-Modified')
+
+        again = client.get('/api/alphabets/chappe/resource/images/a.png',
+                           headers={'If-None-Match': response.headers['ETag']})
+        assert again.status_code == 304
+
+    def test_font_and_unknown_resources(self, client, catalog):
+        """Vérifie la police et le refus des fichiers hors de l'index."""
+        response = client.get(f"/api/alphabets/braille/font?v={catalog.asset_version('braille')}")
+        assert response.status_code == 200
+        assert response.mimetype == 'font/ttf'
+        assert client.get('/api/alphabets/chappe/resource/images/z.png').status_code == 404
+        assert client.get('/api/alphabets/chappe/resource/../braille/alphabet.json').status_code == 404
+
+    def test_list_and_manifest_etag(self, client):
+        """Vérifie les réponses 304 de la liste et du manifeste."""
+        for url in ('/api/alphabets', '/api/alphabets/chappe/manifest'):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+        assert client.get('/api/alphabets/inconnu/manifest').status_code == 404
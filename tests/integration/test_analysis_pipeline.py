@@ -0,0 +1,199 @@
+"""
+Tests pour la pipeline d'analyse des pages de géocaches.
+
+Ce module vérifie la validation du graphe d'étapes, l'exécution en parallèle
+des étapes indépendantes dans le respect des dépendances, le cache des
+résultats (par contenu de la géocache et version des plugins) et le
+post-traitement des résultats combinés.
+"""
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Importé ici pour que sa durée de chargement ne fausse pas les mesures
+import app.routes.coordinates  # noqa: F401
+from app.services.analysis_pipeline_service import (
+    AnalysisPipelineService, parse_pipeline, load_pipeline, finalize_results,
+)
+
+
+class FakePluginManager:
+    """Gestionnaire de plugins factice : chaque exécution dure `delay` secondes."""
+
+    def __init__(self, delay=0.0, versions=None, failing=()):
+        self.delay = delay
+        self.versions = versions or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def get_plugin(self, name):
+        return SimpleNamespace(metadata=SimpleNamespace(version=self.versions.get(name, '1.0.0')))
+
+    def add_reload_listener(self, callback):
+        self.listeners.append(callback)
+
+    def execute_plugin(self, name, inputs):
+        with self._lock:
+            self.calls.append((name, inputs))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if name in self.failing:
+            raise RuntimeError(f"{name} en échec")
+        return {'findings': [f"{name}:{inputs.get('text', inputs.get('geocache_id'))}"],
+                'upstream': sorted(inputs.get('upstream_results', {}))}
+
+
+def _geocache(description='<p>N 48° 51.402 E 002° 21.048</p>', waypoints=()):
+    return SimpleNamespace(id=7, gc_code='GC12345', description=description, additional_waypoints=list(waypoints))
+
+
+def _write_pipeline(tmp_path, steps):
+    path = tmp_path / 'plugin.json'
+    path.write_text(json.dumps({'name': 'analysis_web_page', 'pipeline': steps}), encoding='utf-8')
+    return str(path)
+
+
+PIPELINE = [
+    {'plugin_name': 'color_text_detector', 'inputs': ['text']},
+    {'plugin_name': 'formula_parser', 'inputs': ['text']},
+    {'plugin_name': 'html_comments_finder', 'inputs': ['text']},
+    {'plugin_name': 'additional_waypoints_analyzer', 'inputs': ['geocache_id']},
+]
+
+
+class TestPipelineDefinition:
+    """Tests pour la lecture et la validation de la pipeline."""
+
+    def test_topological_order(self):
+        """Vérifie que chaque étape suit ses dépendances et les valeurs par défaut."""
+        steps = parse_pipeline([
+            {'plugin_name': 'summary', 'depends_on': ['a', 'b']},
+            {'plugin_name': 'a'},
+            {'plugin_name': 'b', 'depends_on': ['a'], 'params': {'mode': 'strict'}},
+        ])
+        assert [step.name for step in steps] == ['a', 'b', 'summary']
+        assert steps[0].inputs == ('text', 'geocache_id')
+        assert steps[1].params == {'mode': 'strict'}
+
+    def test_invalid_pipelines(self):
+        """Vérifie le refus des dépendances inconnues, des doublons et des cycles."""
+        with pytest.raises(ValueError, match='inconnues'):
+            parse_pipeline([{'plugin_name': 'a', 'depends_on': ['absente']}])
+        with pytest.raises(ValueError, match='double'):
+            parse_pipeline([{'plugin_name': 'a'}, {'plugin_name': 'a'}])
+        with pytest.raises(ValueError, match='Cycle'):
+            parse_pipeline([{'plugin_name': 'a', 'depends_on': ['b']}, {'plugin_name': 'b', 'depends_on': ['a']}])
+
+    def test_load_pipeline_cached(self, tmp_path):
+        """Vérifie que plugin.json n'est relu qu'après modification."""
+        path = _write_pipeline(tmp_path, PIPELINE)
+        first = load_pipeline(path)
+        assert load_pipeline(path) is first
+        _write_pipeline(tmp_path, PIPELINE[:2])
+        os.utime(path, ns=(1, 1))
+        assert len(load_pipeline(path)) == 2
+
+
+class TestPipelineExecution:
+    """Tests pour l'exécution de la pipeline."""
+
+    def test_independent_steps_in_parallel(self, tmp_path):
+        """Vérifie que les étapes indépendantes s'exécutent en même temps."""
+        manager = FakePluginManager(delay=0.2)
+        service = AnalysisPipelineService(max_workers=4)
+        start = time.perf_counter()
+        events = list(service.analyze(_geocache(), _write_pipeline(tmp_path, PIPELINE), manager))
+        elapsed = time.perf_counter() - start
+
+        assert manager.max_active == 4
+        assert elapsed < 0.2 * len(PIPELINE) * 0.75
+        summary = events[-1]
+        assert summary['done'] and summary['cached_steps'] == 0
+        assert list(summary['combined_results']) == [step['plugin_name'] for step in PIPELINE]
+        assert dict(manager.calls)['additional_waypoints_analyzer'] == {'geocache_id': 7}
+
+    def test_dependencies_and_failures(self, tmp_path):
+        """Vérifie la transmission des résultats amont et l'abandon des étapes dépendant d'un échec."""
+        path = _write_pipeline(tmp_path, [
+            {'plugin_name': 'a', 'inputs': ['text']},
+            {'plugin_name': 'b', 'inputs': ['text']},
+            {'plugin_name': 'merge', 'inputs': [], 'depends_on': ['a', 'b']},
+            {'plugin_name': 'after_failure', 'depends_on': ['broken']},
+            {'plugin_name': 'broken'},
+        ])
+        manager = FakePluginManager(failing={'broken'})
+        events = {event['step']: event for event in AnalysisPipelineService().analyze(_geocache(), path, manager)
+                  if 'step' in event}
+
+        assert events['merge']['status'] == 'ok'
+        assert events['merge']['result']['upstream'] == ['a', 'b']
+        assert events['broken']['status'] == 'error'
+        assert events['after_failure']['status'] == 'skipped'
+        assert 'after_failure' not in [name for name, _ in manager.calls]
+
+    def test_results_cached(self, tmp_path):
+        """Vérifie la réutilisation des résultats tant que le contenu et les versions ne changent pas."""
+        path = _write_pipeline(tmp_path, PIPELINE)
+        manager = FakePluginManager()
+        service = AnalysisPipelineService()
+        first = list(service.analyze(_geocache(), path, manager))[-1]
+
+        second = list(service.analyze(_geocache(), path, manager))[-1]
+        assert second['cached_steps'] == len(PIPELINE)
+        assert second['combined_results'] == first['combined_results']
+        assert len(manager.calls) == len(PIPELINE)
+
+        # Waypoint ajouté : seule l'étape qui relit la géocache est relancée
+        waypoint = SimpleNamespace(prefix='P1', lookup='P1', name='Parking', gc_lat='N 48° 51.000',
+                                   gc_lon='E 002° 21.000', note='')
+        list(service.analyze(_geocache(waypoints=[waypoint]), path, manager))
+        assert [name for name, _ in manager.calls[len(PIPELINE):]] == ['additional_waypoints_analyzer']
+
+        # Nouvelle version : seule l'étape du plugin concerné est relancée
+        manager.versions['formula_parser'] = '1.1.0'
+        list(service.analyze(_geocache(waypoints=[waypoint]), path, manager))
+        assert [name for name, _ in manager.calls[len(PIPELINE) + 1:]] == ['formula_parser']
+
+        # Rechargement d'un plugin : ses résultats sont oubliés
+        manager.listeners[0]('color_text_detector', '1.0.0', '1.0.0')
+        list(service.analyze(_geocache(waypoints=[waypoint]), path, manager))
+        assert [name for name, _ in manager.calls[len(PIPELINE) + 2:]] == ['color_text_detector']
+
+        # Description modifiée ou cache désactivé : tout est relancé
+        assert list(service.analyze(_geocache(description='<p>Autre</p>'), path, manager))[-1]['cached_steps'] == 0
+        assert list(service.analyze(_geocache(), path, manager, use_cache=False))[-1]['cached_steps'] == 0
+
+
+class TestFinalizeResults:
+    """Tests pour le post-traitement des résultats combinés."""
+
+    def test_duplicate_formula_removed(self):
+        """Vérifie qu'une coordonnée trouvée par le détecteur de couleur est retirée des formules."""
+        combined = {
+            'color_text_detector': {'coordinates': {
+                'exist': True, 'ddm': "N 48° 51.402' E 002° 21.048'",
+                'ddm_lat': "N 48° 51.402'", 'ddm_lon': "E 002° 21.048'",
+            }},
+            'formula_parser': {'coordinates': [
+                {'north': "N 48° 51.402'", 'east': "E 002° 21.048'"},
+                {'north': 'N49°18.(B-A)', 'east': 'E006°16.(C+F)'},
+            ]},
+        }
+        primary = finalize_results(combined)
+        assert combined['formula_parser']['coordinates'] == [{'north': 'N49°18.(B-A)', 'east': 'E006°16.(C+F)'}]
+        assert primary == combined['color_text_detector']['coordinates']['decimal']
+        assert round(primary['latitude'], 4) == 48.8567
@@ -0,0 +1,45 @@
+"""
+Tests pour la suite de benchmarks.
+
+Ce module vérifie le déterminisme du corpus synthétique, la génération de GPX
+et la détection des régressions par la commande de comparaison.
+"""
+import pytest
+import sys
+import os
+import xml.etree.ElementTree as ET
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.tools.benchmark_corpus import generate_corpus, generate_gpx, GPX_NS
+from app.tools.benchmark import compare_results
+
+
+class TestBenchmarkSuite:
+    """Tests pour le corpus et la comparaison des résultats."""
+
+    def test_corpus_is_deterministic(self):
+        """Deux corpus générés avec la même graine sont identiques."""
+        assert generate_corpus(seed=7) == generate_corpus(seed=7)
+        assert generate_corpus(seed=7) != generate_corpus(seed=8)
+
+    def test_generate_gpx(self, tmp_path):
+        """Le GPX généré contient le nombre de caches demandé, avec des codes uniques."""
+        path = generate_gpx(str(tmp_path / 'bench.gpx'), 450, seed=1)
+        waypoints = ET.parse(path).getroot().findall(f'{{{GPX_NS}}}wpt')
+        codes = {wpt.find(f'{{{GPX_NS}}}name').text for wpt in waypoints}
+        assert len(waypoints) == 450
+        assert len(codes) == 450
+
+    def test_compare_results(self):
+        """Les ralentissements au-delà du seuil sont signalés comme régressions."""
+        baseline = {'benchmarks': {'a': {'median_ms': 1.0}, 'b': {'median_ms': 1.0}, 'c': {'median_ms': 1.0}}}
+        current = {'benchmarks': {'a': {'median_ms': 1.5}, 'b': {'median_ms': 1.1}, 'c': {'median_ms': 0.5}}}
+        statuses = {row['name']: row['status'] for row in compare_results(baseline, current, threshold=0.2)}
+        assert statuses == {'a': 'regression', 'b': 'ok', 'c': 'improvement'}
+
+    def test_compare_missing_benchmark(self):
+        """Un benchmark absent d'un des deux fichiers n'est pas une régression."""
+        rows = compare_results({'benchmarks': {'a': {'median_ms': 1.0}}}, {'benchmarks': {}})
+        assert rows[0]['status'] == 'missing'
@@ -0,0 +1,131 @@
+"""
+Tests pour le codec DDM de app.utils.coordinates.
+
+Ce module vérifie l'analyse stricte des chaînes au format Geocaching.com,
+le formatage (retenue des minutes arrondies à 60), le traitement en bloc
+et la compatibilité des fonctions de conversion existantes.
+"""
+import pytest
+import sys
+import os
+import numpy as np
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils.coordinates import (
+    convert_gc_coords_to_decimal, decimal_to_gc_coords, format_ddm, format_ddm_many,
+    parse_ddm, parse_ddm_latitude, parse_ddm_longitude, parse_ddm_many,
+)
+from app.routes.coordinates import convert_ddm_to_decimal
+
+PARIS = (48 + 51.402 / 60, 2 + 21.048 / 60)
+
+
+class TestParse:
+    """Tests pour l'analyse des chaînes DDM."""
+
+    @pytest.mark.parametrize('text', [
+        'N 48° 51.402 E 002° 21.048',
+        'N48°51.402 E002°21.048',
+        "N 48° 51.402' E 002° 21.048'",
+        'n 48 51,402, e 2 21,048',
+        '  N 48º 51.402   E 2º 21.048  ',
+    ])
+    def test_variants(self, text):
+        """Vérifie les variantes d'écriture acceptées."""
+        assert parse_ddm(text) == pytest.approx(PARIS)
+
+    def test_hemispheres(self):
+        """Vérifie le signe des hémisphères sud et ouest."""
+        assert parse_ddm('S 33° 51.000 W 151° 12.000') == pytest.approx((-33.85, -151.2))
+        assert parse_ddm_latitude('S 0° 30.000') == pytest.approx(-0.5)
+        assert parse_ddm_longitude('W 180° 0.000') == pytest.approx(-180.0)
+
+    @pytest.mark.parametrize('text', [
+        'N 91° 00.000 E 002° 00.000',
+        'N 48° 60.000 E 002° 00.000',
+        'N 48° 51.402 E 181° 00.000',
+        'E 002° 21.048 N 48° 51.402',
+        'N 48° 51.402',
+        'N 4851.402 E 00221.048',
+        'N4851.402 E 2 21.048',
+        'coordonnées : N 48° 51.402 E 002° 21.048',
+        '',
+    ])
+    def test_rejected(self, text):
+        """Vérifie le rejet des chaînes hors bornes ou mal formées."""
+        assert parse_ddm(text) is None
+
+    def test_axis_mismatch(self):
+        """Vérifie qu'une longitude n'est pas acceptée comme latitude."""
+        assert parse_ddm_latitude('E 002° 21.048') is None
+        assert parse_ddm_longitude('N 48° 51.402') is None
+
+
+class TestFormat:
+    """Tests pour le formatage en DDM."""
+
+    def test_format(self):
+        """Vérifie le format produit et l'aller-retour."""
+        assert format_ddm(*PARIS) == ('N 48° 51.402', 'E 2° 21.048')
+        assert format_ddm(-33.85, -151.2) == ('S 33° 51.000', 'W 151° 12.000')
+        assert parse_ddm(' '.join(format_ddm(*PARIS))) == pytest.approx(PARIS)
+
+    def test_minutes_carry(self):
+        """Vérifie qu'une minute arrondie à 60 est reportée sur les degrés."""
+        assert format_ddm(48.9999999, -2.9999999) == ('N 49° 0.000', 'W 3° 0.000')
+        assert decimal_to_gc_coords(48.9999999, 2.0) == ('N 49° 0.000', 'E 2° 0.000')
+
+    def test_invalid_input(self):
+        """Vérifie le retour (None, None) pour une entrée non numérique."""
+        assert decimal_to_gc_coords(None, 2.0) == (None, None)
+        assert decimal_to_gc_coords('abc', 2.0) == (None, None)
+
+
+class TestBulk:
+    """Tests pour le traitement en bloc."""
+
+    def test_parse_many(self):
+        """Vérifie l'analyse de listes avec des entrées invalides (NaN)."""
+        lats, lons = parse_ddm_many(['N 48° 51.402 E 002° 21.048', 'invalide', None])
+        assert lats[0] == pytest.approx(PARIS[0])
+        assert np.isnan(lats[1:]).all() and np.isnan(lons[1:]).all()
+
+        lats, lons = parse_ddm_many(['N 48° 51.402', None], ['E 002° 21.048', 'E 002° 21.048'])
+        assert lons.tolist() == pytest.approx([PARIS[1], PARIS[1]])
+        assert np.isnan(lats[1])
+
+    def test_format_many_matches_scalar(self):
+        """Vérifie que le formatage en bloc est identique au formatage unitaire."""
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(-89, 89, 200)
+        lons = rng.uniform(-179, 179, 200)
+        assert format_ddm_many(lats, lons) == [format_ddm(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+        assert format_ddm_many([np.nan, 48.9999999], [2.0, 2.0]) == [(None, None), ('N 49° 0.000', 'E 2° 0.000')]
+
+
+class TestLegacyWrappers:
+    """Tests pour les fonctions de conversion existantes."""
+
+    def test_convert_gc_coords_to_decimal(self):
+        """Vérifie la conversion des colonnes gc_lat / gc_lon."""
+        assert convert_gc_coords_to_decimal('N 48° 51.402', 'E 002° 21.048') == pytest.approx(PARIS)
+        assert convert_gc_coords_to_decimal(None, 'E 002° 21.048') == (None, None)
+
+    def test_convert_ddm_to_decimal_fallback(self):
+        """Vérifie que la recherche tolérante reste disponible pour les textes libres."""
+        result = convert_ddm_to_decimal("N 48° 51.402'", "E 002° 21.048'")
+        assert (result['latitude'], result['longitude']) == pytest.approx(PARIS)
+        result = convert_ddm_to_decimal('lat: N 48° 51.402 !', 'lon: E 002° 21.048 !')
+        assert (result['latitude'], result['longitude']) == pytest.approx(PARIS)
+
+    def test_convert_ddm_to_decimal_rejects_ambiguous(self):
+        """Vérifie le rejet des degrés collés aux minutes et des minutes hors bornes."""
+        assert parse_ddm_latitude('N 4851.402') is None
+        assert parse_ddm_longitude('E 00221.048') is None
+        assert convert_ddm_to_decimal('N 4851.402', 'E 00221.048') == {'latitude': None, 'longitude': None}
+        result = convert_ddm_to_decimal('lat: N 48° 75.000 !', 'lon: E 002° 60.000 !')
+        assert result == {'latitude': None, 'longitude': None}
+        assert convert_ddm_to_decimal('N 48 51.402', 'E 2 21.048') == pytest.approx(
+            {'latitude': PARIS[0], 'longitude': PARIS[1]})
@@ -0,0 +1,143 @@
+"""
+Tests pour la recherche par force brute des lettres inconnues d'une formule.
+
+Ce module vérifie l'analyse des domaines, l'élagage (chiffres, minutes,
+règle des 2 miles), le classement par distance et l'endpoint
+/api/calculate_coordinates/solve.
+"""
+import pytest
+import sys
+import os
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.services.formula_engine import compile_formula
+from app.services.formula_bruteforce_service import FormulaBruteForceSolver, parse_domain
+from app.routes.coordinates import coordinates_bp
+
+FORMULA = 'N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)'
+ORIGIN = (49 + 18.0 / 60, 6 + 16.0 / 60)
+
+
+@pytest.fixture
+def client():
+    """Client de test sur une application minimale avec le blueprint des coordonnées."""
+    app = Flask(__name__)
+    app.register_blueprint(coordinates_bp)
+    return app.test_client()
+
+
+def _brute_force(compiled, domains):
+    """Énumération naïve de référence : toutes les affectations complètes et valides."""
+    import itertools
+    letters = compiled.letters
+    assignments = [dict(zip(letters, values))
+                   for values in itertools.product(*(domains[letter] for letter in letters))]
+    batch = compiled.evaluate_many(assignments)
+    return [a for i, a in enumerate(assignments) if batch.row(i)['status'] == 'complete']
+
+
+class TestParseDomain:
+    """Tests pour l'analyse des domaines de valeurs."""
+
+    def test_formats(self):
+        """Vérifie les différentes syntaxes acceptées."""
+        assert parse_domain(7) == [7]
+        assert parse_domain('2-5') == [2, 3, 4, 5]
+        assert parse_domain('1,3, 5') == [1, 3, 5]
+        assert parse_domain([4, '4', 2]) == [2, 4]
+        assert parse_domain({'min': 8, 'max': 10}) == [8, 9, 10]
+
+    def test_invalid(self):
+        """Vérifie le rejet d'un domaine invalide."""
+        with pytest.raises(ValueError):
+            parse_domain('a-b')
+
+
+class TestFormulaBruteForceSolver:
+    """Tests pour l'énumération avec élagage."""
+
+    def test_matches_naive_enumeration(self):
+        """Vérifie que l'élagage ne perd ni n'invente aucune solution."""
+        compiled = compile_formula('N49°1A.(B-A)(A+C)B E006°16.(C*2)00')
+        domains = {'A': range(10), 'B': range(10), 'C': range(10)}
+        expected = _brute_force(compiled, domains)
+
+        result = FormulaBruteForceSolver(compiled, domains, max_results=10_000, strict_digits=False,
+                                        timeout=30).solve()
+        found = sorted(tuple(s['variables'][l] for l in compiled.letters) for s in result['solutions'])
+        assert found == sorted(tuple(a[l] for l in compiled.letters) for a in expected)
+        assert result['count'] == len(expected)
+        assert result['truncated'] is False
+
+    def test_ranked_by_distance(self):
+        """Vérifie le classement par distance et la règle des 2 miles."""
+        compiled = compile_formula(FORMULA)
+        domains = {letter: range(10) for letter in compiled.letters}
+        domains.update({'A': [1], 'B': [5], 'C': [2]})
+
+        result = FormulaBruteForceSolver(compiled, domains, origin=ORIGIN, max_results=5).solve()
+        distances = [s['distance_from_origin']['meters'] for s in result['solutions']]
+        assert result['returned'] == 5
+        assert distances == sorted(distances)
+        assert all(d <= 2 * 1609.344 for d in distances)
+        assert all(s['status'] == 'complete' for s in result['solutions'])
+
+    def test_distance_limit_prunes_everything(self):
+        """Vérifie qu'aucune solution n'est retournée hors du rayon autorisé."""
+        compiled = compile_formula('N4A°18.000 E006°16.000')
+        result = FormulaBruteForceSolver(compiled, {'A': [0, 1, 2]}, origin=ORIGIN).solve()
+        assert result['solutions'] == []
+        assert result['count'] == 0
+
+    def test_strict_digits(self):
+        """Vérifie qu'un élément concaténé doit tenir sur un chiffre en mode strict."""
+        compiled = compile_formula('N49°18.(A+B)0 E006°16.000')
+        domains = {'A': range(10), 'B': range(10)}
+        strict = FormulaBruteForceSolver(compiled, domains, max_results=1000).solve()
+        assert all(s['variables']['A'] + s['variables']['B'] <= 9 for s in strict['solutions'])
+        assert strict['count'] == 55
+
+        loose = FormulaBruteForceSolver(compiled, domains, max_results=1000, strict_digits=False).solve()
+        assert loose['count'] == 100
+
+
+    def test_impossible_decimals_rejected_before_enumeration(self):
+        """Vérifie qu'une partie décimale de plus de 3 chiffres est rejetée sans énumération."""
+        compiled = compile_formula('N49°18.ABC E006°16.DEFGH')
+        result = FormulaBruteForceSolver(compiled, {}, timeout=5).solve()
+        assert result['rejected_parts'] == ['lon_dec']
+        assert result['evaluated'] == 0 and result['count'] == 0
+        assert result['truncated'] is False
+
+        compiled = compile_formula('N49°18.(ABCD/10) E006°16.000')
+        assert FormulaBruteForceSolver(compiled, {}).rejected_parts == []
+
+
+class TestSolveApi:
+    """Tests pour l'endpoint /api/calculate_coordinates/solve."""
+
+    def test_solve(self, client):
+        """Vérifie que les lettres connues sont fixées et que la meilleure solution est l'origine."""
+        response = client.post('/api/calculate_coordinates/solve', json={
+            'formula': 'N49°18.AB0 E006°16.C00',
+            'variables': {'C': 0},
+            'domains': {'A': '0-3'},
+            'origin_lat': 'N49° 18.000',
+            'origin_lon': 'E006° 16.000',
+            'max_results': 3,
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['returned'] == 3
+        best = data['solutions'][0]
+        assert best['variables'] == {'A': 0, 'B': 0, 'C': 0}
+        assert best['distance_from_origin']['status'] == 'ok'
+        assert all(s['variables']['A'] <= 3 for s in data['solutions'])
+
+    def test_invalid_formula(self, client):
+        """Vérifie la réponse 400 pour une formule invalide."""
+        response = client.post('/api/calculate_coordinates/solve', json={'formula': 'invalide'})
+        assert response.status_code == 400
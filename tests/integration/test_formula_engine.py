@@ -0,0 +1,153 @@
+"""
+Tests pour le moteur de formules compilées et l'API de calcul de coordonnées.
+
+Ce module vérifie la compilation des formules (concaténation, opérateurs,
+parties partielles ou invalides), l'évaluation groupée et les endpoints
+/api/calculate_coordinates et /api/calculate_coordinates/batch.
+"""
+import pytest
+import sys
+import os
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.services.formula_engine import compile_formula, FormulaSyntaxError, PARTIAL, NON_INTEGER, NEGATIVE, TOO_MANY_DIGITS, COMPLETE
+from app.routes.coordinates import coordinates_bp
+
+FORMULA = 'N49°18.(B-A)(B-C-F)(D+E) E006°16.(C+F)(D+F)(C+D)'
+VARIABLES = {'A': 1, 'B': 5, 'C': 2, 'D': 3, 'E': 4, 'F': 1}
+
+
+@pytest.fixture
+def client():
+    """Client de test sur une application minimale avec le blueprint des coordonnées."""
+    app = Flask(__name__)
+    app.register_blueprint(coordinates_bp)
+    return app.test_client()
+
+
+class TestFormulaEngine:
+    """Tests pour la compilation et l'évaluation des formules."""
+
+    def test_compile_is_cached(self):
+        """Vérifie que la même formule n'est compilée qu'une fois."""
+        assert compile_formula(FORMULA) is compile_formula(FORMULA)
+        assert compile_formula(FORMULA).letters == ('A', 'B', 'C', 'D', 'E', 'F')
+
+    def test_concatenation_and_operators(self):
+        """Vérifie la concaténation des sous-expressions et les opérateurs (dont x)."""
+        row = compile_formula('N48° 39.(8/4)(27/9)(2x2x2) E06°11.AB0').evaluate({'A': 9, 'B': 3}).row(0)
+        assert row['coordinates'] == 'N48° 39.238 E006° 11.930'
+        assert row['status'] == 'complete'
+
+    def test_leading_zero_in_decimals(self):
+        """Vérifie qu'une première sous-expression nulle donne des décimales à 3 chiffres."""
+        row = compile_formula('N49°18.(A-A)(B)(C) E006°16.000').evaluate({'A': 4, 'B': 5, 'C': 7}).row(0)
+        assert row['latitude'] == 'N49° 18.057'
+
+    def test_partial_formula(self):
+        """Vérifie qu'une lettre sans valeur laisse la partie partielle."""
+        batch = compile_formula(FORMULA).evaluate({'A': 1, 'B': 5, 'C': 2, 'D': 3, 'E': 4, 'F': ''})
+        assert batch.status['lat_dec'][0] == PARTIAL
+        row = batch.row(0)
+        assert row['status'] == 'partial'
+        assert row['latitude'] == 'N49° 18.(5-1)(5-2-F)(3+4)'
+
+    def test_errors(self):
+        """Vérifie la détection des résultats non entiers, négatifs ou trop longs."""
+        compiled = compile_formula('N49°18.(B/A)00 E006°1A.(A-B)00')
+        batch = compiled.evaluate({'A': 2, 'B': 3})
+        assert batch.status['lat_dec'][0] == NON_INTEGER
+        assert batch.status['lon_dec'][0] == NEGATIVE
+        assert batch.status['lon_min'][0] == COMPLETE
+        assert batch.row(0)['status'] == 'error'
+
+        row = compile_formula('N49°18.ABCD E006°16.000').evaluate({'A': 1, 'B': 2, 'C': 3, 'D': 4}).row(0)
+        assert row['lat_status']['status'] == 'error'
+        assert 'plus de 3 chiffres' in row['lat_status']['message']
+
+        # Un zéro de tête compte dans la longueur des décimales : 0 | 10 | 6 donne 4 chiffres
+        batch = compile_formula('N49°18.(B-A)(A+C)B E006°16.000').evaluate({'A': 6, 'B': 6, 'C': 4})
+        assert batch.status['lat_dec'][0] == TOO_MANY_DIGITS
+
+    def test_nested_concatenation_digits(self):
+        """Vérifie que seule la concaténation de premier niveau compte pour la longueur des décimales."""
+        row = compile_formula('N48° 12.(ABCD/10) E006° 12.345').evaluate({'A': 1, 'B': 2, 'C': 3, 'D': 0}).row(0)
+        assert row['status'] == 'complete'
+        assert row['latitude'] == 'N48° 12.123'
+
+        batch = compile_formula('N48° 12.(AB)CD E006° 12.345').evaluate({'A': 1, 'B': 2, 'C': 3, 'D': 0})
+        assert batch.status['lat_dec'][0] == TOO_MANY_DIGITS
+
+    def test_division_by_zero(self):
+        """Vérifie qu'une division par zéro est une erreur et non une exception."""
+        batch = compile_formula('N49°18.(B/A) E006°16.000').evaluate({'A': 0, 'B': 3})
+        assert batch.status['lat_dec'][0] == NON_INTEGER
+
+    def test_invalid_formula(self):
+        """Vérifie le rejet d'une formule mal formée."""
+        with pytest.raises(FormulaSyntaxError):
+            compile_formula('N49°18.((A) E006°16.000')
+        with pytest.raises(FormulaSyntaxError):
+            compile_formula('pas une formule')
+
+    def test_evaluate_many_matches_single(self):
+        """Vérifie que l'évaluation groupée donne les mêmes résultats que l'évaluation unitaire."""
+        assignments = [dict(VARIABLES, A=a, C=c) for a in range(5) for c in range(4)]
+        compiled = compile_formula(FORMULA)
+        batch = compiled.evaluate_many(assignments)
+        for index, variables in enumerate(assignments):
+            assert batch.row(index) == compiled.evaluate(variables).row(0)
+
+
+class TestCalculateCoordinatesApi:
+    """Tests pour les endpoints de calcul de coordonnées."""
+
+    def test_single(self, client):
+        """Vérifie le calcul d'une formule complète avec distance à l'origine."""
+        response = client.post('/api/calculate_coordinates', json={
+            'formula': FORMULA,
+            'variables': VARIABLES,
+            'origin_lat': 'N49° 18.000',
+            'origin_lon': 'E006° 16.000',
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['coordinates'] == 'N49° 18.427 E006° 16.345'
+        assert data['decimal_latitude'] == pytest.approx(49 + 18.427 / 60)
+        assert data['distance_from_origin']['status'] == 'ok'
+
+    def test_invalid_formula(self, client):
+        """Vérifie la réponse 400 pour une formule invalide."""
+        response = client.post('/api/calculate_coordinates', json={'formula': 'invalide'})
+        assert response.status_code == 400
+
+    def test_batch(self, client):
+        """Vérifie que le lot conserve l'ordre des affectations."""
+        assignments = [dict(VARIABLES, A=a) for a in range(5)] + [{'A': 1}]
+        response = client.post('/api/calculate_coordinates/batch', json={
+            'formula': FORMULA,
+            'assignments': assignments,
+            'origin_lat': 'N49° 18.000',
+            'origin_lon': 'E006° 16.000',
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['count'] == 6
+        assert data['complete_count'] == 5
+        assert [r['latitude'] for r in data['results'][:5]] == [
+            'N49° 18.527', 'N49° 18.427', 'N49° 18.327', 'N49° 18.227', 'N49° 18.127'
+        ]
+        assert data['results'][5]['status'] == 'partial'
+        assert 'distance_from_origin' not in data['results'][5]
+
+    def test_batch_invalid_assignments(self, client):
+        """Vérifie la réponse 400 pour une affectation qui n'est pas un objet."""
+        for assignments in ({'A': 1}, [VARIABLES, [1, 2]], [VARIABLES, 'A=1']):
+            response = client.post('/api/calculate_coordinates/batch', json={
+                'formula': FORMULA,
+                'assignments': assignments,
+            })
+            assert response.status_code == 400
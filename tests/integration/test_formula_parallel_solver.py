@@ -0,0 +1,138 @@
+"""
+Tests pour la résolution parallèle des questions de formules.
+
+Ce module vérifie, avec un modèle factice qui simule une latence par lettre,
+que les questions sont résolues en parallèle (durée proche de la question la
+plus lente), que la limite de concurrence et le délai par appel sont respectés
+et que le contexte thématique n'est calculé qu'une fois.
+"""
+import pytest
+import sys
+import os
+import re
+import threading
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services import formula_solver_service as solver_module
+from app.services.formula_solver_service import FormulaSolverService
+from app.services.formula_questions_service import formula_questions_service
+
+QUESTIONS = {letter: f"Combien de lettres dans le mot {letter} ?" for letter in 'ABCDEFGHIJ'}
+
+
+class StubChat:
+    """Modèle factice : répond en JSON pour la lettre demandée après un délai propre à la lettre."""
+
+    def __init__(self, delays=None, default_delay=0.1):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages, settings=None, use_cache=False):
+        letter = re.search(r'Question (\w):', messages[-1]['content']).group(1)
+        with self._lock:
+            self.calls.append((letter, messages[-1]['content']))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(letter, self.default_delay))
+        finally:
+            with self._lock:
+                self.active -= 1
+        return f'{{"{letter}": "reponse {letter}"}}'
+
+
+@pytest.fixture
+def stub_chat(monkeypatch):
+    def install(**kwargs):
+        chat = StubChat(**kwargs)
+        monkeypatch.setattr(solver_module.ai_service, '_ensure_initialized', lambda: None)
+        monkeypatch.setattr(solver_module.ai_service, 'api_key', 'sk-test', raising=False)
+        monkeypatch.setattr(solver_module.ai_service, 'chat', chat)
+        return chat
+    return install
+
+
+class TestSolveQuestionsConcurrently:
+    """Tests pour FormulaSolverService.solve_questions_concurrently."""
+
+    def test_total_time_close_to_slowest(self, stub_chat):
+        """Vérifie que 10 questions prennent à peu près le temps de la plus lente."""
+        chat = stub_chat(delays={'J': 0.4}, default_delay=0.2)
+        start = time.perf_counter()
+        results = list(FormulaSolverService().solve_questions_concurrently(dict(QUESTIONS), max_workers=10))
+        total = time.perf_counter() - start
+
+        assert {r['letter']: r['answer'] for r in results} == {l: f"reponse {l}" for l in QUESTIONS}
+        assert all(r['status'] == 'ok' for r in results)
+        assert total < 0.4 + 0.3
+        assert chat.max_active == 10
+
+    def test_streams_in_completion_order(self, stub_chat):
+        """Vérifie que chaque réponse est produite dès qu'elle est disponible."""
+        stub_chat(delays={'A': 0.4, 'B': 0.05})
+        start = time.perf_counter()
+        stream = FormulaSolverService().solve_questions_concurrently({'A': 'question A', 'B': 'question B'})
+        first = next(stream)
+        assert first['letter'] == 'B'
+        assert time.perf_counter() - start < 0.3
+        assert next(stream)['letter'] == 'A'
+
+    def test_concurrency_limit(self, stub_chat):
+        """Vérifie que le nombre d'appels simultanés ne dépasse pas la limite."""
+        chat = stub_chat(default_delay=0.1)
+        results = list(FormulaSolverService().solve_questions_concurrently(dict(QUESTIONS), max_workers=3))
+        assert len(results) == len(QUESTIONS)
+        assert chat.max_active == 3
+
+    def test_timeout(self, stub_chat):
+        """Vérifie qu'une question trop lente est signalée sans bloquer les autres."""
+        stub_chat(delays={'B': 1.0}, default_delay=0.05)
+        start = time.perf_counter()
+        results = {r['letter']: r for r in FormulaSolverService().solve_questions_concurrently(
+            {'A': 'question A', 'B': 'question B', 'C': 'question C'}, timeout=0.3)}
+        assert time.perf_counter() - start < 0.8
+        assert results['B']['status'] == 'timeout'
+        assert results['A']['status'] == results['C']['status'] == 'ok'
+
+    def test_thematic_context_shared(self, stub_chat, monkeypatch):
+        """Vérifie que le contexte thématique est calculé une seule fois et ajouté à chaque prompt."""
+        chat = stub_chat(default_delay=0.01)
+        geocache = type('FakeGeocache', (), {'gc_code': 'GC12345', 'name': 'Les phares', 'cache_type': 'Mystery',
+                                             'difficulty': 3, 'terrain': 2})()
+        service = FormulaSolverService()
+        monkeypatch.setattr(service, '_get_geocache', lambda geocache_id: geocache)
+        calls = []
+        monkeypatch.setattr(formula_questions_service, 'extract_thematic_context',
+                            lambda g: calls.append(g) or 'Phares bretons')
+
+        results = list(service.solve_questions_concurrently(dict(QUESTIONS), geocache_id=1))
+        assert len(results) == len(QUESTIONS)
+        assert calls == [geocache]
+        assert all('Phares bretons' in prompt and 'GC12345' in prompt for _, prompt in chat.calls)
+
+        calls.clear()
+        list(service.solve_questions_concurrently(dict(QUESTIONS, _thematic_context='Fourni'), geocache_id=1))
+        assert calls == []
+
+    def test_error_reported_per_letter(self, stub_chat, monkeypatch):
+        """Vérifie qu'une erreur sur une lettre n'interrompt pas les autres."""
+        chat = stub_chat(default_delay=0.01)
+
+        def flaky(messages, settings=None, use_cache=False):
+            if 'Question B:' in messages[-1]['content']:
+                raise RuntimeError('quota dépassé')
+            return chat(messages, settings, use_cache)
+        monkeypatch.setattr(solver_module.ai_service, 'chat', flaky)
+
+        results = {r['letter']: r for r in FormulaSolverService().solve_questions_concurrently(
+            {'A': 'question A', 'B': 'question B'})}
+        assert results['A']['answer'] == 'reponse A'
+        assert results['B']['status'] == 'error'
+        assert 'quota' in results['B']['error']
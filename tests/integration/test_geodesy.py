@@ -0,0 +1,133 @@
+"""
+Tests pour le module géodésique partagé et les endpoints /api/geodesy.
+
+Ce module vérifie que les calculs vectorisés donnent les mêmes résultats
+que les appels point par point, ainsi que le format des réponses HTTP.
+"""
+import pytest
+import sys
+import os
+import numpy as np
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.utils import geodesy
+from app.routes.geodesy import geodesy_bp
+
+ORIGIN = 'N 49° 18.000 E 006° 16.000'
+ORIGIN_DECIMAL = (49.3, 6 + 16 / 60)
+
+
+@pytest.fixture
+def client():
+    """Client de test sur une application minimale avec le blueprint géodésique."""
+    app = Flask(__name__)
+    app.register_blueprint(geodesy_bp)
+    return app.test_client()
+
+
+class TestGeodesy:
+    """Tests pour les fonctions vectorisées."""
+
+    def test_inv_matches_scalar(self):
+        """Vérifie que le calcul groupé est identique aux appels unitaires."""
+        rng = np.random.default_rng(0)
+        lats = 49 + rng.random(50)
+        lons = 6 + rng.random(50)
+        bulk = geodesy.distances(ORIGIN_DECIMAL[0], ORIGIN_DECIMAL[1], lats, lons)
+        for i in range(50):
+            _, _, expected = geodesy.WGS84.inv(ORIGIN_DECIMAL[1], ORIGIN_DECIMAL[0], lons[i], lats[i])
+            assert bulk[i] == pytest.approx(expected)
+        # Un seul point : même forme, sans passer par le chemin scalaire de pyproj
+        assert geodesy.distances(49.3, 6.2, [49.31], [6.2]).shape == (1,)
+        assert float(geodesy.distances(49.3, 6.2, 49.3, 6.2)) == 0.0
+
+    def test_fwd_then_inv(self):
+        """Vérifie qu'une projection puis un calcul inverse redonnent la distance et l'azimut."""
+        bearings = np.array([0.0, 45.0, 90.0, 180.0, 270.0])
+        lats, lons, _ = geodesy.fwd(ORIGIN_DECIMAL[0], ORIGIN_DECIMAL[1], bearings, 1000.0)
+        azimuths, _, meters = geodesy.inv(ORIGIN_DECIMAL[0], ORIGIN_DECIMAL[1], lats, lons)
+        assert meters == pytest.approx(np.full(5, 1000.0))
+        assert np.mod(azimuths, 360) == pytest.approx(bearings, abs=1e-6)
+
+    def test_distance_matrix(self):
+        """Vérifie la forme et la symétrie de la matrice des distances."""
+        lats = np.array([49.0, 49.1, 49.2])
+        lons = np.array([6.0, 6.1, 6.2])
+        matrix = geodesy.distance_matrix(lats, lons)
+        assert matrix.shape == (3, 3)
+        assert np.allclose(matrix, matrix.T)
+        assert np.allclose(np.diag(matrix), 0.0)
+        assert geodesy.distance_matrix(lats, lons, lats[:2], lons[:2]).shape == (3, 2)
+
+    def test_antipodes_and_two_mile_rule(self):
+        """Vérifie les antipodes et les statuts de la règle des 2 miles."""
+        lats, lons = geodesy.antipodes([49.3, -10.0], [6.0, -170.0])
+        assert lats.tolist() == [-49.3, 10.0]
+        assert lons.tolist() == [-174.0, 10.0]
+
+        north, _, _ = geodesy.fwd(49.3, 6.0, 0.0, geodesy.to_meters([1.0, 2.2, 3.0], 'miles'))
+        check = geodesy.check_two_mile_rule(49.3, 6.0, north, np.full(3, 6.0))
+        assert check['status'].tolist() == ['ok', 'warning', 'far']
+        assert check['valid'].tolist() == [True, False, False]
+
+    def test_unknown_unit(self):
+        """Vérifie le rejet d'une unité inconnue."""
+        with pytest.raises(ValueError):
+            geodesy.to_meters(1, 'parsec')
+
+
+class TestGeodesyApi:
+    """Tests pour les endpoints /api/geodesy."""
+
+    def test_distances_single_origin(self, client):
+        """Vérifie une origine unique appliquée à plusieurs points de formats différents."""
+        response = client.post('/api/geodesy/distances', json={
+            'origins': [ORIGIN],
+            'points': [[49.3, 6 + 16 / 60], {'gc_lat': 'N 49° 19.000', 'gc_lon': 'E 006° 16.000'}],
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['count'] == 2
+        assert data['distances'][0]['meters'] == 0.0
+        assert data['distances'][1]['meters'] == pytest.approx(1853, abs=2)
+        assert data['distances'][1]['bearing_deg'] == pytest.approx(0.0, abs=1e-3)
+
+    def test_project(self, client):
+        """Vérifie la projection d'un point selon plusieurs azimuts."""
+        response = client.post('/api/geodesy/project', json={
+            'points': [ORIGIN],
+            'bearing_deg': [0, 90, 180],
+            'distance': 1,
+            'distance_unit': 'km',
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['count'] == 3
+        assert data['results'][0]['latitude'] > 49.3
+        assert data['results'][1]['longitude'] > 6 + 16 / 60
+        assert data['results'][2]['gc_lat'].startswith('N 49° 17.')
+
+    def test_two_mile_check(self, client):
+        """Vérifie la validation groupée de la règle des 2 miles."""
+        response = client.post('/api/geodesy/two_mile_check', json={
+            'origins': [ORIGIN],
+            'points': [ORIGIN, 'N 49° 21.000 E 006° 16.000'],
+        })
+        data = response.get_json()
+        assert response.status_code == 200
+        assert [r['valid'] for r in data['results']] == [True, False]
+        assert data['invalid_count'] == 1
+
+    def test_invalid_points(self, client):
+        """Vérifie la réponse 400 pour un point illisible ou des listes incohérentes."""
+        response = client.post('/api/geodesy/antipodes', json={'points': ['pas une coordonnée']})
+        assert response.status_code == 400
+        response = client.post('/api/geodesy/distances', json={
+            'origins': [ORIGIN, ORIGIN], 'points': [ORIGIN, ORIGIN, ORIGIN],
+        })
+        assert response.status_code == 400
+        response = client.post('/api/geodesy/project', json={'points': [ORIGIN], 'distance': 10})
+        assert response.status_code == 400
@@ -0,0 +1,119 @@
+"""
+Tests pour le document HTML partagé par les plugins d'analyse de page.
+
+Ce module vérifie que la description n'est analysée qu'une fois pour
+plusieurs plugins, le contenu des vues (styles, commentaires, images, liens,
+texte brut) et les résultats des plugins qui les utilisent.
+"""
+import pytest
+import sys
+import os
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils import html_analysis
+from app.utils.html_analysis import HtmlDocument, get_html_document, clear_html_documents
+from plugins.official.color_text_detector.main import ColorTextDetectorPlugin
+from plugins.official.html_comments_finder.main import HtmlCommentsFinderPlugin
+from plugins.official.image_alt_text_extractor.main import ImageAltTitleExtractorPlugin
+
+PAGE = """
+<div class="UserSuppliedContent">
+  <p>Bienvenue sur ma cache.</p>
+  <!-- N 48° 51.402 E 002° 21.048 -->
+  <span style="color: #FFF; font-weight: bold">Texte caché</span>
+  <span style="color:red; background-color:#F00">Rouge sur rouge</span>
+  <img src="https://example.com/spoiler.jpg" alt="Regardez sous la pierre" title="Indice">
+  <img src="https://geocheck.org/img.png" alt="Vérificateur">
+  <a href="https://example.com/outil">Outil de décodage</a>
+  <script>var secret = 1;</script>
+</div>
+<!-- hors description -->
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_html_documents()
+    yield
+    clear_html_documents()
+
+
+class TestHtmlDocument:
+    """Tests pour le document analysé et son cache."""
+
+    def test_parsed_once_for_all_plugins(self, monkeypatch):
+        """Vérifie que les trois plugins HTML partagent une seule analyse de la page."""
+        parsed = []
+        original_init = HtmlDocument.__init__
+
+        def counting_init(self, html, parser=None):
+            parsed.append(html)
+            original_init(self, html, parser)
+
+        monkeypatch.setattr(HtmlDocument, '__init__', counting_init)
+        for plugin in (ColorTextDetectorPlugin(), HtmlCommentsFinderPlugin(), ImageAltTitleExtractorPlugin()):
+            plugin.execute({'text': PAGE})
+        assert parsed == [PAGE]
+
+    def test_cache_bounded(self, monkeypatch):
+        """Vérifie l'éviction des documents les moins récemment utilisés."""
+        monkeypatch.setattr(html_analysis, 'DEFAULT_CACHE_SIZE', 2)
+        first = get_html_document('<p>1</p>')
+        get_html_document('<p>2</p>')
+        assert get_html_document('<p>1</p>') is first
+        get_html_document('<p>3</p>')
+        assert get_html_document('<p>1</p>') is first
+        assert len(html_analysis._documents) == 2
+
+    def test_parse_error_releases_lock(self, monkeypatch):
+        """Vérifie qu'une analyse en échec ne laisse pas de verrou dans _parsing."""
+        def failing_init(self, html, parser=None):
+            raise ValueError("analyse impossible")
+
+        monkeypatch.setattr(HtmlDocument, '__init__', failing_init)
+        with pytest.raises(ValueError):
+            get_html_document('<p>cassé</p>')
+        assert html_analysis._parsing == {}
+        assert '<p>cassé</p>' not in html_analysis._documents
+
+    def test_views(self):
+        """Vérifie le contenu des vues et leur lecture seule."""
+        document = get_html_document(PAGE)
+        styled = document.styled_texts()
+        assert [elem.text for elem in styled] == ['Texte caché', 'Rouge sur rouge']
+        assert styled[0].style['color'] == '#fff'
+        with pytest.raises(TypeError):
+            styled[0].style['color'] = '#000'
+
+        assert document.comments() == ('N 48° 51.402 E 002° 21.048',)
+        assert document.comments(None) == ('N 48° 51.402 E 002° 21.048', 'hors description')
+        assert document.comments('Absente') is None
+        assert document.images()[0] == ('https://example.com/spoiler.jpg', 'Regardez sous la pierre', 'Indice')
+        assert document.links()[0].text == 'Outil de décodage'
+
+        text = document.plain_text()
+        assert 'Bienvenue sur ma cache.' in text and 'Rouge sur rouge' in text
+        assert 'secret' not in text and '51.402' not in text
+
+
+class TestHtmlPlugins:
+    """Tests pour les plugins utilisant le document partagé."""
+
+    def test_color_text_detector(self):
+        """Vérifie la détection du texte de la couleur du fond (blanc par défaut)."""
+        findings = ColorTextDetectorPlugin().execute({'text': PAGE})['findings']
+        assert [f['content'] for f in findings] == ['Texte caché', 'Rouge sur rouge']
+
+    def test_comments_and_images(self):
+        """Vérifie les commentaires de la description et les textes des images non exclues."""
+        result = HtmlCommentsFinderPlugin().execute({'text': PAGE})
+        assert [f['content'] for f in result['findings']] == ['N 48° 51.402 E 002° 21.048']
+        assert result['coordinates']['exist']
+
+        findings = ImageAltTitleExtractorPlugin().execute({'text': PAGE})['findings']
+        assert [(f['type'], f['content']) for f in findings] == [
+            ('image_alt', 'Regardez sous la pierre'),
+            ('image_title', 'Indice'),
+        ]
@@ -0,0 +1,300 @@
+"""
+Tests pour la file de tâches de fond persistante.
+
+Ce module vérifie l'ordre de priorité, les nouvelles tentatives avec délai,
+l'annulation, la reprise d'une tâche interrompue à partir de son checkpoint
+(uniquement après expiration de son bail), l'exécution par le pool de workers,
+le démarrage à la première requête, les routes /api/jobs (dont la durée des
+flux d'événements) et la réponse immédiate de /api/logs/refresh.
+"""
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.routes import jobs as jobs_routes
+from app.routes.jobs import jobs_bp
+from app.services import job_queue_service
+from app.services.job_queue_service import (
+    JobQueue, JobFailed, register_job_handler, QUEUED, SUCCEEDED, FAILED, CANCELLED,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+calls = []
+finished = []
+flaky_failures = {'count': 0}
+crash = {'at': None}
+release = threading.Event()
+
+
+def _record(job):
+    calls.append(job.payload.get('name'))
+    return {'name': job.payload.get('name')}
+
+
+def _flaky(job):
+    if flaky_failures['count'] < 2:
+        flaky_failures['count'] += 1
+        raise RuntimeError('réseau indisponible')
+    return 'ok'
+
+
+def _steps(job):
+    """Traite trois étapes en enregistrant l'étape suivante dans le checkpoint."""
+    for step in range((job.checkpoint or {}).get('next', 0), 3):
+        job.check_cancelled()
+        calls.append(step)
+        if crash['at'] == step:
+            crash['at'] = None
+            raise KeyboardInterrupt  # arrêt brutal de l'application pendant l'étape
+        job.report((step + 1) * 100 / 3, f'Étape {step + 1}/3', checkpoint={'next': step + 1})
+    return {'steps': 3}
+
+
+def _blocking(job):
+    release.wait(5)
+    job.check_cancelled()
+    return 'fini'
+
+
+register_job_handler('test_record', _record, on_finished=finished.append)
+register_job_handler('test_flaky', _flaky, max_attempts=3)
+register_job_handler('test_steps', _steps)
+register_job_handler('test_fatal', lambda job: (_ for _ in ()).throw(JobFailed('fichier invalide')))
+register_job_handler('test_blocking', _blocking)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    calls.clear()
+    finished.clear()
+    flaky_failures['count'] = 0
+    release.clear()
+    queue = JobQueue(str(tmp_path / 'jobs.db'), clock=clock)
+    yield queue
+    release.set()
+    queue.stop()
+
+
+class TestJobQueue:
+    """Tests pour la file de tâches."""
+
+    def test_priority_and_result(self, queue):
+        """Vérifie l'ordre d'exécution, le résultat et la finalisation."""
+        for name, priority in (('a', 0), ('b', 5), ('c', 0)):
+            queue.submit('test_record', {'name': name}, priority=priority)
+        assert queue.run_pending() == 3
+        assert calls == ['b', 'a', 'c']
+        job = queue.get(1)
+        assert job['status'] == SUCCEEDED and job['result'] == {'name': 'a'} and job['progress'] == 100
+        assert [job['id'] for job in finished] == [2, 1, 3]
+        assert [event['type'] for event in queue.events(1)] == ['queued', 'started', 'succeeded']
+        with pytest.raises(ValueError):
+            queue.submit('inconnu')
+
+    def test_retries_with_backoff(self, queue, clock):
+        """Vérifie les nouvelles tentatives après un délai croissant, puis le succès."""
+        job = queue.submit('test_flaky')
+        queue.run_pending()
+        assert queue.get(job['id'])['status'] == QUEUED
+        assert queue.run_pending() == 0  # délai de reprise pas encore écoulé
+        clock.now += job_queue_service.RETRY_DELAY_SECONDS
+        queue.run_pending()
+        clock.now += job_queue_service.RETRY_DELAY_SECONDS * 2
+        queue.run_pending()
+        job = queue.get(job['id'])
+        assert job['status'] == SUCCEEDED and job['attempts'] == 3
+        assert [event['type'] for event in queue.events(job['id'])].count('retry') == 2
+
+    def test_fatal_error_not_retried(self, queue):
+        """Vérifie qu'une erreur définitive fait échouer la tâche sans nouvelle tentative."""
+        job = queue.submit('test_fatal')
+        queue.run_pending()
+        job = queue.get(job['id'])
+        assert job['status'] == FAILED and job['attempts'] == 1 and job['error'] == 'fichier invalide'
+
+    def test_cancel(self, queue):
+        """Vérifie l'annulation en file et en cours d'exécution."""
+        queued = queue.submit('test_record', {'name': 'a'})
+        assert queue.cancel(queued['id'])['status'] == CANCELLED
+        assert queue.run_pending() == 0 and calls == []
+        assert finished[0]['id'] == queued['id']
+
+        running = queue.submit('test_blocking')
+        worker = threading.Thread(target=queue.run_pending)
+        worker.start()
+        while queue.get(running['id'])['status'] != 'running':
+            queue.wait(running['id'], timeout=0.05)
+        assert queue.cancel(running['id'])['cancel_requested']
+        release.set()
+        worker.join(5)
+        assert queue.get(running['id'])['status'] == CANCELLED
+
+    def test_resume_from_checkpoint(self, queue, tmp_path, clock):
+        """Vérifie qu'une tâche interrompue reprend après son dernier checkpoint."""
+        crash['at'] = 1
+        job = queue.submit('test_steps')
+        with pytest.raises(KeyboardInterrupt):
+            queue.run_pending()
+        assert queue.get(job['id'])['status'] == 'running'
+
+        # Redémarrage de l'application : nouvelle instance sur la même base,
+        # qui ne reprend la tâche qu'une fois le bail de l'ancienne expiré
+        restarted = JobQueue(str(tmp_path / 'jobs.db'), clock=clock)
+        assert restarted.recover() == 0
+        clock.now += job_queue_service.LEASE_SECONDS + 1
+        assert restarted.recover() == 1
+        restarted.run_pending()
+        job = restarted.get(job['id'])
+        assert job['status'] == SUCCEEDED and job['checkpoint'] == {'next': 3}
+        assert calls == [0, 1, 1, 2]
+
+    def test_lease(self, queue, tmp_path, clock):
+        """Vérifie qu'une tâche dont le bail est renouvelé n'est pas reprise par un autre processus."""
+        job = queue.submit('test_record', {'name': 'a'})
+        claimed = queue._claim()
+        assert claimed['owner'] == queue.owner and claimed['heartbeat_at'] == clock.now
+
+        other = JobQueue(str(tmp_path / 'jobs.db'), clock=clock)
+        clock.now += job_queue_service.LEASE_SECONDS - 1
+        assert queue.heartbeat() == 1
+        clock.now += job_queue_service.LEASE_SECONDS - 1
+        assert other.recover() == 0 and other.run_pending() == 0
+
+        # Bail expiré : l'autre file reprend la tâche, l'ancienne ne peut plus la terminer
+        clock.now += 2
+        assert other.recover() == 1
+        assert other.run_pending() == 1
+        queue._execute(claimed)
+        job = queue.get(job['id'])
+        assert job['status'] == SUCCEEDED and job['owner'] == other.owner
+        assert calls == ['a', 'a'] and len(finished) == 1
+        assert [event['type'] for event in queue.events(job['id'])] == [
+            'queued', 'started', 'recovered', 'started', 'succeeded']
+
+    def test_workers(self, queue):
+        """Vérifie l'exécution par le pool de workers démarré en arrière-plan."""
+        queue.start()
+        job = queue.submit('test_steps')
+        assert queue.wait(job['id'], timeout=5)['status'] == SUCCEEDED
+        progress = [event for event in queue.events(job['id']) if event['type'] == 'progress']
+        assert [event['message'] for event in progress] == ['Étape 1/3', 'Étape 2/3', 'Étape 3/3']
+
+    def test_purge(self, queue, clock):
+        """Vérifie la suppression des tâches terminées anciennes uniquement."""
+        queue.submit('test_record', {'name': 'a'})
+        queue.run_pending()
+        queue.submit('test_record', {'name': 'b'})
+        clock.now += job_queue_service.RETENTION_SECONDS + 1
+        assert queue.purge() == 1
+        assert [job['id'] for job in queue.list_jobs()] == [2]
+        assert queue.events(1) == []
+
+
+class TestJobsApi:
+    """Tests pour les routes /api/jobs."""
+
+    @pytest.fixture
+    def client(self, queue, monkeypatch):
+        monkeypatch.setattr(job_queue_service, '_job_queue_instance', queue)
+        app = Flask(__name__)
+        app.register_blueprint(jobs_bp)
+        return app.test_client()
+
+    def test_submit_poll_and_stream(self, client, queue):
+        """Vérifie la soumission, la consultation, le flux d'événements et l'annulation."""
+        response = client.post('/api/jobs', json={'kind': 'test_steps'})
+        assert response.status_code == 202
+        job_id = response.get_json()['id']
+        assert client.post('/api/jobs', json={'kind': 'inconnu'}).status_code == 400
+        assert client.get('/api/jobs/999').status_code == 404
+
+        queue.start()
+        lines = [json.loads(line) for line in client.get(f'/api/jobs/{job_id}/events').data.decode().splitlines()]
+        assert lines[0]['type'] == 'queued' and lines[-1]['type'] == 'succeeded'
+        assert client.get(f'/api/jobs/{job_id}').get_json()['result'] == {'steps': 3}
+        assert client.get('/api/jobs?status=succeeded').get_json()['jobs'][0]['id'] == job_id
+
+        after = lines[-2]['event_id']
+        assert [event['type'] for event in client.get(f'/api/jobs/{job_id}/events?after={after}&stream=0')
+                .get_json()['events']] == ['succeeded']
+        assert client.post(f'/api/jobs/{job_id}/cancel').get_json()['status'] == SUCCEEDED
+
+
+    def test_stream_timeout_counts_elapsed_time(self, queue, monkeypatch):
+        """Vérifie que les réveils dus aux autres tâches n'écourtent pas le flux d'une tâche en file."""
+        job = queue.submit('test_record', {'name': 'en attente'})
+        monkeypatch.setattr(jobs_routes, 'STREAM_TIMEOUT_SECONDS', 0.3)
+        monkeypatch.setattr(job_queue_service, '_job_queue_instance', queue)
+        wakeups = []
+
+        def wait_for_events(job_id, after_id=0):
+            wakeups.append(after_id)
+            return queue.events(job_id, after_id) if len(wakeups) == 1 else []
+
+        monkeypatch.setattr(queue, 'wait_for_events', wait_for_events)
+        start = time.monotonic()
+        lines = list(jobs_routes.stream_job_events(job['id']))
+        assert time.monotonic() - start >= 0.3 and len(wakeups) > 2
+        assert [json.loads(line)['type'] for line in lines] == ['queued']
+
+    def test_started_on_first_request(self, queue, monkeypatch):
+        """Vérifie que les workers démarrent à la première requête, une seule fois."""
+        monkeypatch.setattr(job_queue_service, '_job_queue_instance', queue)
+        monkeypatch.setattr(queue, 'purge', lambda: 0)
+        app = Flask(__name__)
+        app.config['JOB_WORKERS'] = 1
+        app.register_blueprint(jobs_bp)
+        job_queue_service.register_job_queue(app)
+        assert not queue._threads
+        client = app.test_client()
+        client.get('/api/jobs')
+        threads = list(queue._threads)
+        assert len(threads) == 2  # un worker et le renouvellement des baux
+        client.get('/api/jobs')
+        assert queue._threads == threads
+
+
+class TestLogsRefreshApi:
+    """Tests pour la route /api/logs/refresh."""
+
+    def test_returns_job_without_waiting(self, queue, monkeypatch):
+        """Vérifie que la route répond 202 avec la tâche au lieu d'attendre sa fin."""
+        from app.routes import logs as logs_routes
+
+        monkeypatch.setattr(job_queue_service, '_job_queue_instance', queue)
+        geocache = SimpleNamespace(id=7, name='Cache de test')
+        monkeypatch.setattr(logs_routes, 'Geocache', SimpleNamespace(
+            query=SimpleNamespace(get_or_404=lambda geocache_id: geocache)))
+        app = Flask(__name__)
+        app.register_blueprint(logs_routes.logs_bp)
+        client = app.test_client()
+
+        start = time.perf_counter()
+        response = client.post('/api/logs/refresh?geocacheId=7')
+        assert time.perf_counter() - start < 1
+        assert response.status_code == 202
+        job = response.get_json()
+        assert job['kind'] == 'refresh_logs' and job['status'] == QUEUED
+        assert job['payload'] == {'geocache_id': 7} and job['priority'] == 10
+        assert client.post('/api/logs/refresh').status_code == 400
@@ -0,0 +1,205 @@
+"""
+Tests pour les outils LangGraph générés à partir des plugins.
+
+Ce module vérifie la construction des schémas d'arguments depuis plugin.json,
+l'initialisation avec le gestionnaire de plugins de l'application, le cache
+des outils par version de plugin (et son invalidation au rechargement),
+l'exécution en parallèle des appels d'outils d'un même tour
+et la limitation de la taille des sorties renvoyées au modèle.
+"""
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from langchain_core.messages import AIMessage, ToolMessage
+from app.database import db
+from app.models.app_config import AppConfig
+from app.models.plugin_model import Plugin
+from app.plugin_manager import PluginManager
+from app.services import langgraph_service as langgraph_module
+from app.services.langgraph_service import (
+    LangGraphService, build_plugin_args_schema, summarize_plugin_result,
+)
+
+CAESAR_INPUTS = {
+    'text': {'type': 'string', 'label': 'Texte à traiter'},
+    'shift': {'type': 'select', 'label': 'Décalage', 'options': list(range(27)), 'default': 13},
+    'mode': {'type': 'select', 'label': 'Mode', 'options': ['decode', 'encode'], 'default': 'decode'},
+}
+
+
+class FakePlugin:
+    """Enregistrement de plugin minimal (comme le modèle Plugin)."""
+
+    def __init__(self, name, version='1.0.0'):
+        self.name = name
+        self.version = version
+        self.description = f"Plugin {name}"
+        self.metadata_json = json.dumps({'input_types': CAESAR_INPUTS})
+
+
+class FakePluginManager:
+    """Gestionnaire de plugins factice : chaque exécution dure `delay` secondes."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def execute_plugin(self, plugin_name, inputs):
+        with self._lock:
+            self.calls.append((plugin_name, inputs))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return {'text_output': f"{plugin_name}:{inputs['text']}"}
+
+
+class ScriptedLLM:
+    """Modèle factice : demande tous les outils au premier tour, puis conclut."""
+
+    def __init__(self, tool_names):
+        self.tool_names = tool_names
+        self.turns = 0
+
+    def bind_tools(self, tools):
+        return self
+
+    def invoke(self, messages):
+        self.turns += 1
+        if self.turns == 1:
+            return AIMessage(content='', tool_calls=[
+                {'name': name, 'args': {'text': 'KHOOR'}, 'id': f"call_{i}"}
+                for i, name in enumerate(self.tool_names)
+            ])
+        results = [m.content for m in messages if isinstance(m, ToolMessage)]
+        return AIMessage(content=' | '.join(results))
+
+
+@pytest.fixture
+def service():
+    service = LangGraphService()
+    service._initialized = True
+    service._plugin_manager = FakePluginManager()
+    return service
+
+
+class TestInitialization:
+    """Tests pour l'initialisation du service dans l'application."""
+
+    def test_uses_application_plugin_manager(self, tmp_path):
+        """Vérifie que le service reprend le gestionnaire de l'application et construit les outils."""
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'main.db')
+        app.config['SQLALCHEMY_BINDS'] = {
+            'plugins': 'sqlite:///' + str(tmp_path / 'plugins.db'),
+            'config': 'sqlite:///' + str(tmp_path / 'config.db'),
+        }
+        db.init_app(app)
+        app.plugin_manager = PluginManager(str(tmp_path / 'plugins'))
+        with app.app_context():
+            AppConfig.__table__.create(db.engines['config'])
+            Plugin.__table__.create(db.engines['plugins'])
+            db.session.add(Plugin(name='caesar_code', version='1.0.0', description='Code César', path='caesar',
+                                  enabled=True, metadata_json=json.dumps({'input_types': CAESAR_INPUTS})))
+            db.session.commit()
+
+            service = LangGraphService()
+            service._ensure_initialized()
+            assert service._initialized and service._plugin_manager is app.plugin_manager
+            assert [tool.name for tool in service._tools] == ['caesar_code']
+            assert service._on_plugin_reloaded in app.plugin_manager._reload_listeners
+
+
+class TestToolSchemas:
+    """Tests pour la génération et le cache des outils."""
+
+    def test_args_schema(self):
+        """Vérifie le schéma : texte obligatoire, options converties en énumérations."""
+        schema = build_plugin_args_schema('caesar_code', CAESAR_INPUTS).model_json_schema()
+        assert schema['required'] == ['text']
+        mode = schema['properties']['mode']['anyOf'][0]
+        assert mode['enum'] == ['decode', 'encode']
+        assert '13' in schema['properties']['shift']['description']
+
+    def test_tool_invocation(self, service):
+        """Vérifie que seuls les paramètres fournis sont transmis au plugin."""
+        tool = service._get_plugin_tool(FakePlugin('caesar_code'))
+        assert tool.invoke({'text': 'KHOOR', 'shift': 3}) == 'Résultat de caesar_code: caesar_code:KHOOR'
+        assert service._plugin_manager.calls == [('caesar_code', {'text': 'KHOOR', 'shift': 3})]
+
+    def test_cached_by_version(self, service):
+        """Vérifie que l'outil n'est reconstruit qu'au changement de version ou au rechargement."""
+        first = service._get_plugin_tool(FakePlugin('caesar_code'))
+        assert service._get_plugin_tool(FakePlugin('caesar_code')) is first
+        upgraded = service._get_plugin_tool(FakePlugin('caesar_code', '1.1.0'))
+        assert upgraded is not first
+
+        service._graph = object()
+        service._on_plugin_reloaded('caesar_code', '1.1.0', '1.1.0')
+        assert service._graph is None
+        assert service._get_plugin_tool(FakePlugin('caesar_code', '1.1.0')) is not upgraded
+
+
+class TestParallelTools:
+    """Tests pour l'exécution des appels d'outils d'un même tour."""
+
+    def test_tool_calls_run_in_parallel(self, service, monkeypatch):
+        """Vérifie que plusieurs appels d'outils s'exécutent en parallèle, dans la limite fixée."""
+        names = ['caesar_code', 'atbash', 'rot47', 'vigenere', 'morse', 'binary']
+        service._plugin_manager = FakePluginManager(delay=0.2)
+        service._tools = [service._get_plugin_tool(FakePlugin(name)) for name in names]
+        llm = ScriptedLLM(names)
+        monkeypatch.setattr(service, '_get_llm', lambda: llm)
+        # Pas de rafraîchissement depuis la base dans ce test
+        monkeypatch.setattr(service, '_create_tools_from_plugins', lambda: None)
+        monkeypatch.setattr(langgraph_module, 'TOOL_MAX_WORKERS', 3)
+
+        start = time.perf_counter()
+        response = service.chat([{'role': 'user', 'content': 'Déchiffre KHOOR'}])
+        elapsed = time.perf_counter() - start
+
+        assert response == ' | '.join(f"Résultat de {name}: {name}:KHOOR" for name in names)
+        assert service._plugin_manager.max_active == 3
+        assert elapsed < 0.2 * len(names) * 0.75
+
+
+class TestToolOutput:
+    """Tests pour le résumé des résultats des plugins."""
+
+    def test_bruteforce_capped(self):
+        """Vérifie que seuls les meilleurs résultats sont conservés et que la sortie est bornée."""
+        result = {
+            'status': 'success',
+            'results': [
+                {'id': f"result_{i}", 'text_output': f"texte {i} " + 'x' * 1000, 'confidence': i / 100,
+                 'parameters': {'shift': i}}
+                for i in range(100)
+            ],
+            'coordinates': {'exist': True, 'ddm': "N 48° 51.402 E 002° 21.048"},
+        }
+        summary = summarize_plugin_result('caesar_code', result)
+        assert len(summary) <= 2000 + 50
+        assert 'texte 99' in summary and 'shift=99' in summary
+        assert 'texte 0 ' not in summary
+        assert '95 autres résultats omis' in summary
+
+        summary = summarize_plugin_result('caesar_code', result, max_chars=200000)
+        assert summary.endswith("Coordonnées détectées : N 48° 51.402 E 002° 21.048")
+
+    def test_errors(self):
+        """Vérifie les messages d'erreur."""
+        assert summarize_plugin_result('caesar_code', None) == "Erreur lors de l'exécution du plugin caesar_code"
+        error = {'status': 'error', 'summary': {'message': 'Aucun texte fourni à traiter.'}}
+        assert summarize_plugin_result('caesar_code', error) == "Erreur du plugin caesar_code: Aucun texte fourni à traiter."
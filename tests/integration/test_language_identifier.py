@@ -0,0 +1,116 @@
+"""
+Tests pour l'identification de langue par n-grammes.
+
+Ce module vérifie la précision du modèle livré sur des phrases rédigées à la
+main (absentes des listes de mots d'entraînement), sa comparaison avec
+langdetect, la classification par lot, l'entraînement et la persistance du
+modèle, ainsi que son utilisation par le service de scoring.
+"""
+import pytest
+import sys
+import os
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.language_identifier import LanguageIdentifier, extract_ngrams, get_language_identifier
+from app.services.scoring_service import ScoringService
+
+CORPUS = [
+    ('fr', "La cache se trouve au pied du grand chêne, à côté de la fontaine du village"),
+    ('fr', "RENDEZ VOUS PRES DU PONT ET CHERCHEZ SOUS LA PIERRE PLATE"),
+    ('fr', "Les coordonnées finales sont cachées dans le texte de cette énigme"),
+    ('fr', "il faudra additionner les chiffres trouves sur le panneau de la mairie"),
+    ('en', "The cache is hidden behind the old stone wall near the church"),
+    ('en', "LOOK FOR THE SMALL CONTAINER UNDER THE BRIDGE AFTER DARK"),
+    ('en', "You will need to count the windows of the house to find the final coordinates"),
+    ('en', "please bring your own pen because the logbook is very small"),
+    ('de', "Der Schatz liegt unter der alten Brücke neben dem großen Baum"),
+    ('de', "BITTE DAS LOGBUCH WIEDER GUT VERSTECKEN UND DEN DECKEL SCHLIESSEN"),
+    ('de', "Die Koordinaten des Finals findest du auf der Tafel am Waldrand"),
+    ('es', "El tesoro está escondido debajo del puente viejo cerca del río"),
+    ('es', "BUSCA LA CAJA PEQUENA DETRAS DE LA IGLESIA DEL PUEBLO"),
+    ('es', "Las coordenadas finales están en la placa de la entrada del parque"),
+    ('it', "Il tesoro si trova sotto il ponte vicino alla chiesa del paese"),
+    ('it', "CERCA LA SCATOLA NASCOSTA DIETRO IL MURO DEL GIARDINO"),
+    ('it', "Le coordinate finali sono scritte sul cartello davanti alla stazione"),
+    ('nl', "De schat ligt onder de oude brug naast de grote boom in het bos"),
+    ('nl', "ZOEK HET KLEINE DOOSJE ACHTER DE MUUR VAN DE KERK"),
+    ('nl', "De eindcoördinaten staan op het bord bij de ingang van het park"),
+    ('pt', "O tesouro está escondido debaixo da ponte velha perto do rio"),
+    ('pt', "PROCURE A CAIXA PEQUENA ATRAS DA IGREJA DA CIDADE"),
+    ('pt', "As coordenadas finais estão na placa da entrada do jardim"),
+]
+
+
+@pytest.fixture(scope='module')
+def identifier():
+    identifier = get_language_identifier()
+    assert identifier is not None, "modèle de langue absent (scripts/build_language_model.py)"
+    return identifier
+
+
+class TestLanguageIdentifier:
+    """Tests pour le modèle livré."""
+
+    def test_accuracy(self, identifier):
+        """Vérifie la précision sur le corpus de validation et l'équivalence avec le traitement par lot."""
+        predictions = [identifier.detect(text) for _, text in CORPUS]
+        correct = sum(1 for (language, _), predicted in zip(CORPUS, predictions) if predicted == language)
+        assert correct / len(CORPUS) >= 0.9, list(zip(CORPUS, predictions))
+        assert identifier.detect_many([text for _, text in CORPUS]) == predictions
+        assert set(identifier.languages) == set(ScoringService.SUPPORTED_LANGUAGES)
+
+    def test_compared_to_langdetect(self, identifier):
+        """Vérifie que le modèle est au moins aussi précis que langdetect sur le corpus."""
+        langdetect = pytest.importorskip('langdetect')
+        langdetect.DetectorFactory.seed = 0
+        ours = sum(1 for language, text in CORPUS if identifier.detect(text) == language)
+        theirs = sum(1 for language, text in CORPUS if langdetect.detect(text) == language)
+        assert ours >= theirs
+
+    def test_accents_and_case(self, identifier):
+        """Vérifie qu'un texte désaccentué en majuscules est classé comme l'original."""
+        text = "Les coordonnées finales sont cachées près de l'église"
+        assert identifier.detect(text) == identifier.detect("LES COORDONNEES FINALES SONT CACHEES PRES DE L EGLISE")
+        assert extract_ngrams("Été!") == ['e', 't', 'e', ' e', 'et', 'te', 'e ', ' et', 'ete', 'te ']
+
+    def test_deterministic_and_empty(self, identifier):
+        """Vérifie le résultat stable, les probabilités et les textes sans n-gramme connu."""
+        text = CORPUS[4][1]
+        assert {identifier.detect(text) for _ in range(5)} == {'en'}
+        scores = identifier.scores(text)
+        assert max(scores, key=scores.get) == 'en' and abs(sum(scores.values()) - 1) < 1e-6
+        assert identifier.detect("1234 !!", default='fr') == 'fr' and identifier.scores("") == {}
+        assert identifier.detect_many(["", CORPUS[0][1], "42"], default='xx') == ['xx', 'fr', 'xx']
+        assert identifier.detect_many([]) == []
+
+
+class TestTraining:
+    """Tests pour l'entraînement et la persistance."""
+
+    def test_train_save_load(self, tmp_path):
+        """Vérifie qu'un petit modèle entraîné se relit à l'identique."""
+        identifier = LanguageIdentifier.train({
+            'aa': {'abab': 0.5, 'baba': 0.5},
+            'xx': {'xyxy': 0.5, 'yxyx': 0.5},
+        })
+        assert identifier.detect("ab ba abba") == 'aa' and identifier.detect("yxxy") == 'xx'
+
+        path = str(tmp_path / 'model.npz')
+        identifier.save(path)
+        loaded = LanguageIdentifier.load(path)
+        assert loaded.languages == ['aa', 'xx'] and loaded.ngrams == identifier.ngrams
+        assert loaded.detect_many(["abab", "xyxy"]) == ['aa', 'xx']
+
+
+class TestScoringIntegration:
+    """Tests pour la détection de langue du service de scoring."""
+
+    def test_detect_languages(self):
+        """Vérifie la détection par lot, le français par défaut et la correction français/anglais."""
+        service = ScoringService.__new__(ScoringService)
+        texts = [CORPUS[8][1], "court", CORPUS[4][1], "the cache est dans la boite avec le logbook"]
+        assert service._detect_languages(texts) == ['de', 'fr', 'en', 'fr']
+        assert service._detect_and_segment(CORPUS[4][1])[0] == 'en'
+        assert service._detect_and_segment("deux mots", 'it') == ('it', ['deux', 'mots'])
@@ -0,0 +1,117 @@
+"""
+Tests pour le service de métriques des plugins.
+
+Ce module vérifie l'agrégation des compteurs et histogrammes entre threads
+ainsi que les formats d'export (Prometheus et JSON).
+"""
+import pytest
+import sys
+import os
+import threading
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.metrics_service import MetricsService, LATENCY_BUCKETS, UNKNOWN_PLUGIN, get_metrics_service
+
+
+@pytest.fixture
+def metrics():
+    """Fournit une instance neuve du service de métriques."""
+    return MetricsService()
+
+
+class TestMetricsService:
+    """Tests pour la collecte et l'export des métriques."""
+
+    def test_timer_records_calls(self, metrics):
+        """Vérifie qu'un appel chronométré est comptabilisé."""
+        with metrics.timer('caesar', 'total'):
+            with metrics.timer('caesar', 'execute'):
+                pass
+
+        snapshot = metrics.snapshot()
+        assert snapshot['caesar']['calls'] == 1
+        assert snapshot['caesar']['errors'] == 0
+        assert snapshot['caesar']['stages']['execute']['count'] == 1
+
+    def test_timer_counts_errors_once(self, metrics):
+        """Vérifie qu'une exception est comptée une seule fois au niveau du plugin."""
+        with pytest.raises(ValueError):
+            with metrics.timer('caesar', 'total'):
+                with metrics.timer('caesar', 'execute'):
+                    raise ValueError('boom')
+
+        snapshot = metrics.snapshot()
+        assert snapshot['caesar']['errors'] == 1
+        assert snapshot['caesar']['stages']['execute']['errors'] == 1
+        assert snapshot['caesar']['stages']['total']['errors'] == 1
+
+    def test_buckets(self, metrics):
+        """Vérifie le rangement des durées dans les buckets."""
+        metrics.observe('morse', 'scoring', 0.0005)
+        metrics.observe('morse', 'scoring', 0.3)
+        metrics.observe('morse', 'scoring', 60)
+
+        buckets = metrics.snapshot()['morse']['stages']['scoring']['buckets']
+        assert buckets[0] == 1
+        assert buckets[LATENCY_BUCKETS.index(0.5)] == 1
+        assert buckets[-1] == 1
+
+    def test_aggregation_between_threads(self, metrics):
+        """Vérifie que les partitions de plusieurs threads sont fusionnées."""
+        def worker():
+            for _ in range(100):
+                metrics.observe('kenny', 'total', 0.002)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.snapshot()['kenny']['calls'] == 400
+
+    def test_prometheus_format(self, metrics):
+        """Vérifie le format texte Prometheus."""
+        metrics.observe('roman_numerals', 'total', 0.002)
+        text = metrics.to_prometheus()
+
+        assert 'mysterai_plugin_calls_total{plugin="roman_numerals"} 1' in text
+        assert 'mysterai_plugin_stage_duration_seconds_bucket{plugin="roman_numerals",stage="total",le="+Inf"} 1' in text
+        assert 'mysterai_plugin_stage_duration_seconds_count{plugin="roman_numerals",stage="total"} 1' in text
+
+    def test_reset(self, metrics):
+        """Vérifie la remise à zéro des métriques."""
+        metrics.observe('abaddon', 'total', 0.01)
+        metrics.reset()
+        assert metrics.to_json()['plugins'] == {}
+
+    def test_dead_thread_shards_are_folded(self, metrics):
+        """Vérifie que la partition d'un thread terminé est fusionnée puis oubliée."""
+        for _ in range(50):
+            thread = threading.Thread(target=metrics.observe, args=('kenny', 'total', 0.002))
+            thread.start()
+            thread.join()
+
+        assert len(metrics._shards) <= 1
+        assert metrics.snapshot()['kenny']['calls'] == 50
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_unknown_plugin_label(self):
+        """Vérifie qu'un nom de plugin inconnu envoyé par le client ne crée pas de série."""
+        from app.plugin_manager import PluginManager
+
+        manager = PluginManager.__new__(PluginManager)
+        manager.loaded_plugins = {}
+        manager._plugin_cache = {'caesar': {}}
+        manager.get_plugin = lambda name: None
+        service = get_metrics_service()
+        service.reset()
+
+        assert manager.execute_plugin('nom-choisi-par-le-client', {}) is None
+        assert manager.execute_plugin('caesar', {}) is None
+        snapshot = service.snapshot()
+        assert set(snapshot) == {UNKNOWN_PLUGIN, 'caesar'}
+        assert snapshot[UNKNOWN_PLUGIN]['errors'] == 1
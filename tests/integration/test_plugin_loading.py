@@ -0,0 +1,226 @@
+"""
+Tests pour le chargement différé des plugins et le cache des manifestes.
+
+Ce module vérifie qu'aucun module de plugin n'est importé au démarrage,
+que l'import a lieu au premier execute/check_code, et que les plugin.json
+inchangés ne sont ni reparsés ni réécrits en base.
+"""
+import pytest
+import sys
+import os
+import json
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.database import db
+from app.models.plugin_model import Plugin
+from app.plugin_manager import PluginManager, PythonPluginWrapper
+
+PLUGIN_SOURCE = '''
+import os
+open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'imported.flag'), 'a').write('x')
+
+class DummyLazyPlugin:
+    def execute(self, inputs):
+        return {"text_output": inputs.get("text", "").upper()}
+
+    def check_code(self, text, strict=False, allowed_chars=None, embedded=False):
+        return {"is_match": text.isupper(), "fragments": [], "score": 1.0}
+'''
+
+
+def _write_plugin(plugins_dir, version='1.0.0', description='Plugin de test'):
+    plugin_dir = os.path.join(plugins_dir, 'official', 'dummy_lazy')
+    os.makedirs(plugin_dir, exist_ok=True)
+    with open(os.path.join(plugin_dir, 'main.py'), 'w', encoding='utf-8') as f:
+        f.write(PLUGIN_SOURCE)
+    with open(os.path.join(plugin_dir, 'plugin.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'name': 'dummy_lazy',
+            'version': version,
+            'description': description,
+            'author': 'tests',
+            'plugin_type': 'python',
+            'entry_point': 'main.py',
+            'categories': ['test'],
+        }, f)
+    return plugin_dir
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Application Flask minimale avec une base de plugins temporaire."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'main.db')
+    app.config['SQLALCHEMY_BINDS'] = {'plugins': 'sqlite:///' + str(tmp_path / 'plugins.db')}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        Plugin.__table__.create(db.engines['plugins'])
+    return app
+
+
+@pytest.fixture
+def plugins_dir(tmp_path):
+    path = tmp_path / 'plugins'
+    path.mkdir()
+    return str(path)
+
+
+class TestLazyPluginLoading:
+    """Tests pour l'import différé des modules de plugins."""
+
+    def test_startup_does_not_import(self, app, plugins_dir):
+        """Vérifie que les plugins sont enregistrés sans être importés."""
+        plugin_dir = _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+
+        wrapper = manager.loaded_plugins['dummy_lazy']
+        assert isinstance(wrapper, PythonPluginWrapper)
+        assert not wrapper.is_imported
+        assert not os.path.exists(os.path.join(os.path.dirname(plugin_dir), 'imported.flag'))
+
+    def test_first_execute_imports(self, app, plugins_dir):
+        """Vérifie que le module est importé une seule fois, au premier appel."""
+        plugin_dir = _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+        wrapper = manager.loaded_plugins['dummy_lazy']
+
+        assert wrapper.execute({'text': 'abc'}) == {'text_output': 'ABC'}
+        assert wrapper.check_code('ABC')['is_match'] is True
+        assert wrapper.is_imported
+        with open(os.path.join(os.path.dirname(plugin_dir), 'imported.flag')) as f:
+            assert f.read() == 'x'
+
+    def test_instance_attribute_imports(self, app, plugins_dir):
+        """Vérifie que l'accès à _instance (utilisé par metadetection) déclenche l'import."""
+        _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+        instance = getattr(manager.loaded_plugins['dummy_lazy'], '_instance', None)
+        assert instance is not None
+        assert hasattr(instance, 'check_code')
+
+    def test_concurrent_first_access(self, app, plugins_dir):
+        """Vérifie que des accès simultanés attendent un import unique au lieu de recevoir None."""
+        import threading
+
+        plugin_dir = _write_plugin(plugins_dir)
+        with open(os.path.join(plugin_dir, 'main.py'), 'w', encoding='utf-8') as f:
+            f.write('import time\ntime.sleep(0.2)\n' + PLUGIN_SOURCE)
+        manager = PluginManager(plugins_dir, app)
+        wrapper = manager.loaded_plugins['dummy_lazy']
+
+        instances = []
+        threads = [threading.Thread(target=lambda: instances.append(wrapper._instance)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(instances) == 8 and all(instance is instances[0] for instance in instances)
+        assert instances[0] is not None
+        with open(os.path.join(os.path.dirname(plugin_dir), 'imported.flag')) as f:
+            assert f.read() == 'x'
+
+
+class TestManifestCache:
+    """Tests pour le cache des plugin.json."""
+
+    def test_unchanged_manifest_is_not_reparsed(self, app, plugins_dir):
+        """Vérifie qu'un second démarrage réutilise le cache."""
+        _write_plugin(plugins_dir)
+        PluginManager(plugins_dir, app)
+        assert os.path.exists(os.path.join(plugins_dir, '.manifest_cache.json'))
+
+        manager = PluginManager(plugins_dir, app)
+        plugin_json = os.path.join(plugins_dir, 'official', 'dummy_lazy', 'plugin.json')
+        info, changed = manager._manifest_cache.read(plugin_json)
+        assert changed is False
+        assert info['name'] == 'dummy_lazy'
+
+    def test_modified_manifest_updates_db(self, app, plugins_dir):
+        """Vérifie qu'un manifeste modifié (même version) est resynchronisé en base."""
+        _write_plugin(plugins_dir)
+        PluginManager(plugins_dir, app)
+
+        time.sleep(0.01)
+        _write_plugin(plugins_dir, description='Nouvelle description')
+        PluginManager(plugins_dir, app)
+
+        with app.app_context():
+            record = Plugin.query.filter_by(name='dummy_lazy').first()
+            assert record.description == 'Nouvelle description'
+            assert Plugin.query.count() == 1
+
+
+class TestPluginHotReload:
+    """Tests pour le rechargement incrémental des plugins."""
+
+    def _touch_source(self, plugin_dir, source):
+        path = os.path.join(plugin_dir, 'main.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_modified_plugin_is_swapped(self, app, plugins_dir):
+        """Vérifie que seul le plugin modifié est rechargé et que l'ancien wrapper reste utilisable."""
+        from app.services.plugin_watcher import PluginWatcher
+
+        plugin_dir = _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+        old_wrapper = manager.loaded_plugins['dummy_lazy']
+        assert old_wrapper.execute({'text': 'abc'}) == {'text_output': 'ABC'}
+
+        events = []
+        manager.add_reload_listener(lambda name, old, new: events.append((name, old, new)))
+        watcher = PluginWatcher(manager, use_inotify=False)
+
+        self._touch_source(plugin_dir, PLUGIN_SOURCE.replace('.upper()', '.lower()'))
+        changes = watcher.check_once()
+
+        assert changes['reloaded'] == {plugin_dir}
+        new_wrapper = manager.loaded_plugins['dummy_lazy']
+        assert new_wrapper is not old_wrapper
+        assert new_wrapper.execute({'text': 'ABC'}) == {'text_output': 'abc'}
+        assert old_wrapper.execute({'text': 'abc'}) == {'text_output': 'ABC'}
+        assert events == [('dummy_lazy', '1.0.0', '1.0.0')]
+
+        # Aucun changement : rien n'est rechargé
+        assert watcher.check_once()['reloaded'] == set()
+
+    def test_broken_plugin_keeps_previous_version(self, app, plugins_dir):
+        """Vérifie qu'un import en échec conserve l'ancienne version."""
+        from app.services.plugin_watcher import PluginWatcher
+
+        plugin_dir = _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+        old_wrapper = manager.loaded_plugins['dummy_lazy']
+        old_wrapper.execute({'text': 'abc'})
+        watcher = PluginWatcher(manager, use_inotify=False)
+
+        self._touch_source(plugin_dir, 'raise SyntaxError("boom")\n')
+        watcher.check_once()
+
+        assert manager.loaded_plugins['dummy_lazy'] is old_wrapper
+        assert manager.get_plugin_status()['dummy_lazy']['error']
+
+    def test_removed_plugin_is_unloaded(self, app, plugins_dir):
+        """Vérifie qu'un plugin supprimé disparaît de la mémoire et de la base."""
+        import shutil
+        from app.services.plugin_watcher import PluginWatcher
+
+        plugin_dir = _write_plugin(plugins_dir)
+        manager = PluginManager(plugins_dir, app)
+        watcher = PluginWatcher(manager, use_inotify=False)
+
+        shutil.rmtree(plugin_dir)
+        changes = watcher.check_once()
+
+        assert changes['removed'] == {plugin_dir}
+        assert 'dummy_lazy' not in manager.loaded_plugins
+        with app.app_context():
+            assert Plugin.query.count() == 0
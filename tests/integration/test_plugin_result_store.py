@@ -0,0 +1,192 @@
+"""
+Tests pour le stockage persistant des résultats de plugins.
+
+Ce module vérifie l'enregistrement compressé et la relecture d'un résultat,
+la réutilisation par la route d'exécution (hors erreurs, et jusqu'à la
+modification de la géocache), l'éviction des anciennes versions d'un plugin et les requêtes par zone, confiance et
+coordonnées.
+"""
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from sqlalchemy import text
+from app.database import db
+from app.models.plugin_result_model import PluginResult
+from app.routes import plugins as plugins_routes
+from app.services import plugin_result_service as store
+
+# Tables minimales (la géométrie des géocaches n'est pas utilisée ici)
+TABLES = [
+    "CREATE TABLE zone (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE geocache (id INTEGER PRIMARY KEY, gc_code TEXT, name TEXT, description TEXT)",
+    "CREATE TABLE additional_waypoint (id INTEGER PRIMARY KEY, geocache_id INTEGER, name TEXT, prefix TEXT, "
+    "lookup TEXT, note TEXT, gc_lat TEXT, gc_lon TEXT)",
+    "CREATE TABLE geocache_zone (geocache_id INTEGER, zone_id INTEGER, added_at DATETIME, "
+    "PRIMARY KEY (geocache_id, zone_id))",
+]
+
+
+def _decoded(ddm, latitude, longitude, score):
+    return {
+        'text_output': 'NORD QUARANTE HUIT ' * 20,
+        'coordinates': {'exist': True, 'ddm': ddm, 'decimal': {'latitude': latitude, 'longitude': longitude}},
+        'scoring': {'score': score},
+    }
+
+
+class FakePluginManager:
+    """Gestionnaire de plugins qui compte les exécutions."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def execute_plugin(self, plugin_name, inputs):
+        self.calls += 1
+        inputs['text'] = inputs.get('text', '').upper()  # le vrai gestionnaire normalise le texte sur place
+        return dict(self.result)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Application Flask minimale avec une base temporaire."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'main.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(plugins_routes.plugins_bp)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for statement in TABLES:
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO zone VALUES (1, 'Nord'), (2, 'Sud')"))
+            connection.execute(text("INSERT INTO geocache (id, gc_code, name) "
+                                    "VALUES (1, 'GC1', 'Un'), (2, 'GC2', 'Deux'), (3, 'GC3', 'Trois')"))
+            connection.execute(text("INSERT INTO geocache_zone (geocache_id, zone_id) VALUES (1, 1), (2, 1), (3, 2)"))
+        PluginResult.__table__.create(db.engine)
+        store._current_versions.clear()
+        yield app
+
+
+class TestPluginResultStore:
+    """Tests pour le service de stockage."""
+
+    def test_save_and_get(self, app):
+        """Vérifie la relecture, la compression et le résumé indexé."""
+        result = _decoded('N 48° 51.402 E 002° 21.048', 48.8567, 2.3508, 0.9)
+        inputs_hash = store.input_hash({'text': 'abc', 'geocache_id': 1, '_format': 'json'})
+        assert inputs_hash == store.input_hash({'geocache_id': 1, 'text': 'abc'})
+
+        record = store.save_result(1, 'caesar', '1.0.0', inputs_hash, result)
+        db.session.commit()
+        assert record.confidence_level == 'high' and record.has_coordinates and record.latitude == 48.8567
+        assert len(record.result_data) < record.result_size / 2
+        assert store.get_result(1, 'caesar', '1.0.0', inputs_hash) == result
+        assert store.get_result(1, 'caesar', '1.0.0', store.input_hash({'text': 'autre'})) is None
+
+        # Même clé : le résultat est remplacé, pas dupliqué
+        store.save_result(1, 'caesar', '1.0.0', inputs_hash, {'text_output': ''})
+        db.session.commit()
+        assert PluginResult.query.count() == 1
+        assert PluginResult.query.one().has_coordinates is False
+
+    def test_stale_versions_evicted(self, app):
+        """Vérifie la suppression des résultats d'une ancienne version, à l'enregistrement et au rechargement."""
+        store.save_result(1, 'caesar', '1.0.0', 'a', {'text_output': 'x'})
+        store.save_result(2, 'caesar', '1.0.0', 'a', {'text_output': 'y'})
+        store.save_result(1, 'atbash', '1.0.0', 'a', {'text_output': 'z'})
+        store.save_result(1, 'caesar', '1.1.0', 'a', {'text_output': 'x'})
+        db.session.commit()
+        assert sorted((r.plugin_name, r.plugin_version) for r in PluginResult.query.all()) == [
+            ('atbash', '1.0.0'), ('caesar', '1.1.0')]
+
+        listeners = []
+        manager = SimpleNamespace(app=app, add_reload_listener=listeners.append)
+        store.watch_plugin_manager(manager)
+        listeners[0]('atbash', '1.0.0', None)  # plugin supprimé
+        assert [r.plugin_name for r in PluginResult.query.all()] == ['caesar']
+
+    def test_queries(self, app):
+        """Vérifie la recherche des géocaches d'une zone avec une coordonnée de confiance élevée."""
+        store.save_result(1, 'metadetection', '1.0.0', 'a', _decoded('N 1 E 2', 1.0, 2.0, 0.8))
+        store.save_result(2, 'metadetection', '1.0.0', 'a', _decoded('N 3 E 4', 3.0, 4.0, 0.5))
+        store.save_result(2, 'caesar', '1.0.0', 'a', {'text_output': 'rien', 'scoring': {'score': 0.9}})
+        store.save_result(3, 'metadetection', '1.0.0', 'a', _decoded('N 5 E 6', 5.0, 6.0, 0.95))
+        db.session.commit()
+
+        high = store.query_results(zone_id=1, with_coordinates=True, min_confidence=store.CONFIDENCE_LEVELS['high'])
+        assert [(row['gc_code'], row['coordinates_ddm']) for row in high] == [('GC1', 'N 1 E 2')]
+        assert [row['gc_code'] for row in store.query_results(zone_id=1)] == ['GC2', 'GC1', 'GC2']
+        assert [row['plugin_name'] for row in store.query_results(geocache_id=2, plugin_name='caesar')] == ['caesar']
+
+        client = app.test_client()
+        response = client.get('/api/plugins/results?zone_id=1&confidence=high&with_coordinates=1').get_json()
+        assert [row['geocache_id'] for row in response['results']] == [1]
+        assert client.get('/api/plugins/results?confidence=haute').status_code == 400
+        detail = client.get(f"/api/plugins/results/{response['results'][0]['id']}").get_json()
+        assert detail['result']['coordinates']['ddm'] == 'N 1 E 2'
+        assert client.get('/api/plugins/results/999').status_code == 404
+
+
+class TestExecuteWithResultStore:
+    """Tests pour la réutilisation des résultats par la route d'exécution."""
+
+    def test_reuse(self, app):
+        """Vérifie que le plugin n'est exécuté qu'une fois pour les mêmes entrées et la même version."""
+        manager = FakePluginManager(_decoded('N 1 E 2', 1.0, 2.0, 0.7))
+        plugin = SimpleNamespace(name='caesar', version='1.0.0')
+        first = plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abc', 'geocache_id': '1'})
+        second = plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abc', 'geocache_id': '1'})
+        assert manager.calls == 1 and first == second
+
+        plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abd', 'geocache_id': '1'})
+        plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abc', 'geocache_id': '1',
+                                                                    'use_result_store': 'false'})
+        plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abc'})
+        assert manager.calls == 4
+
+        newer = SimpleNamespace(name='caesar', version='2.0.0')
+        plugins_routes._execute_with_result_store(manager, newer, {'text': 'abc', 'geocache_id': '1'})
+        assert manager.calls == 5
+        assert {r.plugin_version for r in PluginResult.query.all()} == {'2.0.0'}
+
+    def test_errors_not_stored(self, app):
+        """Vérifie qu'un résultat en erreur n'est pas enregistré ni réutilisé."""
+        plugin = SimpleNamespace(name='caesar', version='1.0.0')
+        for error in ({'error': 'texte vide'}, {'status': 'error', 'text_output': ''}):
+            manager = FakePluginManager(error)
+            for _ in range(2):
+                result = plugins_routes._execute_with_result_store(manager, plugin, {'text': 'abc', 'geocache_id': '1'})
+                assert result == error
+            assert manager.calls == 2
+        assert PluginResult.query.count() == 0
+
+    def test_geocache_edit_invalidates(self, app):
+        """Vérifie qu'une modification de la description ou des waypoints relance le plugin."""
+        manager = FakePluginManager({'text_output': 'waypoints analysés'})
+        plugin = SimpleNamespace(name='additional_waypoints_analyzer', version='1.0.0')
+
+        def execute():
+            plugins_routes._execute_with_result_store(manager, plugin, {'geocache_id': '1'})
+
+        execute()
+        execute()
+        assert manager.calls == 1
+
+        db.session.execute(text("UPDATE geocache SET description = 'Nouvelle énigme' WHERE id = 1"))
+        execute()
+        db.session.execute(text("INSERT INTO additional_waypoint (geocache_id, prefix, note) "
+                                "VALUES (1, 'P1', 'Compter')"))
+        execute()
+        execute()
+        assert manager.calls == 3
+
+        # Géocache inconnue : exécution directe, rien n'est enregistré
+        plugins_routes._execute_with_result_store(manager, plugin, {'geocache_id': '99'})
+        assert manager.calls == 4 and PluginResult.query.count() == 3
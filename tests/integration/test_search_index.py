@@ -0,0 +1,211 @@
+"""
+Tests pour l'index de recherche plein texte des géocaches.
+
+Ce module vérifie l'indexation initiale, la réindexation incrémentale
+déclenchée par les triggers (ajout, modification et suppression de
+géocaches, logs, notes et waypoints), la recherche insensible aux accents
+avec extraits surlignés, les filtres et la route /api/search.
+"""
+import pytest
+import sys
+import os
+import sqlite3
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.routes.search import search_bp
+from app.services import search_index_service
+from app.services.search_index_service import SearchIndex, build_match_query, html_to_text
+
+# Tables minimales (colonnes utilisées par l'index et ses filtres)
+TABLES = """
+CREATE TABLE geocache (id INTEGER PRIMARY KEY, gc_code TEXT, name TEXT, cache_type TEXT,
+                       difficulty REAL, terrain REAL, solved TEXT, description TEXT, hints TEXT);
+CREATE TABLE log (id INTEGER PRIMARY KEY, geocache_id INTEGER, text TEXT);
+CREATE TABLE note (id INTEGER PRIMARY KEY, content TEXT);
+CREATE TABLE geocache_note (geocache_id INTEGER, note_id INTEGER);
+CREATE TABLE additional_waypoint (id INTEGER PRIMARY KEY, geocache_id INTEGER, name TEXT, note TEXT);
+CREATE TABLE geocache_zone (geocache_id INTEGER, zone_id INTEGER);
+"""
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'mysteryai.db')
+    connection = sqlite3.connect(path)
+    connection.executescript(TABLES)
+    connection.execute(
+        "INSERT INTO geocache VALUES (1, 'GC1AAAA', 'La chapelle', 'Mystery', 3.5, 2, 'not_solved', "
+        "'<p>Rendez-vous devant l''<b>église</b> Saint-Étienne</p><script>var eglise = 1;</script>', "
+        "'Sous la pierre')"
+    )
+    connection.execute(
+        "INSERT INTO geocache VALUES (2, 'GC2BBBB', 'Le moulin', 'Traditional', 1.5, 1.5, 'solved', "
+        "'<p>Un vieux moulin à eau</p>', 'Magnétique')"
+    )
+    connection.execute("INSERT INTO log VALUES (1, 2, 'Trouvée près de l''eglise, merci !')")
+    connection.execute("INSERT INTO geocache_zone VALUES (1, 10)")
+    connection.commit()
+    connection.close()
+    return path
+
+
+@pytest.fixture
+def index(database):
+    index = SearchIndex(lambda: sqlite3.connect(database))
+    assert index.ensure_schema()
+    return index
+
+
+def _execute(database, sql, *params):
+    connection = sqlite3.connect(database)
+    connection.execute(sql, params)
+    connection.commit()
+    connection.close()
+
+
+def _codes(result):
+    return [r['gc_code'] for r in result['results']]
+
+
+class TestHelpers:
+    """Tests pour la préparation du texte et des requêtes."""
+
+    def test_html_to_text(self):
+        """Vérifie la suppression des balises, scripts et entités."""
+        assert html_to_text('<p>A&amp;B <script>x()</script><i>c</i></p>') == 'A&B c'
+
+    def test_build_match_query(self):
+        """Vérifie la neutralisation des opérateurs et la recherche par préfixe du dernier mot."""
+        assert build_match_query('église "NEAR(a b)" OR') == '"église" "NEAR" "a" "b" "OR"*'
+        assert build_match_query(' -- ') is None
+
+
+class TestSearchIndex:
+    """Tests pour l'indexation et la recherche."""
+
+    def test_initial_index_and_accents(self, index):
+        """Vérifie l'indexation initiale et la recherche sans tenir compte des accents."""
+        assert index.pending_count() == 2
+        result = index.search('eglise')
+        assert index.pending_count() == 0
+        assert sorted(_codes(result)) == ['GC1AAAA', 'GC2BBBB']
+
+        chapel = next(r for r in result['results'] if r['gc_code'] == 'GC1AAAA')
+        assert chapel['matches'][0]['kind'] == 'description'
+        assert "<mark>église</mark>" in chapel['matches'][0]['snippet']
+        assert 'l&#x27;' in chapel['matches'][0]['snippet']
+        assert _codes(index.search('magnetiq')) == ['GC2BBBB']
+        assert _codes(index.search('var')) == []
+
+    def test_filters(self, index):
+        """Vérifie les filtres de zone, type, difficulté, statut et type de contenu."""
+        assert _codes(index.search('eglise', zone_id=10)) == ['GC1AAAA']
+        assert _codes(index.search('eglise', cache_type='Traditional')) == ['GC2BBBB']
+        assert _codes(index.search('eglise', difficulty_min=3)) == ['GC1AAAA']
+        assert _codes(index.search('eglise', terrain_max=1.5, solved='solved')) == ['GC2BBBB']
+        assert _codes(index.search('eglise', kinds=['log'])) == ['GC2BBBB']
+
+    def test_incremental_updates(self, index, database):
+        """Vérifie que seules les géocaches modifiées sont réindexées."""
+        index.sync()
+        _execute(database, "INSERT INTO note VALUES (5, 'Code du cadenas : fontaine')")
+        _execute(database, "INSERT INTO geocache_note VALUES (1, 5)")
+        _execute(database, "INSERT INTO additional_waypoint VALUES (3, 2, 'Parking', 'Près du lavoir')")
+        assert index.pending_count() == 2
+        assert _codes(index.search('fontaine')) == ['GC1AAAA']
+        assert _codes(index.search('lavoir')) == ['GC2BBBB']
+
+        _execute(database, "UPDATE note SET content = 'Code du cadenas : statue' WHERE id = 5")
+        assert index.pending_count() == 1
+        assert _codes(index.search('fontaine')) == []
+        assert _codes(index.search('statue')) == ['GC1AAAA']
+
+        _execute(database, "UPDATE geocache SET cache_type = 'Letterbox' WHERE id = 2")
+        assert index.pending_count() == 0
+
+        _execute(database, "DELETE FROM log WHERE id = 1")
+        assert _codes(index.search('eglise')) == ['GC1AAAA']
+        _execute(database, "DELETE FROM geocache WHERE id = 1")
+        assert _codes(index.search('eglise')) == []
+        assert index.sync() == 0
+
+    def test_search_does_not_wait_for_sync(self, index, monkeypatch):
+        """Vérifie qu'une recherche ne traite qu'un lot et n'attend pas une synchronisation en cours."""
+        monkeypatch.setattr(search_index_service, 'SYNC_BATCH_SIZE', 1)
+        index.search('eglise')
+        assert index.pending_count() == 1
+
+        index._lock.acquire()
+        try:
+            start = time.perf_counter()
+            index.search('eglise')
+            assert time.perf_counter() - start < 0.5
+            assert index.pending_count() == 1
+        finally:
+            index._lock.release()
+        index.search('eglise')
+        assert index.pending_count() == 0
+
+    def test_search_with_locked_database(self, database):
+        """Vérifie qu'une base verrouillée par un autre écrivain n'empêche pas la recherche."""
+        index = SearchIndex(lambda: sqlite3.connect(database, timeout=0.1))
+        assert index.ensure_schema()
+        index.sync()
+        _execute(database, "UPDATE geocache SET name = 'La vieille chapelle' WHERE id = 1")
+
+        writer = sqlite3.connect(database)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert sorted(_codes(index.search('eglise'))) == ['GC1AAAA', 'GC2BBBB']
+            assert index.pending_count() == 1
+        finally:
+            writer.rollback()
+            writer.close()
+        index.search('eglise')
+        assert index.pending_count() == 0
+
+    def test_large_database(self, index, database):
+        """Vérifie qu'une recherche parmi des milliers de géocaches et de logs reste rapide."""
+        connection = sqlite3.connect(database)
+        connection.executemany(
+            "INSERT INTO geocache (id, gc_code, name, description) VALUES (?, ?, ?, ?)",
+            [(i, f"GC{i:05d}", f"Cache {i}", f"<p>Description numéro {i} du parcours</p>") for i in range(100, 5100)]
+        )
+        connection.executemany(
+            "INSERT INTO log (geocache_id, text) VALUES (?, ?)",
+            [(i, f"Belle balade, log {j}") for i in range(100, 5100) for j in range(3)]
+        )
+        connection.execute("UPDATE geocache SET description = '<p>Trésor caché</p>' WHERE id = 4242")
+        connection.commit()
+        connection.close()
+        index.sync()
+
+        start = time.perf_counter()
+        result = index.search('tresor')
+        assert time.perf_counter() - start < 0.1
+        assert _codes(result) == ['GC04242']
+        assert len(index.search('balade', limit=20)['results']) == 20
+
+
+class TestSearchApi:
+    """Tests pour la route /api/search."""
+
+    @pytest.fixture
+    def client(self, index, monkeypatch):
+        monkeypatch.setattr(search_index_service, '_search_index_instance', index)
+        app = Flask(__name__)
+        app.register_blueprint(search_bp)
+        return app.test_client()
+
+    def test_search(self, client):
+        """Vérifie la recherche, les paramètres invalides et l'état de l'index."""
+        response = client.get('/api/search?q=eglise&zone_id=10')
+        assert response.status_code == 200
+        assert [r['gc_code'] for r in response.get_json()['results']] == ['GC1AAAA']
+        assert client.get('/api/search').status_code == 400
+        assert client.get('/api/search?q=eglise&kinds=log,inconnu').status_code == 400
+        assert client.get('/api/search/status').get_json() == {'available': True, 'pending': 0}
@@ -0,0 +1,119 @@
+"""
+Tests pour les variantes de texte partagées (TextView).
+
+Ce module vérifie que les variantes sont identiques aux anciennes
+normalisations du gestionnaire de plugins et du scoring, qu'elles ne sont
+calculées qu'une fois par texte et que la vue est immuable.
+"""
+import pytest
+import sys
+import os
+import re
+import unicodedata
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils import text_view as text_view_module
+from app.utils.text_view import EXTRA_REPLACEMENTS, TextView, strip_accents, text_view
+
+SAMPLES = [
+    "",
+    "Rendez-vous en N 48° 51.402 E 002° 21.048",
+    "  Le cœur de l'Île\r\nà  Noël, ÆSIR   straße  ",
+    "H E L L O  W O R L D !",
+    "ﬁn ½ Ｔｅｓｔ été Ǆ ṩ",
+    "Ñandú €5 £3 ¥8 — «guillemets»",
+]
+
+
+def _old_normalize(text):
+    """Normalisation historique de PluginManager._normalize_text."""
+    normalized = text.replace('\xa0', ' ').replace('\r\n', '\n')
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def _old_remove_accents(text):
+    """Suppression historique des accents de PluginManager._remove_accents."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    result = ''.join([c for c in decomposed if not unicodedata.combining(c)])
+    for char, replacement in EXTRA_REPLACEMENTS.items():
+        result = result.replace(char, replacement)
+    return result
+
+
+class TestTextView:
+    """Tests pour la vue et ses variantes."""
+
+    @pytest.mark.parametrize('sample', SAMPLES)
+    def test_same_variants_as_before(self, sample):
+        """Vérifie l'équivalence avec les normalisations remplacées."""
+        view = TextView(sample)
+        assert view.normalized == _old_normalize(sample)
+        assert view.unaccented == _old_remove_accents(_old_normalize(sample))
+        assert strip_accents(sample) == _old_remove_accents(sample)
+        assert view.unaccented_lower == view.unaccented.lower()
+        assert view.no_spaces == sample.replace(' ', '')
+        assert view.words == re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', sample)).strip()
+
+    def test_accent_table_covers_latin(self):
+        """Vérifie caractère par caractère la table de traduction sur les plages latines."""
+        for code_point in list(range(0x80, 0x250)) + list(range(0x1E00, 0x1F00)):
+            char = chr(code_point)
+            assert strip_accents(char) == _old_remove_accents(char), hex(code_point)
+
+    def test_variants_computed_once(self, monkeypatch):
+        """Vérifie qu'une variante n'est calculée qu'une fois pour un même texte."""
+        calls = []
+        original = text_view_module.strip_accents
+        monkeypatch.setattr(text_view_module, 'strip_accents', lambda text: calls.append(text) or original(text))
+
+        text = "Texte   partagé entre plusieurs plugins"
+        first = text_view(text)
+        assert text_view(text) is first and text_view(first) is first
+        for _ in range(5):
+            assert text_view(text).unaccented == "Texte partage entre plusieurs plugins"
+        assert calls == ["Texte partagé entre plusieurs plugins"]
+
+        # Le texte normalisé repassé à text_view() n'est pas renormalisé
+        assert text_view(first.normalized)._variants['normalized'] == first.normalized
+
+    def test_immutable(self):
+        """Vérifie qu'une vue ne peut pas être modifiée."""
+        view = TextView("abc")
+        with pytest.raises(AttributeError):
+            view.raw = "def"
+        with pytest.raises(AttributeError):
+            view.extra = 1
+        assert str(view) == "abc" and view == TextView("abc") and len(view) == 3
+
+
+class TestTextViewIntegration:
+    """Tests pour l'utilisation de la vue par le scoring et le gestionnaire de plugins."""
+
+    def test_scoring_candidates(self):
+        """Vérifie que les candidats du scoring viennent de la vue partagée."""
+        from app.services.scoring_service import ScoringService
+
+        service = ScoringService.__new__(ScoringService)
+        text = "H E L L O  le   monde"
+        candidates = service._normalize_text(text)
+        assert candidates == [text, "H E L L O le monde", "HELLOlemonde", "HELLO  le   monde"]
+        assert service._normalize_text(text_view(text)) == candidates
+
+    def test_check_code_receives_strings(self):
+        """Vérifie que check_code reçoit des chaînes même si on lui passe une vue."""
+        from app.plugin_manager import PythonPluginWrapper
+
+        received = []
+
+        class Plugin:
+            def check_code(self, text, strict=False, allowed_chars=None):
+                received.append((text, allowed_chars))
+                return {'is_match': False}
+
+        wrapper = PythonPluginWrapper.__new__(PythonPluginWrapper)
+        wrapper._loaded_instance = Plugin()
+        wrapper._import_attempted = True
+        wrapper.check_code(text_view("abc"), True, allowed_chars=text_view(" "))
+        assert received == [("abc", " ")] and all(type(value) is str for value in received[0])
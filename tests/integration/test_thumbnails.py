@@ -0,0 +1,108 @@
+"""
+Tests pour les miniatures et le cache HTTP des images de géocaches.
+
+Ce module vérifie l'empreinte du contenu utilisée comme ETag (réponse 304),
+le service de l'original tant qu'une miniature n'est pas prête et, si Pillow
+est installé, la génération en arrière-plan des variantes réduites.
+"""
+import pytest
+import sys
+import os
+import io
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.routes.geocaches import geocaches_bp
+from app.services import thumbnail_service as thumbnail_module
+from app.services.thumbnail_service import ThumbnailService
+
+
+@pytest.fixture
+def images_root(tmp_path):
+    root = tmp_path / 'geocaches_images'
+    (root / 'GC12345').mkdir(parents=True)
+    (root / 'GC12345' / 'spoiler.png').write_bytes(b'\x89PNG fausse image')
+    return root
+
+
+@pytest.fixture
+def client(images_root, monkeypatch):
+    monkeypatch.setattr(thumbnail_module, '_thumbnail_service_instance', ThumbnailService(str(images_root)))
+    app = Flask(__name__)
+    app.images_folder = str(images_root)
+    app.register_blueprint(geocaches_bp)
+    return app.test_client()
+
+
+class TestImageHash:
+    """Tests pour les empreintes des images."""
+
+    def test_hash_cached_until_change(self, images_root):
+        """Vérifie que l'empreinte n'est recalculée qu'après modification du fichier."""
+        service = ThumbnailService(str(images_root))
+        path = str(images_root / 'GC12345' / 'spoiler.png')
+        first = service.image_hash(path)
+        assert service.image_hash(path) == first
+
+        with open(path, 'ab') as f:
+            f.write(b'modifiee')
+        os.utime(path, ns=(1, 1))
+        assert service.image_hash(path) != first
+
+    def test_without_pillow(self, images_root, monkeypatch):
+        """Vérifie qu'aucune variante n'est produite sans Pillow."""
+        monkeypatch.setattr(thumbnail_module, 'PIL_AVAILABLE', False)
+        service = ThumbnailService(str(images_root))
+        assert service.get(str(images_root / 'GC12345' / 'spoiler.png'), 'thumb', wait=True) is None
+
+
+class TestServeImage:
+    """Tests pour la route /geocaches_images/<path>."""
+
+    def test_etag_and_304(self, client):
+        """Vérifie l'ETag sur le contenu et la réponse 304."""
+        response = client.get('/geocaches_images/GC12345/spoiler.png')
+        assert response.status_code == 200
+        assert response.data == b'\x89PNG fausse image'
+        etag = response.headers['ETag']
+
+        again = client.get('/geocaches_images/GC12345/spoiler.png', headers={'If-None-Match': etag})
+        assert again.status_code == 304
+        assert again.data == b''
+
+    def test_thumbnail_falls_back_to_original(self, client, monkeypatch):
+        """Vérifie que l'original est servi tant que la miniature n'existe pas."""
+        monkeypatch.setattr(thumbnail_module, 'PIL_AVAILABLE', False)
+        response = client.get('/geocaches_images/GC12345/spoiler.png?size=thumb')
+        assert response.status_code == 200
+        assert response.data == b'\x89PNG fausse image'
+
+    def test_not_found(self, client):
+        """Vérifie le refus des fichiers absents ou hors du dossier des images."""
+        assert client.get('/geocaches_images/GC12345/absente.png').status_code == 404
+        assert client.get('/geocaches_images/../secret.txt').status_code == 404
+
+
+class TestThumbnailGeneration:
+    """Tests pour la génération des variantes (nécessite Pillow)."""
+
+    def test_thumbnail_generated_and_served(self, client, images_root):
+        """Vérifie la génération en arrière-plan puis le service de la miniature."""
+        Image = pytest.importorskip('PIL.Image')
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1500), (200, 30, 30)).save(buffer, 'JPEG')
+        (images_root / 'GC12345' / 'photo.jpg').write_bytes(buffer.getvalue())
+
+        service = thumbnail_module.get_thumbnail_service()
+        source = str(images_root / 'GC12345' / 'photo.jpg')
+        thumbnail_path, _ = service.get(source, 'thumb', wait=True)
+        with Image.open(thumbnail_path) as thumbnail:
+            assert thumbnail.size == (320, 240)
+
+        response = client.get('/geocaches_images/GC12345/photo.jpg?size=thumb')
+        assert response.mimetype == 'image/webp'
+        assert len(response.data) < len(buffer.getvalue())
+        assert client.get('/geocaches_images/GC12345/photo.jpg?size=thumb',
+                          headers={'If-None-Match': response.headers['ETag']}).status_code == 304
@@ -0,0 +1,92 @@
+"""
+Tests pour le traçage des requêtes.
+
+Ce module vérifie l'imbrication des spans, le formatage des messages à la demande
+et l'activation du traçage par en-tête HTTP.
+"""
+import pytest
+import sys
+import os
+from flask import Flask
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.tracing_service import tracer, init_tracing, TRACE_HEADER, TRACE_ID_HEADER
+from app.routes.coordinates import coordinates_bp, detect_gps_coordinates
+from app.routes.traces import traces_bp
+
+
+@pytest.fixture
+def client():
+    """Application Flask minimale avec le traçage activé."""
+    app = Flask(__name__)
+    app.register_blueprint(coordinates_bp)
+    app.register_blueprint(traces_bp)
+    init_tracing(app)
+    return app.test_client()
+
+
+class TestTracing:
+    """Tests pour le service de traçage."""
+
+    def test_disabled_by_default(self):
+        """Sans trace en cours, aucun span n'est créé."""
+        assert tracer.enabled is False
+        detect_gps_coordinates("N 48° 33.787' E 006° 38.803'")
+        assert tracer.enabled is False
+
+    def test_nested_spans(self):
+        """Vérifie l'imbrication des spans de détection GPS."""
+        tracer.start_trace('test')
+        detect_gps_coordinates("N 48° 33.787' E 006° 38.803'")
+        trace = tracer.finish_trace()
+
+        root = trace.to_dict()['root']
+        detection = root['children'][0]
+        assert detection['name'] == 'detect_gps_coordinates'
+        assert any(child['name'].startswith('_detect_') for child in detection['children'])
+        assert tracer.enabled is False
+
+    def test_lazy_message_formatting(self):
+        """Les messages ne sont formatés que si une trace est en cours, au moment de l'appel."""
+        class Counting:
+            calls = 0
+
+            def __str__(self):
+                Counting.calls += 1
+                return 'valeur'
+
+        tracer.log('message %s', Counting())
+        assert Counting.calls == 0
+
+        inputs = {'text': 'avant'}
+        tracer.start_trace('test')
+        tracer.log('message %s', Counting())
+        tracer.log('inputs %s', inputs)
+        inputs['text'] = 'après'
+        trace = tracer.finish_trace()
+        assert Counting.calls == 1
+
+        events = trace.to_dict()['root']['events']
+        assert [event['message'] for event in events] == ['message valeur', "inputs {'text': 'avant'}"]
+
+    def test_trace_header(self, client):
+        """Le traçage est activé par l'en-tête et consultable via /api/traces/<id>."""
+        response = client.post(
+            '/api/detect_coordinates',
+            json={'text': "N 48° 33.787' E 006° 38.803'"},
+            headers={TRACE_HEADER: '1'}
+        )
+        trace_id = response.headers.get(TRACE_ID_HEADER)
+        assert trace_id
+        assert 'detect_gps_coordinates' in response.headers['Server-Timing']
+
+        detail = client.get(f'/api/traces/{trace_id}')
+        assert detail.status_code == 200
+        assert detail.get_json()['id'] == trace_id
+
+    def test_no_trace_without_header(self, client):
+        """Sans en-tête, la réponse ne contient pas d'identifiant de trace."""
+        response = client.post('/api/detect_coordinates', json={'text': 'rien'})
+        assert TRACE_ID_HEADER not in response.headers
@@ -0,0 +1,105 @@
+"""
+Tests pour la segmentation des textes sans espaces.
+
+Ce module vérifie la segmentation de coût minimal sur un petit lexique, le
+regroupement des lettres inconnues, l'exclusion des mots courts, le mémo
+borné des blocs, les lexiques wordfreq par langue (français notamment) et
+l'utilisation du segmenteur par le service de scoring, dont le classement
+des décalages d'une force brute de César.
+"""
+import math
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services import word_segmenter
+from app.services.word_segmenter import WordSegmenter, get_word_segmenter
+from app.services.scoring_service import ScoringService
+from app.tools.benchmark import _word_recall
+from app.tools.benchmark_corpus import caesar
+
+LEXICON = {
+    'la': 0.05, 'cache': 0.001, 'est': 0.02, 'sous': 0.005, 'le': 0.05, 'pont': 0.0005,
+    'pres': 0.001, 'de': 0.06, 'riviere': 0.0002, 'rive': 0.0001, 'ere': 0.00001,
+    'forêt': 0.0003, "aujourd'hui": 0.001, 'pr': 0.01, 's': 0.01,
+}
+SHORT_WORDS = {'la', 'le', 'de'}
+
+
+class TestWordSegmenter:
+    """Tests pour le segmenteur sur un lexique réduit."""
+
+    def test_minimal_cost(self):
+        """Vérifie la segmentation, l'insensibilité à la casse et aux accents, et les chiffres."""
+        segmenter = WordSegmenter(LEXICON, short_words=SHORT_WORDS)
+        assert segmenter.segment("LACACHEESTSOUSLEPONTPRESDELARIVIERE") == [
+            'la', 'cache', 'est', 'sous', 'le', 'pont', 'pres', 'de', 'la', 'riviere']
+        assert segmenter.segment("LaForêtN48E002") == ['la', 'foret', 'n', '48', 'e', '002']
+        assert segmenter.segment("") == [] and segmenter.segment("!!") == []
+        assert segmenter.cost('RIVIÈRE') == pytest.approx(-math.log(0.0002))
+        assert segmenter.cost('riv') is None and segmenter.cost("aujourd'hui") is None
+        assert segmenter.size == 12  # mots avec apostrophe et mots courts hors liste ignorés
+
+    def test_unknown_letters_grouped(self):
+        """Vérifie qu'une suite de lettres inconnues forme un seul segment."""
+        segmenter = WordSegmenter(LEXICON, short_words=SHORT_WORDS)
+        assert segmenter.segment("XQZLACACHEWKV") == ['xqz', 'la', 'cache', 'wkv']
+        assert segmenter.segment("XQZ") == ['xqz']
+
+    def test_short_words(self):
+        """Vérifie que seuls les mots courts de la langue sont gardés dans le lexique."""
+        segmenter = WordSegmenter(LEXICON, short_words=SHORT_WORDS)
+        assert segmenter.cost('pr') is None and segmenter.cost('s') is None and segmenter.cost('DE') is not None
+        assert segmenter.segment("PRSLECACHE") == ['prs', 'le', 'cache']
+        assert WordSegmenter(LEXICON).cost('la') is None
+
+    def test_memo(self):
+        """Vérifie que les variantes d'un texte (casse, ponctuation) réutilisent ses blocs, et la borne du mémo."""
+        segmenter = WordSegmenter(LEXICON, memo_size=2, short_words=SHORT_WORDS)
+        segmenter.segment("lacache 48 lepont")
+        segmenter.segment("LACACHE-LEPONT")
+        assert (segmenter.memo_hits, segmenter.memo_misses) == (2, 2)
+        segmenter.segment("sous")
+        assert list(segmenter._memo) == ['lepont', 'sous']
+        assert segmenter.segment_many(["lepont", "sous"]) == [['le', 'pont'], ['sous']]
+
+
+class TestLanguageLexicons:
+    """Tests pour les lexiques wordfreq."""
+
+    def test_french(self):
+        """Vérifie la segmentation d'un texte français, mal découpé par un modèle anglais."""
+        words = "rendez vous au pied du grand chene pres de la riviere".split()
+        segments = get_word_segmenter('fr').segment(''.join(words).upper())
+        assert _word_recall(words, segments) == len(words)
+        assert get_word_segmenter('fr') is get_word_segmenter('fr')
+
+    def test_english_and_unknown_language(self, monkeypatch):
+        """Vérifie l'anglais et l'absence de segmenteur pour une langue sans lexique."""
+        assert get_word_segmenter('en').segment("THECACHEISUNDERTHEBRIDGE") == [
+            'the', 'cache', 'is', 'under', 'the', 'bridge']
+        monkeypatch.setattr(word_segmenter, '_word_segmenters', {})
+        assert get_word_segmenter('xx') is None
+
+
+class TestScoringIntegration:
+    """Tests pour la segmentation du service de scoring."""
+
+    def test_detect_and_segment(self):
+        """Vérifie que le texte sans espaces est segmenté avec le lexique de la langue."""
+        service = ScoringService.__new__(ScoringService)
+        assert service._detect_and_segment("LESCOORDONNEESSONTSOUSLEPONT", 'fr') == (
+            'fr', ['les', 'coordonnees', 'sont', 'sous', 'le', 'pont'])
+        assert service._detect_and_segment("deux mots", 'fr') == ('fr', ['deux', 'mots'])
+
+    def test_caesar_bruteforce_ranking(self):
+        """Vérifie que le bon décalage de César d'un texte sans espaces devance tous les autres."""
+        plain = "RENDEZVOUSAUPIEDDUGRANDCHENEPRESDELARIVIERE"
+        with patch.object(ScoringService, 'is_scoring_enabled', return_value=True):
+            service = ScoringService()
+            scores = {shift: service.score_text(caesar(plain, shift))['score'] for shift in range(26)}
+        assert max(scores, key=scores.get) == 0, sorted(scores.items(), key=lambda item: -item[1])[:3]
@@ -0,0 +1,251 @@
+"""
+Tests pour la résolution par lot sur une zone.
+
+Ce module vérifie l'exécution d'un plugin sur les géocaches d'une zone dans
+le processus courant et dans un pool de processus, le saut des géocaches
+inchangées, la reprise après interruption (compteurs relus dans la table),
+le tri de la table des résultats, les waypoints transmis aux pipelines, la
+journalisation des processus de calcul et les routes /api/zones/<id>/batch.
+"""
+import pytest
+import sys
+import os
+import json
+import multiprocessing
+from types import SimpleNamespace
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import Flask
+from app.routes import zone_batch
+from app.services import zone_batch_service
+from app.services.analysis_pipeline_service import geocache_fingerprint
+from app.services.zone_batch_service import (WAYPOINT_FIELDS, ZoneBatchStore, build_target, run_zone_batch,
+                                             summarize_result)
+from app.utils.logger import setup_logger
+
+# Plugin de test : renvoie la description, avec un score proportionnel à sa longueur
+PLUGIN_CODE = '''
+class EchoTextPlugin:
+    def execute(self, inputs):
+        text = inputs.get("text", "")
+        if "ERREUR" in text:
+            raise ValueError("texte illisible")
+        return {"text_output": text, "scoring": {"score": round(len(text) / 100, 2)}}
+'''
+
+MANIFEST = {
+    'name': 'echo_text', 'version': '1.0.0', 'plugin_type': 'python', 'entry_point': 'main.py',
+}
+
+DESCRIPTIONS = {
+    1: "Rendez-vous en N 48° 51.402 E 002° 21.048 pour trouver la boite",
+    2: "Aucune coordonnee ici",
+    3: "Encore un texte sans coordonnees mais bien plus long que les autres pour le score",
+    4: "ERREUR",
+}
+
+
+class FakeJob:
+    """JobContext minimal : enregistre les rapports et peut simuler une interruption."""
+
+    def __init__(self, checkpoint=None, stop_after=None):
+        self.checkpoint = checkpoint
+        self.reports = []
+        self.stop_after = stop_after
+
+    def report(self, progress=None, message=None, checkpoint=None, **data):
+        self.reports.append((progress, message))
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        if self.stop_after is not None and len(self.reports) >= self.stop_after:
+            raise KeyboardInterrupt
+
+    def check_cancelled(self):
+        pass
+
+
+@pytest.fixture
+def worker_config(tmp_path):
+    plugin_dir = tmp_path / 'plugins' / 'echo_text'
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / 'main.py').write_text(PLUGIN_CODE, encoding='utf-8')
+    (plugin_dir / 'plugin.json').write_text(json.dumps(MANIFEST), encoding='utf-8')
+    return {
+        'plugins_dir': str(tmp_path / 'plugins'),
+        'plugin_records': [{'name': 'echo_text', 'path': str(plugin_dir), 'metadata_json': json.dumps(MANIFEST)}],
+        'app_config': None,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ZoneBatchStore(str(tmp_path / 'zone_batch.db'))
+
+
+def _tasks(descriptions=DESCRIPTIONS):
+    return [{'geocache_id': geocache_id, 'gc_code': f'GC{geocache_id}', 'name': f'Cache {geocache_id}',
+             'description': text, 'fingerprint': f'{geocache_id}:{len(text)}'}
+            for geocache_id, text in descriptions.items()]
+
+
+def _target(worker_config, version=None):
+    records = worker_config['plugin_records']
+    if version:
+        records = [dict(records[0], metadata_json=json.dumps(dict(MANIFEST, version=version)))]
+    # Scoring désactivé : il lit ses paramètres en base, absente ici
+    return build_target('echo_text', records, {'enable_scoring': False})
+
+
+class TestZoneBatch:
+    """Tests pour l'exécution d'un lot."""
+
+    def test_run_and_skip_unchanged(self, store, worker_config):
+        """Vérifie les résultats, puis que seules les géocaches modifiées ou en erreur sont retraitées."""
+        target = _target(worker_config)
+        summary = run_zone_batch(1, target, _tasks(), store, worker_config, processes=1)
+        assert summary == {'total': 4, 'processed': 4, 'skipped': 0, 'errors': 1, 'with_coordinates': 1,
+                           'processes': 1}
+        first = store.result(1, 'echo_text', 1)
+        assert first['status'] == 'ok' and first['confidence'] == 0.63
+        assert round(first['latitude'], 4) == 48.8567 and round(first['longitude'], 4) == 2.3508
+        assert store.result(1, 'echo_text', 4)['error'] == 'texte illisible'
+
+        descriptions = dict(DESCRIPTIONS)
+        descriptions[2] = "Nouvelle description"
+        del descriptions[3]
+        summary = run_zone_batch(1, target, _tasks(descriptions), store, worker_config, processes=1)
+        assert (summary['processed'], summary['skipped']) == (2, 1)
+        assert store.result(1, 'echo_text', 3) is None  # géocache retirée de la zone
+
+        # Nouvelle version du plugin : tout est retraité
+        summary = run_zone_batch(1, _target(worker_config, '1.1.0'), _tasks(descriptions), store, worker_config,
+                                 processes=1)
+        assert (summary['processed'], summary['skipped']) == (3, 0)
+
+    def test_process_pool(self, store, worker_config, monkeypatch):
+        """Vérifie l'exécution dans un pool de processus (résultats dans l'ordre des tâches)."""
+        monkeypatch.setattr(zone_batch_service, 'SAVE_EVERY', 2)
+        job = FakeJob()
+        summary = run_zone_batch(1, _target(worker_config), _tasks(), store, worker_config, processes=2, job=job)
+        assert summary['processed'] == 4 and summary['processes'] == 2 and summary['errors'] == 1
+        assert [progress for progress, _ in job.reports] == [50, 100, 100]
+        assert round(store.result(1, 'echo_text', 1)['coordinates']['latitude'], 4) == 48.8567
+
+    def test_resume_after_interruption(self, store, worker_config, monkeypatch):
+        """Vérifie qu'un lot interrompu reprend sans retraiter les géocaches déjà enregistrées."""
+        monkeypatch.setattr(zone_batch_service, 'SAVE_EVERY', 2)
+        target = _target(worker_config)
+        job = FakeJob(stop_after=1)
+        with pytest.raises(KeyboardInterrupt):
+            run_zone_batch(1, target, _tasks(), store, worker_config, processes=1, job=job)
+        assert {key: value for key, value in job.checkpoint.items() if key != 'started_at'} == {
+            'processed': 2, 'errors': 0, 'with_coordinates': 1}
+
+        resumed = FakeJob(checkpoint=job.checkpoint)
+        summary = run_zone_batch(1, target, _tasks(), store, worker_config, processes=1, job=resumed)
+        assert summary == {'total': 4, 'processed': 4, 'skipped': 0, 'errors': 1, 'with_coordinates': 1,
+                           'processes': 1}
+        assert resumed.reports[-1][1] == '4/4 géocaches (1 erreur(s))'
+
+    def test_resume_counts_from_store(self, store, worker_config, monkeypatch):
+        """Vérifie qu'une reprise (avec force ou après une erreur) ne compte pas deux fois les géocaches."""
+        monkeypatch.setattr(zone_batch_service, 'SAVE_EVERY', 1)
+        target = _target(worker_config)
+        job = FakeJob(stop_after=4)
+        with pytest.raises(KeyboardInterrupt):
+            run_zone_batch(1, target, _tasks(), store, worker_config, processes=1, force=True, job=job)
+
+        for force in (False, True):
+            resumed = FakeJob(checkpoint=job.checkpoint)
+            summary = run_zone_batch(1, target, _tasks(), store, worker_config, processes=1, force=force,
+                                     job=resumed)
+            assert summary == {'total': 4, 'processed': 4, 'skipped': 0, 'errors': 1, 'with_coordinates': 1,
+                               'processes': 1}
+            assert resumed.reports == [(100, '4/4 géocaches (1 erreur(s))')]
+
+    def test_sorting(self, store, worker_config):
+        """Vérifie le tri par confiance et par coordonnées, et les filtres."""
+        run_zone_batch(1, _target(worker_config), _tasks(), store, worker_config, processes=1)
+        by_confidence = store.results(1, 'echo_text')
+        assert by_confidence['total'] == 4
+        assert [row['geocache_id'] for row in by_confidence['results']] == [3, 1, 2, 4]
+        by_coordinates = store.results(1, 'echo_text', sort='coordinates')
+        assert [row['geocache_id'] for row in by_coordinates['results']] == [1, 3, 2, 4]
+        assert [row['geocache_id'] for row in store.results(1, 'echo_text', with_coordinates=True)['results']] == [1]
+        assert store.results(1, 'echo_text', min_confidence=0.5)['total'] == 2
+        with pytest.raises(ValueError):
+            store.results(1, 'echo_text', sort='inconnu')
+        assert store.summary(1)[0]['with_coordinates'] == 1
+
+    def test_summarize_result(self):
+        """Vérifie le résumé d'un résultat de pipeline (coordonnées et meilleure confiance imbriquées)."""
+        result = {'combined_results': {
+            'formula_parser': {'coordinates': []},
+            'metadetection': {'result': {'decoded_results': [
+                {'decoded_text': 'a', 'scoring': {'score': 0.3}},
+                {'decoded_text': 'b', 'scoring': {'score': 0.8}},
+            ]}},
+            'color_text_detector': {'coordinates': {'exist': True, 'ddm': 'N 1 E 2',
+                                                    'decimal': {'latitude': 1.0, 'longitude': 2.0}}},
+        }}
+        assert summarize_result(result) == (0.8, {'ddm': 'N 1 E 2', 'latitude': 1.0, 'longitude': 2.0})
+        assert summarize_result({'text_output': ''}) == (None, None)
+
+
+    def test_pipeline_receives_waypoints(self, monkeypatch):
+        """Vérifie que le pipeline reçoit les waypoints de la tâche (même empreinte qu'en base)."""
+        waypoint = SimpleNamespace(prefix='P1', lookup='LK', name='Parking', gc_lat='N 48° 51.000',
+                                   gc_lon='E 002° 21.000', note='Compter les bancs')
+        stored = SimpleNamespace(id=7, description="Texte", additional_waypoints=[waypoint])
+        task = {'geocache_id': 7, 'gc_code': 'GC7', 'description': "Texte",
+                'waypoints': [{field: getattr(waypoint, field) for field in WAYPOINT_FIELDS}],
+                'fingerprint': geocache_fingerprint(stored)}
+
+        analyzed = []
+
+        class FakePipeline:
+            def analyze(self, geocache, plugin_json, plugin_manager, use_cache=True):
+                analyzed.append(geocache)
+                yield {'done': True, 'combined_results': {}, 'primary_coordinates': None}
+
+        monkeypatch.setattr(zone_batch_service, '_pipeline_service', FakePipeline())
+        zone_batch_service._run_pipeline(None, {'plugin_json': {}}, task)
+        assert analyzed[0].additional_waypoints[0].note == 'Compter les bancs'
+        assert geocache_fingerprint(analyzed[0]) == task['fingerprint']
+
+    def test_worker_logger_has_no_file(self, tmp_path, monkeypatch):
+        """Vérifie qu'un processus de calcul ne crée ni ne tronque le fichier de logs."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(multiprocessing, 'parent_process', lambda: object())
+        try:
+            setup_logger()
+            assert not (tmp_path / 'logs').exists()
+        finally:
+            monkeypatch.undo()
+            setup_logger()
+
+
+class TestZoneBatchApi:
+    """Tests pour les routes de consultation des résultats."""
+
+    @pytest.fixture
+    def client(self, store, worker_config, monkeypatch):
+        monkeypatch.setattr(zone_batch_service, '_zone_batch_store_instance', store)
+        run_zone_batch(7, _target(worker_config), _tasks(), store, worker_config, processes=1)
+        app = Flask(__name__)
+        app.register_blueprint(zone_batch.zone_batch_bp)
+        return app.test_client()
+
+    def test_results(self, client):
+        """Vérifie la table triée, le résultat complet, le résumé et la suppression."""
+        page = client.get('/api/zones/7/batch/results?target=echo_text&sort=confidence&order=asc&limit=2').get_json()
+        assert page['total'] == 4 and [row['geocache_id'] for row in page['results']] == [2, 1]
+        assert client.get('/api/zones/7/batch/results').status_code == 400
+        assert client.get('/api/zones/7/batch/results?target=echo_text&sort=x').status_code == 400
+        detail = client.get('/api/zones/7/batch/results/1?target=echo_text').get_json()
+        assert detail['result']['text_output'].startswith('Rendez-vous')
+        assert client.get('/api/zones/7/batch/results/99?target=echo_text').status_code == 404
+        assert client.get('/api/zones/7/batch').get_json()['targets'][0]['results'] == 4
+        assert client.delete('/api/zones/7/batch?target=echo_text').get_json() == {'deleted': 4}
@@ -0,0 +1,153 @@
+"""
+Tests pour les opérations ensemblistes sur l'appartenance aux zones.
+
+Ce module vérifie l'ajout, le retrait et le déplacement de géocaches entre
+zones directement sur la table geocache_zone, la sélection par filtre
+(type, D/T, statut, emprise, refus d'une modification sans filtre) et la
+suppression d'une zone avec ses géocaches orphelines.
+"""
+import pytest
+import sys
+import os
+import time
+
+# Ajouter le répertoire racine au chemin Python pour pouvoir importer les modules du projet
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from app.services import zone_membership_service as zones
+
+# Tables minimales ; la géométrie est stockée en WKT et lue par ST_X/ST_Y ci-dessous
+TABLES = [
+    "CREATE TABLE zone (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE geocache (id INTEGER PRIMARY KEY, gc_code TEXT, cache_type TEXT, difficulty REAL, "
+    "terrain REAL, solved TEXT, location TEXT)",
+    "CREATE TABLE geocache_zone (geocache_id INTEGER REFERENCES geocache(id), zone_id INTEGER REFERENCES zone(id), "
+    "added_at DATETIME, PRIMARY KEY (geocache_id, zone_id))",
+    "CREATE TABLE log (id INTEGER PRIMARY KEY, geocache_id INTEGER REFERENCES geocache(id))",
+    "CREATE TABLE additional_waypoint (id INTEGER PRIMARY KEY, geocache_id INTEGER REFERENCES geocache(id))",
+    "CREATE TABLE checker (id INTEGER PRIMARY KEY, geocache_id INTEGER REFERENCES geocache(id))",
+    "CREATE TABLE geocache_image (id INTEGER PRIMARY KEY, geocache_id INTEGER REFERENCES geocache(id), "
+    "parent_image_id INTEGER REFERENCES geocache_image(id))",
+    "CREATE TABLE geocache_attribute (geocache_id INTEGER REFERENCES geocache(id), attribute_id INTEGER)",
+    "CREATE TABLE geocache_note (geocache_id INTEGER REFERENCES geocache(id), note_id INTEGER)",
+    "CREATE TABLE plugin_result (id INTEGER PRIMARY KEY, geocache_id INTEGER REFERENCES geocache(id))",
+]
+
+
+def _coordinate(wkt, index):
+    return float(wkt[wkt.index('(') + 1:wkt.index(')')].split()[index])
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'zones.db'}")
+
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+        dbapi_connection.create_function('ST_X', 1, lambda wkt: _coordinate(wkt, 0))
+        dbapi_connection.create_function('ST_Y', 1, lambda wkt: _coordinate(wkt, 1))
+
+    with engine.begin() as connection:
+        for statement in TABLES:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO zone (id, name) VALUES (1, 'Nord'), (2, 'Sud'), (3, 'Vide')"))
+        connection.execute(text(
+            "INSERT INTO geocache VALUES "
+            "(1, 'GC1', 'Mystery', 3.5, 2, 'not_solved', 'POINT(6.1 49.6)'), "
+            "(2, 'GC2', 'Traditional', 1.5, 1.5, 'solved', 'POINT(6.2 49.7)'), "
+            "(3, 'GC3', 'Mystery', 4.5, 4, 'solved', 'POINT(2.3 48.8)')"
+        ))
+        connection.execute(text("INSERT INTO geocache_zone (geocache_id, zone_id) VALUES (1, 1), (2, 1), (2, 2), (3, 2)"))
+        connection.execute(text("INSERT INTO log (geocache_id) VALUES (1), (1), (2)"))
+        connection.execute(text("INSERT INTO plugin_result (geocache_id) VALUES (1), (3)"))
+        connection.execute(text("INSERT INTO geocache_image (id, geocache_id) VALUES (1, 1)"))
+        connection.execute(text("INSERT INTO geocache_image (id, geocache_id, parent_image_id) VALUES (2, 1, 1)"))
+
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _members(session, zone_id):
+    rows = session.execute(text("SELECT geocache_id FROM geocache_zone WHERE zone_id = :z ORDER BY geocache_id"),
+                           {'z': zone_id})
+    return [row[0] for row in rows]
+
+
+class TestMembership:
+    """Tests pour l'ajout, le retrait et le déplacement par liste d'identifiants."""
+
+    def test_add_and_remove(self, session, monkeypatch):
+        """Vérifie que les doublons et identifiants inconnus sont ignorés, même sur plusieurs lots."""
+        monkeypatch.setattr(zones, 'CHUNK_SIZE', 2)
+        assert zones.add_geocaches_to_zone(3, [1, 2, 2, 3, 99], session=session) == 3
+        assert zones.add_geocaches_to_zone(3, ['1', 2], session=session) == 0
+        assert _members(session, 3) == [1, 2, 3]
+        assert zones.remove_geocaches_from_zone(3, [3, 1, 99], session=session) == 2
+        assert _members(session, 3) == [2]
+
+    def test_move(self, session):
+        """Vérifie que seules les géocaches de la zone source sont déplacées."""
+        assert zones.move_geocaches_to_zone(1, 2, [1, 2, 3], session=session) == {'moved': 2, 'added': 1}
+        assert _members(session, 1) == []
+        assert _members(session, 2) == [1, 2, 3]
+
+    def test_large_move(self, session):
+        """Vérifie que déplacer des milliers de géocaches reste quasi instantané."""
+        session.execute(text("INSERT INTO geocache (id, gc_code, location) VALUES (:id, :code, 'POINT(0 0)')"),
+                        [{'id': i, 'code': f'GC{i}'} for i in range(100, 5100)])
+        zones.add_geocaches_to_zone(1, range(100, 5100), session=session)
+        start = time.perf_counter()
+        result = zones.move_geocaches_to_zone(1, 3, range(100, 5100), session=session)
+        assert time.perf_counter() - start < 1.0
+        assert result == {'moved': 5000, 'added': 5000}
+        assert len(_members(session, 3)) == 5000
+
+
+class TestFilters:
+    """Tests pour la sélection par filtre."""
+
+    def test_count(self, session):
+        """Vérifie chaque critère de filtre."""
+        assert zones.count_geocaches(session=session) == 3
+        assert zones.count_geocaches(session=session, source_zone_id=2) == 2
+        assert zones.count_geocaches(session=session, cache_types=['Mystery']) == 2
+        assert zones.count_geocaches(session=session, difficulty_min=2, terrain_max=3) == 1
+        assert zones.count_geocaches(session=session, solved=['solved'], source_zone_id=1) == 1
+        assert zones.count_geocaches(session=session, bbox=[49, 6, 50, 7]) == 2
+
+    def test_add_and_remove_by_filter(self, session):
+        """Vérifie l'ajout et le retrait d'une sélection sans liste d'identifiants."""
+        assert zones.add_geocaches_by_filter(3, session=session, cache_types=['Mystery']) == 2
+        assert zones.add_geocaches_by_filter(3, session=session, bbox=[49, 6, 50, 7]) == 1
+        assert _members(session, 3) == [1, 2, 3]
+        assert zones.remove_geocaches_by_filter(2, session=session, source_zone_id=1) == 1
+        assert _members(session, 2) == [3]
+
+    def test_no_filter_requires_all(self, session):
+        """Vérifie qu'un ajout ou un retrait sans filtre est refusé sauf avec all_geocaches."""
+        with pytest.raises(ValueError):
+            zones.add_geocaches_by_filter(3, session=session)
+        with pytest.raises(ValueError):
+            zones.remove_geocaches_by_filter(1, session=session, cache_types=[])
+        assert _members(session, 3) == [] and _members(session, 1) == [1, 2]
+        assert zones.add_geocaches_by_filter(3, session=session, all_geocaches=True) == 3
+        assert zones.remove_geocaches_by_filter(1, session=session, all_geocaches=True) == 2
+
+
+class TestDeleteZone:
+    """Tests pour la suppression d'une zone."""
+
+    def test_orphans_deleted(self, session):
+        """Vérifie que seules les géocaches propres à la zone sont supprimées avec leurs dépendances."""
+        assert zones.delete_zone(1, session=session) == {'deleted_geocaches': 1, 'detached_geocaches': 1}
+        session.commit()
+        assert [row[0] for row in session.execute(text("SELECT id FROM geocache ORDER BY id"))] == [2, 3]
+        assert [row[0] for row in session.execute(text("SELECT geocache_id FROM log"))] == [2]
+        assert session.execute(text("SELECT COUNT(*) FROM geocache_image")).scalar() == 0
+        assert [row[0] for row in session.execute(text("SELECT geocache_id FROM plugin_result"))] == [3]
+        assert session.execute(text("SELECT COUNT(*) FROM zone WHERE id = 1")).scalar() == 0
+        assert _members(session, 2) == [2, 3]